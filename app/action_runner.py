@@ -2,30 +2,39 @@ import argparse
 import json
 import os
 import subprocess
+from typing import List
 
 from app import config
 from core.parsers.contribution_builder import (
+    build_contributions_index,
     get_contribution,
-    get_previous_contributions,
 )
 from core.parsers.metrics_extractor_factory import MetricsExtractorFactory
+from core.parsers.parse_cache import ParseCache
 from core.parsers.process_metric_calculation import ProcessMetrics
+from core.parsers.terrametrics_cache import TerraMetricsCache
 from core.use_cases.analyze_tf_code import AnalyzeTFCode
 from core.use_cases.detect_tf_changes import DetectTFChanges
 from core.use_cases.feature_vector_builder import FeatureVectorBuilder
 from core.use_cases.report_generator import ReportGenerator
+from infrastructure.git.block_history_store import open_synced_store
 from infrastructure.git.git_adapter import GitAdapter
 from infrastructure.ml.defect_history_manager import (
     load_defect_history,
     update_defect_history,
 )
+from infrastructure.ml.ensemble_model import EnsembleModel
+from infrastructure.ml.feature_store import FeatureStore
 from infrastructure.ml.model_factory import ModelFactory
-from utils.logger_utils import logger
+from utils.logger_utils import configure_logging, logger
 
-subprocess.run(
-    ["git", "config", "--global", "--add", "safe.directory", "/github/workspace"],
-    check=False,
-)
+
+def trust_github_workspace():
+    """Déclare le dépôt monté par GitHub Actions comme sûr pour Git."""
+    subprocess.run(
+        ["git", "config", "--global", "--add", "safe.directory", "/github/workspace"],
+        check=False,
+    )
 
 
 def verify_jar():
@@ -35,13 +44,25 @@ def verify_jar():
         raise SystemExit(1)
 
 
-def run_prediction_flow(model_type: str):
-    logger.info("Formatage des fichiers Terraform (terraform fmt)...")
-    run_terraform_fmt(config.REPO_PATH)
+def run_prediction_flow(model_type: str, members: List[str] = None):
+    logger.info(f"Chargement du modèle : {model_type}")
+    model = ModelFactory.get_model(model_type, members)
+    logger.info(model.describe())
+    ensemble = isinstance(model, EnsembleModel)
 
+    # Ensemble : une seule extraction pour l'union des schémas des modèles
     logger.info("Construction des vecteurs de caractéristiques...")
     builder = FeatureVectorBuilder(
-        config.REPO_PATH, config.TERRAMETRICS_JAR_PATH, model_name=model_type
+        config.REPO_PATH,
+        config.TERRAMETRICS_JAR_PATH,
+        model_name=model_type,
+        selected_features=model.selected_features if ensemble else None,
+        # Vecteurs déjà extraits pour le commit analysé
+        feature_store=(
+            FeatureStore(config.FEATURE_STORE_DIR)
+            if config.FEATURE_STORE_ENABLED
+            else None
+        ),
     )
     vectors = builder.build_vectors()
 
@@ -49,56 +70,91 @@ def run_prediction_flow(model_type: str):
         logger.warning("Aucun vecteur généré - aucun bloc Terraform modifié.")
         return
 
-    logger.info(f"Chargement du modèle : {model_type}")
-    model = ModelFactory.get_model(model_type)
-    logger.info(model.describe())
-
     logger.info("Prédictions des défauts...")
-    predictions_with_confidence = model.predict_with_confidence(vectors)
+    member_predictions = {}
+    if ensemble:
+        member_predictions = model.predict_members(vectors)
+        predictions_with_confidence = model.combine(member_predictions)
+        save_results(
+            {
+                block_id: {
+                    "fault_prone": label,
+                    "probability": proba,
+                    "models": {
+                        name: predictions[block_id][1]
+                        for name, predictions in member_predictions.items()
+                    },
+                }
+                for block_id, (label, proba) in predictions_with_confidence.items()
+            },
+            config.ENSEMBLE_PREDICTIONS_JSON_PATH,
+        )
+    else:
+        predictions_with_confidence = model.predict_with_confidence(vectors)
 
     # Extraire juste les labels pour la sauvegarde dans defect history
     predictions = {k: v[0] for k, v in predictions_with_confidence.items()}
 
-    logger.info(f"Sauvegarde des prédictions dans `{config.DEFECT_HISTORY_PATH}`")
-    update_defect_history(predictions)
+    logger.info(f"Sauvegarde des prédictions dans `{config.DEFECT_HISTORY_DB_PATH}`")
+    update_defect_history(predictions, repo_path=config.REPO_PATH)
 
     # Génération du rapport HTML
     report_path = ReportGenerator().generate(predictions, model.describe())
     logger.info(f"Rapport disponible ici : {report_path}")
 
     # Affichage avec historique
-    defect_history = load_defect_history()
+    defect_history = load_defect_history(block_ids=predictions)
     print("=" * 60)
     print("📊 Résultats de la prédiction :")
 
     total = 0
     defectives = 0
 
-    for block_id, (label, confidence) in predictions_with_confidence.items():
-        try:
-            file_path, block_identifiers = block_id.split("::", 1)
-            contrib = get_contribution(config.REPO_PATH, file_path, block_identifiers)
-            previous = get_previous_contributions(
-                config.REPO_PATH, file_path, block_identifiers, defect_history
-            )
-            if contrib:
-                pm = ProcessMetrics(contrib, previous)
-                count = pm.num_defects_in_block_before()
-
-                status_icon = "🔴" if label else "🟢"
-                status_label = "Defective" if label else "Clean"
-
-                print(f"\n{status_icon} Block: {block_id}")
-                print(f"    -> État: {status_label}")
-                print(f"    -> Score de confiance: {confidence:.6f}")
-                print(f"    -> Défauts précédents: {count}")
+    # Un seul parcours de l'historique pour tous les blocs prédits
+    targets = {}
+    for block_id in predictions_with_confidence:
+        file_path, _, block_identifiers = block_id.partition("::")
+        targets.setdefault(file_path, []).append(block_identifiers)
+    history_store = open_synced_store(config.REPO_PATH)
+    try:
+        contributions_index = build_contributions_index(
+            config.REPO_PATH, targets, defect_history, history_store
+        )
 
-                total += 1
-                defectives += 1 if label else 0
-            else:
-                logger.warning(f"Contribution introuvable pour {block_id}")
-        except Exception as e:
-            logger.error(f"Erreur sur le bloc {block_id} : {e}")
+        for block_id, (label, confidence) in predictions_with_confidence.items():
+            try:
+                file_path, block_identifiers = block_id.split("::", 1)
+                contrib = get_contribution(
+                    config.REPO_PATH, file_path, block_identifiers, history_store
+                )
+                previous = contributions_index.get((file_path, block_identifiers), [])
+                if contrib:
+                    pm = ProcessMetrics(contrib, previous)
+                    count = pm.num_defects_in_block_before()
+
+                    status_icon = "🔴" if label else "🟢"
+                    status_label = "Defective" if label else "Clean"
+
+                    print(f"\n{status_icon} Block: {block_id}")
+                    print(f"    -> État: {status_label}")
+                    print(f"    -> Score de confiance: {confidence:.6f}")
+                    if member_predictions:
+                        scores = ", ".join(
+                            f"{name}={predictions[block_id][1]:.4f}"
+                            for name, predictions in member_predictions.items()
+                        )
+                        print(f"    -> Probabilités par modèle: {scores}")
+                    print(f"    -> Défauts précédents: {count}")
+
+                    total += 1
+                    defectives += 1 if label else 0
+                else:
+                    logger.warning(f"Contribution introuvable pour {block_id}")
+            except Exception as e:
+                logger.error(f"Erreur sur le bloc {block_id} : {e}")
+    finally:
+        if history_store is not None:
+            history_store.close()
 
     print("\n" + "=" * 60)
     print(
@@ -107,41 +163,15 @@ def run_prediction_flow(model_type: str):
     print("=" * 60)
 
 
-def run_terraform_fmt(repo_path: str) -> None:
-    """
-    Applique `terraform fmt -recursive` pour garantir un formatage correct.
-    """
-    try:
-        result = subprocess.run(
-            ["terraform", "fmt", "-recursive", repo_path],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if result.stdout.strip():
-            logger.info("🔧 terraform fmt appliqué :")
-            print(result.stdout.strip())
-        else:
-            logger.info(
-                "Aucun fichier à reformater : tous les fichiers .tf sont propres."
-            )
-    except FileNotFoundError:
-        logger.warning(
-            "Terraform n'est pas installé. Impossible d'appliquer terraform fmt."
-        )
-    except Exception as e:
-        logger.error(f"Erreur lors de terraform fmt : {e}")
-
-
 def generate_report_from_history():
     """
-    Génère un rapport HTML uniquement à partir du fichier defect_history.json,
+    Génère un rapport HTML uniquement à partir de l'historique des prédictions,
     sans relancer d'analyse ou de prédiction.
     """
     history = load_defect_history()
 
     if not history:
-        logger.warning("Impossible de générer le rapport : defect_history.json vide.")
+        logger.warning("Impossible de générer le rapport : historique des prédictions vide.")
         return
 
     # Construit les prédictions à partir des dernières entrées de l'historique
@@ -167,12 +197,11 @@ def detect_and_analyze(extractor_type):
     """
     logger.info(f"Démarrage de l'analyse avec l'extracteur [{extractor_type}]...")
 
-    detect_changes = DetectTFChanges(config.REPO_PATH)
-
-    if extractor_type == "delta":
-        modified_blocks = detect_changes.get_changed_blocks()
-    else:
-        modified_blocks = detect_changes.get_modified_tf_blocks()
+    with DetectTFChanges(config.REPO_PATH) as detect_changes:
+        if extractor_type in ["delta", "change"]:
+            modified_blocks = detect_changes.get_changed_blocks()
+        else:
+            modified_blocks = detect_changes.get_modified_tf_blocks()
 
     if not modified_blocks:
         logger.warning("Aucun bloc Terraform modifié détecté.")
@@ -214,14 +243,14 @@ def display_analysis_results(results, extractor_type):
     for file, content in results.items():
         msg = (
             "📂 Fichier analysé : "
-            if extractor_type in ["delta", "codemetrics"]
+            if extractor_type in ["delta", "change", "codemetrics"]
             else "🧱 Bloc analysé : "
         )
         print("\n" + "=" * 60)
         print(f"{msg} {file}")
         print("=" * 60)
 
-        if extractor_type in ["delta", "process"]:
+        if extractor_type in ["delta", "change", "process"]:
             formatted_metrics = json.dumps(content, indent=4, ensure_ascii=False)
             print(formatted_metrics)
         else:
@@ -236,19 +265,19 @@ def display_analysis_results(results, extractor_type):
 
 def show_defect_history():
     """
-    Affiche le contenu du fichier defect_history.json (s'il existe),
+    Affiche le contenu de l'historique des prédictions (s'il existe),
     avec l'historique complet par commit.
     """
     history = load_defect_history()
 
     if not history:
         logger.warning(
-            "Aucune prédiction trouvée - defect_history.json est vide ou inexistant."
+            "Aucune prédiction trouvée - l'historique est vide ou inexistant."
         )
         return
 
     print("=" * 60)
-    print("📘 Contenu de defect_history.json :")
+    print(f"📘 Contenu de {config.DEFECT_HISTORY_DB_PATH} :")
     for block_id, predictions in history.items():
         print(f"🔹 {block_id}")
         for entry in predictions:
@@ -259,6 +288,41 @@ def show_defect_history():
     print("=" * 60)
 
 
+def run_analysis(args):
+    """Exécute la prédiction ou l'extraction de métriques demandée en ligne de commande."""
+    if args.model or args.models:
+        try:
+            if args.models:
+                members = [m.strip() for m in args.models.split(",") if m.strip()]
+                run_prediction_flow("ensemble", members)
+            else:
+                run_prediction_flow(args.model)
+        except ValueError as e:
+            logger.error(str(e))
+            raise SystemExit(1)
+        return
+
+    if args.extractor in ["codemetrics", "delta"]:
+        verify_jar()
+
+    results = detect_and_analyze(args.extractor)
+
+    if results:
+        if args.extractor == "delta":
+            output_file = config.DELTA_METRICS_JSON_PATH
+        elif args.extractor == "change":
+            output_file = config.CHANGE_METRICS_JSON_PATH
+        elif args.extractor == "process":
+            output_file = config.PROCESS_METRICS_JSON_PATH
+        else:
+            output_file = config.CODE_METRICS_JSON_PATH
+
+        display_analysis_results(results, args.extractor)
+        save_results(results, output_file)
+    else:
+        logger.warning("Aucun résultat à sauvegarder.")
+
+
 def main():
     """Point d'entrée principal pour exécuter l'analyse et sauvegarder les résultats."""
     parser = argparse.ArgumentParser(
@@ -267,26 +331,43 @@ def main():
     parser.add_argument(
         "--model", type=str, help="Nom du modèle de prédiction à utiliser (ex: dummy, randomforest)"
     )
+    parser.add_argument(
+        "--models",
+        type=str,
+        help="Modèles évalués sur une seule extraction, combinés en ensemble "
+        "(ex: lightgbm,randomforest,logisticreg)",
+    )
     parser.add_argument(
         "--extractor",
         type=str,
-        choices=["codemetrics", "delta", "process"],
+        choices=["codemetrics", "delta", "process", "change"],
         default="codemetrics",
         help="Type d'extracteur à utiliser",
     )
     parser.add_argument(
         "--show-history",
         action="store_true",
-        help="Afficher le contenu de defect_history.json",
+        help="Afficher l'historique des prédictions",
     )
     parser.add_argument(
         "--generate-report",
         action="store_true",
-        help="Générer uniquement le rapport HTML à partir de defect_history.json",
+        help="Générer uniquement le rapport HTML à partir de l'historique des prédictions",
+    )
+    parser.add_argument(
+        "--export-features",
+        type=str,
+        metavar="PATH",
+        help="Exporter les vecteurs du magasin de features (.npz ou .parquet) "
+        "pour l'entraînement",
     )
 
     args = parser.parse_args()
 
+    configure_logging()
+    trust_github_workspace()
+    os.makedirs(config.OUTPUT_DIR, exist_ok=True)
+
     if args.show_history:
         show_defect_history()
         return
@@ -295,33 +376,30 @@ def main():
         generate_report_from_history()
         return
 
-    GitAdapter.verify_git_repo()
-
-    if args.model:
-        try:
-            run_prediction_flow(args.model)
-        except ValueError as e:
-            logger.error(str(e))
-            raise SystemExit(1)
+    if args.export_features:
+        FeatureStore(config.FEATURE_STORE_DIR).export(args.export_features)
         return
 
-    if args.extractor in ["codemetrics", "delta"]:
-        verify_jar()
-
-    results = detect_and_analyze(args.extractor)
-
-    if results:
-        if args.extractor == "delta":
-            output_file = config.DELTA_METRICS_JSON_PATH
-        elif args.extractor == "process":
-            output_file = config.PROCESS_METRICS_JSON_PATH
-        else:
-            output_file = config.CODE_METRICS_JSON_PATH
+    GitAdapter.verify_git_repo()
 
-        display_analysis_results(results, args.extractor)
-        save_results(results, output_file)
-    else:
-        logger.warning("Aucun résultat à sauvegarder.")
+    # Cache des découpages Terraform persistant d'une exécution à l'autre
+    parse_cache = ParseCache.configure(config.PARSE_CACHE_DB_PATH)
+    # Métriques TerraMetrics des blocs déjà mesurés
+    metrics_cache = TerraMetricsCache.configure(
+        config.TERRAMETRICS_CACHE_DB_PATH,
+        config.TERRAMETRICS_CACHE_MAX_MB * 1024 * 1024,
+    )
+    try:
+        run_analysis(args)
+    finally:
+        parse_cache.close()
+        lookups = metrics_cache.hits + metrics_cache.misses
+        if lookups:
+            logger.info(
+                f"Cache TerraMetrics : {metrics_cache.hits}/{lookups} bloc(s) servi(s) "
+                f"depuis le cache ({metrics_cache.hit_rate():.0%})."
+            )
+        TerraMetricsCache.deactivate()
 
 
 if __name__ == "__main__":
@@ -1,31 +1,95 @@
 import os
 
-# Création du dossier 'out' si nécessaire
-os.makedirs("out", exist_ok=True)
+# Racine du projet : les ressources livrées (JAR, modèles, schémas, templates) ne
+# dépendent pas du répertoire courant. Le dossier 'out' est créé par les points
+# d'entrée qui y écrivent, jamais à l'import.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Chemins des ressources
 TERRAMETRICS_JAR_PATH = os.environ.get(
-    "TERRAMETRICS_JAR", "libs/terraform_metrics-1.0.jar"
+    "TERRAMETRICS_JAR", os.path.join(PROJECT_ROOT, "libs", "terraform_metrics-1.0.jar")
 )
 
+# Nombre maximal de blocs analysés par une même invocation de TerraMetrics
+TERRAMETRICS_BATCH_SIZE = int(os.environ.get("TERRAMETRICS_BATCH_SIZE", "200"))
+
+# Nombre d'invocations simultanées de TerraMetrics (par défaut, le nombre de CPU)
+TERRAMETRICS_PARALLELISM = int(
+    os.environ.get("TERRAMETRICS_PARALLELISM") or os.cpu_count() or 1
+)
+
+# Workers TerraMetrics maintenus en vie (0 : une JVM par invocation)
+TERRAMETRICS_WORKERS = int(os.environ.get("TERRAMETRICS_WORKERS", "0"))
+TERRAMETRICS_TIMEOUT = float(os.environ.get("TERRAMETRICS_TIMEOUT", "300"))
+# Commande d'un worker respectant le protocole de core/parsers/terrametrics_worker.py
+# ({jar} est remplacé par le chemin du JAR). Par défaut, le worker Java résident
+# core/parsers/java/TerraMetricsWorker.java, qui charge le JAR une seule fois.
+TERRAMETRICS_WORKER_CMD = os.environ.get("TERRAMETRICS_WORKER_CMD")
+
 OUTPUT_DIR = os.path.join("out")
-TEMPLATE_FOLDER = os.path.join("templates")
+TEMPLATE_FOLDER = os.path.join(PROJECT_ROOT, "templates")
 REPORTS_OUTPUT_FOLDER = os.path.join(OUTPUT_DIR, "reports")
 
 # Chemins des fichiers JSON d'analyse
 CODE_METRICS_JSON_PATH = os.path.join(OUTPUT_DIR, "code_metrics.json")
 DELTA_METRICS_JSON_PATH = os.path.join(OUTPUT_DIR, "delta_metrics.json")
+CHANGE_METRICS_JSON_PATH = os.path.join(OUTPUT_DIR, "change_metrics.json")
 PROCESS_METRICS_JSON_PATH = os.path.join(OUTPUT_DIR, "process_metrics.json")
-DEFECT_HISTORY_PATH = os.path.join(OUTPUT_DIR, "defect_history.json")
+ENSEMBLE_PREDICTIONS_JSON_PATH = os.path.join(OUTPUT_DIR, "ensemble_predictions.json")
+
+# Historique des prédictions par bloc (SQLite) ; un ancien `defect_history.json`
+# placé à côté de la base est importé à sa première ouverture
+DEFECT_HISTORY_DB_PATH = os.path.join(OUTPUT_DIR, "defect_history.db")
+# Attente maximale (s) du verrou d'écriture quand plusieurs analyses enregistrent en même temps
+DEFECT_HISTORY_LOCK_TIMEOUT = float(os.environ.get("TFDEFECT_HISTORY_LOCK_TIMEOUT", "60"))
+
+# Historique persistant des blocs Terraform (SQLite)
+BLOCK_HISTORY_DB_PATH = os.path.join(OUTPUT_DIR, "block_history.db")
+
+# Cache des découpages en blocs Terraform, indexé par hash de blob (SQLite)
+PARSE_CACHE_DB_PATH = os.path.join(OUTPUT_DIR, "parse_cache.db")
+
+# Cache des métriques TerraMetrics par bloc, indexé par contenu et version du JAR (SQLite)
+TERRAMETRICS_CACHE_DB_PATH = os.path.join(OUTPUT_DIR, "terrametrics_cache.db")
+TERRAMETRICS_CACHE_MAX_MB = int(os.environ.get("TERRAMETRICS_CACHE_MAX_MB", "64"))
+
+# Magasin des vecteurs de caractéristiques par commit et par bloc (.npz)
+FEATURE_STORE_DIR = os.path.join(OUTPUT_DIR, "feature_store")
+FEATURE_STORE_ENABLED = os.environ.get("TFDEFECT_FEATURE_STORE", "1") != "0"
 
 # Chemin du repo analysé
 REPO_PATH = os.environ.get("GITHUB_WORKSPACE", ".")
 
+# Backend d'accès Git pour l'analyse du dernier commit ("pydriller" ou "native" :
+# alternative sans PyDriller, à activer explicitement)
+GIT_BACKEND = os.environ.get("TFDEFECT_GIT_BACKEND", "pydriller")
+
 # Template HTML
 REPORT_TEMPLATE = os.environ.get("REPORT_TEMPLATE", "report_template.html")
 
+# Features sélectionnées par modèle (<modèle>_features.csv)
+FEATURE_SCHEMAS_DIR = os.path.join(PROJECT_ROOT, "feature_schemas")
+
 # Modèles de prédiction (.joblib)
-RF_MODEL_PATH = os.path.join("models", "random_forest_model.joblib")
-LIGHTGBM_MODEL_PATH = os.path.join("models", "lightgbm_model.joblib")
-LOGISTICREG_MODEL_PATH = os.path.join("models", "logisticreg_model.joblib")
-NAIVEBAYES_MODEL_PATH = os.path.join("models", "naivebayes_model.joblib")
+RF_MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "random_forest_model.joblib")
+LIGHTGBM_MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "lightgbm_model.joblib")
+LOGISTICREG_MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "logisticreg_model.joblib")
+NAIVEBAYES_MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "naivebayes_model.joblib")
+
+# Modèles compilés en artefacts NumPy (python -m infrastructure.ml.model_compiler),
+# utilisés à la place des .joblib lorsqu'ils sont à jour
+COMPILED_MODELS_DIR = os.path.join(PROJECT_ROOT, "models", "compiled")
+USE_COMPILED_MODELS = os.environ.get("TFDEFECT_COMPILED_MODELS", "1") != "0"
+
+# Modèles combinés par le modèle "ensemble" (sans liste explicite --models)
+ENSEMBLE_MODELS = ["lightgbm", "randomforest", "logisticreg", "naivebayes"]
+
+# Serveur de prédiction local (python -m app.prediction_server serve)
+SERVE_SOCKET_PATH = os.environ.get(
+    "TFDEFECT_SOCKET", os.path.join(OUTPUT_DIR, "tfdefect.sock")
+)
+# Délai d'attente pour regrouper les requêtes simultanées en un seul appel au modèle
+SERVE_BATCH_WINDOW_MS = float(os.environ.get("TFDEFECT_BATCH_WINDOW_MS", "10"))
+SERVE_MAX_BATCH_BLOCKS = int(os.environ.get("TFDEFECT_MAX_BATCH_BLOCKS", "4096"))
+# Dépôts dont l'analyseur reste ouvert (les moins récemment servis sont fermés)
+SERVE_MAX_REPOS = int(os.environ.get("TFDEFECT_MAX_REPOS", "32"))
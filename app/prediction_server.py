@@ -0,0 +1,421 @@
+"""
+Serveur de prédiction local : les modèles, les workers TerraMetrics et l'historique
+des blocs restent chargés entre les analyses, qui sont demandées par un socket Unix.
+
+Protocole : une requête JSON par ligne, une réponse JSON par ligne. Le serveur
+analyse la révision demandée (HEAD par défaut), et retourne le commit analysé.
+    -> {"repo_path": "/chemin/du/depot", "commit": "révision (optionnel)"}
+    <- {"ok": true, "commit": "...", "predictions": {block_id: {"fault_prone": 0|1,
+        "probability": 0.42, "models": {...}}}}
+    <- {"ok": false, "error": "..."}
+
+Usage (`tfdefect` une fois le paquet installé, ou `python -m app.prediction_server`) :
+    tfdefect serve --model randomforest
+    tfdefect score --repo . [--commit SHA]
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app import config
+from core.parsers.terrametrics_worker_pool import TerraMetricsWorkerPool
+from infrastructure.ml.base_model import BaseModel
+from infrastructure.ml.feature_matrix import FeatureMatrix
+from infrastructure.ml.model_factory import ModelFactory
+from infrastructure.ml.model_registry import ModelRegistry
+from tfdefect.analyzer import AnalysisCaches, Analyzer, predict_blocks
+from utils.logger_utils import configure_logging, logger
+
+# Séparateur entre le numéro de la requête et l'identifiant du bloc dans un lot
+BATCH_KEY_SEPARATOR = "|"
+
+
+class PredictionBatcher:
+    """
+    Regroupe les matrices de requêtes simultanées en un seul appel au modèle.
+
+    Un thread dédié attend la première matrice, puis celles qui arrivent pendant
+    `batch_window` secondes (dans la limite de `max_blocks` blocs) : les lignes sont
+    empilées, évaluées en une fois, puis les prédictions sont réparties entre les
+    requêtes. Le modèle est redemandé à `ModelFactory` pour chaque lot, de sorte
+    qu'un fichier `.joblib` modifié est rechargé (voir `ModelRegistry`) ; un
+    ensemble n'est reconstruit que si l'un de ses modèles l'a été.
+    """
+
+    def __init__(
+        self,
+        model_type: str,
+        members: List[str] = None,
+        batch_window: float = None,
+        max_blocks: int = None,
+    ):
+        """
+        Args:
+            model_type (str): Type du modèle (voir `ModelFactory`).
+            members (List[str], optional): Modèles combinés par 'ensemble'.
+            batch_window (float, optional): Délai de regroupement, en secondes
+                (par défaut `config.SERVE_BATCH_WINDOW_MS`).
+            max_blocks (int, optional): Nombre maximal de blocs par lot
+                (par défaut `config.SERVE_MAX_BATCH_BLOCKS`).
+        """
+        self.model_type = model_type
+        self.members = members
+        self.batch_window = (
+            config.SERVE_BATCH_WINDOW_MS / 1000 if batch_window is None else batch_window
+        )
+        self.max_blocks = max_blocks or config.SERVE_MAX_BATCH_BLOCKS
+        self.batches = 0
+
+        self._pending: queue.Queue = queue.Queue()
+        self._model_lock = threading.Lock()
+        # Chargement des modèles au démarrage, et non à la première requête
+        ModelFactory.get_model(model_type, members)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def model(self) -> BaseModel:
+        """Retourne le modèle courant (rechargé si son fichier a changé)."""
+        with self._model_lock:
+            registry = ModelRegistry.shared()
+            loads = registry.loads
+            model = ModelFactory.get_model(self.model_type, self.members)
+            if registry.loads != loads:
+                logger.info(f"Modèle rechargé : {model.describe()}")
+            return model
+
+    def submit(self, matrix: FeatureMatrix) -> concurrent.futures.Future:
+        """
+        Ajoute une matrice au prochain lot.
+
+        Args:
+            matrix (FeatureMatrix): Vecteurs d'une requête.
+
+        Returns:
+            Future: Prédictions de la requête {block_id: {"fault_prone", "probability", ...}}.
+        """
+        future = concurrent.futures.Future()
+        self._pending.put((matrix, future))
+        return future
+
+    def close(self):
+        """Arrête le thread de regroupement après le lot en cours."""
+        self._pending.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+
+            batch = [item]
+            blocks = len(item[0])
+            deadline = time.monotonic() + self.batch_window
+            while blocks < self.max_blocks:
+                try:
+                    item = self._pending.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._pending.put(None)
+                    break
+                batch.append(item)
+                blocks += len(item[0])
+
+            self._predict_batch(batch)
+
+    def _predict_batch(
+        self, batch: List[Tuple[FeatureMatrix, concurrent.futures.Future]]
+    ):
+        """
+        Évalue un lot en un seul appel au modèle et transmet à chaque requête ses
+        prédictions.
+        """
+        try:
+            model = self.model()
+            features = batch[0][0].features
+            keys = [
+                f"{index}{BATCH_KEY_SEPARATOR}{block_id}"
+                for index, (matrix, _) in enumerate(batch)
+                for block_id in matrix.block_ids
+            ]
+            combined = FeatureMatrix(
+                np.vstack(
+                    [FeatureMatrix.from_vectors(m, features).values for m, _ in batch]
+                ),
+                keys,
+                features,
+            )
+
+            predictions = predict_blocks(model, combined)
+            self.batches += 1
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        results: List[Dict[str, dict]] = [{} for _ in batch]
+        for key, result in predictions.items():
+            index, _, block_id = key.partition(BATCH_KEY_SEPARATOR)
+            results[int(index)][block_id] = result
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+class PredictionServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Serveur de prédiction sur socket Unix, un thread par connexion.
+
+    L'extraction des features de chaque requête s'exécute dans le thread de sa
+    connexion, par l'`Analyzer` du dépôt (une extraction à la fois par dépôt),
+    tous les dépôts partageant les mêmes caches ; les prédictions sont regroupées
+    par `PredictionBatcher`. Au-delà de `config.SERVE_MAX_REPOS` dépôts, l'analyseur
+    le moins récemment servi est fermé.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path: str,
+        model_type: str,
+        members: List[str] = None,
+        jar_path: str = None,
+        batch_window: float = None,
+        cache_dir: str = None,
+        max_repos: int = None,
+    ):
+        """
+        Args:
+            socket_path (str): Chemin du socket Unix.
+            model_type (str): Type du modèle (voir `ModelFactory`).
+            members (List[str], optional): Modèles combinés par 'ensemble'.
+            jar_path (str, optional): JAR TerraMetrics (par défaut `config.TERRAMETRICS_JAR_PATH`).
+            batch_window (float, optional): Délai de regroupement, en secondes.
+            cache_dir (str, optional): Caches et historiques des dépôts servis
+                (par défaut `config.OUTPUT_DIR`).
+            max_repos (int, optional): Nombre maximal d'analyseurs ouverts
+                (par défaut `config.SERVE_MAX_REPOS`).
+        """
+        self.socket_path = socket_path
+        self.model_type = model_type.lower()
+        self.members = members
+        self.jar_path = jar_path or config.TERRAMETRICS_JAR_PATH
+        self.cache_dir = cache_dir or config.OUTPUT_DIR
+        self.batcher = PredictionBatcher(self.model_type, members, batch_window)
+        logger.info(self.batcher.model().describe())
+
+        self.caches = AnalysisCaches(self.cache_dir)
+        self.max_repos = max_repos or config.SERVE_MAX_REPOS
+        # Analyseurs par dépôt, du moins au plus récemment servi
+        self._analyzers: "OrderedDict[str, Analyzer]" = OrderedDict()
+        self._analyzers_lock = threading.Lock()
+
+        socket_dir = os.path.dirname(socket_path)
+        if socket_dir:
+            os.makedirs(socket_dir, exist_ok=True)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, PredictionRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+        with self._analyzers_lock:
+            analyzers = list(self._analyzers.values())
+            self._analyzers.clear()
+        for repo_analyzer in analyzers:
+            repo_analyzer.close()
+        self.caches.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def score(self, repo_path: str, commit: str = None) -> dict:
+        """
+        Analyse un commit d'un dépôt et prédit ses blocs modifiés.
+
+        Args:
+            repo_path (str): Chemin du dépôt Git (sur la machine du serveur).
+            commit (str, optional): Révision analysée (par défaut HEAD).
+
+        Returns:
+            dict: Réponse {"ok": True, "commit": ..., "predictions": {...}}.
+        """
+        repo_path = os.path.abspath(repo_path)
+        if not os.path.isdir(repo_path):
+            raise ValueError(f"Dépôt introuvable : {repo_path}")
+
+        analysed, vectors = self._analyzer(repo_path).vectors(commit)
+        predictions = self.batcher.submit(vectors).result() if len(vectors) else {}
+        return {"ok": True, "commit": analysed, "predictions": predictions}
+
+    def _analyzer(self, repo_path: str) -> Analyzer:
+        """
+        Retourne l'analyseur d'un dépôt (créé au besoin) et ferme le moins récemment
+        servi au-delà de `max_repos` dépôts.
+        """
+        evicted = []
+        with self._analyzers_lock:
+            if repo_path in self._analyzers:
+                self._analyzers.move_to_end(repo_path)
+            else:
+                self._analyzers[repo_path] = Analyzer(
+                    repo_path,
+                    self.model_type,
+                    cache_dir=self.cache_dir,
+                    members=self.members,
+                    jar_path=self.jar_path,
+                    record_history=False,
+                    feature_store=config.FEATURE_STORE_ENABLED,
+                    caches=self.caches,
+                )
+                while len(self._analyzers) > self.max_repos:
+                    evicted.append(self._analyzers.popitem(last=False))
+            repo_analyzer = self._analyzers[repo_path]
+
+        # Fermeture hors du verrou : une analyse en cours du dépôt est d'abord terminée
+        for evicted_path, evicted_analyzer in evicted:
+            logger.info(f"Analyseur fermé (dépôt le moins récemment servi) : {evicted_path}")
+            evicted_analyzer.close()
+        return repo_analyzer
+
+
+class PredictionRequestHandler(socketserver.StreamRequestHandler):
+    """Traite les requêtes JSON d'une connexion, une par ligne."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = self.server.score(
+                    request["repo_path"], request.get("commit")
+                )
+            except Exception as e:
+                logger.error(f"Requête de prédiction en échec : {e}")
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+
+def request_prediction(
+    repo_path: str,
+    commit: str = None,
+    socket_path: str = None,
+    timeout: float = None,
+) -> dict:
+    """
+    Demande l'analyse d'un commit d'un dépôt au serveur de prédiction.
+
+    Args:
+        repo_path (str): Chemin du dépôt Git.
+        commit (str, optional): Révision analysée (par défaut HEAD).
+        socket_path (str, optional): Socket du serveur (par défaut `config.SERVE_SOCKET_PATH`).
+        timeout (float, optional): Délai maximal en secondes.
+
+    Returns:
+        dict: Réponse du serveur (`commit` : commit analysé).
+    """
+    request = {"repo_path": os.path.abspath(repo_path)}
+    if commit:
+        request["commit"] = commit
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path or config.SERVE_SOCKET_PATH)
+        with client.makefile("rwb") as stream:
+            stream.write((json.dumps(request) + "\n").encode())
+            stream.flush()
+            line = stream.readline()
+
+    if not line:
+        raise RuntimeError("Le serveur de prédiction a fermé la connexion")
+    return json.loads(line)
+
+
+def serve(args):
+    """Lance le serveur jusqu'à son interruption."""
+    # Workers TerraMetrics résidents, maintenus en vie entre les requêtes
+    if config.TERRAMETRICS_WORKERS <= 0:
+        config.TERRAMETRICS_WORKERS = config.TERRAMETRICS_PARALLELISM
+    TerraMetricsWorkerPool.shared(args.jar or config.TERRAMETRICS_JAR_PATH)
+
+    members = (
+        [m.strip() for m in args.models.split(",") if m.strip()] if args.models else None
+    )
+    server = PredictionServer(
+        args.socket,
+        "ensemble" if members else args.model,
+        members,
+        jar_path=args.jar,
+    )
+    # Arrêt propre (socket supprimé) à la demande du gestionnaire de services
+    signal.signal(
+        signal.SIGTERM,
+        lambda *_: threading.Thread(target=server.shutdown, daemon=True).start(),
+    )
+    logger.info(f"Serveur de prédiction à l'écoute sur `{args.socket}`")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Arrêt du serveur de prédiction.")
+    finally:
+        server.server_close()
+
+
+def score(args):
+    """Demande l'analyse d'un dépôt et affiche la réponse du serveur."""
+    response = request_prediction(args.repo, args.commit, args.socket, args.timeout)
+    print(json.dumps(response, indent=4, ensure_ascii=False))
+    if not response.get("ok"):
+        raise SystemExit(1)
+
+
+def main(argv: List[str] = None):
+    configure_logging()
+    parser = argparse.ArgumentParser(
+        prog="tfdefect", description="TFDefectGA - Serveur de prédiction local"
+    )
+    parser.add_argument(
+        "--socket", default=config.SERVE_SOCKET_PATH, help="Chemin du socket Unix"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Lancer le serveur")
+    serve_parser.add_argument("--model", default="randomforest", help="Modèle de prédiction")
+    serve_parser.add_argument(
+        "--models", help="Modèles combinés en ensemble (ex: lightgbm,randomforest)"
+    )
+    serve_parser.add_argument("--jar", help="JAR TerraMetrics")
+    serve_parser.set_defaults(func=serve)
+
+    score_parser = commands.add_parser(
+        "score", help="Analyser un commit d'un dépôt via le serveur"
+    )
+    score_parser.add_argument("--repo", default=".", help="Dépôt Git à analyser")
+    score_parser.add_argument("--commit", help="Révision analysée (par défaut HEAD)")
+    score_parser.add_argument("--timeout", type=float, help="Délai maximal en secondes")
+    score_parser.set_defaults(func=score)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,28 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, FrozenSet, List
 
 
 class BaseMetricsExtractor(ABC):
     """
     Classe abstraite pour les extracteurs de métriques Terraform.
+
+    Chaque extracteur déclare les features qu'il produit et son coût relatif,
+    afin que seuls les extracteurs utiles au modèle soient exécutés.
     """
 
+    # Coût relatif d'une extraction (1 : calcul en mémoire)
+    COST = 1
+
+    @classmethod
+    def provided_features(cls) -> FrozenSet[str]:
+        """
+        Retourne les features produites par l'extracteur.
+
+        Returns:
+            FrozenSet[str]: Noms des features.
+        """
+        return frozenset()
+
     @abstractmethod
     def extract_metrics(self, modified_blocks: Dict[str, List[str]]) -> Dict[str, dict]:
         """
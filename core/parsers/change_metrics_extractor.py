@@ -0,0 +1,224 @@
+import re
+from difflib import SequenceMatcher
+from typing import Dict, FrozenSet, Iterable, List
+
+from core.parsers.base_metrics_extractor import BaseMetricsExtractor
+from utils.block_utils import terrametrics_block_identifier
+from utils.edit_distance import osa_distance
+from utils.logger_utils import logger
+
+# Métriques textuelles du changement d'un bloc, dans l'ordre de calcul
+CHANGE_METRICS = (
+    "additions",
+    "additions_normalized",
+    "additions_diffusion",
+    "deletions_lines_normalized",
+    "damerau_levenshtein_code_change_distance",
+    "additions_contains_default_change",
+    "additions_contains_type_change",
+    "additions_contains_value_output_change",
+    "additions_contains_versioning_change",
+    "deletions_contains_default_change",
+    "deletions_contains_type_change",
+    "deletions_contains_value_output_change",
+    "deletions_contains_versioning_change",
+)
+
+# Lignes caractéristiques d'un type de changement (lignes normalisées)
+CHANGE_PATTERNS = {
+    "default": re.compile(r"^default\s*="),
+    "type": re.compile(r"^type\s*="),
+    "value_output": re.compile(r"^value\s*="),
+    "versioning": re.compile(r"^(required_version|version)\s*=|[?&]ref="),
+}
+
+
+class BlockChange:
+    """
+    Différence ligne à ligne entre les versions avant et après d'un bloc Terraform.
+
+    Les lignes sont comparées sans lignes vides et avec des espaces normalisés, afin
+    qu'un réalignement par `terraform fmt` ne soit pas compté comme un changement.
+    La distance d'édition porte, elle, sur le texte brut des deux versions.
+    """
+
+    def __init__(self, before: str, after: str):
+        """
+        Args:
+            before (str): Contenu du bloc avant le commit (vide pour un nouveau bloc).
+            after (str): Contenu du bloc après le commit.
+        """
+        self.before_text = before
+        self.after_text = after
+        self.before = self._normalize(before)
+        self.after = self._normalize(after)
+        self.hunks = [
+            (before_start, before_end, after_start, after_end)
+            for tag, before_start, before_end, after_start, after_end in SequenceMatcher(
+                None, self.before, self.after
+            ).get_opcodes()
+            if tag != "equal"
+        ]
+
+    @staticmethod
+    def _normalize(block: str) -> List[str]:
+        return [" ".join(line.split()) for line in block.splitlines() if line.strip()]
+
+    @property
+    def added_lines(self) -> List[str]:
+        return [line for _, _, start, end in self.hunks for line in self.after[start:end]]
+
+    @property
+    def deleted_lines(self) -> List[str]:
+        return [line for start, end, _, _ in self.hunks for line in self.before[start:end]]
+
+    def code_change_distance(self) -> int:
+        """
+        Calcule la distance de Damerau-Levenshtein (restreinte, OSA) entre le texte
+        des deux versions du bloc.
+
+        Le calcul est limité à la bande diagonale fixée par le coût d'un alignement
+        des lignes brutes identiques (chaque région modifiée réécrite caractère par
+        caractère) : pour une modification locale d'un grand bloc, seule une bande
+        étroite de la matrice est calculée, et la distance reste exacte.
+
+        Returns:
+            int: Nombre minimal d'insertions, suppressions, substitutions et
+            transpositions de caractères adjacents.
+        """
+        before_lines = self.before_text.splitlines(keepends=True)
+        after_lines = self.after_text.splitlines(keepends=True)
+        upper_bound = sum(
+            max(
+                sum(map(len, before_lines[before_start:before_end])),
+                sum(map(len, after_lines[after_start:after_end])),
+            )
+            for tag, before_start, before_end, after_start, after_end in SequenceMatcher(
+                None, before_lines, after_lines, autojunk=False
+            ).get_opcodes()
+            if tag != "equal"
+        )
+        return osa_distance(self.before_text, self.after_text, upper_bound)
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return round(numerator / denominator, 4) if denominator else 0.0
+
+
+def _contains_change(lines: List[str], kind: str) -> int:
+    pattern = CHANGE_PATTERNS[kind]
+    return int(any(pattern.search(line) for line in lines))
+
+
+def compute_change_metrics(
+    change: BlockChange, metrics: Iterable[str] = None, commit_additions: int = None
+) -> Dict[str, float]:
+    """
+    Calcule les métriques textuelles d'un changement de bloc.
+
+    `additions_diffusion` transpose au bloc la dimension « diffusion » des métriques
+    de changement (répartition d'un commit sur le code qu'il modifie) : c'est la part
+    des lignes ajoutées par le commit qui le sont dans ce bloc.
+
+    Args:
+        change (BlockChange): Différence entre les versions du bloc.
+        metrics (Iterable[str], optional): Métriques à calculer (par défaut, toutes).
+        commit_additions (int, optional): Lignes ajoutées par le commit dans
+            l'ensemble des blocs modifiés (par défaut, celles du bloc seul).
+
+    Returns:
+        Dict[str, float]: {métrique: valeur}.
+    """
+    added, deleted = change.added_lines, change.deleted_lines
+    if commit_additions is None:
+        commit_additions = len(added)
+
+    calculators = {
+        "additions": lambda: len(added),
+        "additions_normalized": lambda: _ratio(len(added), len(change.after)),
+        "additions_diffusion": lambda: _ratio(len(added), commit_additions),
+        "deletions_lines_normalized": lambda: _ratio(len(deleted), len(change.before)),
+        "damerau_levenshtein_code_change_distance": change.code_change_distance,
+    }
+    for kind in CHANGE_PATTERNS:
+        calculators[f"additions_contains_{kind}_change"] = (
+            lambda kind=kind: _contains_change(added, kind)
+        )
+        calculators[f"deletions_contains_{kind}_change"] = (
+            lambda kind=kind: _contains_change(deleted, kind)
+        )
+
+    selected = CHANGE_METRICS if metrics is None else metrics
+    return {name: calculators[name]() for name in selected if name in calculators}
+
+
+class ChangeMetricsExtractor(BaseMetricsExtractor):
+    """
+    Extracteur des métriques textuelles du changement (lignes ajoutées et supprimées,
+    distance d'édition, nature des attributs modifiés) pour les blocs Terraform modifiés.
+    """
+
+    # Diff et distance d'édition en mémoire
+    COST = 2
+
+    def __init__(self, features: Iterable[str] = None):
+        """
+        Args:
+            features (Iterable[str], optional): Métriques à calculer (par défaut, toutes).
+        """
+        self.features = None if features is None else set(features)
+
+    @classmethod
+    def provided_features(cls) -> FrozenSet[str]:
+        return frozenset(CHANGE_METRICS)
+
+    def extract_metrics(
+        self, modified_blocks: Dict[str, Dict[str, List[str]]]
+    ) -> Dict[str, dict]:
+        """
+        Compare chaque bloc modifié à sa version précédente et calcule ses métriques.
+
+        Un bloc sans version précédente (nouveau bloc) est comparé à un bloc vide ;
+        un bloc supprimé n'a pas de métriques. Les blocs de tous les fichiers
+        constituent le commit sur lequel `additions_diffusion` est rapportée.
+
+        Args:
+            modified_blocks (dict): {fichier: {"before": [blocs], "after": [blocs]}}.
+
+        Returns:
+            Dict[str, dict]: {fichier: {identifiant du bloc: {métrique: valeur}}}.
+        """
+        if not modified_blocks:
+            logger.warning("Aucun bloc Terraform modifié.")
+            return {}
+
+        metrics = [
+            m for m in CHANGE_METRICS if self.features is None or m in self.features
+        ]
+
+        changes = {}
+        for file_name, blocks in modified_blocks.items():
+            before_by_id = {}
+            for block in blocks.get("before", []):
+                before_by_id.setdefault(terrametrics_block_identifier(block), block)
+
+            file_changes = {}
+            for block in blocks.get("after", []):
+                block_id = terrametrics_block_identifier(block)
+                if block_id is None:
+                    continue
+                file_changes[block_id] = BlockChange(before_by_id.get(block_id, ""), block)
+            changes[file_name] = file_changes
+
+        commit_additions = sum(
+            len(change.added_lines)
+            for file_changes in changes.values()
+            for change in file_changes.values()
+        )
+        return {
+            file_name: {
+                block_id: compute_change_metrics(change, metrics, commit_additions)
+                for block_id, change in file_changes.items()
+            }
+            for file_name, file_changes in changes.items()
+        }
@@ -1,100 +1,273 @@
-from typing import Dict, List
-
-from pydriller import Repository
+from typing import Dict, Iterable, List, Set, Tuple
 
+from core.parsers.parse_cache import ParseCache
 from core.parsers.terraform_parser import TerraformParser
+from infrastructure.git.block_history_store import BlockHistoryStore
+from infrastructure.git.head_resolver import HeadResolver
+from infrastructure.git.git_history import get_file_lineage, iter_commits_touching
 from utils.block_utils import extract_block_identifier
 
 
-def get_contribution(repo_path: str, file_path: str, block_identifiers: str) -> Dict:
+def get_contribution(
+    repo_path: str,
+    file_path: str,
+    block_identifiers: str,
+    store: BlockHistoryStore = None,
+    commit: str = "HEAD",
+) -> Dict:
     """
-    Récupère les informations de la contribution actuelle à partir du dernier commit.
+    Récupère les informations de la contribution actuelle à partir du commit analysé.
+
+    Si un `BlockHistoryStore` synchronisé jusqu'à ce commit est fourni, le commit
+    est lu depuis la base plutôt que depuis le dépôt.
     """
-    latest_commit = next(Repository(repo_path, order="reverse").traverse_commits())
+    if store is not None:
+        head = store.get_head_commit_for_file(file_path)
+        if not head:
+            return {}
+        return _build_current_contribution(
+            head["author"],
+            head["hash"],
+            head["date"],
+            head["exp"],
+            file_path,
+            block_identifiers,
+        )
+
+    resolver = HeadResolver.for_repo(repo_path)
+    latest_commit = resolver.latest_non_merge(commit)
+    if latest_commit is None:
+        return {}
 
-    for file in latest_commit.modified_files:
+    for file in resolver.modified_files(latest_commit):
         if file.new_path == file_path or file.old_path == file_path:
-            return {
-                "author": latest_commit.author.name,
-                "file": file_path,
-                "block_identifiers": block_identifiers,
-                "commit": latest_commit.hash,
-                "date": latest_commit.committer_date,
-                "exp": (
+            return _build_current_contribution(
+                latest_commit.author.name,
+                latest_commit.hash,
+                latest_commit.committer_date,
+                (
                     latest_commit.author.total
                     if hasattr(latest_commit.author, "total")
                     else 1
                 ),
-                "isResource": 1 if "resource" in block_identifiers.lower() else 0,
-                "isData": 1 if "data" in block_identifiers.lower() else 0,
-                "block": (
-                    block_identifiers.split(".")[0]
-                    if "." in block_identifiers
-                    else block_identifiers
-                ),
-                "block_id": block_identifiers,
-            }
+                file_path,
+                block_identifiers,
+            )
 
     return {}
 
 
+def build_contributions_index(
+    repo_path: str,
+    targets: Dict[str, Iterable[str]],
+    defect_history: Dict[str, List[Dict]] = None,
+    store: BlockHistoryStore = None,
+    parse_cache: ParseCache = None,
+    commit: str = "HEAD",
+) -> Dict[Tuple[str, str], List[Dict]]:
+    """
+    Reconstruit en un seul parcours de l'historique les contributions passées
+    de tous les blocs demandés.
+
+    Chaque version de fichier n'est analysée qu'une fois par commit, quel que soit
+    le nombre de blocs suivis dans ce fichier, et seuls les commits ayant modifié
+    l'un des fichiers suivis (renommages compris) sont chargés. Si un `BlockHistoryStore` synchronisé
+    jusqu'au commit analysé est fourni, l'historique est lu depuis la base sans
+    parcourir le dépôt ; sinon, seuls les ancêtres du commit analysé sont parcourus.
+
+    Args:
+        repo_path (str): Chemin du dépôt Git.
+        targets (Dict[str, Iterable[str]]): {fichier: identifiants des blocs à suivre}.
+        defect_history (Dict[str, List[Dict]], optional): Historique des prédictions par bloc.
+        store (BlockHistoryStore, optional): Historique persistant des blocs.
+        parse_cache (ParseCache, optional): Cache des découpages des versions
+            parcourues (par défaut le cache partagé).
+        commit (str): Révision analysée (par défaut HEAD).
+
+    Returns:
+        Dict[Tuple[str, str], List[Dict]]: {(fichier, identifiant_bloc): contributions}.
+    """
+    wanted: Dict[str, Set[str]] = {
+        file_path: set(block_ids) for file_path, block_ids in targets.items()
+    }
+    index: Dict[Tuple[str, str], List[Dict]] = {
+        (file_path, block_id): []
+        for file_path, block_ids in wanted.items()
+        for block_id in block_ids
+    }
+    if not index:
+        return index
+
+    fault_prone_by_commit = _index_defect_history(index, defect_history)
+
+    if store is not None:
+        for (file_path, block_id), contributions in index.items():
+            by_commit = fault_prone_by_commit.get((file_path, block_id), {})
+            for past_commit in store.get_contributions(file_path, block_id):
+                contributions.append(
+                    _build_previous_contribution(
+                        past_commit["author"],
+                        past_commit["hash"],
+                        past_commit["date"],
+                        past_commit["exp"],
+                        file_path,
+                        block_id,
+                        by_commit.get(past_commit["hash"], 0),
+                    )
+                )
+        return index
+
+    # Chemins historiques (renommages compris) -> fichiers suivis correspondants
+    aliases: Dict[str, Set[str]] = {}
+    for file_path in wanted:
+        for path in get_file_lineage(repo_path, file_path, commit):
+            aliases.setdefault(path, set()).add(file_path)
+
+    # Seuls les commits ayant touché l'un de ces chemins sont parcourus
+    for past_commit in iter_commits_touching(repo_path, aliases, commit):
+        for file in past_commit.modified_files:
+            matched_paths = aliases.get(file.new_path, set()) | aliases.get(
+                file.old_path, set()
+            )
+            if not matched_paths or not file.source_code:
+                continue
+
+            try:
+                parser = TerraformParser.from_string(
+                    file.source_code, cache=parse_cache
+                )
+                all_blocks = parser.find_blocks(list(range(len(parser.lines))))
+            except Exception:
+                continue
+
+            for block in all_blocks:
+                extracted_id = extract_block_identifier(block)
+
+                for file_path in matched_paths:
+                    if extracted_id not in wanted[file_path]:
+                        continue
+
+                    fault_prone = fault_prone_by_commit.get(
+                        (file_path, extracted_id), {}
+                    ).get(past_commit.hash, 0)
+                    index[(file_path, extracted_id)].append(
+                        _build_previous_contribution(
+                            past_commit.author.name,
+                            past_commit.hash,
+                            past_commit.committer_date,
+                            (
+                                past_commit.author.total
+                                if hasattr(past_commit.author, "total")
+                                else 1
+                            ),
+                            file_path,
+                            extracted_id,
+                            fault_prone,
+                        )
+                    )
+
+    return index
+
+
 def get_previous_contributions(
     repo_path: str,
     file_path: str,
     block_identifiers: str,
     defect_history: Dict[str, List[Dict]] = None,
+    store: BlockHistoryStore = None,
 ) -> List[Dict]:
     """
     Reconstruit l'historique des contributions passées pour un bloc donné,
     en identifiant les blocs structurellement et en injectant le vrai fault_prone par commit.
+
+    Pour plusieurs blocs, préférer `build_contributions_index` qui ne parcourt
+    l'historique qu'une seule fois.
+    """
+    index = build_contributions_index(
+        repo_path, {file_path: [block_identifiers]}, defect_history, store
+    )
+    return index.get((file_path, block_identifiers), [])
+
+
+def _index_defect_history(
+    keys: Iterable[Tuple[str, str]], defect_history: Dict[str, List[Dict]] = None
+) -> Dict[Tuple[str, str], Dict[str, int]]:
+    """
+    Indexe les prédictions passées par commit pour les blocs suivis.
+
+    Args:
+        keys (Iterable[Tuple[str, str]]): Couples (fichier, identifiant_bloc) suivis.
+        defect_history (Dict[str, List[Dict]], optional): Historique des prédictions par bloc.
+
+    Returns:
+        Dict[Tuple[str, str], Dict[str, int]]: {(fichier, bloc): {commit: fault_prone}}.
+    """
+    if not defect_history:
+        return {}
+
+    indexed = {}
+    for file_path, block_id in keys:
+        by_commit = {}
+        for record in defect_history.get(f"{file_path}::{block_id}", []):
+            # Conserver la première prédiction enregistrée pour un commit donné
+            by_commit.setdefault(record["commit"], record["fault_prone"])
+        indexed[(file_path, block_id)] = by_commit
+    return indexed
+
+
+def _build_current_contribution(
+    author: str,
+    commit_hash: str,
+    date,
+    exp: int,
+    file_path: str,
+    block_identifiers: str,
+) -> Dict:
+    """
+    Construit l'entrée de contribution d'un bloc pour le commit analysé.
+    """
+    return {
+        "author": author,
+        "file": file_path,
+        "block_identifiers": block_identifiers,
+        "commit": commit_hash,
+        "date": date,
+        "exp": exp,
+        "isResource": 1 if "resource" in block_identifiers.lower() else 0,
+        "isData": 1 if "data" in block_identifiers.lower() else 0,
+        "block": (
+            block_identifiers.split(".")[0]
+            if "." in block_identifiers
+            else block_identifiers
+        ),
+        "block_id": block_identifiers,
+    }
+
+
+def _build_previous_contribution(
+    author: str,
+    commit_hash: str,
+    date,
+    exp: int,
+    file_path: str,
+    block_identifiers: str,
+    fault_prone: int,
+) -> Dict:
+    """
+    Construit l'entrée de contribution passée d'un bloc pour un commit donné.
     """
-    contributions = []
-    full_id = f"{file_path}::{block_identifiers}"
-
-    for commit in Repository(repo_path).traverse_commits():
-        for file in commit.modified_files:
-            if file.new_path == file_path or file.old_path == file_path:
-                if not file.source_code:
-                    continue
-
-                try:
-                    parser = TerraformParser.from_string(file.source_code)
-                    all_blocks = parser.find_blocks(list(range(len(parser.lines))))
-
-                    for block in all_blocks:
-                        extracted_id = extract_block_identifier(block)
-
-                        if extracted_id == block_identifiers:
-                            # Cherche la prédiction pour ce bloc à ce commit
-                            fault_prone = 0
-                            if defect_history:
-                                for record in defect_history.get(full_id, []):
-                                    if record["commit"] == commit.hash:
-                                        fault_prone = record["fault_prone"]
-                                        break
-
-                            contributions.append(
-                                {
-                                    "author": commit.author.name,
-                                    "file": file_path,
-                                    "block_identifiers": block_identifiers,
-                                    "commit": commit.hash,
-                                    "date": commit.committer_date,
-                                    "fault_prone": fault_prone,
-                                    "exp": (
-                                        commit.author.total
-                                        if hasattr(commit.author, "total")
-                                        else 1
-                                    ),
-                                    "block": (
-                                        block_identifiers.split(".")[0]
-                                        if "." in block_identifiers
-                                        else block_identifiers
-                                    ),
-                                    "block_id": block_identifiers,
-                                }
-                            )
-                except Exception:
-                    continue
-
-    return contributions
+    return {
+        "author": author,
+        "file": file_path,
+        "block_identifiers": block_identifiers,
+        "commit": commit_hash,
+        "date": date,
+        "fault_prone": fault_prone,
+        "exp": exp,
+        "block": (
+            block_identifiers.split(".")[0]
+            if "." in block_identifiers
+            else block_identifiers
+        ),
+        "block_id": block_identifiers,
+    }
@@ -1,11 +1,12 @@
-import json
 import os
-import subprocess
-import tempfile
-from typing import Dict, List
+from concurrent.futures import Future
+from typing import Dict, FrozenSet, List, Union
 
 from core.parsers.base_metrics_extractor import BaseMetricsExtractor
-from infrastructure.git.git_changes import GitChanges
+from core.parsers.code_metrics_extractor import TERRAMETRICS_METRICS
+from core.parsers.terrametrics_cache import TerraMetricsCache
+from core.parsers.terrametrics_runner import TerraMetricsRunner
+from utils.block_utils import terrametrics_block_identifier
 from utils.logger_utils import logger
 
 
@@ -15,20 +16,45 @@ class DeltaMetricsExtractor(BaseMetricsExtractor):
     Compare les métriques des blocs avant et après modification.
     """
 
-    def __init__(self, jar_path: str):
+    # Invocation de la JVM (versions avant/après)
+    COST = 3
+
+    @classmethod
+    def provided_features(cls) -> FrozenSet[str]:
+        return frozenset(f"{metric}_delta" for metric in TERRAMETRICS_METRICS)
+
+    def __init__(self, jar_path: str, cache: TerraMetricsCache = None):
+        """
+        Args:
+            jar_path (str): Chemin vers le fichier JAR de TerraMetrics.
+            cache (TerraMetricsCache, optional): Cache des métriques par bloc de
+                TerraMetrics (par défaut le cache actif de l'exécution).
+        """
         self.jar_path = jar_path
-        self.git_changes = GitChanges()
         if not os.path.exists(self.jar_path):
             raise FileNotFoundError(f"TerraMetrics JAR introuvable : {self.jar_path}")
+        self.runner = TerraMetricsRunner(jar_path, label="DELTA", cache=cache)
 
     def extract_metrics(
-        self, modified_blocks: Dict[str, Dict[str, List[str]]]
+        self,
+        modified_blocks: Dict[str, Dict[str, List[str]]],
+        after_metrics: Union[Dict[str, dict], Future, None] = None,
     ) -> Dict[str, dict]:
         """
         Analyse les blocs Terraform avant et après modification et calcule les deltas.
 
+        Les métriques « après » déjà calculées par l'extracteur CodeMetrics (sur les
+        blocs lus au même commit) sont réutilisées : seuls les blocs « après »
+        qu'elles ne couvrent pas et les blocs « avant » ayant un homologue « après »
+        sont envoyés à TerraMetrics. Un fichier sans bloc « avant » comparable
+        (fichier ajouté, blocs tous nouveaux) a un delta vide.
+        Les blocs « avant » sont analysés sans attendre les métriques « après »,
+        qui peuvent être fournies sous forme de `Future` encore en cours de calcul.
+
         Args:
             modified_blocks (dict): Dictionnaire contenant les fichiers et blocs modifiés.
+            after_metrics (Dict[str, dict] | Future, optional): Sortie de
+                `CodeMetricsExtractor` pour le commit analysé ({fichier: {"data": [...]}}).
 
         Returns:
             dict: Dictionnaire des métriques delta.
@@ -37,120 +63,115 @@ class DeltaMetricsExtractor(BaseMetricsExtractor):
             logger.warning("Aucun bloc Terraform modifié.")
             return {}
 
-        results = {}
-
+        # Un bloc « avant » sans homologue « après » n'intervient dans aucun delta
+        before_documents = {}
+        for file_name, blocks in modified_blocks.items():
+            after_ids = {
+                terrametrics_block_identifier(b) for b in blocks.get("after", [])
+            }
+            before_blocks = [
+                b
+                for b in blocks.get("before", [])
+                if terrametrics_block_identifier(b) in after_ids
+            ]
+            if before_blocks:
+                before_documents[f"{file_name}::before"] = before_blocks
+
+        outputs = (
+            self.runner.run_batch(before_documents) if before_documents else {}
+        )
+
+        after_metrics = self._resolve_after_metrics(after_metrics)
+        known_after = {}
+        after_documents = {}
         for file_name, blocks in modified_blocks.items():
-            temp_tf_before, temp_tf_after = None, None
-            temp_output_before, temp_output_after = None, None
+            if f"{file_name}::before" not in before_documents:
+                continue
 
-            try:
-                # Récupérer les blocs AVANT et APRÈS modification
-                blocks_before = blocks.get("before", [])
-                blocks_after = blocks.get("after", [])
+            known = self._index_by_identifier(after_metrics.get(file_name, {}))
+            reused, missing = [], []
+            for block in blocks.get("after", []):
+                entry = known.get(terrametrics_block_identifier(block))
+                if entry is not None:
+                    reused.append(entry)
+                else:
+                    missing.append(block)
+            known_after[file_name] = reused
+            if missing:
+                after_documents[f"{file_name}::after"] = missing
+
+        if after_documents:
+            outputs.update(self.runner.run_batch(after_documents))
 
-                # Créer des fichiers temporaires pour stocker ces blocs
-                temp_tf_before, temp_output_before = self._create_temp_files(
-                    blocks_before
-                )
-                temp_tf_after, temp_output_after = self._create_temp_files(blocks_after)
+        results = {}
+
+        for file_name in modified_blocks:
+            # Fichier ajouté ou sans bloc « avant » comparable : aucun delta
+            if f"{file_name}::before" not in before_documents:
+                results[file_name] = {}
+                continue
 
-                # Exécuter TerraMetrics AVANT et APRÈS commit
-                self._run_terrametrics(temp_tf_before, temp_output_before)
-                self._run_terrametrics(temp_tf_after, temp_output_after)
+            metrics_before = outputs.get(f"{file_name}::before", {"data": []})
+            metrics_after = outputs.get(f"{file_name}::after", {"data": []})
+
+            failed = next(
+                (m for m in (metrics_before, metrics_after) if "error" in m), None
+            )
+            if failed is not None:
+                results[file_name] = failed
+                continue
 
-                # Charger les métriques JSON
-                metrics_before = self._load_metrics(temp_output_before)
-                metrics_after = self._load_metrics(temp_output_after)
+            metrics_after = {
+                "data": known_after.get(file_name, []) + metrics_after.get("data", [])
+            }
 
+            try:
                 # Calcul des métriques Delta
                 results[file_name] = self._compute_delta_metrics(
                     metrics_before, metrics_after
                 )
-
-            except subprocess.CalledProcessError as e:
-                logger.error(
-                    f"Erreur TerraMetrics ({file_name}): {e.stdout}\n{e.stderr}"
-                )
-                results[file_name] = {"error": "TerraMetrics execution failed"}
-
             except Exception as e:
                 logger.error(f"Erreur inattendue ({file_name}): {e}")
                 results[file_name] = {"error": str(e)}
 
-            finally:
-                # Nettoyage des fichiers temporaires
-                self._cleanup_temp_files(
-                    [
-                        temp_tf_before,
-                        temp_tf_after,
-                        temp_output_before,
-                        temp_output_after,
-                    ]
-                )
-
         return results
 
-    def _create_temp_files(self, blocks: List[str]) -> tuple:
+    @staticmethod
+    def _resolve_after_metrics(
+        after_metrics: Union[Dict[str, dict], Future, None]
+    ) -> Dict[str, dict]:
         """
-        Crée des fichiers temporaires pour stocker les blocs Terraform en les formattant correctement.
-
-        Args:
-            blocks (List[str]): Liste des blocs Terraform.
+        Attend, si nécessaire, les métriques « après » calculées en parallèle.
 
         Returns:
-            Tuple[str, str]: Chemins des fichiers temporaires (Terraform et JSON).
-        """
-        temp_tf = tempfile.NamedTemporaryFile(suffix=".tf", delete=False, mode="w")
-        temp_json = tempfile.NamedTemporaryFile(suffix=".json", delete=False)
-
-        # Écriture correcte avec des retours à la ligne
-        formatted_blocks = "\n\n".join(blocks)
-        temp_tf.write(formatted_blocks)
-        temp_tf.close()
-
-        return temp_tf.name, temp_json.name
-
-    def _run_terrametrics(self, tf_path: str, output_path: str):
+            Dict[str, dict]: Métriques « après », vides si indisponibles.
         """
-        Exécute TerraMetrics sur un fichier Terraform.
+        if isinstance(after_metrics, Future):
+            try:
+                after_metrics = after_metrics.result()
+            except Exception as e:
+                logger.warning(
+                    f"Métriques CodeMetrics indisponibles pour le delta, analyse complète : {e}"
+                )
+                return {}
+        return after_metrics or {}
 
-        Args:
-            tf_path (str): Chemin du fichier Terraform.
-            output_path (str): Chemin du fichier de sortie JSON.
+    @staticmethod
+    def _index_by_identifier(metrics: dict) -> Dict[str, dict]:
         """
-        command = [
-            "java",
-            "-jar",
-            self.jar_path,
-            "--file",
-            tf_path,
-            "-b",
-            "--target",
-            output_path,
-        ]
-
-        logger.info(f"[DELTA] Exécution de TerraMetrics pour {tf_path}...")
-
-        subprocess.run(command, check=True)
-
-    def _load_metrics(self, json_path: str) -> dict:
-        """
-        Charge les métriques depuis un fichier JSON.
+        Indexe les entrées `data` d'une sortie TerraMetrics par identifiant de bloc.
 
         Args:
-            json_path (str): Chemin du fichier JSON.
+            metrics (dict): Sortie TerraMetrics d'un fichier.
 
         Returns:
-            dict: Données de métriques.
+            Dict[str, dict]: {identifiant: entrée}, la première entrée l'emportant.
         """
-        if not os.path.exists(json_path):
-            logger.warning(f"Fichier JSON introuvable : {json_path}")
-            return {}
-
-        with open(json_path, "r") as f:
-            metrics = json.load(f)
-
-        return metrics
+        index = {}
+        for entry in metrics.get("data", []) if isinstance(metrics, dict) else []:
+            identifier = " ".join(str(entry.get("block_identifiers", "")).split())
+            index.setdefault(identifier, entry)
+        return index
 
     def _compute_delta_metrics(self, metrics_before: dict, metrics_after: dict) -> dict:
         """
@@ -176,13 +197,14 @@ class DeltaMetricsExtractor(BaseMetricsExtractor):
 
         delta_results = {}
 
+        # Index des blocs avant par identifiant
+        before_by_id = {}
+        for before_block in before_data:
+            before_by_id.setdefault(before_block.get("block_identifiers"), before_block)
+
         for after_block in after_data:
             block_id = after_block.get("block_identifiers", "unknown_block")
-
-            # Recherche du bloc correspondant dans les métriques avant
-            before_block = next(
-                (b for b in before_data if b.get("block_identifiers") == block_id), None
-            )
+            before_block = before_by_id.get(block_id)
 
             if before_block is None:
                 logger.warning(
@@ -202,17 +224,3 @@ class DeltaMetricsExtractor(BaseMetricsExtractor):
                 delta_results[block_id] = deltas
 
         return delta_results
-
-    def _cleanup_temp_files(self, file_paths: List[str]):
-        """
-        Supprime les fichiers temporaires.
-
-        Args:
-            file_paths (List[str]): Liste des chemins de fichiers à supprimer.
-        """
-        for path in file_paths:
-            if path and os.path.exists(path):
-                try:
-                    os.remove(path)
-                except Exception as e:
-                    logger.warning(f"Impossible de supprimer {path} : {e}")
@@ -0,0 +1,279 @@
+import java.io.BufferedReader;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.security.Permission;
+import java.util.HashMap;
+import java.util.Map;
+import java.util.jar.JarFile;
+
+/**
+ * Worker TerraMetrics résident parlant le protocole de `TerraMetricsWorkerPool`.
+ *
+ * <p>Le JAR TerraMetrics est chargé une seule fois au démarrage ; chaque requête
+ * `extract` appelle directement son point d'entrée (`Main-Class`) dans la même JVM,
+ * avec les arguments de `java -jar ... --file <fichier> -b --target <sortie>`.
+ *
+ * <p>Lancement (Java 11+, sans compilation préalable) :
+ * <pre>java core/parsers/java/TerraMetricsWorker.java --jar libs/terraform_metrics-1.0.jar</pre>
+ *
+ * <p>La sortie standard est réservée au protocole : ce que TerraMetrics y écrit est
+ * redirigé vers la sortie d'erreur. Un `System.exit` de TerraMetrics est intercepté
+ * tant que la JVM autorise un `SecurityManager` (Java 11 à 17) ; au-delà, il arrête
+ * le worker, que le pool relance.
+ */
+public final class TerraMetricsWorker {
+
+    /** Levée à la place de `System.exit` pendant une analyse. */
+    private static final class ExitTrapped extends SecurityException {
+        final int status;
+
+        ExitTrapped(int status) {
+            super("System.exit(" + status + ")");
+            this.status = status;
+        }
+    }
+
+    /** Vrai pendant l'appel à TerraMetrics : seuls ses `System.exit` sont interceptés. */
+    private static volatile boolean inJob;
+
+    private TerraMetricsWorker() {
+    }
+
+    public static void main(String[] args) throws Exception {
+        String jarPath = null;
+        for (int i = 0; i < args.length - 1; i++) {
+            if ("--jar".equals(args[i])) {
+                jarPath = args[i + 1];
+            }
+        }
+        if (jarPath == null) {
+            System.err.println("Usage : TerraMetricsWorker --jar <terraform_metrics.jar>");
+            System.exit(2);
+        }
+
+        PrintStream protocol = new PrintStream(
+                new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        System.setOut(System.err);
+
+        Method entryPoint = loadEntryPoint(jarPath);
+        trapExit();
+
+        BufferedReader in = new BufferedReader(
+                new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        String line;
+        while ((line = in.readLine()) != null) {
+            if (line.trim().isEmpty()) {
+                continue;
+            }
+
+            Map<String, String> request = new HashMap<>();
+            String response;
+            try {
+                request = parseRequest(line);
+                response = handleRequest(request, entryPoint);
+            } catch (Exception e) {
+                response = reply(request.get("id"), false, String.valueOf(e));
+            }
+            protocol.println(response);
+
+            if ("shutdown".equals(request.get("op"))) {
+                break;
+            }
+        }
+        protocol.flush();
+        Runtime.getRuntime().halt(0);
+    }
+
+    private static Method loadEntryPoint(String jarPath) throws Exception {
+        Path jar = Paths.get(jarPath).toAbsolutePath();
+        String mainClass;
+        try (JarFile jarFile = new JarFile(jar.toFile())) {
+            mainClass = jarFile.getManifest().getMainAttributes().getValue("Main-Class");
+        }
+        if (mainClass == null) {
+            throw new IllegalStateException("Main-Class absente du manifeste de " + jar);
+        }
+
+        URLClassLoader loader = new URLClassLoader(
+                new URL[] {jar.toUri().toURL()}, TerraMetricsWorker.class.getClassLoader());
+        Thread.currentThread().setContextClassLoader(loader);
+        return Class.forName(mainClass, true, loader).getMethod("main", String[].class);
+    }
+
+    @SuppressWarnings("removal")
+    private static void trapExit() {
+        try {
+            System.setSecurityManager(new SecurityManager() {
+                @Override
+                public void checkPermission(Permission perm) {
+                }
+
+                @Override
+                public void checkPermission(Permission perm, Object context) {
+                }
+
+                @Override
+                public void checkExit(int status) {
+                    if (inJob) {
+                        throw new ExitTrapped(status);
+                    }
+                }
+            });
+        } catch (UnsupportedOperationException | SecurityException e) {
+            System.err.println(
+                    "System.exit ne peut pas être intercepté sur cette JVM : " + e);
+        }
+    }
+
+    private static String handleRequest(Map<String, String> request, Method entryPoint) {
+        String id = request.get("id");
+        String op = request.get("op");
+
+        if ("ping".equals(op) || "shutdown".equals(op)) {
+            return reply(id, true, null);
+        }
+        if (!"extract".equals(op)) {
+            return reply(id, false, "Opération inconnue : " + op);
+        }
+
+        String[] arguments = {
+            "--file", request.get("file"), "-b", "--target", request.get("target"),
+        };
+        inJob = true;
+        try {
+            entryPoint.invoke(null, (Object) arguments);
+            return reply(id, true, null);
+        } catch (InvocationTargetException e) {
+            Throwable cause = e.getCause();
+            if (cause instanceof ExitTrapped) {
+                int status = ((ExitTrapped) cause).status;
+                return status == 0 ? reply(id, true, null) : reply(id, false, "code " + status);
+            }
+            return reply(id, false, String.valueOf(cause));
+        } catch (ReflectiveOperationException e) {
+            return reply(id, false, String.valueOf(e));
+        } finally {
+            inJob = false;
+            System.out.flush();
+        }
+    }
+
+    /**
+     * Décode une requête du protocole : un objet JSON plat dont les valeurs sont
+     * des chaînes, des nombres, des booléens ou `null`.
+     */
+    static Map<String, String> parseRequest(String line) {
+        Map<String, String> request = new HashMap<>();
+        int[] pos = {skipSpaces(line, 0)};
+        expect(line, pos, '{');
+        if (peek(line, pos) == '}') {
+            return request;
+        }
+        while (true) {
+            String key = readString(line, pos);
+            expect(line, pos, ':');
+            String value = peek(line, pos) == '"' ? readString(line, pos) : readLiteral(line, pos);
+            request.put(key, value);
+            char next = peek(line, pos);
+            pos[0]++;
+            if (next == '}') {
+                return request;
+            }
+            if (next != ',') {
+                throw new IllegalArgumentException("Requête JSON invalide : " + line);
+            }
+        }
+    }
+
+    private static int skipSpaces(String s, int i) {
+        while (i < s.length() && Character.isWhitespace(s.charAt(i))) {
+            i++;
+        }
+        return i;
+    }
+
+    private static char peek(String s, int[] pos) {
+        pos[0] = skipSpaces(s, pos[0]);
+        if (pos[0] >= s.length()) {
+            throw new IllegalArgumentException("Requête JSON incomplète : " + s);
+        }
+        return s.charAt(pos[0]);
+    }
+
+    private static void expect(String s, int[] pos, char c) {
+        if (peek(s, pos) != c) {
+            throw new IllegalArgumentException("'" + c + "' attendu : " + s);
+        }
+        pos[0]++;
+    }
+
+    private static String readLiteral(String s, int[] pos) {
+        int start = pos[0];
+        while (pos[0] < s.length() && ",}".indexOf(s.charAt(pos[0])) < 0) {
+            pos[0]++;
+        }
+        String literal = s.substring(start, pos[0]).trim();
+        return "null".equals(literal) ? null : literal;
+    }
+
+    private static String readString(String s, int[] pos) {
+        expect(s, pos, '"');
+        StringBuilder out = new StringBuilder();
+        while (true) {
+            char c = s.charAt(pos[0]++);
+            if (c == '"') {
+                return out.toString();
+            }
+            if (c != '\\') {
+                out.append(c);
+                continue;
+            }
+            char escaped = s.charAt(pos[0]++);
+            switch (escaped) {
+                case 'b': out.append('\b'); break;
+                case 'f': out.append('\f'); break;
+                case 'n': out.append('\n'); break;
+                case 'r': out.append('\r'); break;
+                case 't': out.append('\t'); break;
+                case 'u':
+                    out.append((char) Integer.parseInt(s.substring(pos[0], pos[0] + 4), 16));
+                    pos[0] += 4;
+                    break;
+                default: out.append(escaped);
+            }
+        }
+    }
+
+    private static String reply(String id, boolean ok, String error) {
+        StringBuilder out = new StringBuilder("{\"id\": ");
+        out.append(id == null ? "null" : id.matches("-?\\d+") ? id : quote(id));
+        out.append(", \"ok\": ").append(ok);
+        if (error != null) {
+            out.append(", \"error\": ").append(quote(error));
+        }
+        return out.append('}').toString();
+    }
+
+    private static String quote(String s) {
+        StringBuilder out = new StringBuilder("\"");
+        for (char c : s.toCharArray()) {
+            if (c == '"' || c == '\\') {
+                out.append('\\').append(c);
+            } else if (c < 0x20) {
+                out.append(String.format("\\u%04x", (int) c));
+            } else {
+                out.append(c);
+            }
+        }
+        return out.append('"').toString();
+    }
+}
@@ -1,6 +1,12 @@
+from typing import Iterable, Type
+
+from core.parsers.base_metrics_extractor import BaseMetricsExtractor
+from core.parsers.change_metrics_extractor import ChangeMetricsExtractor
 from core.parsers.code_metrics_extractor import CodeMetricsExtractor
 from core.parsers.delta_metrics_extractor import DeltaMetricsExtractor
+from core.parsers.parse_cache import ParseCache
 from core.parsers.process_metrics_extractor import ProcessMetricsExtractor
+from core.parsers.terrametrics_cache import TerraMetricsCache
 
 
 class MetricsExtractorFactory:
@@ -9,22 +15,75 @@ class MetricsExtractorFactory:
     """
 
     @staticmethod
-    def get_extractor(extractor_type: str, jar_path: str):
+    def get_extractor(
+        extractor_type: str,
+        jar_path: str,
+        features: Iterable[str] = None,
+        repo_path: str = ".",
+        history_db_path: str = None,
+        defect_history_path: str = None,
+        parse_cache: ParseCache = None,
+        metrics_cache: TerraMetricsCache = None,
+    ):
         """
         Retourne l'instance d'extracteur de métriques correspondant au type demandé.
 
         Args:
-            extractor_type (str): Type de l'extracteur à utiliser (codemetrics, delta, process).
-            jar_path (str): Chemin vers le fichier JAR de TerraMetrics (ignoré pour process).
+            extractor_type (str): Type de l'extracteur à utiliser (codemetrics, delta, process,
+                change).
+            jar_path (str): Chemin vers le fichier JAR de TerraMetrics (ignoré pour process
+                et change).
+            features (Iterable[str], optional): Features à calculer, pour les extracteurs
+                capables de n'en calculer qu'une partie (par défaut, toutes).
+            repo_path (str, optional): Dépôt Git analysé (process).
+            history_db_path (str, optional): Base de l'historique persistant des blocs
+                (process, par défaut `config.BLOCK_HISTORY_DB_PATH`).
+            defect_history_path (str, optional): Historique des prédictions du dépôt
+                (process, par défaut `config.DEFECT_HISTORY_DB_PATH`).
+            parse_cache (ParseCache, optional): Cache des découpages (process, par
+                défaut le cache partagé).
+            metrics_cache (TerraMetricsCache, optional): Cache des métriques TerraMetrics
+                (codemetrics, delta, par défaut le cache actif de l'exécution).
 
         Returns:
             Instance de l'extracteur de métriques.
         """
         if extractor_type == "codemetrics":
-            return CodeMetricsExtractor(jar_path)
+            return CodeMetricsExtractor(jar_path, cache=metrics_cache)
+        elif extractor_type == "delta":
+            return DeltaMetricsExtractor(jar_path, cache=metrics_cache)
+        elif extractor_type == "process":
+            return ProcessMetricsExtractor(
+                repo_path,
+                history_db_path=history_db_path,
+                features=features,
+                defect_history_path=defect_history_path,
+                parse_cache=parse_cache,
+            )
+        elif extractor_type == "change":
+            return ChangeMetricsExtractor(features=features)
+        else:
+            raise ValueError(f"Type d'extracteur inconnu : {extractor_type}")
+
+    @staticmethod
+    def get_extractor_class(extractor_type: str) -> Type[BaseMetricsExtractor]:
+        """
+        Retourne la classe d'extracteur correspondant au type demandé, sans l'instancier
+        (pour consulter les features produites et le coût de l'extraction).
+
+        Args:
+            extractor_type (str): Type de l'extracteur.
+
+        Returns:
+            Type[BaseMetricsExtractor]: Classe de l'extracteur.
+        """
+        if extractor_type == "codemetrics":
+            return CodeMetricsExtractor
         elif extractor_type == "delta":
-            return DeltaMetricsExtractor(jar_path)
+            return DeltaMetricsExtractor
         elif extractor_type == "process":
-            return ProcessMetricsExtractor()
+            return ProcessMetricsExtractor
+        elif extractor_type == "change":
+            return ChangeMetricsExtractor
         else:
             raise ValueError(f"Type d'extracteur inconnu : {extractor_type}")
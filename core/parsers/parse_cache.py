@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS block_spans (
+    key TEXT PRIMARY KEY,
+    parser_version INTEGER NOT NULL,
+    line_count INTEGER NOT NULL,
+    spans TEXT NOT NULL
+);
+"""
+
+# Version du découpage : les entrées produites par une autre version sont ignorées
+PARSER_VERSION = 1
+
+# Nombre maximal de versions de fichiers conservées en mémoire
+DEFAULT_MAX_ENTRIES = 4096
+
+# Nombre d'écritures entre deux validations de la transaction SQLite
+COMMIT_BATCH_SIZE = 100
+
+Span = Tuple[int, int]
+
+
+def content_key(content: str) -> str:
+    """
+    Calcule la clé de cache d'un contenu : le hash de blob Git (`git hash-object`).
+
+    Un fichier du répertoire de travail non modifié a donc la même clé que le blob
+    correspondant dans l'historique.
+
+    Args:
+        content (str): Contenu du fichier.
+
+    Returns:
+        str: Hash SHA-1 hexadécimal.
+    """
+    data = content.encode("utf-8", "surrogateescape")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class ParseCache:
+    """
+    Cache des découpages en blocs Terraform, indexé par hash de blob.
+
+    Pour chaque version de fichier, les bornes (début, fin) de ses blocs sont
+    conservées : une même version n'est découpée qu'une fois par exécution, et,
+    si une base SQLite est fournie, une seule fois d'une exécution à l'autre.
+    """
+
+    _shared: Optional["ParseCache"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            db_path (str, optional): Base SQLite persistante (cache mémoire seul si absent).
+            max_entries (int): Nombre maximal de versions conservées en mémoire.
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, List[Span]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self.conn = None
+
+        if db_path:
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def shared(cls) -> "ParseCache":
+        """
+        Retourne le cache partagé par tous les parsers de l'exécution.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @classmethod
+    def configure(cls, db_path: str = None) -> "ParseCache":
+        """
+        Remplace le cache partagé, par exemple pour activer la persistance sur disque.
+
+        Args:
+            db_path (str, optional): Base SQLite persistante.
+
+        Returns:
+            ParseCache: Nouveau cache partagé.
+        """
+        with cls._shared_lock:
+            if cls._shared is not None:
+                cls._shared.close()
+            cls._shared = cls(db_path)
+            return cls._shared
+
+    def close(self):
+        """Ferme la base SQLite éventuelle."""
+        with self._lock:
+            if self.conn is not None:
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
+
+    def get_block_spans(
+        self, key: str, line_count: int, compute: Callable[[], List[Span]]
+    ) -> List[Span]:
+        """
+        Retourne les bornes des blocs d'une version de fichier, en les calculant au besoin.
+
+        Args:
+            key (str): Hash de la version du fichier.
+            line_count (int): Nombre de lignes du fichier (contrôle de cohérence).
+            compute (Callable[[], List[Span]]): Calcul des bornes en cas d'absence.
+
+        Returns:
+            List[Span]: Bornes (début, fin) des blocs, dans l'ordre du fichier.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            elif self.conn is not None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._remember(key, entry)
+
+        if entry is not None and entry[0] == line_count:
+            return entry[1]
+
+        spans = compute()
+        with self._lock:
+            self._remember(key, (line_count, spans))
+            if self.conn is not None:
+                self._store(key, line_count, spans)
+        return spans
+
+    def _remember(self, key: str, entry: Tuple[int, List[Span]]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[Tuple[int, List[Span]]]:
+        row = self.conn.execute(
+            "SELECT line_count, spans FROM block_spans WHERE key = ? AND parser_version = ?",
+            (key, PARSER_VERSION),
+        ).fetchone()
+        if row is None:
+            return None
+
+        line_count, encoded = row
+        return line_count, [tuple(span) for span in json.loads(encoded)]
+
+    def _store(self, key: str, line_count: int, spans: List[Span]):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO block_spans (key, parser_version, line_count, spans) VALUES (?, ?, ?, ?)",
+            (key, PARSER_VERSION, line_count, json.dumps(spans)),
+        )
+        self._pending_writes += 1
+        if self._pending_writes >= COMMIT_BATCH_SIZE:
+            self.conn.commit()
+            self._pending_writes = 0
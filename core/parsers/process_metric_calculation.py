@@ -1,5 +1,24 @@
+from typing import Iterable
+
 import numpy as np
 
+# Métriques produites par `ProcessMetrics.resume_process_metrics`
+PROCESS_METRICS = (
+    "ndevs",
+    "ncommits",
+    "code_ownership",
+    "exp",
+    "rexp",
+    "sexp",
+    "bexp",
+    "age",
+    "time_interval",
+    "num_defects_before",
+    "num_same_instances_changed_before",
+    "kexp",
+    "num_unique_change",
+)
+
 
 def get_subs_dire_name(fileDirs):
     """
@@ -204,22 +223,31 @@ class ProcessMetrics:
             return delta.days
         return 0
 
-    def resume_process_metrics(self):
-        """
-        Regroupe toutes les métriques calculées en un seul dictionnaire.
-        """
+    def resume_process_metrics(self, metrics: Iterable[str] = None):
+        """
+        Regroupe les métriques calculées en un seul dictionnaire.
+
+        Args:
+            metrics (Iterable[str], optional): Métriques à calculer (par défaut, toutes).
+        """
+        calculators = {
+            "ndevs": self.num_devs,
+            "ncommits": self.num_commits,
+            "code_ownership": self.code_ownership,
+            "exp": lambda: self.contribution["exp"],
+            "rexp": self.get_author_rexp,
+            "sexp": self.get_author_sexp,
+            "bexp": self.get_author_bexp,
+            "age": self.age,
+            "time_interval": self.time_interval,
+            "num_defects_before": self.num_defects_in_block_before,
+            "num_same_instances_changed_before": self.num_same_blocks_with_different_names_changed_before,
+            "kexp": self.kexp,
+            "num_unique_change": self.num_unique_change,
+        }
+        selected = PROCESS_METRICS if metrics is None else set(metrics)
         return {
-            "ndevs": self.num_devs(),
-            "ncommits": self.num_commits(),
-            "code_ownership": self.code_ownership(),
-            "exp": self.contribution["exp"],
-            "rexp": self.get_author_rexp(),
-            "sexp": self.get_author_sexp(),
-            "bexp": self.get_author_bexp(),
-            "age": self.age(),
-            "time_interval": self.time_interval(),
-            "num_defects_before": self.num_defects_in_block_before(),
-            "num_same_instances_changed_before": self.num_same_blocks_with_different_names_changed_before(),
-            "kexp": self.kexp(),
-            "num_unique_change": self.num_unique_change(),
+            name: calculate()
+            for name, calculate in calculators.items()
+            if name in selected
         }
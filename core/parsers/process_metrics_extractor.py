@@ -1,11 +1,13 @@
-from typing import Dict, List
+from typing import Dict, FrozenSet, Iterable, List, Optional
 
 from core.parsers.base_metrics_extractor import BaseMetricsExtractor
 from core.parsers.contribution_builder import (
+    build_contributions_index,
     get_contribution,
-    get_previous_contributions,
 )
-from core.parsers.process_metric_calculation import ProcessMetrics
+from core.parsers.parse_cache import ParseCache
+from core.parsers.process_metric_calculation import PROCESS_METRICS, ProcessMetrics
+from infrastructure.git.block_history_store import BlockHistoryStore, open_synced_store
 from infrastructure.ml.defect_history_manager import load_defect_history
 from utils.block_utils import extract_block_identifier
 from utils.logger_utils import logger
@@ -16,50 +18,148 @@ class ProcessMetricsExtractor(BaseMetricsExtractor):
     Extracteur de métriques de processus pour les blocs Terraform modifiés.
     """
 
-    def __init__(self, repo_path: str = "."):
+    # Parcours de l'historique Git
+    COST = 5
+
+    def __init__(
+        self,
+        repo_path: str = ".",
+        history_db_path: str = None,
+        features: Iterable[str] = None,
+        defect_history_path: str = None,
+        parse_cache: ParseCache = None,
+    ):
+        """
+        Args:
+            repo_path (str): Chemin du dépôt Git.
+            history_db_path (str, optional): Base de l'historique persistant des blocs.
+            features (Iterable[str], optional): Métriques à calculer (par défaut, toutes).
+            defect_history_path (str, optional): Historique des prédictions du dépôt
+                (par défaut `config.DEFECT_HISTORY_DB_PATH`).
+            parse_cache (ParseCache, optional): Cache des découpages des versions
+                historiques (par défaut le cache partagé).
+        """
         self.repo_path = repo_path
+        self.parse_cache = parse_cache
+        self.history_db_path = history_db_path
+        self.defect_history_path = defect_history_path
+        self.features = None if features is None else set(features)
 
-    def extract_metrics(self, modified_blocks: Dict[str, List[str]]) -> Dict[str, dict]:
+    @classmethod
+    def provided_features(cls) -> FrozenSet[str]:
+        return frozenset(PROCESS_METRICS)
+
+    def extract_metrics(
+        self, modified_blocks: Dict[str, List[str]], commit: str = None
+    ) -> Dict[str, dict]:
         """
         Extrait les métriques de processus pour chaque bloc modifié dans les fichiers.
 
+        L'historique persistant des blocs est indexé jusqu'à HEAD : il n'est utilisé
+        que si le commit analysé est le dernier commit indexé. Pour un autre commit,
+        l'historique est reconstruit à partir des ancêtres de ce commit.
+
         Args:
             modified_blocks (Dict[str, List[str]]): Dictionnaire {fichier: [blocs Terraform modifiés]}
+            commit (str, optional): Hash du commit analysé (par défaut HEAD).
 
         Returns:
-            Dict[str, dict]: Métriques de processus pour chaque bloc (clé = fichier::identifiant_bloc)
+            Dict[str, dict]: Métriques de processus pour chaque bloc (clé = fichier::identifiant_bloc),
+            ou `{"error": ...}` pour un bloc dont le calcul a échoué.
         """
         if not modified_blocks:
             logger.warning("Aucun bloc Terraform modifié reçu.")
             return {}
 
-        results = {}
-        defect_history = load_defect_history()
-
+        targets = {}
         for file_path, blocks in modified_blocks.items():
+            identifiers = []
             for block in blocks:
-                try:
-                    block_identifier = extract_block_identifier(block)
+                block_identifier = extract_block_identifier(block)
+                if not block_identifier:
+                    logger.warning(f"Identifiant introuvable pour bloc dans {file_path}")
+                    continue
+                identifiers.append(block_identifier)
+            targets[file_path] = identifiers
 
-                    if not block_identifier:
-                        logger.warning(
-                            f"Identifiant introuvable pour bloc dans {file_path}"
-                        )
-                        continue
+        # Seuls les blocs analysés sont lus dans l'historique des prédictions
+        defect_history = load_defect_history(
+            self.defect_history_path,
+            (f"{f}::{b}" for f, identifiers in targets.items() for b in identifiers),
+        )
+
+        store = self._open_history_store()
+        if (
+            store is not None
+            and commit is not None
+            and store.get_last_indexed_commit() != commit
+        ):
+            logger.info(
+                f"Commit {commit[:7]} différent du dernier commit indexé : "
+                "historique des blocs reconstruit depuis le dépôt"
+            )
+            store.close()
+            store = None
+        try:
+            return self._compute_metrics(
+                targets, defect_history, store, commit or "HEAD"
+            )
+        finally:
+            if store is not None:
+                store.close()
+
+    def _open_history_store(self) -> Optional[BlockHistoryStore]:
+        """
+        Ouvre et synchronise l'historique persistant des blocs.
 
+        Returns:
+            Optional[BlockHistoryStore]: La base synchronisée, ou None si elle est
+            indisponible (l'historique est alors reconstruit en mémoire).
+        """
+        return open_synced_store(self.repo_path, self.history_db_path, self.parse_cache)
+
+    def _compute_metrics(
+        self,
+        targets: Dict[str, List[str]],
+        defect_history: Dict[str, list],
+        store: Optional[BlockHistoryStore],
+        commit: str = "HEAD",
+    ) -> Dict[str, dict]:
+        """
+        Calcule les métriques de processus des blocs suivis.
+
+        Args:
+            targets (Dict[str, List[str]]): {fichier: identifiants des blocs modifiés}.
+            defect_history (Dict[str, list]): Historique des prédictions par bloc.
+            store (Optional[BlockHistoryStore]): Historique persistant des blocs.
+            commit (str): Révision analysée (par défaut HEAD).
+
+        Returns:
+            Dict[str, dict]: Métriques de processus par bloc (clé = fichier::identifiant_bloc).
+        """
+        results = {}
+
+        # Un seul parcours de l'historique pour l'ensemble des blocs modifiés
+        contributions_index = build_contributions_index(
+            self.repo_path, targets, defect_history, store, self.parse_cache, commit
+        )
+
+        for file_path, identifiers in targets.items():
+            for block_identifier in identifiers:
+                try:
                     # Générer la contribution actuelle
                     contribution = get_contribution(
-                        self.repo_path, file_path, block_identifier
+                        self.repo_path, file_path, block_identifier, store, commit
                     )
 
-                    # Générer l'historique enrichi avec defect_history
-                    previous_contributions = get_previous_contributions(
-                        self.repo_path, file_path, block_identifier, defect_history
+                    # Historique enrichi avec defect_history
+                    previous_contributions = contributions_index.get(
+                        (file_path, block_identifier), []
                     )
 
                     if contribution:
                         pm = ProcessMetrics(contribution, previous_contributions)
-                        metrics = pm.resume_process_metrics()
+                        metrics = pm.resume_process_metrics(self.features)
                         results[f"{file_path}::{block_identifier}"] = metrics
                     else:
                         logger.warning(
@@ -70,5 +170,6 @@ class ProcessMetricsExtractor(BaseMetricsExtractor):
                     logger.error(
                         f"Erreur lors du traitement de {file_path} / {block_identifier}: {e}"
                     )
+                    results[f"{file_path}::{block_identifier}"] = {"error": str(e)}
 
         return results
@@ -1,14 +1,23 @@
 import re
-from typing import List, Tuple
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+from core.parsers.parse_cache import ParseCache, content_key
+
+# Ligne d'en-tête d'un bloc Terraform de premier niveau
+BLOCK_HEADER_PATTERN = re.compile(
+    r"^\s*(resource|variable|module|output|provider|data|terraform)\s"
+)
 
 
 class TerraformParser:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, cache: ParseCache = None):
         """
         Initialise le parser avec le contenu du fichier.
 
         Args:
             file_path (str): Chemin vers le fichier Terraform à analyser.
+            cache (ParseCache, optional): Cache des découpages (par défaut le cache partagé).
         """
         with open(file_path, "r") as f:
             self.lines = f.readlines()
@@ -19,14 +28,20 @@ class TerraformParser:
                 f"Le fichier Terraform {file_path} est vide. Analyse ignorée."
             )
 
+        self._init_cache(content_key("".join(self.lines)), cache)
+
     @classmethod
-    def from_string(cls, file_content: str):
+    def from_string(
+        cls, file_content: str, blob_sha: str = None, cache: ParseCache = None
+    ):
         """
         Initialise un parser Terraform à partir d'une chaîne de caractères
         représentant le contenu d'un fichier Terraform.
 
         Args:
             file_content (str): Le contenu du fichier Terraform sous forme de string.
+            blob_sha (str, optional): Hash du blob Git s'il est connu (sinon calculé).
+            cache (ParseCache, optional): Cache des découpages (par défaut le cache partagé).
 
         Returns:
             TerraformParser: Une instance de la classe initialisée avec ce contenu.
@@ -37,54 +52,96 @@ class TerraformParser:
         if not instance.lines:
             raise ValueError("Le contenu Terraform fourni est vide. Analyse ignorée.")
 
+        instance._init_cache(blob_sha or content_key(file_content), cache)
         return instance
 
+    def _init_cache(self, key: str, cache: Optional[ParseCache]):
+        self._cache_key = key
+        self._cache = cache or ParseCache.shared()
+        self._block_spans: Optional[List[Tuple[int, int]]] = None
+        self._block_starts: Optional[List[int]] = None
+
+    def get_block_spans(self) -> List[Tuple[int, int]]:
+        """
+        Retourne les bornes (début, fin) des blocs Terraform de premier niveau, triées.
+
+        L'index est construit en une seule passe sur le fichier, une seule fois par
+        version de fichier, et partagé via le cache de parsing.
+
+        Returns:
+            List[Tuple[int, int]]: Bornes des blocs, dans l'ordre du fichier.
+        """
+        if self._block_spans is None:
+            self._block_spans = self._cache.get_block_spans(
+                self._cache_key, len(self.lines), self._build_block_index
+            )
+            self._block_starts = [start for start, _ in self._block_spans]
+        return self._block_spans
+
     def find_block(self, changed_line: int) -> str:
         """
         Trouve le bloc Terraform englobant une ligne modifiée.
 
+        Une ligne située entre deux blocs est rattachée au bloc qui la précède ;
+        une ligne située avant le premier bloc n'appartient à aucun bloc.
+
         Args:
             changed_line (int): Numéro de la ligne modifiée.
 
         Returns:
             str: Le bloc Terraform englobant la ligne modifiée.
         """
-        if changed_line < 0 or changed_line >= len(self.lines):
+        span = self._find_block_span(changed_line)
+        if span is None:
             return ""
 
-        start, end = self._find_block_bounds(changed_line)
+        start, end = span
         return "\n".join(self.lines[start : end + 1])
 
-    def _find_block_bounds(self, line_number: int) -> Tuple[int, int]:
+    def _find_block_span(self, line_number: int) -> Optional[Tuple[int, int]]:
         """
-        Trouve les bornes exactes du bloc Terraform englobant une ligne donnée.
+        Recherche par dichotomie le bloc dont le début précède la ligne donnée.
 
         Args:
-            line_number (int): Numéro de la ligne pour laquelle trouver les bornes du bloc.
+            line_number (int): Numéro de la ligne.
 
         Returns:
-            Tuple[int, int]: Les indices de début et de fin du bloc Terraform.
+            Optional[Tuple[int, int]]: Bornes du bloc, ou None.
         """
-        if line_number >= len(self.lines):
-            raise IndexError(
-                f"Ligne {line_number} hors des limites du fichier {len(self.lines)} lignes."
-            )
+        if line_number < 0 or line_number >= len(self.lines):
+            return None
 
-        start, end = line_number, line_number
+        spans = self.get_block_spans()
+        index = bisect_right(self._block_starts, line_number) - 1
+        return spans[index] if index >= 0 else None
 
-        # Remonter jusqu'au début du bloc Terraform
-        while start > 0 and not re.match(
-            r"^\s*(resource|variable|module|output|provider|data|terraform)\s",
-            self.lines[start],
-        ):
-            start -= 1
+    def _build_block_index(self) -> List[Tuple[int, int]]:
+        """
+        Construit en une passe l'index des blocs Terraform de premier niveau.
 
-        # Trouver la fin du bloc en comptant les accolades `{}`
+        Un bloc commence sur une ligne d'en-tête (resource, variable, module, ...) située
+        hors de tout bloc et de tout commentaire multiligne, et se termine lorsque
+        le compte des accolades `{}` revient à zéro. Un bloc non refermé s'étend
+        jusqu'à la fin du fichier.
+
+        Returns:
+            List[Tuple[int, int]]: Bornes (début, fin) des blocs, dans l'ordre du fichier.
+        """
+        spans = []
+        block_start = None
         brace_count = 0
         inside_multiline_comment = False
 
-        for i in range(start, len(self.lines)):
-            line = self.lines[i].strip()
+        for i, raw_line in enumerate(self.lines):
+            if (
+                block_start is None
+                and not inside_multiline_comment
+                and BLOCK_HEADER_PATTERN.match(raw_line.rstrip("\n"))
+            ):
+                block_start = i
+                brace_count = 0
+
+            line = raw_line.strip()
 
             if line.startswith("#") or line.startswith("//"):
                 continue
@@ -95,7 +152,7 @@ class TerraformParser:
                 inside_multiline_comment = False
                 continue
 
-            if inside_multiline_comment:
+            if inside_multiline_comment or block_start is None:
                 continue
 
             # Compter les accolades `{}` seulement si ce n'est pas un commentaire
@@ -103,10 +160,13 @@ class TerraformParser:
             brace_count -= line.count("}")
 
             if brace_count == 0:
-                end = i
-                break
+                spans.append((block_start, i))
+                block_start = None
+
+        if block_start is not None:
+            spans.append((block_start, len(self.lines) - 1))
 
-        return start, end
+        return spans
 
     def find_blocks(self, changed_lines: List[int]) -> List[str]:
         """
@@ -116,11 +176,19 @@ class TerraformParser:
             changed_lines (List[int]): Liste des lignes modifiées.
 
         Returns:
-            List[str]: Liste des blocs Terraform impactés.
+            List[str]: Liste des blocs Terraform impactés, sans doublon, dans l'ordre
+            des lignes fournies.
         """
-        unique_blocks = set()
+        seen_spans = set()
+        unique_blocks = {}
         for line in changed_lines:
-            block = self.find_block(line)
+            span = self._find_block_span(line)
+            if span is None or span in seen_spans:
+                continue
+
+            seen_spans.add(span)
+            start, end = span
+            block = "\n".join(self.lines[start : end + 1])
             if block:
-                unique_blocks.add(block)
+                unique_blocks.setdefault(block, None)
         return list(unique_blocks)
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS block_metrics (
+    key TEXT PRIMARY KEY,
+    metrics TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_block_metrics_last_used ON block_metrics (last_used);
+"""
+
+# Taille maximale par défaut des métriques conservées sur disque (octets)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Nombre d'écritures entre deux validations de la base
+COMMIT_BATCH_SIZE = 100
+
+_jar_versions: Dict[Tuple[str, float, int], str] = {}
+
+
+def normalize_block(block: str) -> str:
+    """
+    Normalise le texte d'un bloc : fins de ligne, espaces en fin de ligne et
+    lignes vides en début et fin de bloc.
+
+    Args:
+        block (str): Contenu brut du bloc.
+
+    Returns:
+        str: Texte normalisé.
+    """
+    lines = [line.rstrip() for line in block.replace("\r\n", "\n").split("\n")]
+    return "\n".join(lines).strip("\n")
+
+
+def jar_version(jar_path: str) -> str:
+    """
+    Identifie la version du JAR TerraMetrics par le hash de son contenu.
+
+    Le hash est mémorisé tant que la date de modification et la taille du fichier
+    ne changent pas.
+
+    Args:
+        jar_path (str): Chemin vers le fichier JAR.
+
+    Returns:
+        str: Hash SHA-256 du JAR.
+    """
+    stat = os.stat(jar_path)
+    signature = (os.path.abspath(jar_path), stat.st_mtime, stat.st_size)
+    if signature not in _jar_versions:
+        digest = hashlib.sha256()
+        with open(jar_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        _jar_versions[signature] = digest.hexdigest()
+    return _jar_versions[signature]
+
+
+class TerraMetricsCache:
+    """
+    Cache disque des métriques TerraMetrics par bloc, adressé par contenu.
+
+    La clé est le hash du texte normalisé du bloc et de la version du JAR : un bloc
+    identique à un bloc déjà mesuré (commit précédent, version « avant » du delta,
+    instance de module copiée) n'est pas renvoyé à TerraMetrics. La taille totale
+    est bornée, les entrées les moins récemment utilisées étant évincées.
+    """
+
+    _active: Optional["TerraMetricsCache"] = None
+    _active_lock = threading.Lock()
+
+    def __init__(self, db_path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            db_path (str): Chemin de la base SQLite.
+            max_bytes (int): Taille maximale des métriques conservées.
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._last_used = 0.0
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        (self._total_bytes,) = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM block_metrics"
+        ).fetchone()
+
+    @classmethod
+    def active(cls) -> Optional["TerraMetricsCache"]:
+        """
+        Retourne le cache configuré pour l'exécution, ou None s'il est désactivé.
+        """
+        return cls._active
+
+    @classmethod
+    def configure(cls, db_path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Active le cache pour l'exécution (remplace le cache actif éventuel).
+
+        Args:
+            db_path (str): Chemin de la base SQLite.
+            max_bytes (int): Taille maximale des métriques conservées.
+
+        Returns:
+            TerraMetricsCache: Cache actif.
+        """
+        with cls._active_lock:
+            if cls._active is not None:
+                cls._active.close()
+            cls._active = cls(db_path, max_bytes)
+            return cls._active
+
+    @classmethod
+    def deactivate(cls):
+        """Ferme et désactive le cache actif."""
+        with cls._active_lock:
+            if cls._active is not None:
+                cls._active.close()
+            cls._active = None
+
+    @staticmethod
+    def block_key(block: str, version: str) -> str:
+        """
+        Calcule la clé d'un bloc pour une version du JAR.
+
+        Args:
+            block (str): Contenu brut du bloc.
+            version (str): Version du JAR (voir `jar_version`).
+
+        Returns:
+            str: Clé SHA-256.
+        """
+        payload = f"{version}\0{normalize_block(block)}".encode("utf-8", "surrogateescape")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Retourne les métriques d'un bloc, ou None si elles ne sont pas en cache.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT metrics FROM block_metrics WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.conn.execute(
+                "UPDATE block_metrics SET last_used = ? WHERE key = ?",
+                (self._now(), key),
+            )
+            return json.loads(row[0])
+
+    def put(self, key: str, metrics: dict):
+        """
+        Enregistre les métriques d'un bloc puis évince les entrées les plus anciennes
+        si la taille maximale est dépassée.
+        """
+        encoded = json.dumps(metrics)
+        with self._lock:
+            previous = self.conn.execute(
+                "SELECT size FROM block_metrics WHERE key = ?", (key,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO block_metrics (key, metrics, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, encoded, len(encoded), self._now()),
+            )
+            self._total_bytes += len(encoded) - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+            self._pending_writes += 1
+            if self._pending_writes >= COMMIT_BATCH_SIZE:
+                self.conn.commit()
+                self._pending_writes = 0
+
+    def hit_rate(self) -> float:
+        """Proportion de blocs servis depuis le cache depuis l'ouverture."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self):
+        """Valide les dernières mises à jour et ferme la base."""
+        with self._lock:
+            if self.conn is not None:
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
+
+    def _now(self) -> float:
+        """Horodatage strictement croissant, pour départager les accès rapprochés."""
+        self._last_used = max(time.time(), self._last_used + 1e-6)
+        return self._last_used
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à respecter la taille maximale."""
+        excess = self._total_bytes - self.max_bytes
+        freed = 0
+        stale = []
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM block_metrics ORDER BY last_used"
+        ).fetchall():
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self.conn.executemany("DELETE FROM block_metrics WHERE key = ?", stale)
+        self._total_bytes -= freed
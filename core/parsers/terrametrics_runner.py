@@ -0,0 +1,426 @@
+import json
+import math
+import os
+import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Deque, Dict, List, Optional
+
+from app import config
+from core.parsers.terrametrics_cache import TerraMetricsCache, jar_version
+from core.parsers.terrametrics_worker_pool import TerraMetricsWorkerPool
+from utils.block_utils import terrametrics_block_identifier
+from utils.logger_utils import logger
+
+
+class TerraMetricsRunner:
+    """
+    Exécute TerraMetrics sur des ensembles de blocs Terraform en regroupant les
+    analyses dans le moins d'invocations possible de la JVM.
+
+    Les blocs de plusieurs documents (fichiers, versions avant/après, ...) sont écrits
+    dans un même fichier de travail accompagné d'un manifeste, puis la sortie JSON
+    est redistribuée par document à l'aide des identifiants de blocs.
+    """
+
+    def __init__(
+        self,
+        jar_path: str,
+        label: str = "CODE",
+        batch_size: int = None,
+        pool: TerraMetricsWorkerPool = None,
+        cache: TerraMetricsCache = None,
+        max_workers: int = None,
+    ):
+        """
+        Args:
+            jar_path (str): Chemin vers le fichier JAR de TerraMetrics.
+            label (str): Préfixe des messages de log (CODE, DELTA, ...).
+            batch_size (int, optional): Nombre maximal de blocs par invocation
+                (par défaut `config.TERRAMETRICS_BATCH_SIZE`).
+            pool (TerraMetricsWorkerPool, optional): Workers maintenus en vie (par défaut
+                le pool partagé si `config.TERRAMETRICS_WORKERS` est positif, sinon
+                une JVM par invocation).
+            cache (TerraMetricsCache, optional): Cache des métriques par bloc (par défaut
+                le cache actif de l'exécution, s'il est configuré).
+            max_workers (int, optional): Nombre d'invocations simultanées de TerraMetrics
+                (par défaut la taille du pool, sinon `config.TERRAMETRICS_PARALLELISM`).
+        """
+        self.jar_path = jar_path
+        self.label = label
+        self.batch_size = batch_size or config.TERRAMETRICS_BATCH_SIZE
+        if pool is None and config.TERRAMETRICS_WORKERS > 0:
+            pool = TerraMetricsWorkerPool.shared(jar_path)
+        self.pool = pool
+        self.cache = cache
+        self.max_workers = max(
+            1, max_workers or (pool.size if pool is not None else config.TERRAMETRICS_PARALLELISM)
+        )
+
+    def run_batch(self, documents: Dict[str, List[str]]) -> Dict[str, dict]:
+        """
+        Calcule les métriques TerraMetrics de plusieurs documents.
+
+        Chaque document reçoit `{"data": [...]}` restreint à ses blocs, qu'il ait été
+        analysé seul, dans un lot partagé ou en partie depuis le cache. En cas d'échec d'un lot, ses documents sont réanalysés un par un.
+        Les lots sont analysés en parallèle (au plus `max_workers` à la fois) ; les
+        documents sont répartis pour occuper chaque worker et le résultat suit l'ordre
+        des documents fournis.
+        Avec un cache, seuls les blocs absents du cache sont analysés ; les métriques
+        d'un document dont au moins un bloc provient du cache suivent l'ordre de ses blocs.
+
+        Args:
+            documents (Dict[str, List[str]]): {clé du document: blocs Terraform}.
+
+        Returns:
+            Dict[str, dict]: {clé du document: métriques}, ou `{"error": ...}` en cas d'échec.
+            Un document dont la sortie JSON n'a pas été générée est absent du résultat.
+        """
+        cache = self.cache or TerraMetricsCache.active()
+        version = self._jar_version() if cache is not None else None
+        if version is None:
+            return self._run_batches(documents)
+
+        keys = {
+            doc: [TerraMetricsCache.block_key(block, version) for block in blocks]
+            for doc, blocks in documents.items()
+        }
+        cached = {doc: [cache.get(key) for key in doc_keys] for doc, doc_keys in keys.items()}
+
+        pending = {
+            doc: [block for block, hit in zip(documents[doc], cached[doc]) if hit is None]
+            for doc in documents
+        }
+        outputs = self._run_batches(
+            {doc: blocks for doc, blocks in pending.items() if blocks or not documents[doc]}
+        )
+
+        results = {}
+        for doc, blocks in documents.items():
+            hits = cached[doc]
+            missing = [i for i, hit in enumerate(hits) if hit is None]
+            output = outputs.get(doc) if missing or not blocks else {"data": []}
+            if output is None or "error" in output:
+                if output is not None:
+                    results[doc] = output
+                continue
+
+            entries = self._attribute_entries(output, pending[doc])
+            if entries is not None:
+                for i, entry in zip(missing, entries):
+                    cache.put(keys[doc][i], entry)
+                    hits[i] = entry
+
+            if len(missing) == len(blocks):
+                results[doc] = output
+            elif entries is not None:
+                results[doc] = {"data": hits}
+            else:
+                results[doc] = {
+                    "data": [hit for hit in hits if hit is not None] + output.get("data", [])
+                }
+        return results
+
+    def _run_batches(self, documents: Dict[str, List[str]]) -> Dict[str, dict]:
+        """
+        Analyse les documents par lots (voir `run_batch`), sans passer par le cache.
+        """
+        chunks = self._build_chunks(documents)
+        results = {}
+
+        with tempfile.TemporaryDirectory(prefix="terrametrics_") as work_dir:
+            jobs = [
+                partial(self._process_chunk, index, chunk, documents, work_dir)
+                for index, chunk in enumerate(chunks)
+            ]
+
+            if self.max_workers > 1 and len(jobs) > 1:
+                with ThreadPoolExecutor(
+                    max_workers=min(self.max_workers, len(jobs))
+                ) as executor:
+                    chunk_results = list(executor.map(lambda job: job(), jobs))
+            else:
+                chunk_results = [job() for job in jobs]
+
+        for chunk_result in chunk_results:
+            results.update(chunk_result)
+        return {key: results[key] for key in documents if key in results}
+
+    def run(self, tf_path: str, output_path: str):
+        """
+        Exécute TerraMetrics pour un fichier donné.
+
+        Args:
+            tf_path (str): Chemin du fichier Terraform.
+            output_path (str): Chemin du fichier de sortie JSON.
+        """
+        logger.info(f"[{self.label}] Exécution de TerraMetrics pour {tf_path}...")
+
+        if self.pool is not None:
+            self.pool.run(tf_path, output_path)
+            return
+
+        command = [
+            "java",
+            "-jar",
+            self.jar_path,
+            "--file",
+            tf_path,
+            "-b",
+            "--target",
+            output_path,
+        ]
+        subprocess.run(command, check=True)
+
+    def _process_chunk(
+        self,
+        index: int,
+        chunk: List[str],
+        documents: Dict[str, List[str]],
+        work_dir: str,
+    ) -> Dict[str, dict]:
+        """
+        Analyse un lot, avec repli document par document en cas d'échec.
+
+        Returns:
+            Dict[str, dict]: Métriques des documents du lot.
+        """
+        if len(chunk) == 1:
+            key = chunk[0]
+            return self._run_single(key, documents[key], work_dir, f"single_{index}")
+
+        try:
+            return self._run_chunk(index, chunk, documents, work_dir)
+        except Exception as e:
+            logger.warning(
+                f"[{self.label}] Échec de l'analyse groupée ({len(chunk)} documents) : {e}. "
+                "Analyse document par document."
+            )
+
+        results = {}
+        for position, key in enumerate(chunk):
+            results.update(
+                self._run_single(
+                    key, documents[key], work_dir, f"chunk_{index}_{position}"
+                )
+            )
+        return results
+
+    def _build_chunks(self, documents: Dict[str, List[str]]) -> List[List[str]]:
+        """
+        Répartit les documents en lots sans identifiant de bloc commun entre documents.
+
+        Un document dont un bloc n'a pas d'identifiant reconnaissable est analysé seul.
+        La taille des lots est réduite pour fournir au moins un lot par worker.
+
+        Args:
+            documents (Dict[str, List[str]]): {clé du document: blocs Terraform}.
+
+        Returns:
+            List[List[str]]: Clés des documents de chaque lot.
+        """
+        total_blocks = sum(len(blocks) for blocks in documents.values())
+        chunk_size = min(
+            self.batch_size, max(1, math.ceil(total_blocks / self.max_workers))
+        )
+
+        chunks = []
+        current, current_ids, current_size = [], set(), 0
+
+        for key, blocks in documents.items():
+            identifiers = [terrametrics_block_identifier(block) for block in blocks]
+            if not blocks or None in identifiers:
+                chunks.append([key])
+                continue
+
+            if current and (
+                current_ids & set(identifiers)
+                or current_size + len(blocks) > chunk_size
+            ):
+                chunks.append(current)
+                current, current_ids, current_size = [], set(), 0
+
+            current.append(key)
+            current_ids.update(identifiers)
+            current_size += len(blocks)
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _run_single(
+        self, key: str, blocks: List[str], work_dir: str, name: str
+    ) -> Dict[str, dict]:
+        """
+        Analyse un document seul.
+
+        Returns:
+            Dict[str, dict]: {clé du document: {"data": métriques de ses blocs}}, vide
+            si aucune sortie.
+        """
+        tf_path, json_path = self._write_work_files(work_dir, name, blocks)
+        try:
+            self.run(tf_path, json_path)
+            output = self._load_output(json_path)
+            if output is None:
+                logger.error(f"Fichier JSON non généré pour {key}.")
+                return {}
+            if "data" not in output:
+                logger.error(f"Sortie TerraMetrics sans clé 'data' pour {key}.")
+                return {
+                    key: {"error": "Structure des métriques invalide (clé 'data' absente)."}
+                }
+            return {key: {"data": output["data"]}}
+
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Erreur TerraMetrics ({key}) : {e}")
+            return {key: {"error": "TerraMetrics execution failed"}}
+
+        except Exception as e:
+            logger.error(f"Erreur inattendue ({key}): {e}")
+            return {key: {"error": str(e)}}
+
+    def _run_chunk(
+        self,
+        index: int,
+        chunk: List[str],
+        documents: Dict[str, List[str]],
+        work_dir: str,
+    ) -> Dict[str, dict]:
+        """
+        Analyse plusieurs documents en une seule invocation de TerraMetrics.
+
+        Returns:
+            Dict[str, dict]: {clé du document: {"data": métriques de ses blocs}}.
+        """
+        manifest = [
+            {
+                "document": key,
+                "identifiers": [terrametrics_block_identifier(b) for b in documents[key]],
+            }
+            for key in chunk
+        ]
+        blocks = [block for key in chunk for block in documents[key]]
+
+        name = f"chunk_{index}"
+        tf_path, json_path = self._write_work_files(work_dir, name, blocks)
+        with open(os.path.join(work_dir, f"{name}.manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        logger.info(
+            f"[{self.label}] Analyse groupée de {len(chunk)} documents ({len(blocks)} blocs)."
+        )
+        self.run(tf_path, json_path)
+
+        output = self._load_output(json_path)
+        if output is None or not isinstance(output.get("data"), list):
+            raise ValueError("sortie JSON absente ou sans clé 'data'")
+
+        return {
+            key: {"data": entries}
+            for key, entries in _demultiplex(output["data"], manifest).items()
+        }
+
+    def _jar_version(self) -> Optional[str]:
+        """
+        Retourne la version du JAR, ou None si elle ne peut être déterminée
+        (le cache est alors ignoré).
+        """
+        try:
+            return jar_version(self.jar_path)
+        except OSError as e:
+            logger.debug(f"[{self.label}] Cache TerraMetrics ignoré : {e}")
+            return None
+
+    @staticmethod
+    def _attribute_entries(output: dict, blocks: List[str]) -> Optional[List[dict]]:
+        """
+        Associe les entrées `data` d'une sortie TerraMetrics aux blocs analysés.
+
+        Returns:
+            Optional[List[dict]]: Une entrée par bloc, dans l'ordre des blocs, ou None
+            si l'association n'est pas univoque.
+        """
+        entries = output.get("data")
+        if not isinstance(entries, list) or not blocks:
+            return None
+
+        manifest = [
+            {"document": str(position), "identifiers": [terrametrics_block_identifier(block)]}
+            for position, block in enumerate(blocks)
+        ]
+        try:
+            per_block = _demultiplex(entries, manifest)
+        except ValueError:
+            return None
+
+        if any(len(items) != 1 for items in per_block.values()):
+            return None
+        return [per_block[str(position)][0] for position in range(len(blocks))]
+
+    @staticmethod
+    def _write_work_files(work_dir: str, name: str, blocks: List[str]) -> tuple:
+        """
+        Écrit les blocs dans le répertoire de travail.
+
+        Returns:
+            Tuple[str, str]: Chemins des fichiers .tf et .json.
+        """
+        tf_path = os.path.join(work_dir, f"{name}.tf")
+        with open(tf_path, "w") as f:
+            f.write("\n\n".join(blocks))
+        return tf_path, os.path.join(work_dir, f"{name}.json")
+
+    @staticmethod
+    def _load_output(json_path: str) -> Optional[dict]:
+        if not os.path.exists(json_path):
+            return None
+        with open(json_path, "r") as f:
+            return json.load(f)
+
+
+def _demultiplex(entries: List[dict], manifest: List[dict]) -> Dict[str, List[dict]]:
+    """
+    Redistribue les métriques d'un lot entre ses documents.
+
+    Les entrées sont associées par identifiant de bloc (dans l'ordre du manifeste pour
+    un identifiant répété dans un document) ; à défaut, par position si le nombre
+    d'entrées correspond au nombre de blocs écrits.
+
+    Args:
+        entries (List[dict]): Entrées `data` de la sortie TerraMetrics.
+        manifest (List[dict]): Documents du lot et identifiants de leurs blocs.
+
+    Returns:
+        Dict[str, List[dict]]: {clé du document: entrées de ses blocs}.
+    """
+    per_document = {item["document"]: [] for item in manifest}
+
+    owners: Dict[str, Deque[str]] = {}
+    for item in manifest:
+        for identifier in item["identifiers"]:
+            owners.setdefault(identifier, deque()).append(item["document"])
+
+    by_identifier = True
+    for entry in entries:
+        identifier = " ".join(str(entry.get("block_identifiers", "")).split())
+        if not owners.get(identifier):
+            by_identifier = False
+            break
+        per_document[owners[identifier].popleft()].append(entry)
+
+    if by_identifier:
+        return per_document
+
+    positions = [item["document"] for item in manifest for _ in item["identifiers"]]
+    if len(positions) != len(entries):
+        raise ValueError(
+            f"{len(entries)} entrées TerraMetrics pour {len(positions)} blocs écrits"
+        )
+
+    per_document = {item["document"]: [] for item in manifest}
+    for document, entry in zip(positions, entries):
+        per_document[document].append(entry)
+    return per_document
@@ -0,0 +1,87 @@
+"""
+Worker TerraMetrics parlant le protocole de `TerraMetricsWorkerPool`.
+
+Protocole (une requête JSON par ligne sur stdin, une réponse JSON par ligne sur stdout) :
+    {"id": 1, "op": "extract", "file": "blocs.tf", "target": "sortie.json"}
+        -> {"id": 1, "ok": true} ou {"id": 1, "ok": false, "error": "..."}
+    {"id": 2, "op": "ping"}      -> {"id": 2, "ok": true}
+    {"id": 3, "op": "shutdown"}  -> {"id": 3, "ok": true}, puis arrêt du worker
+
+Le pool utilise par défaut le worker Java résident `java/TerraMetricsWorker.java`,
+qui charge TerraMetrics une seule fois. Ce worker Python exécute `java -jar` pour
+chaque requête : il n'apporte aucun gain et sert de référence du protocole, pour les
+tests et les environnements où le worker Java ne peut pas être lancé
+(`TERRAMETRICS_WORKER_CMD`).
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+
+def handle_request(request: dict, jar_path: str) -> dict:
+    """
+    Traite une requête du protocole.
+
+    Args:
+        request (dict): Requête décodée.
+        jar_path (str): Chemin vers le fichier JAR de TerraMetrics.
+
+    Returns:
+        dict: Réponse à renvoyer.
+    """
+    response = {"id": request.get("id")}
+    op = request.get("op")
+
+    if op in ("ping", "shutdown"):
+        response["ok"] = True
+        return response
+
+    if op != "extract":
+        response.update(ok=False, error=f"Opération inconnue : {op}")
+        return response
+
+    command = [
+        "java",
+        "-jar",
+        jar_path,
+        "--file",
+        request["file"],
+        "-b",
+        "--target",
+        request["target"],
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode == 0:
+        response["ok"] = True
+    else:
+        response.update(ok=False, error=result.stderr.strip() or f"code {result.returncode}")
+    return response
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker TerraMetrics")
+    parser.add_argument("--jar", required=True, help="Chemin du JAR TerraMetrics")
+    args = parser.parse_args(argv)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+
+        request = {}
+        try:
+            request = json.loads(line)
+            response = handle_request(request, args.jar)
+        except Exception as e:
+            response = {"id": request.get("id"), "ok": False, "error": str(e)}
+
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+        if request.get("op") == "shutdown":
+            break
+
+
+if __name__ == "__main__":
+    main()
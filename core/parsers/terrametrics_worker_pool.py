@@ -0,0 +1,296 @@
+import atexit
+import json
+import os
+import queue
+import shlex
+import signal
+import subprocess
+import threading
+from itertools import count
+from typing import Dict, List, Optional
+
+from app import config
+from utils.logger_utils import logger
+
+# Racine du projet, ajoutée au PYTHONPATH des workers Python
+PROJECT_ROOT = config.PROJECT_ROOT
+
+# Worker Java résident par défaut (lancé depuis ses sources, Java 11+)
+JAVA_WORKER_SOURCE = os.path.join(
+    PROJECT_ROOT, "core", "parsers", "java", "TerraMetricsWorker.java"
+)
+
+
+class TerraMetricsWorker:
+    """
+    Processus worker TerraMetrics maintenu en vie entre les analyses.
+
+    Les réponses sont lues par un thread dédié afin de pouvoir appliquer un délai
+    maximal à chaque requête. Le worker est lancé dans son propre groupe de
+    processus : le tuer arrête aussi la JVM qu'il a lancée.
+    """
+
+    def __init__(self, command: List[str]):
+        """
+        Args:
+            command (List[str]): Commande de lancement du worker.
+        """
+        self.command = command
+        self.process: Optional[subprocess.Popen] = None
+        self._responses: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._ids = count(1)
+        self.start()
+
+    def start(self):
+        """Lance (ou relance) le processus worker."""
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            path for path in (PROJECT_ROOT, env.get("PYTHONPATH")) if path
+        )
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            env=env,
+            start_new_session=os.name == "posix",
+        )
+        self._responses = queue.Queue()
+        threading.Thread(
+            target=self._read_responses,
+            args=(self.process, self._responses),
+            daemon=True,
+        ).start()
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def request(self, payload: dict, timeout: float) -> dict:
+        """
+        Envoie une requête et attend la réponse correspondante.
+
+        Args:
+            payload (dict): Requête (sans identifiant).
+            timeout (float): Délai maximal en secondes.
+
+        Returns:
+            dict: Réponse du worker.
+
+        Raises:
+            subprocess.TimeoutExpired: Si le worker ne répond pas à temps.
+            RuntimeError: Si le worker s'est arrêté.
+        """
+        request_id = next(self._ids)
+        self.process.stdin.write(json.dumps({"id": request_id, **payload}) + "\n")
+        self.process.stdin.flush()
+
+        while True:
+            try:
+                response = self._responses.get(timeout=timeout)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(self.command, timeout)
+
+            if response is None:
+                raise RuntimeError("le worker TerraMetrics s'est arrêté")
+            if response.get("id") == request_id:
+                return response
+
+    def stop(self):
+        """Arrête le worker, en le tuant s'il ne s'arrête pas de lui-même."""
+        if self.process is None:
+            return
+
+        try:
+            if self.is_alive():
+                self.process.stdin.write(json.dumps({"op": "shutdown"}) + "\n")
+                self.process.stdin.flush()
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except Exception:
+            self._kill_group()
+        self.process = None
+
+    def kill(self):
+        """Tue immédiatement le worker et les processus qu'il a lancés (JVM)."""
+        if self.process is not None:
+            self._kill_group()
+            self.process = None
+
+    def _kill_group(self):
+        if os.name == "posix":
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            self.process.kill()
+        self.process.wait()
+
+    @staticmethod
+    def _read_responses(process: subprocess.Popen, responses: queue.Queue):
+        for line in process.stdout:
+            try:
+                responses.put(json.loads(line))
+            except ValueError:
+                logger.debug(f"Réponse invalide du worker TerraMetrics : {line!r}")
+        responses.put(None)
+
+
+class TerraMetricsWorkerPool:
+    """
+    Pool de workers TerraMetrics maintenus en vie, communiquant par un protocole
+    requête/réponse JSON ligne par ligne (voir `core.parsers.terrametrics_worker`).
+
+    Chaque analyse est confiée à un worker libre ; un worker arrêté est relancé et
+    un worker dépassant le délai imparti est tué (avec sa JVM) puis relancé.
+
+    Par défaut, chaque worker est une JVM exécutant `TerraMetricsWorker.java`, qui
+    charge TerraMetrics une seule fois et l'appelle directement pour chaque analyse.
+    """
+
+    _shared: Dict[str, "TerraMetricsWorkerPool"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        jar_path: str,
+        size: int = None,
+        timeout: float = None,
+        command: List[str] = None,
+    ):
+        """
+        Args:
+            jar_path (str): Chemin vers le fichier JAR de TerraMetrics.
+            size (int, optional): Nombre de workers (par défaut `config.TERRAMETRICS_WORKERS`).
+            timeout (float, optional): Délai maximal par analyse, en secondes.
+            command (List[str], optional): Commande de lancement d'un worker
+                (par défaut `config.TERRAMETRICS_WORKER_CMD`, sinon le worker Java
+                résident).
+        """
+        self.jar_path = jar_path
+        self.size = max(1, size or config.TERRAMETRICS_WORKERS)
+        self.timeout = timeout or config.TERRAMETRICS_TIMEOUT
+        self.command = command or self._default_command(jar_path)
+
+        self._idle: "queue.Queue[TerraMetricsWorker]" = queue.Queue()
+        self._workers: List[TerraMetricsWorker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @classmethod
+    def shared(cls, jar_path: str) -> "TerraMetricsWorkerPool":
+        """
+        Retourne le pool partagé pour un JAR donné (arrêté à la fin du processus).
+        """
+        with cls._shared_lock:
+            if jar_path not in cls._shared:
+                pool = cls(jar_path)
+                atexit.register(pool.close)
+                cls._shared[jar_path] = pool
+            return cls._shared[jar_path]
+
+    def run(self, tf_path: str, output_path: str):
+        """
+        Exécute TerraMetrics sur un fichier à l'aide d'un worker du pool.
+
+        Args:
+            tf_path (str): Chemin du fichier Terraform.
+            output_path (str): Chemin du fichier de sortie JSON.
+
+        Raises:
+            subprocess.CalledProcessError: Si l'analyse échoue.
+            subprocess.TimeoutExpired: Si l'analyse dépasse le délai imparti.
+        """
+        worker = self._acquire()
+        try:
+            response = worker.request(
+                {"op": "extract", "file": tf_path, "target": output_path},
+                self.timeout,
+            )
+        except subprocess.TimeoutExpired:
+            logger.error(
+                f"Délai TerraMetrics dépassé ({self.timeout}s) pour {tf_path} : redémarrage du worker."
+            )
+            worker.kill()
+            raise
+        except Exception as e:
+            logger.error(f"Worker TerraMetrics arrêté pendant l'analyse de {tf_path} : {e}")
+            worker.kill()
+            raise subprocess.CalledProcessError(1, self.command, stderr=str(e))
+        finally:
+            self._release(worker)
+
+        if not response.get("ok"):
+            raise subprocess.CalledProcessError(
+                1, self.command, stderr=response.get("error")
+            )
+
+    def health_check(self) -> int:
+        """
+        Vérifie que les workers libres répondent et relance ceux qui ne répondent pas.
+
+        Returns:
+            int: Nombre de workers relancés.
+        """
+        restarted = 0
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+            try:
+                healthy = worker.is_alive() and worker.request(
+                    {"op": "ping"}, self.timeout
+                ).get("ok")
+            except Exception:
+                healthy = False
+
+            if not healthy:
+                worker.kill()
+                worker.start()
+                restarted += 1
+            self._idle.put(worker)
+        return restarted
+
+    def close(self):
+        """Arrête tous les workers."""
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+
+    def _acquire(self) -> TerraMetricsWorker:
+        """
+        Retourne un worker libre, en lançant un nouveau worker tant que le pool n'est pas plein.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Pool TerraMetrics fermé")
+            if self._idle.empty() and len(self._workers) < self.size:
+                worker = TerraMetricsWorker(self.command)
+                self._workers.append(worker)
+                return worker
+
+        worker = self._idle.get()
+        if not worker.is_alive():
+            logger.warning("Worker TerraMetrics arrêté : redémarrage.")
+            worker.start()
+        return worker
+
+    def _release(self, worker: TerraMetricsWorker):
+        if worker.process is None:
+            worker.start()
+        self._idle.put(worker)
+
+    @staticmethod
+    def _default_command(jar_path: str) -> List[str]:
+        if config.TERRAMETRICS_WORKER_CMD:
+            return [
+                part.replace("{jar}", jar_path)
+                for part in shlex.split(config.TERRAMETRICS_WORKER_CMD)
+            ]
+        return ["java", JAVA_WORKER_SOURCE, "--jar", jar_path]
@@ -1,23 +1,39 @@
 from typing import Dict, List
 
+from core.parsers.parse_cache import ParseCache
 from infrastructure.git.git_changes import GitChanges
 
 
 class DetectTFChanges:
     """Orchestration de la détection des blocs Terraform modifiés."""
 
-    def __init__(self, repo_path: str = "."):
+    def __init__(
+        self, repo_path: str = ".", parse_cache: ParseCache = None, commit: str = "HEAD"
+    ):
         """
         Initialise la classe en configurant l'analyse des changements Git.
 
         Args:
             repo_path (str, optional): Chemin du dépôt Git (par défaut, le répertoire courant).
+            parse_cache (ParseCache, optional): Cache des découpages (par défaut le
+                cache partagé).
+            commit (str): Révision dont les changements sont analysés (par défaut HEAD).
         """
-        self.git_changes = GitChanges(repo_path)
+        self.git_changes = GitChanges(repo_path, parse_cache=parse_cache, commit=commit)
+
+    def close(self):
+        """Libère le service Git utilisé pour la détection."""
+        self.git_changes.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def get_modified_tf_blocks(self) -> Dict[str, List[str]]:
         """
-        Récupère les blocs Terraform modifiés à partir du dernier commit (pour CodeMetrics).
+        Récupère les blocs Terraform modifiés par le commit analysé (pour CodeMetrics).
 
         Returns:
             Dict[str, List[str]]: Dictionnaire contenant les fichiers Terraform et leurs blocs modifiés.
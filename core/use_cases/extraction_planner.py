@@ -0,0 +1,90 @@
+from typing import Dict, List
+
+from core.parsers.metrics_extractor_factory import MetricsExtractorFactory
+
+
+class ExtractionPlan:
+    """
+    Extracteurs à exécuter pour un ensemble de features, avec les features
+    attendues de chacun.
+    """
+
+    def __init__(
+        self,
+        extractors: Dict[str, str],
+        features: Dict[str, List[str]],
+        unresolved: List[str],
+        cost: int,
+    ):
+        """
+        Args:
+            extractors (Dict[str, str]): {rôle: type d'extracteur}, dans l'ordre d'exécution.
+            features (Dict[str, List[str]]): {rôle: features produites pour le modèle}.
+            unresolved (List[str]): Features qu'aucun extracteur ne produit (valeur 0.0).
+            cost (int): Coût relatif total des extractions.
+        """
+        self.extractors = extractors
+        self.features = features
+        self.unresolved = unresolved
+        self.cost = cost
+
+    def requires(self, role: str) -> bool:
+        """Indique si l'extracteur du rôle donné doit être exécuté."""
+        return role in self.extractors
+
+    def describe(self) -> str:
+        steps = ", ".join(
+            f"{extractor_type} ({len(self.features[role])} features)"
+            for role, extractor_type in self.extractors.items()
+        )
+        return (
+            f"Plan d'extraction : {steps or 'aucun extracteur'} - coût {self.cost}, "
+            f"{len(self.unresolved)} feature(s) sans extracteur"
+        )
+
+
+class ExtractionPlanner:
+    """
+    Détermine, à partir du schéma de features d'un modèle, les extracteurs à exécuter.
+
+    Un extracteur n'est retenu que s'il produit au moins une feature sélectionnée ;
+    par exemple, le parcours de l'historique Git (métriques de processus) est évité
+    lorsqu'aucune feature de processus n'est sélectionnée.
+    """
+
+    def __init__(self, extractor_types: Dict[str, str]):
+        """
+        Args:
+            extractor_types (Dict[str, str]): {rôle: type d'extracteur} disponibles,
+                dans l'ordre d'exécution (ex: {"code": "codemetrics", ...}).
+        """
+        self.extractor_types = extractor_types
+
+    def plan(self, selected_features: List[str]) -> ExtractionPlan:
+        """
+        Construit le plan d'extraction des features sélectionnées.
+
+        Args:
+            selected_features (List[str]): Features du modèle.
+
+        Returns:
+            ExtractionPlan: Extracteurs retenus et features attendues de chacun.
+        """
+        extractors, features = {}, {}
+        resolved = set()
+        cost = 0
+
+        for role, extractor_type in self.extractor_types.items():
+            extractor_class = MetricsExtractorFactory.get_extractor_class(extractor_type)
+            provided = extractor_class.provided_features()
+            wanted = [f for f in selected_features if f in provided]
+            if not wanted:
+                continue
+
+            extractors[role] = extractor_type
+            features[role] = wanted
+            resolved.update(wanted)
+            cost += extractor_class.COST
+
+        unresolved = [f for f in selected_features if f not in resolved]
+        return ExtractionPlan(extractors, features, unresolved, cost)
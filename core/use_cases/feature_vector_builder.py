@@ -1,8 +1,23 @@
-from typing import Dict, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 
+from app import config
+from core.parsers.base_metrics_extractor import BaseMetricsExtractor
 from core.parsers.metrics_extractor_factory import MetricsExtractorFactory
+from core.parsers.parse_cache import ParseCache
+from core.parsers.terrametrics_cache import TerraMetricsCache
 from core.use_cases.detect_tf_changes import DetectTFChanges
+from core.use_cases.extraction_planner import ExtractionPlanner
+from infrastructure.git.git_adapter import resolve_analyzed_commit
+from infrastructure.ml.defect_history_manager import defect_history_digest
+from infrastructure.ml.feature_matrix import FeatureMatrix
+from infrastructure.ml.feature_store import FeatureStore
 from infrastructure.ml.selected_features_loader import load_selected_features
+from utils.logger_utils import logger
+
+# Moteur des métriques de code, enregistré avec les vecteurs du magasin de features
+METRICS_ENGINE = "terrametrics"
 
 
 def normalize_block_identifier(block_str: str) -> str:
@@ -22,28 +37,100 @@ def normalize_block_identifier(block_str: str) -> str:
 class FeatureVectorBuilder:
     """
     Construit des vecteurs de caractéristiques pour chaque bloc Terraform modifié
-    en combinant les métriques codemetrics, delta et process.
+    en combinant les métriques codemetrics, delta, change et process.
     """
 
-    def __init__(self, repo_path: str, terrametrics_jar_path: str, model_name: str):
+    def __init__(
+        self,
+        repo_path: str,
+        terrametrics_jar_path: str,
+        model_name: str,
+        selected_features: List[str] = None,
+        history_db_path: str = None,
+        defect_history_path: str = None,
+        parse_cache: ParseCache = None,
+        metrics_cache: TerraMetricsCache = None,
+        feature_store: FeatureStore = None,
+    ):
+        """
+        Args:
+            repo_path (str): Chemin du dépôt Git.
+            terrametrics_jar_path (str): Chemin vers le fichier JAR de TerraMetrics.
+            model_name (str): Nom du modèle dont le schéma de features est utilisé.
+            selected_features (List[str], optional): Schéma à utiliser à la place de celui
+                du modèle (ex: union des schémas d'un ensemble de modèles).
+            history_db_path (str, optional): Base de l'historique persistant des blocs du
+                dépôt (par défaut `config.BLOCK_HISTORY_DB_PATH`).
+            defect_history_path (str, optional): Historique des prédictions du dépôt
+                (par défaut `config.DEFECT_HISTORY_DB_PATH`).
+            parse_cache (ParseCache, optional): Cache des découpages en blocs (par
+                défaut le cache partagé du processus).
+            metrics_cache (TerraMetricsCache, optional): Cache des métriques TerraMetrics
+                (par défaut le cache actif du processus, s'il est configuré).
+            feature_store (FeatureStore, optional): Magasin des vecteurs déjà extraits
+                (par défaut, aucun).
+        """
         self.repo_path = repo_path
+        self.history_db_path = history_db_path
+        self.defect_history_path = defect_history_path
+        self.parse_cache = parse_cache
+        self.metrics_cache = metrics_cache
+        self.feature_store = feature_store
         self.terrametrics_jar_path = terrametrics_jar_path
         self.model_name = model_name
 
-        # Initialisation des extracteurs
-        self.code_extractor = MetricsExtractorFactory.get_extractor(
-            "codemetrics", self.terrametrics_jar_path
+        # Features du modèle : seuls les extracteurs qui en produisent sont exécutés
+        self.selected_features = (
+            selected_features
+            if selected_features is not None
+            else load_selected_features(model_name)
         )
-        self.delta_extractor = MetricsExtractorFactory.get_extractor(
-            "delta", self.terrametrics_jar_path
+        planner = ExtractionPlanner(
+            {
+                "code": "codemetrics",
+                "delta": "delta",
+                "change": "change",
+                "process": "process",
+            }
         )
-        self.process_extractor = MetricsExtractorFactory.get_extractor(
-            "process", self.terrametrics_jar_path
+        self.plan = planner.plan(self.selected_features)
+        logger.info(f"[{model_name}] {self.plan.describe()}")
+
+        # Initialisation des extracteurs retenus par le plan
+        self.code_extractor = self._create_extractor("code")
+        self.delta_extractor = self._create_extractor("delta")
+        self.change_extractor = self._create_extractor("change")
+        self.process_extractor = self._create_extractor("process")
+
+    def _create_extractor(self, role: str) -> Optional[BaseMetricsExtractor]:
+        if not self.plan.requires(role):
+            return None
+        return MetricsExtractorFactory.get_extractor(
+            self.plan.extractors[role],
+            self.terrametrics_jar_path,
+            features=self.plan.features[role],
+            repo_path=self.repo_path,
+            history_db_path=self.history_db_path,
+            defect_history_path=self.defect_history_path,
+            parse_cache=self.parse_cache,
+            metrics_cache=self.metrics_cache,
         )
 
+    @staticmethod
+    def _submit(
+        executor: ThreadPoolExecutor,
+        extractor: Optional[BaseMetricsExtractor],
+        blocks: dict,
+        **kwargs,
+    ) -> Optional[Future]:
+        """Lance une extraction en arrière-plan (None si l'extracteur n'est pas planifié)."""
+        if extractor is None:
+            return None
+        return executor.submit(extractor.extract_metrics, blocks, **kwargs)
+
     def filter_and_order_vectors(
         self, all_metrics: Dict[str, Dict[str, float]], selected_features: List[str]
-    ) -> Dict[str, List[float]]:
+    ) -> FeatureMatrix:
         """
         Filtre et ordonne les vecteurs selon les features sélectionnées.
 
@@ -52,33 +139,139 @@ class FeatureVectorBuilder:
             selected_features (List[str]): Liste ordonnée des features à conserver.
 
         Returns:
-            Dict[str, List[float]]: Dictionnaire {block_id: vecteur filtré et ordonné}.
+            FeatureMatrix: Matrice {block_id: vecteur filtré et ordonné}.
         """
-        vectors = {}
-        for block_id, features in all_metrics.items():
-            vector = [float(features.get(f, 0.0)) for f in selected_features]
-            vectors[block_id] = vector
-        return vectors
+        return FeatureMatrix.from_records(all_metrics, selected_features)
 
-    def build_vectors(self) -> Dict[str, List[float]]:
+    def build_vectors(self, commit: str = None) -> FeatureMatrix:
         """
         Construit un vecteur de caractéristiques pour chaque bloc modifié.
 
+        Args:
+            commit (str, optional): Hash du commit analysé, déjà résolu par l'appelant
+                (par défaut, résolu depuis HEAD).
+
         Returns:
-            Dict[str, List[float]]: Mapping block_id -> vecteur de caractéristiques (features)
+            FeatureMatrix: Matrice block_id -> vecteur de caractéristiques (features)
         """
-        detect = DetectTFChanges(self.repo_path)
+        if not self.selected_features:
+            raise ValueError("Aucune feature sélectionnée trouvée.")
 
-        blocks_for_code_and_process = detect.get_modified_tf_blocks()
-        blocks_for_delta = detect.get_changed_blocks()
+        # Vecteurs déjà extraits pour ce commit
+        store = self.feature_store
+        if commit is None and store is not None:
+            commit = resolve_analyzed_commit(self.repo_path)
+        if store is not None:
+            stored = store.load(
+                commit,
+                self.selected_features,
+                METRICS_ENGINE,
+                history_digest=partial(self._history_digest, commit=commit),
+            )
+            if stored is not None:
+                logger.info(
+                    f"[{self.model_name}] {len(stored)} vecteur(s) repris du magasin "
+                    f"de features (commit {commit[:7]})"
+                )
+                return stored
+
+        vectors, failures = self._extract_vectors(commit)
+        if store is not None and len(vectors):
+            if failures:
+                # Des métriques manquent (valent 0) : l'extraction n'est pas réutilisable
+                logger.warning(
+                    f"[{self.model_name}] Extraction incomplète ({', '.join(failures)}) : "
+                    "vecteurs non enregistrés dans le magasin de features"
+                )
+            else:
+                store.save(
+                    commit,
+                    vectors,
+                    METRICS_ENGINE,
+                    history=self._history_digest(vectors.block_ids.tolist(), commit),
+                )
+        return vectors
 
-        # Extraction des métriques
-        code_metrics_raw = self.code_extractor.extract_metrics(
-            blocks_for_code_and_process
+    def _history_digest(self, block_ids: List[str], commit: str) -> str:
+        """
+        Empreinte de l'historique des prédictions des blocs, dont dépendent les
+        métriques de processus (vide si aucune n'est calculée). Les prédictions du
+        commit analysé, enregistrées après l'extraction, en sont exclues.
+        """
+        if not self.plan.requires("process"):
+            return ""
+        return defect_history_digest(
+            block_ids, self.defect_history_path, exclude_commit=commit
         )
-        delta_metrics_raw = self.delta_extractor.extract_metrics(blocks_for_delta)
-        process_metrics_raw = self.process_extractor.extract_metrics(
-            blocks_for_code_and_process
+
+    @staticmethod
+    def _failed(role: str, metrics_raw: Dict[str, dict]) -> List[str]:
+        """Liste les entrées en échec (`{"error": ...}`) d'un extracteur."""
+        return [
+            f"{role} {key}"
+            for key, metrics in metrics_raw.items()
+            if isinstance(metrics, dict) and "error" in metrics
+        ]
+
+    def _extract_vectors(self, commit: str = None) -> Tuple[FeatureMatrix, List[str]]:
+        """
+        Exécute les extracteurs du plan et fusionne leurs métriques par bloc.
+
+        Args:
+            commit (str, optional): Hash du commit analysé (par défaut HEAD).
+
+        Returns:
+            Tuple[FeatureMatrix, List[str]]: Matrice block_id -> vecteur de
+            caractéristiques (features) et entrées dont l'extraction a échoué.
+        """
+        with DetectTFChanges(
+            self.repo_path, parse_cache=self.parse_cache, commit=commit or "HEAD"
+        ) as detect:
+            blocks_for_code_and_process = (
+                detect.get_modified_tf_blocks()
+                if self.code_extractor or self.process_extractor
+                else {}
+            )
+            blocks_for_delta = (
+                detect.get_changed_blocks()
+                if self.delta_extractor or self.change_extractor
+                else {}
+            )
+
+        # Extraction des métriques en parallèle : TerraMetrics (code, delta), diff
+        # textuel (change) et historique Git (process) ; extracteurs absents du plan :
+        # aucune métrique
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            code_future = self._submit(
+                executor, self.code_extractor, blocks_for_code_and_process
+            )
+            # Les métriques « après » du delta sont reprises de CodeMetrics dès
+            # qu'elles sont disponibles ; les blocs « avant » sont analysés sans attendre
+            delta_future = self._submit(
+                executor,
+                self.delta_extractor,
+                blocks_for_delta,
+                after_metrics=code_future,
+            )
+            change_future = self._submit(
+                executor, self.change_extractor, blocks_for_delta
+            )
+            process_future = self._submit(
+                executor,
+                self.process_extractor,
+                blocks_for_code_and_process,
+                commit=commit,
+            )
+
+            code_metrics_raw = code_future.result() if code_future else {}
+            delta_metrics_raw = delta_future.result() if delta_future else {}
+            change_metrics_raw = change_future.result() if change_future else {}
+            process_metrics_raw = process_future.result() if process_future else {}
+
+        failures = (
+            self._failed("code", code_metrics_raw)
+            + self._failed("delta", delta_metrics_raw)
+            + self._failed("process", process_metrics_raw)
         )
 
         # Reformatage pour codemetrics
@@ -92,35 +285,50 @@ class FeatureVectorBuilder:
         # Reformatage pour delta
         delta_by_block_id = {}
         for file_path, file_metrics in delta_metrics_raw.items():
+            # Fichier en échec : {"error": ...}
+            if "error" in file_metrics:
+                continue
             for block_name, metrics in file_metrics.items():
                 block_id = normalize_block_identifier(block_name)
                 full_id = f"{file_path}::{block_id}"
                 delta_by_block_id[full_id] = metrics
 
+        # Reformatage pour change
+        change_by_block_id = {}
+        for file_path, file_metrics in change_metrics_raw.items():
+            for block_name, metrics in file_metrics.items():
+                block_id = normalize_block_identifier(block_name)
+                change_by_block_id[f"{file_path}::{block_id}"] = metrics
+
         # Reformatage pour process
         process_by_block_id = {}
         for full_id, metrics in process_metrics_raw.items():
+            # Bloc en échec : {"error": ...}
+            if "error" in metrics:
+                continue
             file_path, raw_block_id = full_id.split("::", 1)
             normalized_id = normalize_block_identifier(raw_block_id)
             full_normalized_id = f"{file_path}::{normalized_id}"
             process_by_block_id[full_normalized_id] = metrics
 
         # Fusion des sources
-        all_block_ids = (
-            set(code_by_block_id) | set(delta_by_block_id) | set(process_by_block_id)
-        )
+        sources = [
+            code_by_block_id,
+            delta_by_block_id,
+            change_by_block_id,
+            process_by_block_id,
+        ]
+        all_block_ids = set().union(*sources)
 
         all_metrics = {}
         for block_id in all_block_ids:
             combined = {}
-            for source in [code_by_block_id, delta_by_block_id, process_by_block_id]:
+            for source in sources:
                 combined.update(source.get(block_id, {}))
             all_metrics[block_id] = combined
 
-        # Charger la liste des features sélectionnées dans le bon ordre
-        selected_features = load_selected_features(self.model_name)
-        if not selected_features:
-            raise ValueError("Aucune feature sélectionnée trouvée.")
-
         # Appliquer le filtrage et l’ordre
-        return self.filter_and_order_vectors(all_metrics, selected_features)
+        return (
+            self.filter_and_order_vectors(all_metrics, self.selected_features),
+            failures,
+        )
@@ -18,7 +18,7 @@ class ReportGenerator:
         Génère un rapport HTML contenant les prédictions enrichies.
         Tronque le commit hash et formate la date pour un meilleur affichage.
         """
-        defect_history = load_defect_history()
+        defect_history = load_defect_history(block_ids=predictions)
         enriched_predictions = []
 
         for block_id, label in predictions.items():
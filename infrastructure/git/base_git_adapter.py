@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+
+class BaseGitAdapter(ABC):
+    """
+    Interface des services d'accès Git utilisés pour analyser un commit (HEAD par défaut).
+    """
+
+    @abstractmethod
+    def get_latest_commit_files(self) -> List[Tuple[str, str]]:
+        """
+        Récupère la liste des fichiers Terraform modifiés ou supprimés dans le commit analysé.
+
+        Returns:
+            List[Tuple[str, str]]: Liste des fichiers `.tf` modifiés avec leur statut (modified/deleted).
+        """
+        pass
+
+    @abstractmethod
+    def get_modified_tf_files_with_content(self) -> List[Tuple[str, str, str, str]]:
+        """
+        Récupère les fichiers .tf modifiés avec leur contenu avant et après le commit.
+
+        Returns:
+            List[Tuple[str, str, str, str]]: (chemin, statut, contenu_actuel, contenu_précédent)
+        """
+        pass
+
+    @abstractmethod
+    def get_latest_commit_sources(self) -> Dict[str, str]:
+        """
+        Récupère le contenu, après le commit analysé, des fichiers Terraform qu'il modifie.
+
+        Returns:
+            Dict[str, str]: {chemin: contenu} (fichiers supprimés exclus).
+        """
+        pass
+
+    @abstractmethod
+    def get_modified_lines(self) -> Dict[str, Tuple[List[int], List[int]]]:
+        """
+        Récupère les numéros des lignes ajoutées et supprimées par fichier dans le commit analysé.
+
+        Returns:
+            Dict[str, Tuple[List[int], List[int]]]: {chemin: (lignes ajoutées, lignes supprimées)}.
+        """
+        pass
+
+    def close(self):
+        """Libère les ressources du service (processus Git persistants)."""
+        pass
@@ -0,0 +1,349 @@
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pydriller import Git
+
+from app import config
+from core.parsers.parse_cache import ParseCache
+from core.parsers.terraform_parser import TerraformParser
+from infrastructure.git.git_history import TERRAFORM_PATHSPEC, iter_commits_touching
+from utils.block_utils import extract_block_identifier
+from utils.logger_utils import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS commits (
+    seq INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    author TEXT,
+    date TEXT,
+    exp INTEGER
+);
+CREATE TABLE IF NOT EXISTS file_changes (
+    seq INTEGER NOT NULL,
+    new_path TEXT,
+    old_path TEXT
+);
+CREATE TABLE IF NOT EXISTS block_changes (
+    seq INTEGER NOT NULL,
+    new_path TEXT,
+    old_path TEXT,
+    block_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_commits_author ON commits (author);
+CREATE INDEX IF NOT EXISTS idx_file_changes_seq ON file_changes (seq);
+CREATE INDEX IF NOT EXISTS idx_file_changes_new_path ON file_changes (new_path);
+CREATE INDEX IF NOT EXISTS idx_file_changes_old_path ON file_changes (old_path);
+CREATE INDEX IF NOT EXISTS idx_block_changes_block_id ON block_changes (block_id, seq);
+CREATE INDEX IF NOT EXISTS idx_block_changes_new_path ON block_changes (new_path);
+CREATE INDEX IF NOT EXISTS idx_block_changes_old_path ON block_changes (old_path);
+"""
+
+# Nombre de commits indexés entre deux validations de la transaction
+COMMIT_BATCH_SIZE = 500
+
+
+class BlockHistoryStore:
+    """
+    Historique persistant des blocs Terraform par commit, stocké dans une base SQLite.
+
+    La base mémorise le dernier commit indexé : chaque synchronisation ne traite
+    que les commits postérieurs, de sorte que le coût d'une exécution dépend du
+    nombre de nouveaux commits et non de la taille totale de l'historique.
+    Seuls les commits modifiant au moins un fichier `.tf` sont chargés.
+    """
+
+    def __init__(
+        self, repo_path: str = ".", db_path: str = None, parse_cache: ParseCache = None
+    ):
+        """
+        Ouvre (ou crée) la base d'historique des blocs.
+
+        Args:
+            repo_path (str): Chemin du dépôt Git indexé.
+            db_path (str, optional): Chemin de la base SQLite (par défaut sous `out/`).
+            parse_cache (ParseCache, optional): Cache des découpages des versions
+                indexées (par défaut le cache partagé).
+        """
+        self.repo_path = repo_path
+        self.parse_cache = parse_cache
+        self.db_path = db_path or config.BLOCK_HISTORY_DB_PATH
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """Ferme la connexion à la base."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_last_indexed_commit(self) -> Optional[str]:
+        """
+        Retourne le hash du dernier commit indexé, ou None si la base est vide.
+        """
+        return self._get_meta("last_indexed_commit")
+
+    def sync(self) -> int:
+        """
+        Indexe les commits ajoutés depuis la dernière synchronisation.
+
+        Si le dernier commit indexé n'est plus un ancêtre de HEAD (historique réécrit)
+        ou si la base provient d'un autre dépôt, l'index est reconstruit.
+
+        Returns:
+            int: Nombre de commits indexés lors de cet appel.
+        """
+        git = Git(self.repo_path)
+        try:
+            head = git.repo.head.commit.hexsha
+            last_indexed = self.get_last_indexed_commit()
+            repo_root = os.path.abspath(git.path)
+
+            if self._get_meta("repo_root") != repo_root:
+                self._reset()
+                last_indexed = None
+            elif last_indexed == head:
+                return 0
+            elif last_indexed and not self._is_ancestor(git, last_indexed, head):
+                logger.warning(
+                    "Historique Git réécrit depuis la dernière indexation : reconstruction de l'historique des blocs."
+                )
+                self._reset()
+                last_indexed = None
+
+            self._set_meta("repo_root", repo_root)
+
+            rev = f"{last_indexed}..{head}" if last_indexed else head
+            next_seq = self._next_seq()
+            indexed = 0
+
+            for commit in iter_commits_touching(
+                self.repo_path, [TERRAFORM_PATHSPEC], rev
+            ):
+                self._index_commit(next_seq + indexed, commit)
+                indexed += 1
+
+                if indexed % COMMIT_BATCH_SIZE == 0:
+                    self._set_meta("last_indexed_commit", commit.hash)
+                    self.conn.commit()
+
+            self._set_meta("last_indexed_commit", head)
+            self.conn.commit()
+
+            if indexed:
+                logger.info(f"Historique des blocs : {indexed} nouveau(x) commit(s) indexé(s).")
+            return indexed
+        finally:
+            git.clear()
+
+    def get_contributions(self, file_path: str, block_identifiers: str) -> List[Dict]:
+        """
+        Retourne, dans l'ordre chronologique, les commits ayant contenu un bloc donné
+        dans une version modifiée du fichier.
+
+        Les renommages du fichier (`git mv`) sont suivis : l'historique antérieur
+        au renommage est lu sous l'ancien chemin.
+
+        Args:
+            file_path (str): Chemin du fichier Terraform.
+            block_identifiers (str): Identifiant du bloc (ex: aws_s3_bucket.mybucket).
+
+        Returns:
+            List[Dict]: Commits {hash, author, date, exp}, un par occurrence du bloc.
+        """
+        commits = []
+        for path, first_seq, last_seq in reversed(self._get_path_lineage(file_path)):
+            rows = self.conn.execute(
+                """
+                SELECT c.hash, c.author, c.date, c.exp
+                FROM block_changes b JOIN commits c ON c.seq = b.seq
+                WHERE b.block_id = ? AND (b.new_path = ? OR b.old_path = ?)
+                  AND b.seq BETWEEN ? AND ?
+                ORDER BY b.seq, b.rowid
+                """,
+                (block_identifiers, path, path, first_seq, last_seq),
+            ).fetchall()
+            commits.extend(self._row_to_commit(row) for row in rows)
+        return commits
+
+    def _get_path_lineage(self, file_path: str) -> List[Tuple[str, int, int]]:
+        """
+        Reconstitue les chemins successifs d'un fichier à partir des renommages indexés.
+
+        Args:
+            file_path (str): Chemin actuel du fichier.
+
+        Returns:
+            List[Tuple[str, int, int]]: Segments (chemin, premier seq, dernier seq),
+            du plus récent au plus ancien.
+        """
+        lineage = []
+        path, last_seq = file_path, self._next_seq()
+        visited = set()
+
+        while (path, last_seq) not in visited:
+            visited.add((path, last_seq))
+            rename = self.conn.execute(
+                """
+                SELECT seq, old_path FROM file_changes
+                WHERE new_path = ? AND old_path IS NOT NULL AND old_path != new_path
+                  AND seq <= ?
+                ORDER BY seq DESC LIMIT 1
+                """,
+                (path, last_seq),
+            ).fetchone()
+
+            if rename is None:
+                lineage.append((path, 0, last_seq))
+                break
+
+            rename_seq, old_path = rename
+            lineage.append((path, rename_seq, last_seq))
+            path, last_seq = old_path, rename_seq - 1
+
+        return lineage
+
+    def get_head_commit_for_file(self, file_path: str) -> Optional[Dict]:
+        """
+        Retourne le dernier commit indexé s'il a modifié le fichier donné.
+
+        Args:
+            file_path (str): Chemin du fichier Terraform.
+
+        Returns:
+            Optional[Dict]: Commit {hash, author, date, exp}, ou None.
+        """
+        row = self.conn.execute(
+            """
+            SELECT c.hash, c.author, c.date, c.exp
+            FROM commits c JOIN file_changes f ON f.seq = c.seq
+            WHERE c.hash = ? AND (f.new_path = ? OR f.old_path = ?)
+            LIMIT 1
+            """,
+            (self.get_last_indexed_commit(), file_path, file_path),
+        ).fetchone()
+        return self._row_to_commit(row) if row else None
+
+    def _index_commit(self, seq: int, commit):
+        """
+        Enregistre un commit, ses fichiers Terraform modifiés et les blocs qu'ils contiennent.
+        """
+        self.conn.execute(
+            "INSERT INTO commits (seq, hash, author, date, exp) VALUES (?, ?, ?, ?, ?)",
+            (
+                seq,
+                commit.hash,
+                commit.author.name,
+                commit.committer_date.isoformat(),
+                commit.author.total if hasattr(commit.author, "total") else 1,
+            ),
+        )
+
+        for file in commit.modified_files:
+            if not (file.new_path or file.old_path or "").endswith(".tf"):
+                continue
+
+            self.conn.execute(
+                "INSERT INTO file_changes (seq, new_path, old_path) VALUES (?, ?, ?)",
+                (seq, file.new_path, file.old_path),
+            )
+
+            if not file.source_code:
+                continue
+
+            try:
+                parser = TerraformParser.from_string(
+                    file.source_code, cache=self.parse_cache
+                )
+                all_blocks = parser.find_blocks(list(range(len(parser.lines))))
+            except Exception:
+                continue
+
+            rows = []
+            for block in all_blocks:
+                block_id = extract_block_identifier(block)
+                if block_id:
+                    rows.append((seq, file.new_path, file.old_path, block_id))
+
+            self.conn.executemany(
+                "INSERT INTO block_changes (seq, new_path, old_path, block_id) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    @staticmethod
+    def _is_ancestor(git, ancestor: str, descendant: str) -> bool:
+        try:
+            return git.repo.is_ancestor(ancestor, descendant)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _row_to_commit(row) -> Dict:
+        commit_hash, author, date, exp = row
+        return {
+            "hash": commit_hash,
+            "author": author,
+            "date": datetime.fromisoformat(date),
+            "exp": exp,
+        }
+
+    def _next_seq(self) -> int:
+        (max_seq,) = self.conn.execute("SELECT MAX(seq) FROM commits").fetchone()
+        return (max_seq or 0) + 1
+
+    def _reset(self):
+        for table in ("commits", "file_changes", "block_changes", "meta"):
+            self.conn.execute(f"DELETE FROM {table}")
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+
+def open_synced_store(
+    repo_path: str = ".", db_path: str = None, parse_cache: ParseCache = None
+) -> Optional[BlockHistoryStore]:
+    """
+    Ouvre et synchronise l'historique persistant des blocs d'un dépôt.
+
+    Args:
+        repo_path (str): Chemin du dépôt Git.
+        db_path (str, optional): Base SQLite (par défaut `config.BLOCK_HISTORY_DB_PATH`).
+        parse_cache (ParseCache, optional): Cache des découpages (par défaut le cache partagé).
+
+    Returns:
+        Optional[BlockHistoryStore]: La base synchronisée, ou None si elle est
+        indisponible (base verrouillée ou corrompue, échec de la synchronisation) :
+        l'historique est alors reconstruit en mémoire.
+    """
+    store = None
+    try:
+        store = BlockHistoryStore(repo_path, db_path, parse_cache)
+        store.sync()
+        return store
+    except Exception as e:
+        logger.warning(
+            f"Historique persistant des blocs indisponible, parcours complet du dépôt : {e}"
+        )
+        if store is not None:
+            store.close()
+        return None
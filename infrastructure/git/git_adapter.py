@@ -1,42 +1,67 @@
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
-from pydriller import ModificationType, Repository
+from pydriller import ModificationType
 
+from infrastructure.git.base_git_adapter import BaseGitAdapter
+from infrastructure.git.head_resolver import HeadResolver
 from utils.logger_utils import logger
 
 
 def get_latest_commit_hash(repo_path: str = ".") -> str:
-    latest = next(Repository(repo_path, order="reverse").traverse_commits())
-    return latest.hash
+    return HeadResolver.for_repo(repo_path).head().hash
 
 
-class GitAdapter:
+def resolve_analyzed_commit(repo_path: str = ".", rev: str = "HEAD") -> str:
+    """
+    Résout une révision en hash du commit dont les changements sont analysés : la
+    révision elle-même, ou son dernier ancêtre qui n'est pas un merge.
+
+    Args:
+        repo_path (str): Chemin du dépôt local.
+        rev (str): Révision Git (hash, branche, tag ; par défaut HEAD).
+
+    Returns:
+        str: Hash complet du commit analysé.
+
+    Raises:
+        ValueError: Si la révision est inconnue ou ne mène à aucun commit non-merge.
+    """
+    try:
+        commit = HeadResolver.for_repo(repo_path).latest_non_merge(rev)
+    except Exception as e:
+        raise ValueError(f"Révision Git inconnue : {rev} ({e})") from e
+    if commit is None:
+        raise ValueError(f"Aucun commit non-merge à la révision {rev}")
+    return commit.hash
+
+
+class GitAdapter(BaseGitAdapter):
     """
     Service centralisé pour les opérations Git, utilisant PyDriller.
     """
 
-    def __init__(self, repo_path: str = "."):
+    def __init__(self, repo_path: str = ".", commit: str = "HEAD"):
         """
         Initialise le service Git et configure l'analyse du dépôt.
 
         Args:
             repo_path (str): Chemin du dépôt local (par défaut le répertoire courant).
+            commit (str): Révision analysée (par défaut HEAD).
         """
         self.repo_path = repo_path
-        self.repo = Repository(repo_path, order="reverse", only_no_merge=True)
+        self.commit = commit
+        self.head_resolver = HeadResolver.for_repo(repo_path)
 
     @staticmethod
     def verify_git_repo(repo_path: str = "."):
         """
-        Vérifie que le répertoire est un dépôt Git valide en utilisant PyDriller.
+        Vérifie que le répertoire est un dépôt Git valide contenant au moins un commit.
+        Seul HEAD est lu, sans parcourir l'historique.
         """
         try:
-            repo = Repository(repo_path)
-            commits = list(repo.traverse_commits())
-            if not commits:
-                raise ValueError("Aucun commit trouvé dans le dépôt.")
+            head = HeadResolver.for_repo(repo_path).head()
             logger.info(
-                f"Git est bien initialisé et accessible. Dernier commit : {commits[0].hash}"
+                f"Git est bien initialisé et accessible. Dernier commit : {head.hash}"
             )
         except Exception as e:
             logger.error(
@@ -46,16 +71,18 @@ class GitAdapter:
 
     def get_latest_commit_files(self) -> List[Tuple[str, str]]:
         """
-        Récupère la liste des fichiers Terraform modifiés ou supprimés dans le dernier commit.
+        Récupère la liste des fichiers Terraform modifiés ou supprimés dans le commit analysé.
 
         Returns:
             List[Tuple[str, str]]: Liste des fichiers `.tf` modifiés avec leur statut (modified/deleted).
         """
         try:
-            latest_commit = next(self.repo.traverse_commits())
+            latest_commit = self.head_resolver.latest_non_merge(self.commit)
+            if latest_commit is None:
+                return []
             modified_files = []
 
-            for file in latest_commit.modified_files:
+            for file in self.head_resolver.modified_files(latest_commit):
                 if file.filename.endswith(".tf"):
                     if file.change_type == ModificationType.DELETE:
                         status = "deleted"
@@ -83,16 +110,14 @@ class GitAdapter:
             List[Tuple[str, str, str, str]]: (chemin, statut, contenu_actuel, contenu_précédent)
         """
         try:
-            commits = list(self.repo.traverse_commits())
-            if len(commits) < 2:
+            latest_commit = self.head_resolver.latest_non_merge(self.commit)  # Dernier commit
+            if latest_commit is None or not latest_commit.parents:
                 logger.warning("Aucun commit précédent trouvé.")
                 return []
 
-            latest_commit = commits[0]  # Dernier commit
-
             files = []
 
-            for file in latest_commit.modified_files:
+            for file in self.head_resolver.modified_files(latest_commit):
                 if file.filename.endswith(".tf"):
                     # Déterminer le statut du fichier
                     status = "modified"
@@ -126,3 +151,42 @@ class GitAdapter:
                 f"Erreur lors de la récupération des fichiers modifiés : {str(e)}"
             )
             return []
+
+    def get_latest_commit_sources(self) -> Dict[str, str]:
+        """
+        Récupère le contenu, après le commit analysé, des fichiers Terraform qu'il modifie.
+
+        Returns:
+            Dict[str, str]: {chemin: contenu} (fichiers supprimés exclus).
+        """
+        latest_commit = self.head_resolver.latest_non_merge(self.commit)
+        if latest_commit is None:
+            return {}
+
+        return {
+            file.new_path: file.source_code
+            for file in self.head_resolver.modified_files(latest_commit)
+            if file.new_path
+            and file.filename.endswith(".tf")
+            and file.source_code is not None
+        }
+
+    def get_modified_lines(self) -> Dict[str, Tuple[List[int], List[int]]]:
+        """
+        Récupère les numéros des lignes ajoutées et supprimées par fichier dans le commit analysé.
+
+        Returns:
+            Dict[str, Tuple[List[int], List[int]]]: {chemin: (lignes ajoutées, lignes supprimées)}.
+        """
+        latest_commit = self.head_resolver.latest_non_merge(self.commit)
+        if latest_commit is None:
+            return {}
+
+        lines = {}
+        for file in self.head_resolver.modified_files(latest_commit):
+            added_lines = [line[0] for line in file.diff_parsed["added"]]
+            deleted_lines = [line[0] for line in file.diff_parsed["deleted"]]
+            for path in (file.new_path, file.old_path):
+                if path and path not in lines:
+                    lines[path] = (added_lines, deleted_lines)
+        return lines
@@ -0,0 +1,33 @@
+from infrastructure.git.base_git_adapter import BaseGitAdapter
+from infrastructure.git.git_adapter import GitAdapter
+from infrastructure.git.native_git_adapter import NativeGitAdapter
+
+
+class GitAdapterFactory:
+    """
+    Factory permettant de récupérer le service Git en fonction du backend spécifié.
+    """
+
+    @staticmethod
+    def get_adapter(
+        backend: str, repo_path: str = ".", commit: str = "HEAD"
+    ) -> BaseGitAdapter:
+        """
+        Retourne le service Git correspondant au backend demandé.
+
+        Args:
+            backend (str): Backend Git à utiliser (native, pydriller).
+            repo_path (str): Chemin du dépôt local.
+            commit (str): Révision analysée (par défaut HEAD).
+
+        Returns:
+            BaseGitAdapter: Instance du service Git.
+        """
+        backend = backend.lower()
+
+        if backend == "native":
+            return NativeGitAdapter(repo_path, commit)
+        elif backend == "pydriller":
+            return GitAdapter(repo_path, commit)
+        else:
+            raise ValueError(f"Backend Git inconnu : {backend}")
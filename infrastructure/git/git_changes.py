@@ -1,9 +1,12 @@
 import os
 from typing import Dict, List, Tuple
 
+from app import config
+from core.parsers.parse_cache import ParseCache
 from core.parsers.terraform_parser import TerraformParser
-from infrastructure.git.git_adapter import GitAdapter
+from infrastructure.git.git_adapter_factory import GitAdapterFactory
 from utils.logger_utils import logger
+from utils.terraform_fmt import format_terraform_source
 
 
 class GitChanges:
@@ -11,15 +14,39 @@ class GitChanges:
     Classe permettant d'extraire les lignes modifiées des fichiers Terraform et d'identifier les blocs impactés.
     """
 
-    def __init__(self, repo_path: str = "."):
+    def __init__(
+        self,
+        repo_path: str = ".",
+        git_backend: str = None,
+        parse_cache: ParseCache = None,
+        commit: str = "HEAD",
+    ):
         """
         Initialise la classe pour analyser les changements Git.
 
         Args:
             repo_path (str): Chemin du dépôt local.
+            git_backend (str, optional): Backend Git (par défaut `config.GIT_BACKEND`).
+            parse_cache (ParseCache, optional): Cache des découpages (par défaut le
+                cache partagé).
+            commit (str): Révision dont les changements sont analysés (par défaut HEAD).
         """
         self.repo_path = repo_path
-        self.git_adapter = GitAdapter(repo_path)
+        self.parse_cache = parse_cache
+        self.commit = commit
+        self.git_adapter = GitAdapterFactory.get_adapter(
+            git_backend or config.GIT_BACKEND, repo_path, commit
+        )
+
+    def close(self):
+        """Libère le service Git (processus `git cat-file` du backend natif)."""
+        self.git_adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def get_modified_lines(self) -> List[Tuple[str, List[int], List[int]]]:
         """
@@ -31,6 +58,7 @@ class GitChanges:
         """
         try:
             modified_files = self.git_adapter.get_latest_commit_files()
+            lines_by_file = self.git_adapter.get_modified_lines()
             modified_files_with_lines = []
 
             for file_path, _ in modified_files:
@@ -39,17 +67,7 @@ class GitChanges:
                     logger.error(f"Fichier introuvable : {abs_file_path}")
                     continue
 
-                added_lines = []
-                deleted_lines = []
-                latest_commit = next(self.git_adapter.repo.traverse_commits())
-
-                for file in latest_commit.modified_files:
-                    if file.new_path == file_path or file.old_path == file_path:
-                        added_lines = [line[0] for line in file.diff_parsed["added"]]
-                        deleted_lines = [
-                            line[0] for line in file.diff_parsed["deleted"]
-                        ]
-                        break
+                added_lines, deleted_lines = lines_by_file.get(file_path, ([], []))
 
                 modified_files_with_lines.append(
                     (file_path, added_lines, deleted_lines)
@@ -64,21 +82,29 @@ class GitChanges:
         """
         Récupère les blocs Terraform modifiés à partir des lignes impactées.
 
+        Les blocs sont lus dans le contenu des fichiers au commit analysé (et non
+        dans la copie de travail), comme les versions comparées par
+        `get_changed_blocks` : les numéros de lignes du diff s'y rapportent.
+        `terraform fmt` est appliqué en mémoire à ce contenu avant le découpage.
+
         Returns:
             Dict[str, List[str]]: Dictionnaire où la clé est le chemin du fichier,
             et la valeur est une liste de blocs Terraform modifiés.
         """
         try:
-            modified_lines = self.get_modified_lines()
+            sources = self.git_adapter.get_latest_commit_sources()
+            lines_by_file = self.git_adapter.get_modified_lines()
             modified_blocks = {}
 
-            for file_path, added_lines, _ in modified_lines:
-                abs_file_path = os.path.join(self.repo_path, file_path)
-                if not os.path.exists(abs_file_path):
-                    logger.error(f"Fichier introuvable : {abs_file_path}")
+            for file_path, content in sources.items():
+                if not content.strip():
+                    logger.warning(f"Fichier Terraform vide, analyse ignorée : {file_path}")
                     continue
 
-                parser = TerraformParser(abs_file_path)
+                added_lines, _ = lines_by_file.get(file_path, ([], []))
+                parser = TerraformParser.from_string(
+                    format_terraform_source(content), cache=self.parse_cache
+                )
                 blocks = parser.find_blocks(added_lines)
                 if blocks:
                     modified_blocks[file_path] = blocks
@@ -115,8 +141,12 @@ class GitChanges:
                     continue
 
                 # Extraire les blocs Terraform AVANT et APRÈS modification
-                parser_before = TerraformParser.from_string(previous_content)
-                parser_after = TerraformParser.from_string(current_content)
+                parser_before = TerraformParser.from_string(
+                    previous_content, cache=self.parse_cache
+                )
+                parser_after = TerraformParser.from_string(
+                    current_content, cache=self.parse_cache
+                )
 
                 blocks_before = parser_before.find_blocks(
                     range(len(previous_content.split("\n")))
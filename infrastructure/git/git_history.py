@@ -0,0 +1,72 @@
+from typing import Generator, Iterable, List
+
+from pydriller import Git
+from pydriller.domain.commit import Commit
+
+from utils.logger_utils import logger
+
+# Pathspec couvrant tous les fichiers Terraform du dépôt, quel que soit le dossier
+TERRAFORM_PATHSPEC = "*.tf"
+
+
+def iter_commits_touching(
+    repo_path: str, paths: Iterable[str], rev: str = "HEAD"
+) -> Generator[Commit, None, None]:
+    """
+    Parcourt, du plus ancien au plus récent, uniquement les commits ayant modifié
+    l'un des chemins donnés.
+
+    Le filtrage est délégué à `git rev-list -- <paths>` : les commits qui ne touchent
+    aucun de ces chemins ne sont jamais chargés ni analysés.
+
+    Args:
+        repo_path (str): Chemin du dépôt Git.
+        paths (Iterable[str]): Chemins ou pathspecs Git (ex: "*.tf").
+        rev (str): Révision ou intervalle à parcourir (ex: "HEAD", "abc..HEAD").
+
+    Yields:
+        Commit: Commits PyDriller concernés.
+    """
+    paths = list(paths)
+    if not paths:
+        return
+
+    git = Git(repo_path)
+    try:
+        for gitpython_commit in git.repo.iter_commits(
+            rev, paths=paths, reverse=True, full_history=True
+        ):
+            yield git.get_commit_from_gitpython(gitpython_commit)
+    finally:
+        git.clear()
+
+
+def get_file_lineage(repo_path: str, file_path: str, rev: str = "HEAD") -> List[str]:
+    """
+    Retourne les chemins successifs d'un fichier en suivant ses renommages (`git log --follow`).
+
+    Args:
+        repo_path (str): Chemin du dépôt Git.
+        file_path (str): Chemin du fichier à la révision donnée.
+        rev (str): Révision à partir de laquelle l'historique est suivi (par défaut HEAD).
+
+    Returns:
+        List[str]: Chemins du fichier, du plus récent au plus ancien (inclut `file_path`).
+    """
+    lineage = [file_path]
+    git = Git(repo_path)
+    try:
+        output = git.repo.git.log(
+            "--follow", "--name-only", "--format=", rev, "--", file_path
+        )
+    except Exception as e:
+        logger.debug(f"Impossible de suivre l'historique de {file_path} : {e}")
+        return lineage
+    finally:
+        git.clear()
+
+    for line in output.splitlines():
+        path = line.strip()
+        if path and path not in lineage:
+            lineage.append(path)
+    return lineage
@@ -0,0 +1,161 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from pydriller import Git
+from pydriller.domain.commit import Commit, ModifiedFile
+
+
+# Commits hors HEAD dont la résolution et les fichiers modifiés sont conservés
+MAX_CACHED_COMMITS = 16
+
+
+class HeadResolver:
+    """
+    Résolution légère du commit HEAD (ou d'une autre révision) d'un dépôt Git et de
+    son premier parent.
+
+    Seuls le commit et son parent sont lus, sans parcourir l'historique. Une instance
+    est partagée par dépôt pour toute l'exécution : le commit et ses fichiers
+    modifiés ne sont calculés qu'une fois tant que HEAD ne change pas (et une fois
+    par commit pour les autres révisions, dans la limite de `MAX_CACHED_COMMITS`).
+    """
+
+    _instances: Dict[str, "HeadResolver"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, repo_path: str = "."):
+        """
+        Ouvre le dépôt Git.
+
+        Args:
+            repo_path (str): Chemin du dépôt local.
+        """
+        self.repo_path = repo_path
+        self.git = Git(repo_path)
+        self._lock = threading.Lock()
+        self._head: Optional[Commit] = None
+        self._latest_non_merge: Optional[Commit] = None
+        self._modified_files: Dict[str, List[ModifiedFile]] = {}
+        # {hash de la révision: dernier commit non-merge}, hors HEAD
+        self._resolved: "OrderedDict[str, Optional[Commit]]" = OrderedDict()
+
+    @classmethod
+    def for_repo(cls, repo_path: str = ".") -> "HeadResolver":
+        """
+        Retourne l'instance partagée pour un dépôt.
+
+        Args:
+            repo_path (str): Chemin du dépôt local.
+
+        Returns:
+            HeadResolver: Résolveur associé au dépôt.
+        """
+        key = os.path.abspath(repo_path)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(repo_path)
+            return cls._instances[key]
+
+    @classmethod
+    def evict(cls, repo_path: str = "."):
+        """
+        Oublie l'instance partagée d'un dépôt (et libère le dépôt ouvert).
+
+        Args:
+            repo_path (str): Chemin du dépôt local.
+        """
+        with cls._instances_lock:
+            resolver = cls._instances.pop(os.path.abspath(repo_path), None)
+        if resolver is not None:
+            resolver.git.clear()
+
+    @classmethod
+    def reset(cls):
+        """Oublie toutes les instances partagées (et libère les dépôts ouverts)."""
+        with cls._instances_lock:
+            for resolver in cls._instances.values():
+                resolver.git.clear()
+            cls._instances.clear()
+
+    def head(self) -> Commit:
+        """
+        Retourne le commit HEAD.
+
+        Lève une exception si le dépôt ne contient aucun commit.
+        """
+        with self._lock:
+            self._refresh()
+            return self._head
+
+    def latest_non_merge(self, rev: str = "HEAD") -> Optional[Commit]:
+        """
+        Retourne le dernier commit qui n'est pas un merge à une révision donnée (la
+        révision elle-même dans le cas courant).
+
+        Args:
+            rev (str): Révision Git (hash, branche, tag ; par défaut HEAD).
+
+        Returns:
+            Optional[Commit]: Commit analysé, ou None si la révision n'a que des merges.
+        """
+        with self._lock:
+            if rev == "HEAD":
+                self._refresh()
+                if self._latest_non_merge is None:
+                    self._latest_non_merge = self._non_merge(self._head)
+                return self._latest_non_merge
+
+            sha = self.git.repo.commit(rev).hexsha
+            if self._head is not None and sha == self._head.hash:
+                if self._latest_non_merge is None:
+                    self._latest_non_merge = self._non_merge(self._head)
+                return self._latest_non_merge
+
+            if sha not in self._resolved:
+                self._resolved[sha] = self._non_merge(self.git.get_commit(sha))
+                if len(self._resolved) > MAX_CACHED_COMMITS:
+                    evicted = self._resolved.popitem(last=False)[1]
+                    if evicted is not None:
+                        self._modified_files.pop(evicted.hash, None)
+            self._resolved.move_to_end(sha)
+            return self._resolved[sha]
+
+    def _non_merge(self, commit: Commit) -> Optional[Commit]:
+        """Retourne le commit s'il n'est pas un merge, sinon son dernier ancêtre non-merge."""
+        if len(commit.parents) <= 1:
+            return commit
+        latest = next(
+            self.git.repo.iter_commits(commit.hash, max_count=1, no_merges=True), None
+        )
+        return self.git.get_commit_from_gitpython(latest) if latest is not None else None
+
+    def modified_files(self, commit: Commit) -> List[ModifiedFile]:
+        """
+        Retourne les fichiers modifiés d'un commit, calculés une seule fois par commit.
+
+        Args:
+            commit (Commit): Commit résolu par cette instance.
+
+        Returns:
+            List[ModifiedFile]: Fichiers modifiés par rapport au premier parent.
+        """
+        with self._lock:
+            if commit.hash not in self._modified_files:
+                self._modified_files[commit.hash] = commit.modified_files
+            return self._modified_files[commit.hash]
+
+    def _refresh(self):
+        """
+        Relit HEAD (lecture directe des références) et invalide le cache s'il a changé.
+        """
+        head_sha = self.git.repo.head.commit.hexsha
+        if self._head is None or self._head.hash != head_sha:
+            self._head = self.git.get_commit(head_sha)
+            self._latest_non_merge = None
+            # Fichiers modifiés conservés pour les seules révisions encore en cache
+            kept = {commit.hash for commit in self._resolved.values() if commit is not None}
+            self._modified_files = {
+                sha: files for sha, files in self._modified_files.items() if sha in kept
+            }
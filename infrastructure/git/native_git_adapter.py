@@ -0,0 +1,445 @@
+import codecs
+import os
+import re
+import subprocess
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from infrastructure.git.base_git_adapter import BaseGitAdapter
+from utils.logger_utils import logger
+
+# Hash d'objet nul utilisé par `git diff --raw` pour un côté absent (ajout/suppression)
+NULL_OID_PATTERN = re.compile(r"^0+$")
+
+# En-tête de hunk d'un diff unifié : @@ -a[,b] +c[,d] @@
+HUNK_HEADER_PATTERN = re.compile(rb"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class FileChange(NamedTuple):
+    """
+    Modification d'un fichier dans un commit, lue depuis `git diff-tree --raw`.
+    """
+
+    change_type: str  # added, deleted, renamed, modified ou unknown
+    old_path: Optional[str]
+    new_path: Optional[str]
+    old_blob: Optional[str]
+    new_blob: Optional[str]
+    added_lines: List[int]
+    deleted_lines: List[int]
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.new_path or self.old_path)
+
+
+class GitCatFile:
+    """
+    Processus `git cat-file --batch` persistant servant à lire le contenu des blobs.
+
+    Tous les objets demandés pendant l'exécution transitent par le même processus.
+    """
+
+    def __init__(self, repo_path: str = "."):
+        """
+        Args:
+            repo_path (str): Chemin du dépôt local.
+        """
+        self.repo_path = repo_path
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def read_blob(self, oid: str) -> Optional[bytes]:
+        """
+        Lit le contenu brut d'un blob.
+
+        Args:
+            oid (str): Hash de l'objet.
+
+        Returns:
+            Optional[bytes]: Contenu du blob, ou None si l'objet est introuvable.
+        """
+        with self._lock:
+            process = self._ensure_process()
+            process.stdin.write(f"{oid}\n".encode())
+            process.stdin.flush()
+
+            header = process.stdout.readline().split()
+            if len(header) != 3:
+                # "<oid> missing" ou "<oid> ambiguous"
+                return None
+
+            size = int(header[2])
+            content = process.stdout.read(size)
+            process.stdout.read(1)  # saut de ligne terminant l'objet
+            return content
+
+    def close(self):
+        """Arrête le processus `git cat-file`."""
+        with self._lock:
+            if self._process is not None:
+                self._process.stdin.close()
+                self._process.wait()
+                self._process.stdout.close()
+                self._process = None
+
+    def _ensure_process(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._process
+
+
+class NativeGitAdapter(BaseGitAdapter):
+    """
+    Service Git s'appuyant directement sur la plomberie Git, sans PyDriller.
+
+    Les modifications du commit analysé (chemins, blobs et en-têtes de hunks) sont lues
+    par un seul appel à `git diff-tree --raw -p -z`, et le contenu des fichiers
+    par un processus `git cat-file --batch` unique.
+    """
+
+    def __init__(self, repo_path: str = ".", commit: str = "HEAD"):
+        """
+        Initialise le service Git.
+
+        Args:
+            repo_path (str): Chemin du dépôt local (par défaut le répertoire courant).
+            commit (str): Révision analysée (par défaut HEAD).
+        """
+        self.repo_path = repo_path
+        self.commit = commit
+        self.cat_file = GitCatFile(repo_path)
+        self._changes: Optional[Tuple[str, List[FileChange]]] = None
+
+    @staticmethod
+    def verify_git_repo(repo_path: str = "."):
+        """
+        Vérifie que le répertoire est un dépôt Git valide contenant au moins un commit.
+        """
+        try:
+            head = _run_git(repo_path, "rev-parse", "--verify", "HEAD").decode().strip()
+            logger.info(
+                f"Git est bien initialisé et accessible. Dernier commit : {head}"
+            )
+        except Exception as e:
+            logger.error(
+                f"Ce répertoire n'est pas un dépôt Git valide ou il est vide. Détails : {str(e)}"
+            )
+            exit(1)
+
+    def close(self):
+        """Libère le processus `git cat-file`."""
+        self.cat_file.close()
+
+    def get_latest_commit_files(self) -> List[Tuple[str, str]]:
+        """
+        Récupère la liste des fichiers Terraform modifiés ou supprimés dans le commit analysé.
+
+        Returns:
+            List[Tuple[str, str]]: Liste des fichiers `.tf` modifiés avec leur statut (modified/deleted).
+        """
+        try:
+            commit = self._latest_commit()
+            if commit is None:
+                return []
+
+            modified_files = []
+            for change in self._get_changes(commit[0]):
+                if change.filename.endswith(".tf"):
+                    status = (
+                        change.change_type
+                        if change.change_type in ("added", "deleted", "modified")
+                        else "unknown"
+                    )
+                    modified_files.append((change.new_path or change.old_path, status))
+
+            return modified_files
+        except Exception as e:
+            logger.error(
+                f"Erreur lors de la récupération des fichiers modifiés : {str(e)}"
+            )
+            return []
+
+    def get_modified_tf_files_with_content(self) -> List[Tuple[str, str, str, str]]:
+        """
+        Récupère les fichiers .tf modifiés avec leur contenu avant et après le commit.
+
+        Returns:
+            List[Tuple[str, str, str, str]]: (chemin, statut, contenu_actuel, contenu_précédent)
+        """
+        try:
+            commit = self._latest_commit()
+            if commit is None or not commit[1]:
+                logger.warning("Aucun commit précédent trouvé.")
+                return []
+
+            files = []
+            for change in self._get_changes(commit[0]):
+                if not change.filename.endswith(".tf"):
+                    continue
+
+                status = (
+                    change.change_type
+                    if change.change_type in ("added", "deleted")
+                    else "modified"
+                )
+                files.append(
+                    (
+                        change.new_path or change.old_path,
+                        status,
+                        self._read_source(change.new_blob),
+                        self._read_source(change.old_blob),
+                    )
+                )
+
+            return files
+        except Exception as e:
+            logger.error(
+                f"Erreur lors de la récupération des fichiers modifiés : {str(e)}"
+            )
+            return []
+
+    def get_latest_commit_sources(self) -> Dict[str, str]:
+        """
+        Récupère le contenu, après le commit analysé, des fichiers Terraform qu'il modifie.
+
+        Returns:
+            Dict[str, str]: {chemin: contenu} (fichiers supprimés exclus).
+        """
+        commit = self._latest_commit()
+        if commit is None:
+            return {}
+
+        return {
+            change.new_path: self._read_source(change.new_blob)
+            for change in self._get_changes(commit[0])
+            if change.new_blob is not None and change.new_path.endswith(".tf")
+        }
+
+    def get_modified_lines(self) -> Dict[str, Tuple[List[int], List[int]]]:
+        """
+        Récupère les numéros des lignes ajoutées et supprimées par fichier dans le commit analysé.
+
+        Returns:
+            Dict[str, Tuple[List[int], List[int]]]: {chemin: (lignes ajoutées, lignes supprimées)}.
+        """
+        commit = self._latest_commit()
+        if commit is None:
+            return {}
+
+        lines = {}
+        for change in self._get_changes(commit[0]):
+            for path in (change.new_path, change.old_path):
+                if path and path not in lines:
+                    lines[path] = (change.added_lines, change.deleted_lines)
+        return lines
+
+    def _latest_commit(self) -> Optional[Tuple[str, List[str]]]:
+        """
+        Retourne le dernier commit qui n'est pas un merge à la révision analysée et
+        ses parents.
+
+        Returns:
+            Optional[Tuple[str, List[str]]]: (hash, parents), ou None si aucun commit.
+        """
+        output = _run_git(
+            self.repo_path, "rev-list", "--parents", "--no-merges", "-1", self.commit, "--"
+        ).split()
+        if not output:
+            return None
+        return output[0].decode(), [parent.decode() for parent in output[1:]]
+
+    def _get_changes(self, commit_hash: str) -> List[FileChange]:
+        """
+        Lit en un seul appel Git les fichiers modifiés d'un commit et leurs hunks.
+
+        Args:
+            commit_hash (str): Hash du commit analysé.
+
+        Returns:
+            List[FileChange]: Modifications par rapport au premier parent.
+        """
+        if self._changes is not None and self._changes[0] == commit_hash:
+            return self._changes[1]
+
+        output = _run_git(
+            self.repo_path,
+            "diff-tree",
+            "-r",
+            "--root",
+            "-M",
+            "--raw",
+            "-p",
+            "-z",
+            "--no-abbrev",
+            "--no-commit-id",
+            "--no-ext-diff",
+            "--no-color",
+            "--src-prefix=a/",
+            "--dst-prefix=b/",
+            commit_hash,
+        )
+        changes = _parse_diff_tree(output)
+        self._changes = (commit_hash, changes)
+        return changes
+
+    def _read_source(self, oid: Optional[str]) -> str:
+        """
+        Lit le contenu texte d'un blob (chaîne vide si absent).
+        """
+        if oid is None:
+            return ""
+        content = self.cat_file.read_blob(oid)
+        return content.decode("utf-8", "ignore") if content else ""
+
+
+def _run_git(repo_path: str, *args: str) -> bytes:
+    """
+    Exécute une commande Git et retourne sa sortie brute.
+    """
+    return subprocess.run(
+        ["git", *args], cwd=repo_path, check=True, capture_output=True
+    ).stdout
+
+
+def _parse_diff_tree(output: bytes) -> List[FileChange]:
+    """
+    Analyse la sortie de `git diff-tree --raw -p -z`.
+
+    La partie `--raw` (enregistrements séparés par NUL) précède les patchs ; chaque
+    patch commence par une ligne `diff --git`. Les fichiers binaires et les
+    changements de mode seuls n'ont pas de hunk : les patchs sont associés aux
+    enregistrements par chemin, et non par position.
+
+    Args:
+        output (bytes): Sortie brute de la commande.
+
+    Returns:
+        List[FileChange]: Modifications, dans l'ordre de Git.
+    """
+    tokens = output.split(b"\0")
+    entries = []
+    position = 0
+
+    while position < len(tokens) and tokens[position].startswith(b":"):
+        meta = tokens[position][1:].split()
+        old_blob, new_blob, status = meta[2].decode(), meta[3].decode(), meta[4][:1]
+        paths = 2 if status in (b"R", b"C") else 1
+        path_tokens = [os.fsdecode(t) for t in tokens[position + 1 : position + 1 + paths]]
+        entries.append((status, old_blob, new_blob, path_tokens))
+        position += 1 + paths
+
+    patches = {}
+    for patch in _split_patches(b"\0".join(tokens[position:]).lstrip(b"\0")):
+        path = _patch_path(patch)
+        if path is not None:
+            patches.setdefault(path, patch)
+
+    changes = []
+    for status, old_blob, new_blob, paths in entries:
+        old_path = None if status == b"A" else paths[0]
+        new_path = None if status == b"D" else paths[-1]
+        old_blob = None if NULL_OID_PATTERN.match(old_blob) else old_blob
+        new_blob = None if NULL_OID_PATTERN.match(new_blob) else new_blob
+
+        if status == b"A":
+            change_type = "added"
+        elif status == b"D":
+            change_type = "deleted"
+        elif status == b"R":
+            change_type = "renamed"
+        elif old_blob != new_blob:
+            change_type = "modified"
+        else:
+            change_type = "unknown"
+
+        patch = patches.get(new_path or old_path)
+        added_lines, deleted_lines = _parse_hunks(patch) if patch else ([], [])
+        changes.append(
+            FileChange(
+                change_type,
+                old_path,
+                new_path,
+                old_blob,
+                new_blob,
+                added_lines,
+                deleted_lines,
+            )
+        )
+
+    return changes
+
+
+def _split_patches(patch_output: bytes) -> List[List[bytes]]:
+    """
+    Découpe la sortie `-p` en un patch (liste de lignes) par fichier.
+    """
+    patches = []
+    for line in patch_output.split(b"\n"):
+        if line.startswith(b"diff --git "):
+            patches.append([])
+        elif patches:
+            patches[-1].append(line)
+    return patches
+
+
+def _patch_path(patch: List[bytes]) -> Optional[str]:
+    """
+    Retourne le chemin du fichier d'un patch, lu sur ses lignes `+++` (ou `---` pour
+    une suppression), ou None si le patch n'a pas de contenu (binaire, mode seul).
+    """
+    paths = {}
+    for line in patch:
+        if line.startswith((b"--- ", b"+++ ")):
+            paths[line[:3]] = line[4:]
+        elif line.startswith(b"@@"):
+            break
+
+    for marker in (b"+++", b"---"):
+        path = paths.get(marker)
+        if path is None or path == b"/dev/null":
+            continue
+        # Git termine par une tabulation les chemins contenant des espaces et place
+        # entre guillemets (échappements C) ceux contenant des caractères spéciaux
+        path = path.rstrip(b"\t")
+        if path.startswith(b'"') and path.endswith(b'"'):
+            path = codecs.escape_decode(path[1:-1])[0]
+        return os.fsdecode(path[2:])
+    return None
+
+
+def _parse_hunks(patch: List[bytes]) -> Tuple[List[int], List[int]]:
+    """
+    Relève les numéros des lignes ajoutées et supprimées d'un patch.
+
+    Les lignes sont lues une à une dans les hunks (avec contexte), comme PyDriller :
+    l'alignement du diff dépend du contexte demandé, les en-têtes seuls d'un diff
+    sans contexte ne donneraient pas toujours les mêmes lignes.
+
+    Returns:
+        Tuple[List[int], List[int]]: (lignes ajoutées, lignes supprimées).
+    """
+    added_lines, deleted_lines = [], []
+    old_line = new_line = None
+    for line in patch:
+        match = HUNK_HEADER_PATTERN.match(line)
+        if match:
+            old_line, new_line = int(match.group(1)), int(match.group(3))
+        elif old_line is None:
+            continue
+        elif line.startswith(b"+"):
+            added_lines.append(new_line)
+            new_line += 1
+        elif line.startswith(b"-"):
+            deleted_lines.append(old_line)
+            old_line += 1
+        elif line.startswith(b" "):
+            old_line += 1
+            new_line += 1
+    return added_lines, deleted_lines
@@ -1,5 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
+
+from infrastructure.ml.feature_matrix import FeatureMatrix
+
+# Vecteurs de caractéristiques : matrice en colonnes ou {block_id: vecteur}
+Vectors = Union[FeatureMatrix, Dict[str, List[float]]]
 
 
 class BaseModel(ABC):
@@ -8,12 +13,12 @@ class BaseModel(ABC):
     """
 
     @abstractmethod
-    def predict(self, vectors: Dict[str, List[float]]) -> Dict[str, int]:
+    def predict(self, vectors: Vectors) -> Dict[str, int]:
         """
         Prédit si chaque bloc est fault-prone ou non.
 
         Args:
-            vectors (Dict[str, List[float]]): Dictionnaire {block_id: vecteur de caractéristiques}
+            vectors (Vectors): Matrice de caractéristiques (ou {block_id: vecteur})
 
         Returns:
             Dict[str, int]: Dictionnaire {block_id: 0 ou 1}, 1 si defectueux
@@ -21,7 +26,7 @@ class BaseModel(ABC):
         pass
 
     def predict_with_confidence(
-        self, vectors: Dict[str, List[float]]
+        self, vectors: Vectors
     ) -> Dict[str, Tuple[int, float]]:
         """
         Optionnel : Retourne aussi le score de confiance (probabilité).
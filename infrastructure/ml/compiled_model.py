@@ -0,0 +1,153 @@
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+from infrastructure.ml.base_model import BaseModel, Vectors
+from infrastructure.ml.feature_matrix import FeatureMatrix
+
+# Valeurs de `missing` des nœuds (voir model_compiler)
+MISSING_ZERO, MISSING_NAN = 1, 2
+
+# Seuil sous lequel LightGBM considère une valeur comme nulle
+ZERO_THRESHOLD = 1e-35
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class CompiledModel(BaseModel):
+    """
+    Modèle évalué uniquement avec NumPy, à partir d'un artefact `.npz` produit par
+    `infrastructure.ml.model_compiler` (ni scikit-learn, ni LightGBM, ni unpickling).
+
+    L'artefact contient le scaler sous forme affine et, selon le modèle, les arbres
+    aplatis (RandomForest, LightGBM), les coefficients (régression logistique) ou
+    les moyennes, variances et probabilités a priori (Naive Bayes gaussien).
+    """
+
+    def __init__(self, artifact_path: str):
+        """
+        Args:
+            artifact_path (str): Chemin de l'artefact `.npz` compilé.
+        """
+        if not os.path.exists(artifact_path):
+            raise FileNotFoundError(f"Modèle compilé non trouvé : {artifact_path}")
+
+        with np.load(artifact_path, allow_pickle=False) as data:
+            self.arrays = {key: data[key] for key in data.files}
+
+        self.kind = str(self.arrays["kind"])
+        self.model_type = str(self.arrays["model_type"])
+        self.scaler_type = str(self.arrays["scaler_type"])
+        self.n_features = int(self.arrays["n_features"])
+        self.source_sha256 = str(self.arrays.get("source_sha256", ""))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Calcule la probabilité de la classe « fautif » pour chaque ligne.
+
+        Args:
+            X (np.ndarray): Matrice brute (non normalisée), une ligne par bloc.
+
+        Returns:
+            np.ndarray: Probabilités, une par ligne.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"{self.n_features} features attendues, matrice de forme {X.shape}"
+            )
+
+        X = X * self.arrays["scaler_scale"] + self.arrays["scaler_offset"]
+
+        if self.kind == "forest":
+            return self._tree_values(X).mean(axis=1)
+        if self.kind == "gbdt":
+            raw = self._tree_values(X).sum(axis=1)
+            return _sigmoid(float(self.arrays["sigmoid"]) * raw)
+        if self.kind == "linear":
+            return _sigmoid(X @ self.arrays["coef"] + float(self.arrays["intercept"]))
+        if self.kind == "gaussian_nb":
+            return self._gaussian_nb_proba(X)
+        raise ValueError(f"Type de modèle compilé inconnu : {self.kind}")
+
+    def _tree_values(self, X: np.ndarray) -> np.ndarray:
+        """
+        Parcourt tous les arbres en parallèle : une ligne par bloc, une colonne par arbre.
+
+        Returns:
+            np.ndarray: Valeur de la feuille atteinte dans chaque arbre.
+        """
+        a = self.arrays
+        if bool(a["float32_inputs"]):
+            X = X.astype(np.float32).astype(np.float64)
+
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(a["roots"], (len(X), len(a["roots"]))).copy()
+
+        for _ in range(int(a["depth"])):
+            left = a["left"][nodes]
+            internal = left >= 0
+            if not internal.any():
+                break
+            x = X[rows, a["feature"][nodes]]
+            go_left = x <= a["threshold"][nodes]
+
+            missing = a["missing"][nodes]
+            if missing.any():
+                zero = (missing == MISSING_ZERO) & (np.abs(x) <= ZERO_THRESHOLD)
+                is_missing = zero | ((missing == MISSING_NAN) & np.isnan(x))
+                go_left = np.where(is_missing, a["default_left"][nodes], go_left)
+
+            nodes = np.where(
+                internal, np.where(go_left, left, a["right"][nodes]), nodes
+            )
+
+        return a["value"][nodes]
+
+    def _gaussian_nb_proba(self, X: np.ndarray) -> np.ndarray:
+        a = self.arrays
+        theta, var = a["theta"], a["var"]
+        # Log-vraisemblance jointe de chaque classe (comme GaussianNB)
+        jll = (
+            a["log_prior"]
+            - 0.5 * np.sum(np.log(2.0 * np.pi * var), axis=1)
+            - 0.5 * (((X[:, None, :] - theta) ** 2) / var).sum(axis=2)
+        )
+        jll -= jll.max(axis=1, keepdims=True)
+        proba = np.exp(jll)
+        return proba[:, 1] / proba.sum(axis=1)
+
+    def predict(self, vectors: Vectors) -> Dict[str, int]:
+        return {
+            block_id: label
+            for block_id, (label, _) in self.predict_with_confidence(vectors).items()
+        }
+
+    def predict_with_confidence(
+        self, vectors: Vectors
+    ) -> Dict[str, Tuple[int, float]]:
+        """
+        Prédit le label + la probabilité pour chaque bloc.
+
+        Returns:
+            Dict[str, Tuple[int, float]]: {block_id: (label, proba)}
+        """
+        matrix = FeatureMatrix.from_vectors(vectors)
+        probas = self.predict_proba(matrix.values)
+        labels = (probas >= 0.5).astype(int)
+
+        return dict(
+            zip(
+                matrix.block_ids.tolist(),
+                zip(labels.tolist(), np.round(probas, 4).tolist()),
+            )
+        )
+
+    def describe(self) -> str:
+        return (
+            f"🧠 Modèle : {self.model_type} (compilé NumPy) | 🔧 Scaler : "
+            f"{self.scaler_type} | 🔁 Features : {self.n_features}"
+        )
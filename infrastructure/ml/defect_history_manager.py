@@ -1,48 +1,79 @@
+import hashlib
 import json
 import os
-from datetime import datetime
-from typing import Dict
+from typing import Dict, Iterable
 
 from app import config
 from infrastructure.git.git_adapter import get_latest_commit_hash
+from infrastructure.ml.defect_history_store import DefectHistoryStore, legacy_json_path
 
 
-def load_defect_history() -> Dict[str, list]:
+def load_defect_history(
+    path: str = None, block_ids: Iterable[str] = None
+) -> Dict[str, list]:
     """
-    Charge l'historique des prédictions par bloc. Si le fichier n'existe pas, retourne un dict vide.
+    Charge l'historique des prédictions par bloc. Si la base n'existe pas, retourne un dict vide.
+
+    Args:
+        path (str, optional): Base de l'historique (par défaut `config.DEFECT_HISTORY_DB_PATH`).
+        block_ids (Iterable[str], optional): Blocs à charger (par défaut, tous les blocs).
+
+    Returns:
+        Dict[str, list]: {block_id: [{"commit", "fault_prone", "date"}, ...]}
     """
-    if not os.path.exists(config.DEFECT_HISTORY_PATH):
+    path = path or config.DEFECT_HISTORY_DB_PATH
+    if not os.path.exists(path) and not os.path.exists(legacy_json_path(path)):
         return {}
-    with open(config.DEFECT_HISTORY_PATH, "r") as f:
-        return json.load(f)
+    with DefectHistoryStore(path) as store:
+        return store.history(block_ids)
 
 
-def save_defect_history(history: Dict[str, list]):
+def defect_history_digest(
+    block_ids: Iterable[str], path: str = None, exclude_commit: str = None
+) -> str:
     """
-    Sauvegarde l'historique dans defect_history.json.
+    Calcule l'empreinte des prédictions enregistrées pour des blocs : elle change dès
+    qu'une prédiction de l'un d'eux est ajoutée à l'historique.
+
+    Args:
+        block_ids (Iterable[str]): Blocs concernés (fichier::bloc).
+        path (str, optional): Base de l'historique (par défaut `config.DEFECT_HISTORY_DB_PATH`).
+        exclude_commit (str, optional): Commit dont les prédictions sont ignorées (le
+            commit analysé : ses prédictions sont enregistrées après l'extraction).
+
+    Returns:
+        str: Empreinte hexadécimale courte.
     """
-    os.makedirs(config.OUTPUT_DIR, exist_ok=True)
-    with open(config.DEFECT_HISTORY_PATH, "w") as f:
-        json.dump(history, f, indent=4)
+    history = {}
+    for block_id, entries in load_defect_history(path, block_ids).items():
+        kept = [
+            (entry["commit"], entry["fault_prone"])
+            for entry in entries
+            if entry["commit"] != exclude_commit
+        ]
+        if kept:
+            history[block_id] = kept
+    return hashlib.sha1(
+        json.dumps(history, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
 
 
-def update_defect_history(predictions: Dict[str, int]):
+def update_defect_history(
+    predictions: Dict[str, int],
+    path: str = None,
+    repo_path: str = ".",
+    commit: str = None,
+):
     """
     Met à jour l'historique des défauts avec la prédiction du modèle pour chaque bloc.
     On enregistre aussi le commit et la date de prédiction.
-    """
-    history = load_defect_history()
-    current_commit = get_latest_commit_hash()
-    now = datetime.now().isoformat()
-
-    for block_id, pred in predictions.items():
-        entry = {"commit": current_commit, "fault_prone": pred, "date": now}
 
-        if block_id not in history:
-            history[block_id] = [entry]
-        else:
-            # Ne pas ajouter deux fois une prédiction pour le même commit
-            if not any(p["commit"] == current_commit for p in history[block_id]):
-                history[block_id].append(entry)
-
-    save_defect_history(history)
+    Args:
+        predictions (Dict[str, int]): {block_id: 0 ou 1}.
+        path (str, optional): Base de l'historique (par défaut `config.DEFECT_HISTORY_DB_PATH`).
+        repo_path (str): Dépôt Git dont le dernier commit est enregistré.
+        commit (str, optional): Commit analysé (par défaut, le dernier commit du dépôt).
+    """
+    current_commit = commit or get_latest_commit_hash(repo_path)
+    with DefectHistoryStore(path) as store:
+        store.record(predictions, current_commit)
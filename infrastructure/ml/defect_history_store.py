@@ -0,0 +1,245 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from app import config
+from utils.logger_utils import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS predictions (
+    seq INTEGER PRIMARY KEY,
+    block_id TEXT NOT NULL,
+    commit_hash TEXT NOT NULL,
+    fault_prone INTEGER NOT NULL,
+    date TEXT,
+    UNIQUE (block_id, commit_hash)
+);
+"""
+
+# Nombre maximal de paramètres d'une requête SQLite (`IN (...)`)
+QUERY_CHUNK_SIZE = 500
+
+
+def legacy_json_path(db_path: str) -> str:
+    """Fichier JSON historique correspondant à une base (même nom, extension .json)."""
+    return os.path.splitext(db_path)[0] + ".json"
+
+
+class DefectHistoryStore:
+    """
+    Historique des prédictions par bloc et par commit, stocké dans une base SQLite.
+
+    Chaque prédiction est une ligne indexée par (bloc, commit) : une consultation ne
+    lit que les blocs demandés et un enregistrement n'écrit que les nouvelles
+    prédictions, quelle que soit la taille de l'historique. La première prédiction
+    d'un bloc pour un commit est conservée. Un ancien `defect_history.json` voisin
+    de la base est importé une seule fois, à la première ouverture.
+
+    Plusieurs processus peuvent enregistrer en même temps dans la même base : chaque
+    enregistrement est une transaction (journal WAL, verrou d'écriture attendu au
+    plus `config.DEFECT_HISTORY_LOCK_TIMEOUT` secondes), les prédictions des
+    différents écrivains s'ajoutent sans s'écraser et une interruption ne laisse
+    jamais de base partiellement écrite.
+    """
+
+    def __init__(self, db_path: str = None, json_path: str = None):
+        """
+        Ouvre (ou crée) la base de l'historique.
+
+        Args:
+            db_path (str, optional): Base SQLite (par défaut `config.DEFECT_HISTORY_DB_PATH`).
+            json_path (str, optional): Ancien fichier JSON à importer (par défaut, le
+                fichier `.json` de même nom que la base).
+        """
+        self.db_path = db_path or config.DEFECT_HISTORY_DB_PATH
+        self.json_path = json_path or legacy_json_path(self.db_path)
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(
+            self.db_path, timeout=config.DEFECT_HISTORY_LOCK_TIMEOUT
+        )
+        # Les lectures ne bloquent pas les écritures (et inversement)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate_json()
+
+    def close(self):
+        """Ferme la connexion à la base."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM predictions").fetchone()
+        return count
+
+    def record(
+        self, predictions: Dict[str, int], commit: str, date: str = None
+    ) -> int:
+        """
+        Enregistre les prédictions d'un commit (sans remplacer une prédiction déjà
+        enregistrée pour le même bloc et le même commit).
+
+        Args:
+            predictions (Dict[str, int]): {block_id: 0 ou 1}.
+            commit (str): Commit prédit.
+            date (str, optional): Date ISO de la prédiction (par défaut, maintenant).
+
+        Returns:
+            int: Nombre de prédictions ajoutées.
+        """
+        date = date or datetime.now().isoformat()
+        before = self.conn.total_changes
+        with self.conn:
+            # Verrou d'écriture pris dès le début : les écrivains passent l'un après l'autre
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO predictions (block_id, commit_hash, fault_prone, date) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (block_id, commit, int(fault_prone), date)
+                    for block_id, fault_prone in predictions.items()
+                ),
+            )
+        return self.conn.total_changes - before
+
+    def get(self, block_id: str, commit: str) -> Optional[int]:
+        """
+        Retourne la prédiction d'un bloc pour un commit, ou None si elle est absente.
+        """
+        row = self.conn.execute(
+            "SELECT fault_prone FROM predictions WHERE block_id = ? AND commit_hash = ?",
+            (block_id, commit),
+        ).fetchone()
+        return row[0] if row else None
+
+    def fault_prone_by_commit(
+        self, block_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Retourne les prédictions passées des blocs demandés.
+
+        Args:
+            block_ids (Iterable[str]): Identifiants des blocs (fichier::bloc).
+
+        Returns:
+            Dict[str, Dict[str, int]]: {block_id: {commit: fault_prone}}.
+        """
+        indexed: Dict[str, Dict[str, int]] = {}
+        for block_id, commit, fault_prone, _ in self._select(block_ids):
+            indexed.setdefault(block_id, {})[commit] = fault_prone
+        return indexed
+
+    def history(self, block_ids: Iterable[str] = None) -> Dict[str, List[dict]]:
+        """
+        Retourne l'historique des blocs demandés (par défaut, de tous les blocs), au
+        format de l'ancien fichier JSON.
+
+        Returns:
+            Dict[str, List[dict]]: {block_id: [{"commit", "fault_prone", "date"}, ...]}
+            dans l'ordre d'enregistrement.
+        """
+        history: Dict[str, List[dict]] = {}
+        rows = (
+            self.conn.execute(
+                "SELECT block_id, commit_hash, fault_prone, date FROM predictions ORDER BY seq"
+            )
+            if block_ids is None
+            else self._select(block_ids)
+        )
+        for block_id, commit, fault_prone, date in rows:
+            history.setdefault(block_id, []).append(
+                {"commit": commit, "fault_prone": fault_prone, "date": date}
+            )
+        return history
+
+    def latest(self, block_ids: Iterable[str] = None) -> Dict[str, dict]:
+        """
+        Retourne la dernière prédiction enregistrée de chaque bloc demandé (par défaut,
+        de tous les blocs).
+
+        Returns:
+            Dict[str, dict]: {block_id: {"commit", "fault_prone", "date"}}.
+        """
+        return {
+            block_id: entries[-1]
+            for block_id, entries in self.history(block_ids).items()
+        }
+
+    def _select(self, block_ids: Iterable[str]) -> List[tuple]:
+        block_ids = list(dict.fromkeys(block_ids))
+        rows = []
+        for start in range(0, len(block_ids), QUERY_CHUNK_SIZE):
+            chunk = block_ids[start : start + QUERY_CHUNK_SIZE]
+            rows.extend(
+                self.conn.execute(
+                    "SELECT block_id, commit_hash, fault_prone, date, seq FROM predictions "
+                    f"WHERE block_id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+            )
+        rows.sort(key=lambda row: row[4])
+        return [row[:4] for row in rows]
+
+    def _migrate_json(self):
+        """
+        Importe l'ancien fichier JSON lors de la première ouverture de la base
+        (une seule fois, même si plusieurs processus l'ouvrent en même temps).
+        """
+        if self._get_meta("json_migrated"):
+            return
+
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self._get_meta("json_migrated"):
+                return
+
+            if os.path.exists(self.json_path):
+                try:
+                    with open(self.json_path, "r") as f:
+                        legacy = json.load(f)
+                except json.JSONDecodeError as e:
+                    # Fichier tronqué par une ancienne écriture concurrente : import
+                    # reporté à la prochaine ouverture, une fois le fichier réparé
+                    logger.warning(
+                        f"Historique `{self.json_path}` illisible, import ignoré : {e}"
+                    )
+                    return
+
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO predictions "
+                    "(block_id, commit_hash, fault_prone, date) VALUES (?, ?, ?, ?)",
+                    (
+                        (block_id, e["commit"], int(e["fault_prone"]), e.get("date"))
+                        for block_id, entries in legacy.items()
+                        for e in entries
+                    ),
+                )
+                logger.info(
+                    f"Historique des défauts importé depuis `{self.json_path}` "
+                    f"({len(self)} prédiction(s))."
+                )
+
+            self._set_meta("json_migrated", self.json_path)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
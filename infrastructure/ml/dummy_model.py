@@ -1,7 +1,9 @@
-import random
-from typing import Dict, List, Tuple
+from typing import Dict, Tuple
 
-from infrastructure.ml.base_model import BaseModel
+import numpy as np
+
+from infrastructure.ml.base_model import BaseModel, Vectors
+from infrastructure.ml.feature_matrix import FeatureMatrix
 
 
 class DummyModel(BaseModel):
@@ -10,19 +12,20 @@ class DummyModel(BaseModel):
     Utile pour tester l'intégration de la prédiction.
     """
 
-    def predict(self, vectors: Dict[str, List[float]]) -> Dict[str, int]:
-        predictions = {}
-        for block_id in vectors:
-            predictions[block_id] = random.choice([0, 1])
-        return predictions
+    def predict(self, vectors: Vectors) -> Dict[str, int]:
+        matrix = FeatureMatrix.from_vectors(vectors)
+        labels = np.random.randint(0, 2, size=len(matrix))
+        return dict(zip(matrix.block_ids.tolist(), labels.tolist()))
 
     def predict_with_confidence(
-        self, vectors: Dict[str, List[float]]
+        self, vectors: Vectors
     ) -> Dict[str, Tuple[int, float]]:
-        return {
-            block_id: (random.randint(0, 1), round(random.uniform(0.5, 1.0), 2))
-            for block_id in vectors
-        }
+        matrix = FeatureMatrix.from_vectors(vectors)
+        labels = np.random.randint(0, 2, size=len(matrix))
+        confidences = np.round(np.random.uniform(0.5, 1.0, size=len(matrix)), 2)
+        return dict(
+            zip(matrix.block_ids.tolist(), zip(labels.tolist(), confidences.tolist()))
+        )
 
     def describe(self) -> str:
         return "🧠 Modèle fictif (Dummy) pour tests uniquement."
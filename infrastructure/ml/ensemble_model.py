@@ -0,0 +1,109 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from infrastructure.ml.base_model import BaseModel, Vectors
+from infrastructure.ml.feature_matrix import FeatureMatrix
+from infrastructure.ml.selected_features_loader import load_selected_features
+
+
+class EnsembleModel(BaseModel):
+    """
+    Combinaison de plusieurs modèles évalués sur une seule extraction de features.
+
+    Les vecteurs sont construits une fois pour l'union des schémas des modèles
+    (`selected_features`), puis projetés sur le schéma de chaque modèle. La
+    probabilité combinée est la moyenne des probabilités des modèles (vote souple).
+    """
+
+    def __init__(self, models: Dict[str, BaseModel]):
+        """
+        Args:
+            models (Dict[str, BaseModel]): {nom du modèle: instance}, dans l'ordre d'affichage.
+        """
+        if not models:
+            raise ValueError("L'ensemble doit contenir au moins un modèle")
+
+        self.models = models
+        self.schemas: Dict[str, List[str]] = {
+            name: load_selected_features(name) for name in models
+        }
+
+        # Union ordonnée des schémas : une seule extraction pour tous les modèles
+        self.selected_features: List[str] = list(
+            dict.fromkeys(f for schema in self.schemas.values() for f in schema)
+        )
+
+    def predict(self, vectors: Vectors) -> Dict[str, int]:
+        return {
+            block_id: label
+            for block_id, (label, _) in self.predict_with_confidence(vectors).items()
+        }
+
+    def predict_with_confidence(
+        self, vectors: Vectors
+    ) -> Dict[str, Tuple[int, float]]:
+        """
+        Prédit le label et la probabilité combinée de chaque bloc.
+
+        Args:
+            vectors (Vectors): Matrice construite pour `selected_features`.
+
+        Returns:
+            Dict[str, Tuple[int, float]]: {block_id: (label, probabilité moyenne)}
+        """
+        return self.combine(self.predict_members(vectors))
+
+    def predict_members(
+        self, vectors: Vectors
+    ) -> Dict[str, Dict[str, Tuple[int, float]]]:
+        """
+        Évalue chaque modèle sur la projection de la matrice sur son schéma.
+
+        Args:
+            vectors (Vectors): Matrice construite pour `selected_features`.
+
+        Returns:
+            Dict[str, Dict[str, Tuple[int, float]]]: {modèle: {block_id: (label, proba)}}
+        """
+        matrix = FeatureMatrix.from_vectors(vectors, self.selected_features)
+        return {
+            name: model.predict_with_confidence(matrix.project(self.schemas[name]))
+            for name, model in self.models.items()
+        }
+
+    @staticmethod
+    def combine(
+        member_predictions: Dict[str, Dict[str, Tuple[int, float]]]
+    ) -> Dict[str, Tuple[int, float]]:
+        """
+        Combine les prédictions des modèles par moyenne des probabilités.
+
+        Args:
+            member_predictions (dict): Sortie de `predict_members`.
+
+        Returns:
+            Dict[str, Tuple[int, float]]: {block_id: (label, probabilité moyenne)}
+        """
+        if not member_predictions:
+            return {}
+
+        block_ids = list(next(iter(member_predictions.values())))
+        probas = np.array(
+            [
+                [predictions[block_id][1] for block_id in block_ids]
+                for predictions in member_predictions.values()
+            ],
+            dtype=np.float64,
+        ).mean(axis=0)
+        labels = (probas >= 0.5).astype(int)
+
+        return dict(
+            zip(block_ids, zip(labels.tolist(), np.round(probas, 4).tolist()))
+        )
+
+    def describe(self) -> str:
+        return (
+            f"🧠 Ensemble ({len(self.models)} modèles, moyenne des probabilités) : "
+            f"{', '.join(self.models)} | 🔁 Features : {len(self.selected_features)}"
+        )
@@ -0,0 +1,132 @@
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+
+
+class FeatureMatrix(Mapping):
+    """
+    Matrice de caractéristiques en colonnes : une ligne par bloc, une colonne par
+    feature du schéma du modèle.
+
+    Les valeurs sont stockées dans un `ndarray` contigu, consommé tel quel par les
+    modèles. La matrice reste utilisable comme un dictionnaire
+    {block_id: vecteur (liste de floats)} pour l'affichage et les tests.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        block_ids: Sequence[str],
+        features: Sequence[str],
+    ):
+        """
+        Args:
+            values (np.ndarray): Valeurs, de forme (nombre de blocs, nombre de features).
+            block_ids (Sequence[str]): Identifiant de chaque ligne.
+            features (Sequence[str]): Nom de chaque colonne, dans l'ordre du schéma.
+        """
+        self.values = np.ascontiguousarray(values)
+        self.block_ids = np.asarray(block_ids, dtype=object)
+        self.features = list(features)
+        self.columns: Dict[str, int] = {f: i for i, f in enumerate(self.features)}
+        self._rows: Dict[str, int] = {b: i for i, b in enumerate(self.block_ids)}
+
+        if self.values.shape != (len(self.block_ids), len(self.features)):
+            raise ValueError(
+                f"Dimensions incohérentes : {self.values.shape} pour "
+                f"{len(self.block_ids)} blocs et {len(self.features)} features"
+            )
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Dict[str, Dict[str, float]],
+        features: Sequence[str],
+        dtype=np.float64,
+    ) -> "FeatureMatrix":
+        """
+        Construit la matrice à partir des métriques de chaque bloc.
+
+        Les métriques absentes du schéma sont ignorées ; les features sans valeur valent 0.
+
+        Args:
+            records (Dict[str, Dict[str, float]]): {block_id: {feature: valeur}}.
+            features (Sequence[str]): Features du modèle, dans l'ordre des colonnes.
+            dtype: Type des valeurs (float64 par défaut, float32 possible).
+
+        Returns:
+            FeatureMatrix: Matrice des blocs.
+        """
+        columns = {f: i for i, f in enumerate(features)}
+        values = np.zeros((len(records), len(columns)), dtype=dtype)
+
+        for row, metrics in enumerate(records.values()):
+            for feature, value in metrics.items():
+                column = columns.get(feature)
+                if column is not None:
+                    values[row, column] = value
+
+        return cls(values, list(records), features)
+
+    @classmethod
+    def from_vectors(
+        cls,
+        vectors: Union["FeatureMatrix", Dict[str, List[float]]],
+        features: Sequence[str] = None,
+    ) -> "FeatureMatrix":
+        """
+        Convertit des vecteurs {block_id: [valeurs]} en matrice (sans copie pour une
+        matrice existante).
+
+        Args:
+            vectors: Vecteurs ordonnés selon le schéma, ou matrice existante.
+            features (Sequence[str], optional): Noms des colonnes (par défaut, leur position).
+
+        Returns:
+            FeatureMatrix: Matrice des blocs.
+        """
+        if isinstance(vectors, FeatureMatrix):
+            return vectors
+
+        if vectors:
+            values = np.asarray(list(vectors.values()), dtype=np.float64)
+        else:
+            values = np.zeros((0, len(features or ())), dtype=np.float64)
+        if features is None:
+            features = [str(i) for i in range(values.shape[1])]
+        return cls(values, list(vectors), features)
+
+    def project(self, features: Sequence[str]) -> "FeatureMatrix":
+        """
+        Extrait les colonnes d'un autre schéma de features (ex: celui d'un modèle
+        d'un ensemble), dans son ordre ; les features absentes de la matrice valent 0.
+
+        Args:
+            features (Sequence[str]): Features du schéma cible.
+
+        Returns:
+            FeatureMatrix: Matrice des mêmes blocs, restreinte au schéma.
+        """
+        values = np.zeros((len(self), len(features)), dtype=self.values.dtype)
+        for target, feature in enumerate(features):
+            source = self.columns.get(feature)
+            if source is not None:
+                values[:, target] = self.values[:, source]
+        return FeatureMatrix(values, self.block_ids, features)
+
+    def column(self, feature: str) -> np.ndarray:
+        """Retourne la colonne d'une feature (vue, sans copie)."""
+        return self.values[:, self.columns[feature]]
+
+    def __getitem__(self, block_id: str) -> List[float]:
+        return self.values[self._rows[block_id]].tolist()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.block_ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self.block_ids)
+
+    def __repr__(self) -> str:
+        return f"FeatureMatrix({len(self)} blocs x {len(self.features)} features)"
@@ -0,0 +1,235 @@
+import hashlib
+import os
+import tempfile
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from infrastructure.ml.feature_matrix import FeatureMatrix
+from utils.logger_utils import logger
+
+# Version du calcul des features : les entrées d'une autre version sont ignorées
+STORE_VERSION = 3
+
+
+def schema_version(features: Sequence[str]) -> str:
+    """
+    Calcule la version d'un schéma de features (hash de la liste ordonnée).
+
+    Args:
+        features (Sequence[str]): Features du schéma.
+
+    Returns:
+        str: Empreinte hexadécimale courte.
+    """
+    return hashlib.sha1("\n".join(features).encode("utf-8")).hexdigest()[:16]
+
+
+class FeatureStore:
+    """
+    Magasin persistant des vecteurs de caractéristiques, indexés par (commit, block_id).
+
+    Chaque extraction est enregistrée dans un fichier `.npz` compressé
+    (`<racine>/<commit>/<version du schéma>.npz`) contenant la matrice en colonnes,
+    les identifiants des blocs, les features, la version du schéma, le moteur de
+    métriques utilisé et l'empreinte de l'historique des prédictions des blocs. Une
+    extraction déjà faite pour un commit est ainsi réutilisée par tout modèle dont le
+    schéma est inclus dans celui de l'entrée, tant que l'historique dont dépendent
+    les métriques de processus n'a pas changé.
+    """
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root (str): Répertoire du magasin (créé si nécessaire).
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _commit_dir(self, commit: str) -> str:
+        return os.path.join(self.root, commit)
+
+    def _entries(self, commit: str = None) -> List[str]:
+        """Liste les fichiers du magasin (d'un commit, ou de tous les commits)."""
+        commits = [commit] if commit else sorted(os.listdir(self.root))
+        paths = []
+        for name in commits:
+            directory = self._commit_dir(name)
+            if os.path.isdir(directory):
+                paths += [
+                    os.path.join(directory, f)
+                    for f in sorted(os.listdir(directory))
+                    if f.endswith(".npz")
+                ]
+        return paths
+
+    @staticmethod
+    def _read(path: str) -> Optional[dict]:
+        """Lit une entrée, ou retourne None si elle est illisible ou d'une autre version."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                entry = {key: data[key] for key in data.files}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Entrée du magasin de features illisible ({path}) : {e}")
+            return None
+        if int(entry.get("store_version", -1)) != STORE_VERSION:
+            return None
+        return entry
+
+    @staticmethod
+    def _matrix(entry: dict) -> FeatureMatrix:
+        return FeatureMatrix(
+            entry["values"], entry["block_ids"].tolist(), entry["features"].tolist()
+        )
+
+    def load(
+        self,
+        commit: str,
+        features: Sequence[str],
+        engine: str,
+        history_digest: Callable[[List[str]], str] = None,
+    ) -> Optional[FeatureMatrix]:
+        """
+        Recherche une extraction du commit couvrant toutes les features demandées.
+
+        Args:
+            commit (str): Hash du commit analysé.
+            features (Sequence[str]): Schéma du modèle.
+            engine (str): Moteur de métriques (les extractions d'un autre moteur sont ignorées).
+            history_digest (Callable[[List[str]], str], optional): Calcule l'empreinte
+                actuelle de l'historique des blocs d'une entrée ; une entrée enregistrée
+                avec une autre empreinte est périmée. Par défaut, l'historique est ignoré.
+
+        Returns:
+            Optional[FeatureMatrix]: Matrice projetée sur le schéma, ou None.
+        """
+        wanted = set(features)
+        for path in self._entries(commit):
+            entry = self._read(path)
+            if entry is None or str(entry["engine"]) != engine:
+                continue
+            if not wanted.issubset(entry["features"].tolist()):
+                continue
+            if history_digest is not None and str(entry["history"]) != history_digest(
+                entry["block_ids"].tolist()
+            ):
+                continue
+            return self._matrix(entry).project(features)
+        return None
+
+    def save(
+        self, commit: str, matrix: FeatureMatrix, engine: str, history: str = ""
+    ) -> str:
+        """
+        Enregistre l'extraction d'un commit (remplace l'entrée du même schéma).
+
+        Args:
+            commit (str): Hash du commit analysé.
+            matrix (FeatureMatrix): Vecteurs des blocs du commit.
+            engine (str): Moteur de métriques utilisé.
+            history (str): Empreinte de l'historique des prédictions des blocs au
+                moment de l'extraction (voir `load`).
+
+        Returns:
+            str: Chemin du fichier écrit.
+        """
+        directory = self._commit_dir(commit)
+        os.makedirs(directory, exist_ok=True)
+        version = schema_version(matrix.features)
+        path = os.path.join(directory, f"{version}.npz")
+
+        # Écriture atomique : un lecteur ne voit jamais de fichier partiel
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    values=matrix.values,
+                    block_ids=np.array(matrix.block_ids.tolist(), dtype=str),
+                    features=np.array(matrix.features, dtype=str),
+                    schema_version=np.array(version),
+                    store_version=np.array(STORE_VERSION),
+                    engine=np.array(engine),
+                    history=np.array(history),
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return path
+
+    def export(self, path: str, features: Sequence[str] = None) -> int:
+        """
+        Exporte toutes les extractions du magasin dans un seul fichier, pour
+        l'entraînement d'un modèle.
+
+        Le fichier contient une ligne par (commit, block_id) : colonnes `commit`,
+        `block_id` puis une colonne par feature. Les entrées d'un même commit
+        enregistrées pour des schémas différents sont fusionnées bloc par bloc. Le
+        format dépend de l'extension : `.parquet` (pandas et pyarrow requis) ou `.npz`
+        (tableaux `commits`, `block_ids`, `values` et `features`).
+
+        Args:
+            path (str): Fichier de sortie.
+            features (Sequence[str], optional): Schéma exporté (par défaut, l'union
+                des features enregistrées ; les features absentes de toutes les
+                entrées d'un bloc valent 0).
+
+        Returns:
+            int: Nombre de lignes exportées.
+        """
+        entries = [
+            (os.path.basename(os.path.dirname(p)), e)
+            for p in self._entries()
+            for e in [self._read(p)]
+            if e is not None
+        ]
+        if features is None:
+            features = list(
+                dict.fromkeys(f for _, e in entries for f in e["features"].tolist())
+            )
+        targets = {feature: index for index, feature in enumerate(features)}
+
+        # Une ligne par (commit, block_id), quel que soit le nombre d'entrées du commit
+        rows = {}
+        for commit, entry in entries:
+            for block_id in entry["block_ids"].tolist():
+                rows.setdefault((commit, block_id), len(rows))
+
+        values = np.zeros((len(rows), len(features)))
+        for commit, entry in entries:
+            indices = [rows[(commit, b)] for b in entry["block_ids"].tolist()]
+            for source, feature in enumerate(entry["features"].tolist()):
+                target = targets.get(feature)
+                if target is not None:
+                    values[indices, target] = entry["values"][:, source]
+
+        commits = np.array([commit for commit, _ in rows], dtype=str)
+        block_ids = np.array([block_id for _, block_id in rows], dtype=str)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if path.endswith(".parquet"):
+            import pandas as pd
+
+            frame = pd.DataFrame(values, columns=list(features))
+            frame.insert(0, "block_id", block_ids)
+            frame.insert(0, "commit", commits)
+            try:
+                frame.to_parquet(path, index=False)
+            except ImportError as e:
+                raise ValueError(f"Export Parquet indisponible : {e}")
+        else:
+            with open(path, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    commits=commits,
+                    block_ids=block_ids,
+                    values=values,
+                    features=np.array(list(features), dtype=str),
+                )
+
+        logger.info(f"{len(values)} vecteur(s) exporté(s) dans `{path}`")
+        return len(values)
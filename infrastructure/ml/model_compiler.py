@@ -0,0 +1,220 @@
+"""
+Compilation des modèles `.joblib` en artefacts NumPy (`.npz`) évalués par `CompiledModel`.
+
+Usage :
+    python -m infrastructure.ml.model_compiler [modèle ...]
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+from app import config
+from infrastructure.ml.model_registry import MODEL_PATHS, file_sha256, load_bundle
+
+# Valeurs de `missing_type` des arbres LightGBM
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+
+
+def compiled_model_path(model_name: str) -> str:
+    """Retourne le chemin de l'artefact compilé d'un modèle."""
+    return os.path.join(config.COMPILED_MODELS_DIR, f"{model_name}.npz")
+
+
+def _compile_scaler(scaler) -> Dict[str, np.ndarray]:
+    """Réduit le scaler à une transformation affine : X * scale + offset."""
+    scaler_type = type(scaler).__name__
+    if scaler_type == "MinMaxScaler":
+        scale, offset = scaler.scale_, scaler.min_
+    elif scaler_type == "StandardScaler":
+        n_features = scaler.n_features_in_
+        std = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+        scale, offset = 1.0 / std, -mean / std
+    else:
+        raise ValueError(f"Scaler non supporté : {scaler_type}")
+    return {
+        "scaler_type": np.array(scaler_type),
+        "scaler_scale": np.asarray(scale, dtype=np.float64),
+        "scaler_offset": np.asarray(offset, dtype=np.float64),
+    }
+
+
+def _flatten_trees(trees: List[dict]) -> Dict[str, np.ndarray]:
+    """
+    Concatène des arbres en tableaux plats : les enfants d'un nœud sont des indices
+    globaux, une feuille a `left == -1` et porte sa valeur dans `value`.
+    """
+    keys = ("feature", "threshold", "left", "right", "value", "default_left", "missing")
+    arrays = {key: np.concatenate([tree[key] for tree in trees]) for key in keys}
+    sizes = np.array([len(tree["feature"]) for tree in trees])
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+    for key in ("left", "right"):
+        children = arrays[key]
+        shifted = children + np.repeat(roots, sizes)
+        arrays[key] = np.where(children >= 0, shifted, -1).astype(np.int32)
+    arrays["roots"] = roots
+    arrays["depth"] = np.array(max(tree["depth"] for tree in trees))
+    return arrays
+
+
+def _sklearn_tree(estimator) -> dict:
+    tree = estimator.tree_
+    values = tree.value[:, 0, :]
+    totals = values.sum(axis=1)
+    # Probabilité de la classe 1 dans chaque feuille
+    proba = np.divide(values[:, 1], totals, out=np.zeros_like(totals), where=totals > 0)
+    size = tree.node_count
+    return {
+        # Feuilles : feature -2 dans sklearn, ramenée à un indice valide
+        "feature": np.maximum(tree.feature, 0).astype(np.int32),
+        "threshold": tree.threshold.astype(np.float64),
+        "left": tree.children_left.astype(np.int32),
+        "right": tree.children_right.astype(np.int32),
+        "value": proba,
+        "default_left": np.zeros(size, dtype=bool),
+        "missing": np.full(size, MISSING_NONE, dtype=np.int8),
+        "depth": tree.max_depth,
+    }
+
+
+def _lightgbm_tree(structure: dict) -> dict:
+    nodes = []
+
+    def visit(node, depth):
+        index = len(nodes)
+        nodes.append(None)
+        if "split_index" not in node:
+            nodes[index] = (0, 0.0, -1, -1, node["leaf_value"], False, MISSING_NONE)
+            return depth
+        if node["decision_type"] != "<=":
+            raise ValueError("Arbres LightGBM catégoriels non supportés")
+        left_depth = visit(node["left_child"], depth + 1)
+        right = len(nodes)
+        right_depth = visit(node["right_child"], depth + 1)
+        missing = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+        nodes[index] = (
+            node["split_feature"],
+            node["threshold"],
+            index + 1,
+            right,
+            0.0,
+            node["default_left"],
+            missing[node["missing_type"]],
+        )
+        return max(left_depth, right_depth)
+
+    depth = visit(structure, 0)
+    feature, threshold, left, right, value, default_left, missing = zip(*nodes)
+    return {
+        "feature": np.array(feature, dtype=np.int32),
+        "threshold": np.array(threshold, dtype=np.float64),
+        "left": np.array(left, dtype=np.int32),
+        "right": np.array(right, dtype=np.int32),
+        "value": np.array(value, dtype=np.float64),
+        "default_left": np.array(default_left, dtype=bool),
+        "missing": np.array(missing, dtype=np.int8),
+        "depth": depth,
+    }
+
+
+def _compile_estimator(model) -> Dict[str, np.ndarray]:
+    model_type = type(model).__name__
+    if list(getattr(model, "classes_", [0, 1])) != [0, 1]:
+        raise ValueError(f"Classes non supportées pour {model_type} : {model.classes_}")
+
+    if model_type in ("RandomForestClassifier", "ExtraTreesClassifier"):
+        arrays = _flatten_trees([_sklearn_tree(e) for e in model.estimators_])
+        arrays["kind"] = np.array("forest")
+        # sklearn compare les features converties en float32
+        arrays["float32_inputs"] = np.array(True)
+    elif model_type == "LGBMClassifier":
+        dump = model.booster_.dump_model()
+        if dump["num_tree_per_iteration"] != 1 or not dump["objective"].startswith(
+            "binary"
+        ):
+            raise ValueError(f"Objectif LightGBM non supporté : {dump['objective']}")
+        sigmoid = float(dump["objective"].partition("sigmoid:")[2] or 1.0)
+        arrays = _flatten_trees(
+            [_lightgbm_tree(tree["tree_structure"]) for tree in dump["tree_info"]]
+        )
+        arrays["kind"] = np.array("gbdt")
+        arrays["sigmoid"] = np.array(sigmoid)
+        arrays["float32_inputs"] = np.array(False)
+    elif model_type == "LogisticRegression":
+        arrays = {
+            "kind": np.array("linear"),
+            "coef": model.coef_[0].astype(np.float64),
+            "intercept": np.array(float(model.intercept_[0])),
+        }
+    elif model_type == "GaussianNB":
+        arrays = {
+            "kind": np.array("gaussian_nb"),
+            "theta": model.theta_.astype(np.float64),
+            "var": model.var_.astype(np.float64),
+            "log_prior": np.log(model.class_prior_).astype(np.float64),
+        }
+    else:
+        raise ValueError(f"Modèle non supporté par le compilateur : {model_type}")
+
+    arrays["model_type"] = np.array(model_type)
+    arrays["n_features"] = np.array(int(model.n_features_in_))
+    return arrays
+
+
+def compile_bundle(bundle: dict) -> Dict[str, np.ndarray]:
+    """
+    Convertit un bundle {"model": ..., "scaler": ...} en tableaux NumPy.
+
+    Args:
+        bundle (dict): Contenu d'un fichier `.joblib` de `models/`.
+
+    Returns:
+        Dict[str, np.ndarray]: Tableaux de l'artefact compilé.
+    """
+    if bundle.get("model") is None or bundle.get("scaler") is None:
+        raise ValueError("Le fichier joblib doit contenir les clés 'model' et 'scaler'")
+    arrays = _compile_scaler(bundle["scaler"])
+    arrays.update(_compile_estimator(bundle["model"]))
+    return arrays
+
+
+def compile_model_file(model_path: str, output_path: str) -> str:
+    """
+    Compile un fichier `.joblib` en artefact `.npz`.
+
+    Args:
+        model_path (str): Fichier `.joblib` du modèle.
+        output_path (str): Artefact compilé.
+
+    Returns:
+        str: Chemin de l'artefact écrit.
+    """
+    arrays = compile_bundle(load_bundle(model_path))
+    # Un artefact dont le modèle source a changé n'est plus utilisé
+    arrays["source_sha256"] = np.array(file_sha256(model_path))
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    return output_path
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Compilation des modèles en artefacts NumPy")
+    parser.add_argument(
+        "models", nargs="*", default=list(MODEL_PATHS), help="Modèles à compiler"
+    )
+    args = parser.parse_args(argv)
+
+    for name in args.models:
+        if name not in MODEL_PATHS:
+            sys.exit(f"Modèle inconnu : {name}")
+        path = compile_model_file(MODEL_PATHS[name], compiled_model_path(name))
+        print(f"{name} -> {path} ({os.path.getsize(path) // 1024} Ko)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,96 @@
+import os
+from functools import partial
+from typing import List, Optional
+
 from app import config
 from infrastructure.ml.base_model import BaseModel
-from infrastructure.ml.dummy_model import DummyModel
-from infrastructure.ml.random_forest_model import RandomForestModel
-from infrastructure.ml.sklearn_model import SklearnModel
+from infrastructure.ml.model_compiler import compiled_model_path
+from infrastructure.ml.model_registry import MODEL_PATHS, ModelRegistry, backend
+from utils.logger_utils import logger
 
 
 class ModelFactory:
     @staticmethod
-    def get_model(model_type: str) -> BaseModel:
+    def get_model(model_type: str, members: List[str] = None) -> BaseModel:
         """
         Retourne une instance de modèle prédictif selon le type spécifié.
 
+        Les classes des modèles sont importées à la demande, et les modèles chargés
+        depuis un fichier sont mis en cache pour le processus (voir `ModelRegistry`).
+
         Args:
-            model_type (str): Type du modèle (ex: 'dummy', 'randomforest', 'lightgbm', etc.)
+            model_type (str): Type du modèle (ex: 'dummy', 'randomforest', 'lightgbm',
+                'ensemble', etc.)
+            members (List[str], optional): Modèles combinés par 'ensemble'
+                (par défaut, `config.ENSEMBLE_MODELS`).
 
         Returns:
             BaseModel: instance du modèle
         """
         model_type = model_type.lower()
 
+        if model_type == "ensemble":
+            names = [name.lower() for name in members or config.ENSEMBLE_MODELS]
+            if "ensemble" in names:
+                raise ValueError("Un ensemble ne peut pas contenir de modèle 'ensemble'")
+            models = {name: ModelFactory.get_model(name) for name in dict.fromkeys(names)}
+            # Ensemble (et lecture des schémas) reconstruit seulement si un modèle change
+            return ModelRegistry.shared().get_composite(
+                ("ensemble", tuple(models)),
+                tuple(models.values()),
+                partial(backend("ensemble"), models),
+            )
+
         if model_type == "dummy":
-            return DummyModel()
+            return backend("dummy")()
+
+        if model_type not in MODEL_PATHS:
+            raise ValueError(f"Modèle non supporté : {model_type}")
+
+        if config.USE_COMPILED_MODELS:
+            compiled = ModelFactory.get_compiled_model(model_type)
+            if compiled is not None:
+                return compiled
+
+        model_path = MODEL_PATHS[model_type]
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Modèle non trouvé : {model_path}")
 
+        model_class = backend(model_type)
         if model_type == "randomforest":
-            return RandomForestModel()
+            load = partial(model_class, model_path)
+        else:
+            load = partial(model_class, model_type, model_path)
+        return ModelRegistry.shared().get(model_type, model_path, load)
 
-        supported_models = {
-            "lightgbm": config.LIGHTGBM_MODEL_PATH,
-            "logisticreg": config.LOGISTICREG_MODEL_PATH,
-            "naivebayes": config.NAIVEBAYES_MODEL_PATH,
-        }
+    @staticmethod
+    def get_compiled_model(model_type: str) -> Optional[BaseModel]:
+        """
+        Retourne la version compilée (NumPy) d'un modèle, si son artefact existe et
+        correspond au fichier .joblib actuel.
+
+        Args:
+            model_type (str): Type du modèle.
 
-        if model_type in supported_models:
-            return SklearnModel(model_type, supported_models[model_type])
+        Returns:
+            Optional[BaseModel]: Modèle compilé (`CompiledModel`), ou None (modèle
+            .joblib à utiliser).
+        """
+        source = MODEL_PATHS.get(model_type)
+        artifact = compiled_model_path(model_type)
+        if source is None or not os.path.exists(artifact):
+            return None
 
-        raise ValueError(f"Modèle non supporté : {model_type}")
+        registry = ModelRegistry.shared()
+        compiled = registry.get(
+            "compiled", artifact, partial(backend("compiled"), artifact)
+        )
+        if os.path.exists(source) and compiled.source_sha256 != registry.file_hash(
+            source
+        ):
+            logger.warning(
+                f"Modèle compilé obsolète pour {model_type} : utilisation du .joblib "
+                "(recompiler avec `python -m infrastructure.ml.model_compiler`)"
+            )
+            return None
+        return compiled
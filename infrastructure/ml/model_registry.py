@@ -0,0 +1,195 @@
+import hashlib
+import importlib
+import os
+import threading
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from app import config
+
+# Modèles livrés : {nom du modèle: fichier .joblib}
+MODEL_PATHS = {
+    "randomforest": config.RF_MODEL_PATH,
+    "lightgbm": config.LIGHTGBM_MODEL_PATH,
+    "logisticreg": config.LOGISTICREG_MODEL_PATH,
+    "naivebayes": config.NAIVEBAYES_MODEL_PATH,
+}
+
+# Classes des modèles, importées à la demande : {nom: (module, classe)}
+MODEL_BACKENDS = {
+    "dummy": ("infrastructure.ml.dummy_model", "DummyModel"),
+    "ensemble": ("infrastructure.ml.ensemble_model", "EnsembleModel"),
+    "compiled": ("infrastructure.ml.compiled_model", "CompiledModel"),
+    "randomforest": ("infrastructure.ml.random_forest_model", "RandomForestModel"),
+    "lightgbm": ("infrastructure.ml.sklearn_model", "SklearnModel"),
+    "logisticreg": ("infrastructure.ml.sklearn_model", "SklearnModel"),
+    "naivebayes": ("infrastructure.ml.sklearn_model", "SklearnModel"),
+}
+
+# Version d'un fichier : (date de modification en ns, taille)
+FileVersion = Tuple[int, int]
+
+
+def backend(model_type: str):
+    """
+    Importe et retourne la classe d'un modèle (scikit-learn, LightGBM... ne sont
+    importés que lorsque le modèle qui en dépend est demandé).
+
+    Args:
+        model_type (str): Nom du modèle ou du backend (voir `MODEL_BACKENDS`).
+
+    Returns:
+        type: Classe du modèle.
+    """
+    module_name, class_name = MODEL_BACKENDS[model_type]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def load_bundle(model_path: str) -> dict:
+    """
+    Charge un bundle `.joblib` ; ses tableaux NumPy sont projetés en mémoire
+    (`mmap_mode="r"`) plutôt que copiés lorsque le fichier n'est pas compressé.
+
+    Args:
+        model_path (str): Fichier `.joblib` du modèle.
+
+    Returns:
+        dict: Contenu du bundle ({"model": ..., "scaler": ...}).
+    """
+    import joblib
+
+    try:
+        return joblib.load(model_path, mmap_mode="r")
+    except ValueError:
+        # Certains fichiers compressés ne supportent pas la projection en mémoire
+        return joblib.load(model_path)
+
+
+def file_sha256(path: str) -> str:
+    """Calcule l'empreinte SHA-256 d'un fichier (version du modèle source)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_version(path: str) -> FileVersion:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ModelRegistry:
+    """
+    Cache des modèles chargés pendant l'exécution, partagé par tout le processus.
+
+    Un modèle est rechargé uniquement si son fichier a changé : la date de
+    modification et la taille sont vérifiées à chaque accès, et l'empreinte SHA-256
+    n'est recalculée que si elles diffèrent (un fichier simplement touché n'est
+    donc pas rechargé). Les évaluations répétées (historique, plusieurs modèles)
+    ne paient le chargement qu'une fois.
+    """
+
+    _shared: Optional["ModelRegistry"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # {(type, chemin): (version, empreinte, modèle)}
+        self._models: Dict[Tuple[str, str], Tuple[FileVersion, str, object]] = {}
+        # {chemin: (version, empreinte)}
+        self._hashes: Dict[str, Tuple[FileVersion, str]] = {}
+        # {clé: (composants, modèle composé)}
+        self._composites: Dict[Hashable, Tuple[Tuple[object, ...], object]] = {}
+        self.loads = 0
+
+    @classmethod
+    def shared(cls) -> "ModelRegistry":
+        """
+        Retourne le registre partagé par tout le processus.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def file_hash(self, path: str) -> str:
+        """
+        Retourne l'empreinte SHA-256 d'un fichier, recalculée seulement s'il a changé.
+
+        Args:
+            path (str): Chemin du fichier.
+
+        Returns:
+            str: Empreinte hexadécimale.
+        """
+        version = _file_version(path)
+        with self._lock:
+            cached = self._hashes.get(path)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            sha256 = file_sha256(path)
+            self._hashes[path] = (version, sha256)
+            return sha256
+
+    def get(self, model_type: str, path: str, load: Callable[[], object]):
+        """
+        Retourne le modèle chargé depuis `path`, en le chargeant au premier accès ou
+        si le fichier a changé.
+
+        Args:
+            model_type (str): Type du modèle (distingue plusieurs usages d'un même fichier).
+            path (str): Fichier du modèle.
+            load (Callable[[], object]): Chargement du modèle.
+
+        Returns:
+            object: Modèle.
+        """
+        key = (model_type, os.path.abspath(path))
+        version = _file_version(path)
+        with self._lock:
+            cached = self._models.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[2]
+
+            sha256 = self.file_hash(path)
+            if cached is not None and cached[1] == sha256:
+                self._models[key] = (version, sha256, cached[2])
+                return cached[2]
+
+            model = load()
+            self.loads += 1
+            self._models[key] = (version, sha256, model)
+            return model
+
+    def get_composite(
+        self, key: Hashable, parts: Tuple[object, ...], build: Callable[[], object]
+    ):
+        """
+        Retourne un modèle composé de modèles du registre (ex: un ensemble), construit
+        une seule fois tant que ses composants ne sont pas rechargés.
+
+        Args:
+            key (Hashable): Identifiant du modèle composé (type et noms des composants).
+            parts (Tuple[object, ...]): Composants actuels, retournés par `get`.
+            build (Callable[[], object]): Construction du modèle composé.
+
+        Returns:
+            object: Modèle composé.
+        """
+        with self._lock:
+            cached = self._composites.get(key)
+            if cached is not None and len(cached[0]) == len(parts) and all(
+                a is b for a, b in zip(cached[0], parts)
+            ):
+                return cached[1]
+
+            model = build()
+            self._composites[key] = (parts, model)
+            return model
+
+    def clear(self):
+        """Oublie tous les modèles chargés."""
+        with self._lock:
+            self._models.clear()
+            self._hashes.clear()
+            self._composites.clear()
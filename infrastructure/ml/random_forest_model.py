@@ -1,10 +1,12 @@
 import os
-from typing import Dict, List, Tuple
+from typing import Dict, Tuple
 
-import joblib
+import numpy as np
 
 from app import config
-from infrastructure.ml.base_model import BaseModel
+from infrastructure.ml.base_model import BaseModel, Vectors
+from infrastructure.ml.feature_matrix import FeatureMatrix
+from infrastructure.ml.model_registry import load_bundle
 
 
 class RandomForestModel(BaseModel):
@@ -18,7 +20,7 @@ class RandomForestModel(BaseModel):
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Modèle non trouvé : {model_path}")
 
-        bundle = joblib.load(model_path)
+        bundle = load_bundle(model_path)
         self.model = bundle.get("model")
         self.scaler = bundle.get("scaler")
 
@@ -27,40 +29,39 @@ class RandomForestModel(BaseModel):
                 "Le fichier joblib doit contenir les clés 'model' et 'scaler'"
             )
 
-    def predict(self, vectors: Dict[str, List[float]]) -> Dict[str, int]:
+    def predict(self, vectors: Vectors) -> Dict[str, int]:
         """
         Prédit le label de chaque bloc Terraform après application du scaler.
         Retourne un dictionnaire {block_id: 0|1}.
         """
-        block_ids = list(vectors.keys())
-        X = list(vectors.values())
+        matrix = FeatureMatrix.from_vectors(vectors)
 
-        X_scaled = self.scaler.transform(X)
-        predictions = self.model.predict(X_scaled)
+        X_scaled = self.scaler.transform(matrix.values)
+        predictions = np.asarray(self.model.predict(X_scaled)).astype(int)
 
-        return {block_id: int(pred) for block_id, pred in zip(block_ids, predictions)}
+        return dict(zip(matrix.block_ids.tolist(), predictions.tolist()))
 
     def predict_with_confidence(
-        self, vectors: Dict[str, List[float]]
+        self, vectors: Vectors
     ) -> Dict[str, Tuple[int, float]]:
         """
         Prédit le label de chaque bloc Terraform ainsi que son score de confiance (proba).
         Retourne un dictionnaire {block_id: (label, proba)}.
         """
-        block_ids = list(vectors.keys())
-        X = list(vectors.values())
+        matrix = FeatureMatrix.from_vectors(vectors)
 
-        X_scaled = self.scaler.transform(X)
+        X_scaled = self.scaler.transform(matrix.values)
 
-        predicted_probs = self.model.predict_proba(X_scaled)
-        results = {}
+        # Probabilité de la classe « fautif » pour toute la matrice
+        probas = np.asarray(self.model.predict_proba(X_scaled))[:, 1]
+        labels = (probas >= 0.5).astype(int)
 
-        for i, block_id in enumerate(block_ids):
-            proba = predicted_probs[i][1]
-            label = int(proba >= 0.5)
-            results[block_id] = (label, round(proba, 4))
-
-        return results
+        return dict(
+            zip(
+                matrix.block_ids.tolist(),
+                zip(labels.tolist(), np.round(probas, 4).tolist()),
+            )
+        )
 
     def describe(self) -> str:
         """
@@ -2,6 +2,8 @@ from typing import List
 import pandas as pd
 import os
 
+from app import config
+
 
 def load_selected_features(model_name: str) -> List[str]:
     """
@@ -13,7 +15,7 @@ def load_selected_features(model_name: str) -> List[str]:
     Returns:
         List[str]: Liste ordonnée des features à utiliser.
     """
-    path = os.path.join("feature_schemas", f"{model_name}_features.csv")
+    path = os.path.join(config.FEATURE_SCHEMAS_DIR, f"{model_name}_features.csv")
 
     try:
         df = pd.read_csv(path)
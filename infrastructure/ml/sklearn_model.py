@@ -1,10 +1,12 @@
 import os
-from typing import Dict, List, Tuple
+from typing import Dict, Tuple
 
-import joblib
+import numpy as np
 
 from app import config
-from infrastructure.ml.base_model import BaseModel
+from infrastructure.ml.base_model import BaseModel, Vectors
+from infrastructure.ml.feature_matrix import FeatureMatrix
+from infrastructure.ml.model_registry import load_bundle
 from infrastructure.ml.selected_features_loader import load_selected_features
 
 
@@ -25,7 +27,7 @@ class SklearnModel(BaseModel):
             raise FileNotFoundError(f"Modèle non trouvé : {model_path}")
 
         # Charge le modèle et le scaler depuis le fichier joblib
-        bundle = joblib.load(model_path)
+        bundle = load_bundle(model_path)
         self.model = bundle.get("model")
         self.scaler = bundle.get("scaler")
 
@@ -37,26 +39,25 @@ class SklearnModel(BaseModel):
                 "Le fichier joblib doit contenir les clés 'model' et 'scaler'"
             )
 
-    def predict(self, vectors: Dict[str, List[float]]) -> Dict[str, int]:
+    def predict(self, vectors: Vectors) -> Dict[str, int]:
         """
         Prédit le label (0 ou 1) pour chaque bloc après avoir appliqué le scaler.
 
         Args:
-            vectors (Dict[str, List[float]]): Vecteurs de caractéristiques par bloc
+            vectors (Vectors): Matrice de caractéristiques (ou {block_id: vecteur})
 
         Returns:
             Dict[str, int]: Dictionnaire {block_id: 0|1}
         """
-        block_ids = list(vectors.keys())
-        X = list(vectors.values())
+        matrix = FeatureMatrix.from_vectors(vectors)
 
-        X_scaled = self.scaler.transform(X)
-        predictions = self.model.predict(X_scaled)
+        X_scaled = self.scaler.transform(matrix.values)
+        predictions = np.asarray(self.model.predict(X_scaled)).astype(int)
 
-        return {block_id: int(pred) for block_id, pred in zip(block_ids, predictions)}
+        return dict(zip(matrix.block_ids.tolist(), predictions.tolist()))
 
     def predict_with_confidence(
-        self, vectors: Dict[str, List[float]]
+        self, vectors: Vectors
     ) -> Dict[str, Tuple[int, float]]:
         """
         Prédit le label + la probabilité pour chaque bloc.
@@ -64,16 +65,18 @@ class SklearnModel(BaseModel):
         Returns:
             Dict[str, Tuple[int, float]]: {block_id: (label, proba)}
         """
-        block_ids = list(vectors.keys())
-        X = list(vectors.values())
+        matrix = FeatureMatrix.from_vectors(vectors)
 
-        X_scaled = self.scaler.transform(X)
-        predicted_probs = self.model.predict_proba(X_scaled)
+        X_scaled = self.scaler.transform(matrix.values)
+        probas = np.asarray(self.model.predict_proba(X_scaled))[:, 1]
+        labels = (probas >= 0.5).astype(int)
 
-        return {
-            block_id: (int(proba[1] >= 0.5), round(proba[1], 4))
-            for block_id, proba in zip(block_ids, predicted_probs)
-        }
+        return dict(
+            zip(
+                matrix.block_ids.tolist(),
+                zip(labels.tolist(), np.round(probas, 4).tolist()),
+            )
+        )
 
     def describe(self) -> str:
         """
@@ -1,3 +1,8 @@
 from setuptools import find_packages, setup
 
-setup(name="TFDefectGA", version="1.0", packages=find_packages())
+setup(
+    name="TFDefectGA",
+    version="1.0",
+    packages=find_packages(),
+    entry_points={"console_scripts": ["tfdefect=app.prediction_server:main"]},
+)
@@ -0,0 +1,80 @@
+"""
+Mesure du temps de calcul des métriques textuelles de changement sur de gros blocs.
+
+Usage :
+    python -m tests.benchmarks.bench_change_metrics [--lines 5000] [--edits 200]
+"""
+
+import argparse
+import random
+import time
+
+from core.parsers.change_metrics_extractor import ChangeMetricsExtractor
+from utils.edit_distance import osa_distance
+
+
+def generate_block(num_lines: int, rng: random.Random) -> str:
+    """Génère un bloc `locals` de `num_lines` attributs."""
+    lines = ["locals {"]
+    lines += [f'  attribute_{i:05d} = "{rng.getrandbits(64):016x}"' for i in range(num_lines)]
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def mutate_block(block: str, num_edits: int, rng: random.Random) -> str:
+    """Modifie, supprime ou insère `num_edits` lignes à des positions aléatoires."""
+    lines = block.split("\n")
+    for _ in range(num_edits):
+        index = rng.randrange(1, len(lines) - 1)
+        action = rng.choice(("edit", "delete", "insert"))
+        if action == "edit":
+            line = lines[index]
+            position = rng.randrange(len(line))
+            lines[index] = line[:position] + "x" + line[position + 1 :]
+        elif action == "delete":
+            del lines[index]
+        else:
+            lines.insert(index, f'  version = "{rng.randint(1, 9)}.0"')
+    return "\n".join(lines)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=5000)
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    before = generate_block(args.lines, rng)
+    after = mutate_block(before, args.edits, rng)
+    blocks = {"main.tf": {"before": [before], "after": [after]}}
+
+    print(f"Bloc : {args.lines} lignes ({len(before)} caractères), {args.edits} modifications")
+
+    results, elapsed = timed(ChangeMetricsExtractor().extract_metrics, blocks)
+    metrics = results["main.tf"]["locals"]
+    print(
+        f"Extracteur complet : {elapsed * 1000:.1f} ms "
+        f"(additions={metrics['additions']}, "
+        f"distance={metrics['damerau_levenshtein_code_change_distance']})"
+    )
+
+    # Pire cas du noyau : réécriture complète d'un bloc de taille réduite
+    size = min(len(before), 20000)
+    rewritten = generate_block(args.lines, rng)[:size]
+    distance, elapsed = timed(osa_distance, before[:size], rewritten)
+    print(
+        f"Noyau bit-parallèle, réécriture complète de {size} caractères : "
+        f"{elapsed * 1000:.1f} ms (distance={distance})"
+    )
+
+
+if __name__ == "__main__":
+    main()
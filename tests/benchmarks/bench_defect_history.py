@@ -0,0 +1,76 @@
+"""
+Mesure du débit d'enregistrement dans l'historique des défauts avec plusieurs écrivains.
+
+Usage :
+    python -m tests.benchmarks.bench_defect_history [--writers 8] [--runs 50] [--blocks 200]
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from infrastructure.ml.defect_history_store import DefectHistoryStore
+
+
+def prefill(db_path: str, entries: int, blocks: int):
+    """Remplit la base avec `entries` prédictions passées (un commit par lot de blocs)."""
+    with DefectHistoryStore(db_path) as store:
+        for run in range(entries // blocks):
+            store.record(
+                {f"main.tf::block_{i}": i % 2 for i in range(blocks)}, f"old-{run}"
+            )
+
+
+def write(db_path: str, writer: int, runs: int, blocks: int) -> float:
+    """Enregistre `runs` analyses de `blocks` blocs ; retourne l'enregistrement le plus lent (s)."""
+    slowest = 0.0
+    with DefectHistoryStore(db_path) as store:
+        for run in range(runs):
+            predictions = {f"main.tf::block_{i}": (i + run) % 2 for i in range(blocks)}
+            start = time.perf_counter()
+            store.record(predictions, f"w{writer}-{run}")
+            slowest = max(slowest, time.perf_counter() - start)
+    return slowest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--blocks", type=int, default=200)
+    parser.add_argument("--history", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "defect_history.db")
+        prefill(db_path, args.history, args.blocks)
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.writers) as pool:
+            slowest = pool.starmap(
+                write,
+                [(db_path, w, args.runs, args.blocks) for w in range(args.writers)],
+            )
+        elapsed = time.perf_counter() - start
+
+        with DefectHistoryStore(db_path) as store:
+            total = len(store)
+
+    written = args.writers * args.runs * args.blocks
+    expected = written + args.history // args.blocks * args.blocks
+    print(
+        f"{args.writers} écrivains x {args.runs} analyses x {args.blocks} blocs, "
+        f"historique initial de {args.history} prédictions"
+    )
+    print(
+        f"{written} prédictions en {elapsed:.2f} s "
+        f"({written / elapsed:.0f}/s, {args.writers * args.runs / elapsed:.1f} analyses/s)"
+    )
+    print(f"Enregistrement le plus lent : {max(slowest) * 1000:.1f} ms")
+    print(f"Prédictions en base : {total} (attendu : {expected})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import subprocess
+
+import pytest
+
+
+class GitRepo:
+    """
+    Dépôt Git temporaire utilisé par les tests qui ont besoin d'un historique réel.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.git("init", "-q")
+
+    def git(self, *args) -> str:
+        result = subprocess.run(
+            ["git", *args], cwd=self.path, check=True, capture_output=True, text=True
+        )
+        return result.stdout.strip()
+
+    def commit(self, files: dict, message: str, author: str = "alice") -> str:
+        """
+        Écrit les fichiers donnés ({chemin: contenu}) puis crée un commit.
+
+        Returns:
+            str: Hash du commit créé.
+        """
+        for path, content in files.items():
+            file_path = self.path / path
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(content)
+            self.git("add", path)
+        return self._commit(message, author)
+
+    def move(self, old_path: str, new_path: str, message: str, author: str = "alice"):
+        """Renomme un fichier (`git mv`) puis crée un commit."""
+        (self.path / new_path).parent.mkdir(parents=True, exist_ok=True)
+        self.git("mv", old_path, new_path)
+        return self._commit(message, author)
+
+    def _commit(self, message: str, author: str) -> str:
+        self.git(
+            "-c",
+            f"user.name={author}",
+            "-c",
+            f"user.email={author}@example.com",
+            "commit",
+            "-q",
+            "-m",
+            message,
+        )
+        return self.git("rev-parse", "HEAD")
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """Fournit un dépôt Git vide dans un répertoire temporaire."""
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    return GitRepo(repo_path)
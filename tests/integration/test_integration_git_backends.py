@@ -0,0 +1,47 @@
+import subprocess
+
+import pytest
+
+from tests.unit.test_native_git_adapter import assert_backends_agree
+
+# Nombre de commits du dépôt comparés entre les deux backends
+MAX_COMMITS = 40
+
+
+def test_native_backend_matches_pydriller_on_repository_history(tmp_path):
+    """
+    Teste la parité du backend Git natif avec PyDriller sur l'historique réel du dépôt.
+
+    Scénario :
+        - Le dépôt du projet est cloné dans un répertoire temporaire.
+        - Chacun des derniers commits (hors merges) est extrait, puis les deux
+          backends sont interrogés sur ce commit.
+
+    Assertions :
+        - Vérifie que fichiers modifiés, statuts, contenus et lignes modifiées sont
+          identiques pour chaque commit.
+
+    Returns:
+        None
+    """
+    clone = tmp_path / "clone"
+    subprocess.run(
+        ["git", "clone", "-q", "--no-local", ".", str(clone)],
+        check=True,
+        capture_output=True,
+    )
+    commits = subprocess.run(
+        ["git", "rev-list", "--no-merges", f"--max-count={MAX_COMMITS}", "HEAD"],
+        cwd=clone,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    if len(commits) < 2:
+        pytest.skip("Historique du dépôt indisponible (clone superficiel)")
+
+    for commit in commits:
+        subprocess.run(
+            ["git", "checkout", "-q", commit], cwd=clone, check=True, capture_output=True
+        )
+        assert_backends_agree(str(clone))
@@ -1,9 +1,11 @@
-import json
 from datetime import datetime
 from unittest.mock import patch
 
 from core.use_cases.feature_vector_builder import FeatureVectorBuilder
-from infrastructure.ml.defect_history_manager import update_defect_history
+from infrastructure.ml.defect_history_manager import (
+    load_defect_history,
+    update_defect_history,
+)
 from infrastructure.ml.model_factory import ModelFactory
 
 
@@ -34,7 +36,7 @@ def test_dummy_model_prediction_and_history_update(mock_get_commit, tmp_path):
     from app import config
 
     # Configuration des chemins pour l'historique des défauts et les sorties
-    config.DEFECT_HISTORY_PATH = tmp_path / "defect_history.json"
+    config.DEFECT_HISTORY_DB_PATH = str(tmp_path / "defect_history.db")
     config.OUTPUT_DIR = tmp_path
 
     # Étape 1 : Génération de vecteurs à partir du code
@@ -57,10 +59,7 @@ def test_dummy_model_prediction_and_history_update(mock_get_commit, tmp_path):
     update_defect_history(predictions)
 
     # Étape 4 : Vérification que l'historique a bien été sauvegardé
-    assert config.DEFECT_HISTORY_PATH.exists()
-
-    with open(config.DEFECT_HISTORY_PATH, "r") as f:
-        history = json.load(f)
+    history = load_defect_history()
 
     # Vérifie que l'historique est un dictionnaire et qu'il contient toutes les prédictions
     assert isinstance(history, dict)
@@ -0,0 +1,147 @@
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+from core.parsers.parse_cache import ParseCache
+from core.parsers.terrametrics_cache import TerraMetricsCache
+from infrastructure.git.head_resolver import HeadResolver
+from infrastructure.ml.defect_history_manager import load_defect_history
+from tfdefect import Analyzer
+from utils.block_utils import terrametrics_block_identifier
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_import_has_no_side_effects(tmp_path):
+    """
+    Teste que l'import de l'API et des points d'entrée n'a aucun effet de bord.
+
+    Scénario :
+        - Dans un nouvel interpréteur lancé depuis un répertoire vide, `subprocess.run`
+          est remplacé puis `tfdefect`, `app.action_runner` et `app.prediction_server`
+          sont importés.
+
+    Assertions :
+        - Vérifie qu'aucune commande n'est exécutée.
+        - Vérifie qu'aucun fichier ni dossier (`out/`) n'est créé.
+        - Vérifie qu'aucun handler de log n'est ajouté.
+
+    Returns:
+        None
+    """
+    code = (
+        "import os, subprocess\n"
+        "calls = []\n"
+        "subprocess.run = lambda *args, **kwargs: calls.append(args)\n"
+        "import tfdefect, app.action_runner, app.prediction_server\n"
+        "from utils.logger_utils import logger\n"
+        "print(calls, os.listdir('.'), logger.handlers)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[] [] []"
+
+
+def _fake_terrametrics(tf_path: str, output_path: str):
+    """Remplace l'exécution du JAR : une entrée par bloc, avec son nombre de lignes."""
+    with open(tf_path) as f:
+        blocks = f.read().split("\n\n")
+    entries = [
+        {"block_identifiers": terrametrics_block_identifier(b), "nloc": len(b.splitlines())}
+        for b in blocks
+        if terrametrics_block_identifier(b)
+    ]
+    with open(output_path, "w") as f:
+        json.dump({"data": entries}, f)
+
+
+@patch(
+    "core.parsers.terrametrics_runner.TerraMetricsRunner.run",
+    side_effect=_fake_terrametrics,
+)
+def test_analyzer_scores_commits_with_explicit_paths(
+    mock_run, git_repo, tmp_path, monkeypatch
+):
+    """
+    Teste l'analyse d'un dépôt par l'API, depuis un autre répertoire courant.
+
+    Scénario :
+        - Un dépôt contient deux commits modifiant un bloc Terraform.
+        - Un `Analyzer` (modèle de régression logistique, exécution de TerraMetrics
+          simulée) analyse le dernier commit deux fois, puis le premier commit, le
+          répertoire courant étant un dossier vide.
+
+    Assertions :
+        - Vérifie que le bloc modifié est prédit pour le HEAD du dépôt, puis pour
+          la révision demandée.
+        - Vérifie que la prédiction est enregistrée dans l'historique du dépôt, sous
+          `cache_dir`, et que rien n'est écrit dans le répertoire courant.
+        - Vérifie que la seconde analyse réutilise les extracteurs et les vecteurs
+          enregistrés.
+        - Vérifie que les caches de l'analyseur lui sont propres : les caches
+          globaux du processus ne sont pas modifiés.
+        - Vérifie que la fermeture de l'analyseur libère le résolveur de commits
+          du dépôt.
+
+    Returns:
+        None
+    """
+    first = git_repo.commit(
+        {"main.tf": 'resource "aws_s3_bucket" "logs" {\n  bucket = "a"\n}\n'}, "init"
+    )
+    head = git_repo.commit(
+        {"main.tf": 'resource "aws_s3_bucket" "logs" {\n  bucket = "b"\n  acl = "private"\n}\n'},
+        "update",
+    )
+    cwd = tmp_path / "cwd"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+    cache_dir = tmp_path / "cache"
+    jar_path = tmp_path / "terrametrics.jar"
+    jar_path.write_bytes(b"")
+
+    shared_parse_cache = ParseCache.shared()
+    with Analyzer(
+        str(git_repo.path),
+        model="logisticreg",
+        cache_dir=str(cache_dir),
+        jar_path=str(jar_path),
+    ) as analyzer:
+        result = analyzer.analyze()
+        builder = analyzer._builder
+        again = analyzer.analyze()
+        older = analyzer.analyze(first[:10])
+        assert os.path.abspath(str(git_repo.path)) in HeadResolver._instances
+
+    assert result["commit"] == head
+    assert list(result["predictions"]) == ["main.tf::aws_s3_bucket.logs"]
+    prediction = result["predictions"]["main.tf::aws_s3_bucket.logs"]
+    assert prediction["fault_prone"] in (0, 1)
+    assert 0.0 <= prediction["probability"] <= 1.0
+
+    history = load_defect_history(analyzer.defect_history_path)
+    assert analyzer.defect_history_path.startswith(str(cache_dir))
+    assert history["main.tf::aws_s3_bucket.logs"][0]["commit"] == head
+    assert os.listdir(cwd) == []
+
+    assert analyzer._builder is builder
+    assert again == result
+    assert older["commit"] == first
+    assert list(older["predictions"]) == ["main.tf::aws_s3_bucket.logs"]
+    assert sorted(os.listdir(cache_dir / "feature_store")) == sorted([head, first])
+    assert os.path.abspath(str(git_repo.path)) not in HeadResolver._instances
+
+    assert builder.parse_cache is analyzer.caches.parse_cache
+    assert analyzer.caches.parse_cache.db_path == str(cache_dir / "parse_cache.db")
+    assert ParseCache.shared() is shared_parse_cache
+    assert ParseCache.shared().db_path is None
+    assert TerraMetricsCache.active() is None
@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+from infrastructure.git.block_history_store import BlockHistoryStore, open_synced_store
+
+
+def test_sync_is_incremental(git_repo, tmp_path):
+    """
+    Teste la synchronisation incrémentale de `BlockHistoryStore`.
+
+    Scénario :
+        - Un dépôt Git temporaire contient deux commits modifiant un fichier Terraform.
+        - La base est synchronisée, puis un troisième commit est ajouté et la base
+          est resynchronisée.
+
+    Assertions :
+        - Vérifie que la première synchronisation indexe tout l'historique.
+        - Vérifie qu'une synchronisation sans nouveau commit n'indexe rien.
+        - Vérifie que la synchronisation suivante n'indexe que le nouveau commit.
+        - Vérifie que les contributions d'un bloc sont retournées dans l'ordre chronologique.
+        - Vérifie que le dernier commit indexé est bien HEAD.
+
+    Returns:
+        None
+    """
+    git_repo.commit(
+        {"main.tf": 'resource "aws_s3_bucket" "a" {\n  bucket = "a"\n}\n'}, "c1"
+    )
+    git_repo.commit(
+        {"main.tf": 'resource "aws_s3_bucket" "a" {\n  bucket = "a2"\n}\n'},
+        "c2",
+        author="bob",
+    )
+
+    db_path = str(tmp_path / "history.db")
+    with BlockHistoryStore(str(git_repo.path), db_path) as store:
+        assert store.sync() == 2
+        assert store.sync() == 0
+
+    head = git_repo.commit(
+        {
+            "main.tf": 'resource "aws_s3_bucket" "a" {\n  bucket = "a3"\n}\n\n'
+            'resource "aws_s3_bucket" "b" {\n  bucket = "b"\n}\n'
+        },
+        "c3",
+    )
+
+    with BlockHistoryStore(str(git_repo.path), db_path) as store:
+        assert store.sync() == 1
+
+        history_a = store.get_contributions("main.tf", "aws_s3_bucket.a")
+        history_b = store.get_contributions("main.tf", "aws_s3_bucket.b")
+
+        assert [c["author"] for c in history_a] == ["alice", "bob", "alice"]
+        assert len(history_b) == 1
+
+        assert store.get_last_indexed_commit() == head
+        assert store.get_head_commit_for_file("main.tf")["hash"] == head
+        assert store.get_head_commit_for_file("other.tf") is None
+
+
+def test_sync_skips_non_terraform_commits_and_follows_renames(git_repo, tmp_path):
+    """
+    Teste que `BlockHistoryStore` ne charge que les commits Terraform et suit les renommages.
+
+    Scénario :
+        - Un fichier Terraform est créé, puis un commit ne touche qu'un fichier non Terraform.
+        - Le fichier Terraform est renommé avec `git mv`, puis modifié sous son nouveau nom.
+
+    Assertions :
+        - Vérifie que le commit sans fichier `.tf` n'est pas indexé.
+        - Vérifie que l'historique du bloc sous le nouveau chemin inclut les commits
+          antérieurs au renommage.
+
+    Returns:
+        None
+    """
+    bucket = 'resource "aws_s3_bucket" "a" {\n  bucket = "%s"\n}\n'
+
+    first = git_repo.commit({"old/main.tf": bucket % "a"}, "c1")
+    git_repo.commit({"README.md": "doc"}, "docs only")
+    git_repo.move("old/main.tf", "new/main.tf", "rename")
+    last = git_repo.commit({"new/main.tf": bucket % "b"}, "c4")
+
+    with BlockHistoryStore(str(git_repo.path), str(tmp_path / "history.db")) as store:
+        assert store.sync() == 3
+
+        history = store.get_contributions("new/main.tf", "aws_s3_bucket.a")
+
+    # Un renommage pur n'apporte pas de nouvelle version du bloc
+    assert [c["hash"] for c in history] == [first, last]
+
+
+def test_open_synced_store_falls_back_when_sync_fails(git_repo, tmp_path):
+    """
+    Teste l'ouverture de l'historique persistant quand la synchronisation échoue.
+
+    Scénario :
+        - La synchronisation de la base lève une erreur (base verrouillée).
+
+    Assertions :
+        - Vérifie que None est retourné (l'historique est reconstruit en mémoire).
+        - Vérifie que la connexion ouverte est refermée.
+
+    Returns:
+        None
+    """
+    git_repo.commit({"main.tf": 'resource "aws_s3_bucket" "a" {}\n'}, "c1")
+
+    with patch.object(
+        BlockHistoryStore, "sync", side_effect=RuntimeError("database is locked")
+    ), patch.object(BlockHistoryStore, "close") as mock_close:
+        store = open_synced_store(str(git_repo.path), str(tmp_path / "history.db"))
+
+    assert store is None
+    mock_close.assert_called_once()
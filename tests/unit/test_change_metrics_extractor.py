@@ -0,0 +1,175 @@
+import random
+
+from core.parsers.change_metrics_extractor import ChangeMetricsExtractor
+from utils.edit_distance import osa_distance
+
+
+def _reference_osa_distance(a: str, b: str) -> int:
+    """Distance de Damerau-Levenshtein (OSA) par programmation dynamique classique."""
+    d = [[i + j if i == 0 or j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(
+                d[i - 1][j] + 1,
+                d[i][j - 1] + 1,
+                d[i - 1][j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+def test_osa_distance_matches_dynamic_programming():
+    """
+    Teste le noyau bit-parallèle de la distance de Damerau-Levenshtein.
+
+    Scénario :
+        - Des cas connus (transposition, chaînes vides, insertion) sont calculés.
+        - Des paires de chaînes aléatoires sur un petit alphabet, favorisant les
+          transpositions et les affixes communs, sont comparées à l'algorithme
+          de programmation dynamique classique.
+
+    Assertions :
+        - Vérifie qu'une transposition de caractères adjacents coûte 1.
+        - Vérifie que la distance bit-parallèle est identique à la référence.
+
+    Returns:
+        None
+    """
+    assert osa_distance("ab", "ba") == 1
+    assert osa_distance("", "abc") == 3
+    assert osa_distance("t3.micro", "t3.micro") == 0
+    assert osa_distance("ca", "abc") == 3
+
+    rng = random.Random(42)
+    for _ in range(500):
+        a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 70)))
+        b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 70)))
+        assert osa_distance(a, b) == _reference_osa_distance(a, b)
+
+
+def test_osa_distance_restricted_to_band_is_exact():
+    """
+    Teste le calcul de la distance limité à la bande diagonale (majorant connu).
+
+    Scénario :
+        - De longues chaînes reçoivent quelques éditions locales (substitutions,
+          insertions, suppressions, transpositions).
+        - La distance est calculée avec un majorant exact puis lâche.
+
+    Assertions :
+        - Vérifie que la distance est identique à la référence quel que soit le
+          majorant, y compris lorsque la bande est plus étroite que les chaînes.
+
+    Returns:
+        None
+    """
+    rng = random.Random(7)
+    for _ in range(40):
+        a = "".join(rng.choice("ab =\n") for _ in range(rng.randint(300, 500)))
+        b = list(a)
+        for _ in range(rng.randint(1, 8)):
+            index = rng.randrange(len(b) - 1)
+            action = rng.choice(("edit", "delete", "insert", "swap"))
+            if action == "edit":
+                b[index] = rng.choice("ab =\n")
+            elif action == "delete":
+                del b[index]
+            elif action == "insert":
+                b.insert(index, rng.choice("ab =\n"))
+            else:
+                b[index], b[index + 1] = b[index + 1], b[index]
+        b = "".join(b)
+
+        expected = _reference_osa_distance(a, b)
+        for upper_bound in (expected, expected + 3, 2 * expected + 10):
+            assert osa_distance(a, b, upper_bound) == expected
+
+
+def test_extractor_computes_textual_change_metrics():
+    """
+    Teste le calcul des métriques textuelles pour un bloc modifié et un nouveau bloc.
+
+    Scénario :
+        - Une variable voit son type et sa valeur par défaut modifiés ; le
+          réalignement des attributs (indentation) ne doit pas compter.
+        - Un output est ajouté (aucune version précédente).
+        - Un bloc supprimé n'apparaît que dans la version avant.
+
+    Assertions :
+        - Vérifie les lignes ajoutées, leur normalisation et leur part dans les
+          ajouts du commit.
+        - Vérifie la distance d'édition sur le texte brut des blocs et la
+          détection des types de changements.
+        - Vérifie qu'un nouveau bloc est comparé à un bloc vide et qu'un bloc
+          supprimé n'a pas de métriques.
+
+    Returns:
+        None
+    """
+    before = 'variable "region" {\n  type    = string\n  default = "us-east-1"\n}'
+    after = (
+        'variable "region" {\n'
+        '  description = "AWS region"\n'
+        "  type        = list(string)\n"
+        '  default     = ["us-east-2"]\n'
+        "}"
+    )
+    added_output = 'output "ip" {\n  value = aws_instance.web.public_ip\n}'
+    removed = 'provider "aws" {\n  version = "~> 4.0"\n}'
+
+    results = ChangeMetricsExtractor().extract_metrics(
+        {
+            "main.tf": {
+                "before": [before, removed],
+                "after": [after, added_output],
+            }
+        }
+    )
+
+    assert set(results["main.tf"]) == {"variable region", "output ip"}
+
+    variable = results["main.tf"]["variable region"]
+    assert variable["additions"] == 3
+    assert variable["additions_normalized"] == 0.6
+    assert variable["additions_diffusion"] == 0.5
+    assert variable["deletions_lines_normalized"] == 0.5
+    assert variable["damerau_levenshtein_code_change_distance"] == _reference_osa_distance(
+        before, after
+    )
+    assert variable["additions_contains_type_change"] == 1
+    assert variable["additions_contains_default_change"] == 1
+    assert variable["deletions_contains_type_change"] == 1
+    assert variable["additions_contains_value_output_change"] == 0
+    assert variable["deletions_contains_versioning_change"] == 0
+
+    output = results["main.tf"]["output ip"]
+    assert output["additions"] == 3
+    assert output["additions_normalized"] == 1.0
+    assert output["additions_diffusion"] == 0.5
+    assert output["damerau_levenshtein_code_change_distance"] == len(added_output)
+    assert output["deletions_lines_normalized"] == 0.0
+    assert output["additions_contains_value_output_change"] == 1
+
+
+def test_extractor_computes_only_requested_features():
+    """
+    Teste que seules les métriques demandées par le modèle sont calculées.
+
+    Scénario :
+        - L'extracteur est créé pour une seule feature.
+
+    Assertions :
+        - Vérifie que la distance d'édition (la métrique la plus coûteuse) n'est pas
+          calculée lorsqu'elle n'est pas demandée.
+
+    Returns:
+        None
+    """
+    extractor = ChangeMetricsExtractor(features=["additions"])
+
+    results = extractor.extract_metrics(
+        {"main.tf": {"before": ['locals {\n  a = 1\n}'], "after": ['locals {\n  a = 2\n}']}}
+    )
+
+    assert results == {"main.tf": {"locals": {"additions": 1}}}
@@ -1,47 +1,43 @@
-from unittest.mock import MagicMock, patch
+import json
+import os
+import re
+from unittest.mock import patch
 
 from core.parsers.code_metrics_extractor import CodeMetricsExtractor
+from core.parsers.delta_metrics_extractor import DeltaMetricsExtractor
 
 
-@patch("core.parsers.code_metrics_extractor.CodeMetricsExtractor._cleanup_temp_files")
-@patch("core.parsers.code_metrics_extractor.open", create=True)
 @patch("core.parsers.code_metrics_extractor.os.path.exists", return_value=True)
-@patch("core.parsers.code_metrics_extractor.CodeMetricsExtractor._run_terrametrics")
-@patch("core.parsers.code_metrics_extractor.CodeMetricsExtractor._create_temp_files")
-def test_extract_metrics_success(
-    mock_create_temp,
-    mock_run_terrametrics,
-    mock_exists,
-    mock_open_file,
-    mock_cleanup,
-):
+@patch("core.parsers.terrametrics_runner.TerraMetricsRunner.run")
+def test_extract_metrics_success(mock_run_terrametrics, mock_exists):
     """
     Teste la méthode `extract_metrics` de la classe CodeMetricsExtractor.
 
-    Ce test simule les dépendances internes de la classe pour vérifier que la méthode
+    Ce test simule l'exécution de TerraMetrics pour vérifier que la méthode
     `extract_metrics` retourne les métriques attendues pour des blocs Terraform fictifs.
 
     Scénario :
-        - Les méthodes internes de CodeMetricsExtractor sont remplacées par des mocks.
-        - Un fichier temporaire contenant des métriques simulées est créé.
+        - L'exécution de TerraMetrics est remplacée par un mock écrivant des métriques simulées.
         - La méthode `extract_metrics` est appelée avec des blocs Terraform modifiés.
         - Les résultats retournés sont comparés aux métriques simulées.
 
     Assertions :
         - Vérifie que le résultat contient les métriques pour le fichier "main.tf".
         - Vérifie que les métriques retournées correspondent aux données simulées.
-        - Vérifie que la méthode `_run_terrametrics` est appelée une fois.
-        - Vérifie que la méthode `_cleanup_temp_files` est appelée une fois.
+        - Vérifie que TerraMetrics est exécuté une fois.
+        - Vérifie que les fichiers temporaires sont supprimés.
 
     Returns:
         None
     """
-    mock_open_file.return_value.__enter__.return_value.read.return_value = '{"data": "ok"}'
-    mock_open_file.return_value.__enter__.return_value = MagicMock(
-        read=MagicMock(return_value='{"data": "ok"}')
-    )
+    written_paths = []
 
-    mock_create_temp.return_value = ("tmp.tf", "tmp.json")
+    def fake_run(tf_path, output_path):
+        written_paths.append(tf_path)
+        with open(output_path, "w") as f:
+            json.dump({"data": "ok"}, f)
+
+    mock_run_terrametrics.side_effect = fake_run
 
     extractor = CodeMetricsExtractor(jar_path="fake_path.jar")
     modified_blocks = {
@@ -53,4 +49,40 @@ def test_extract_metrics_success(
     assert "main.tf" in result
     assert result["main.tf"] == {"data": "ok"}
     mock_run_terrametrics.assert_called_once()
-    mock_cleanup.assert_called_once()
+    assert not any(os.path.lexists(path) for path in written_paths)
+
+
+def test_provided_features_cover_terrametrics_schema_metrics():
+    """
+    Teste que les features déclarées par les extracteurs TerraMetrics couvrent les
+    métriques TerraMetrics des schémas de features des modèles.
+
+    Scénario :
+        - Les schémas `feature_schemas/*.csv` sont lus.
+        - Les features de métriques de code (et leurs deltas) sont comparées aux
+          features déclarées par CodeMetricsExtractor et DeltaMetricsExtractor.
+
+    Assertions :
+        - Vérifie que chaque métrique de code des schémas est déclarée par
+          CodeMetricsExtractor, et chaque delta par DeltaMetricsExtractor.
+        - Vérifie que les métriques absentes des schémas (ex: `avgMccabeCC`) sont
+          aussi déclarées.
+
+    Returns:
+        None
+    """
+    schema_dir = os.path.join(os.path.dirname(__file__), "..", "..", "feature_schemas")
+    features = set()
+    for name in os.listdir(schema_dir):
+        with open(os.path.join(schema_dir, name)) as f:
+            features.update(line.strip() for line in f.readlines()[1:] if line.strip())
+
+    code = CodeMetricsExtractor.provided_features()
+    deltas = DeltaMetricsExtractor.provided_features()
+    for feature in features:
+        if feature.endswith("_delta"):
+            assert feature in deltas
+        elif re.fullmatch(r"nloc|textEntropyMeasure|num[A-Z]\w*", feature):
+            assert feature in code
+    assert {"avgMccabeCC", "numVars"} <= code
+    assert "avgMccabeCC_delta" in deltas
@@ -0,0 +1,83 @@
+import warnings
+
+import joblib
+import numpy as np
+import pytest
+
+from app import config
+from infrastructure.ml.compiled_model import CompiledModel
+from infrastructure.ml.model_compiler import MODEL_PATHS, compile_model_file
+from infrastructure.ml.model_factory import ModelFactory
+
+
+@pytest.mark.parametrize("model_name", sorted(MODEL_PATHS))
+def test_compiled_model_matches_predict_proba(model_name, tmp_path):
+    """
+    Teste la parité entre un modèle compilé (NumPy seul) et le modèle `.joblib` d'origine.
+
+    Scénario :
+        - Le modèle livré est compilé en artefact `.npz`.
+        - Des vecteurs aléatoires sont générés autour de la plage d'entraînement du
+          scaler, dont des valeurs entières et des vecteurs nuls (valeurs fréquentes
+          des métriques, proches des seuils des arbres).
+
+    Assertions :
+        - Vérifie que les probabilités du modèle compilé sont identiques à celles de
+          `predict_proba` du modèle d'origine, après son scaler.
+        - Vérifie que `predict_with_confidence` retourne les mêmes labels.
+
+    Returns:
+        None
+    """
+    artifact = compile_model_file(MODEL_PATHS[model_name], str(tmp_path / "model.npz"))
+    compiled = CompiledModel(artifact)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        bundle = joblib.load(MODEL_PATHS[model_name])
+    scaler, model = bundle["scaler"], bundle["model"]
+
+    rng = np.random.default_rng(0)
+    low, high = scaler.data_min_, scaler.data_max_
+    margin = 0.2 * (high - low)
+    X = rng.uniform(low - margin, high + margin, size=(400, len(low)))
+    X[:150] = np.round(X[:150])
+    X[150:200] = 0.0
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = model.predict_proba(scaler.transform(X))[:, 1]
+
+    np.testing.assert_allclose(compiled.predict_proba(X), expected, rtol=0, atol=1e-9)
+
+    vectors = {f"main.tf::block_{i}": row.tolist() for i, row in enumerate(X[:20])}
+    labels = {b: label for b, (label, _) in compiled.predict_with_confidence(vectors).items()}
+    assert list(labels.values()) == (expected[:20] >= 0.5).astype(int).tolist()
+
+
+def test_factory_ignores_stale_compiled_model(tmp_path, monkeypatch):
+    """
+    Teste que la factory n'utilise un modèle compilé que s'il correspond au `.joblib`.
+
+    Scénario :
+        - Le modèle de régression logistique est compilé dans un répertoire temporaire.
+        - Le fichier `.joblib` source est ensuite remplacé par un autre modèle.
+
+    Assertions :
+        - Vérifie que l'artefact à jour est utilisé.
+        - Vérifie qu'un artefact obsolète est ignoré.
+
+    Returns:
+        None
+    """
+    source = tmp_path / "logisticreg_model.joblib"
+    source.write_bytes(open(MODEL_PATHS["logisticreg"], "rb").read())
+    monkeypatch.setitem(MODEL_PATHS, "logisticreg", str(source))
+    monkeypatch.setattr(config, "COMPILED_MODELS_DIR", str(tmp_path / "compiled"))
+    compile_model_file(str(source), str(tmp_path / "compiled" / "logisticreg.npz"))
+
+    assert isinstance(ModelFactory.get_compiled_model("logisticreg"), CompiledModel)
+
+    source.write_bytes(open(MODEL_PATHS["naivebayes"], "rb").read())
+
+    assert ModelFactory.get_compiled_model("logisticreg") is None
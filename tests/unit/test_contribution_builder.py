@@ -1,11 +1,12 @@
 from unittest.mock import MagicMock, patch
 
-from core.parsers.contribution_builder import (get_contribution,
+from core.parsers.contribution_builder import (build_contributions_index,
+                                               get_contribution,
                                                get_previous_contributions)
 
 
-@patch("core.parsers.contribution_builder.Repository")
-def test_get_contribution_success(mock_repo):
+@patch("core.parsers.contribution_builder.HeadResolver")
+def test_get_contribution_success(mock_resolver_cls):
     """
     Teste la fonction `get_contribution` pour vérifier qu'elle retourne les informations
     correctes sur un bloc Terraform donné.
@@ -33,9 +34,10 @@ def test_get_contribution_success(mock_repo):
 
     mock_file = MagicMock()
     mock_file.new_path = "main.tf"
-    mock_commit.modified_files = [mock_file]
 
-    mock_repo.return_value.traverse_commits.return_value = iter([mock_commit])
+    mock_resolver = mock_resolver_cls.for_repo.return_value
+    mock_resolver.latest_non_merge.return_value = mock_commit
+    mock_resolver.modified_files.return_value = [mock_file]
 
     result = get_contribution(".", "main.tf", "resource.aws_s3_bucket.mybucket")
 
@@ -50,9 +52,9 @@ def test_get_contribution_success(mock_repo):
 
 @patch("core.parsers.contribution_builder.extract_block_identifier")
 @patch("core.parsers.contribution_builder.TerraformParser")
-@patch("core.parsers.contribution_builder.Repository")
+@patch("core.parsers.contribution_builder.iter_commits_touching")
 def test_get_previous_contributions_success(
-    mock_repo, mock_parser_cls, mock_extract_id
+    mock_iter_commits, mock_parser_cls, mock_extract_id
 ):
     """
     Teste la fonction `get_previous_contributions` pour vérifier qu'elle retourne
@@ -96,7 +98,7 @@ def test_get_previous_contributions_success(
     mock_file.source_code = 'resource "aws_s3_bucket" "mybucket" { ... }'
 
     mock_commit.modified_files = [mock_file]
-    mock_repo.return_value.traverse_commits.return_value = [mock_commit]
+    mock_iter_commits.return_value = [mock_commit]
 
     defect_history = {
         "main.tf::aws_s3_bucket.mybucket": [{"commit": "abc123", "fault_prone": 1}]
@@ -115,3 +117,101 @@ def test_get_previous_contributions_success(
     assert result["fault_prone"] == 1
     assert result["block"] == "aws_s3_bucket"
     assert result["block_id"] == "aws_s3_bucket.mybucket"
+
+
+@patch("core.parsers.contribution_builder.iter_commits_touching")
+def test_build_contributions_index_single_traversal(mock_iter_commits):
+    """
+    Teste la fonction `build_contributions_index` pour vérifier qu'elle reconstruit
+    l'historique de plusieurs blocs en un seul parcours des commits.
+
+    Scénario :
+        - Deux commits fictifs modifient un fichier Terraform contenant deux blocs.
+        - Le second commit ne contient plus que l'un des deux blocs.
+        - La fonction est appelée pour les deux blocs à la fois.
+
+    Assertions :
+        - Vérifie que l'historique n'est parcouru qu'une seule fois, limité aux chemins suivis.
+        - Vérifie que chaque bloc reçoit les contributions des commits qui le contiennent.
+        - Vérifie que le `fault_prone` est injecté depuis l'historique des défauts.
+
+    Returns:
+        None
+    """
+    content_v1 = (
+        'resource "aws_s3_bucket" "a" {\n  bucket = "a"\n}\n\n'
+        'resource "aws_s3_bucket" "b" {\n  bucket = "b"\n}\n'
+    )
+    content_v2 = 'resource "aws_s3_bucket" "a" {\n  bucket = "a2"\n}\n'
+
+    commits = []
+    for commit_hash, author, content in [
+        ("c1", "alice", content_v1),
+        ("c2", "bob", content_v2),
+    ]:
+        mock_commit = MagicMock()
+        mock_commit.hash = commit_hash
+        mock_commit.author.name = author
+        mock_commit.committer_date = "2025-03-20"
+
+        mock_file = MagicMock()
+        mock_file.new_path = "main.tf"
+        mock_file.old_path = "main.tf"
+        mock_file.source_code = content
+        mock_commit.modified_files = [mock_file]
+        commits.append(mock_commit)
+
+    mock_iter_commits.return_value = commits
+
+    defect_history = {
+        "main.tf::aws_s3_bucket.a": [{"commit": "c2", "fault_prone": 1}]
+    }
+
+    index = build_contributions_index(
+        ".",
+        {"main.tf": ["aws_s3_bucket.a", "aws_s3_bucket.b"]},
+        defect_history,
+    )
+
+    mock_iter_commits.assert_called_once()
+    assert set(mock_iter_commits.call_args[0][1]) == {"main.tf"}
+
+    history_a = index[("main.tf", "aws_s3_bucket.a")]
+    history_b = index[("main.tf", "aws_s3_bucket.b")]
+
+    assert [c["commit"] for c in history_a] == ["c1", "c2"]
+    assert [c["fault_prone"] for c in history_a] == [0, 1]
+    assert [c["commit"] for c in history_b] == ["c1"]
+    assert history_b[0]["author"] == "alice"
+
+
+def test_build_contributions_index_follows_renames(git_repo):
+    """
+    Teste que `build_contributions_index` suit les renommages de fichiers sans base persistante.
+
+    Scénario :
+        - Un fichier Terraform est créé, puis un commit ne touche qu'un fichier non Terraform.
+        - Le fichier est renommé avec `git mv`, puis modifié sous son nouveau nom.
+
+    Assertions :
+        - Vérifie que l'historique du bloc sous le nouveau chemin inclut le commit
+          antérieur au renommage.
+        - Vérifie que les contributions sont rattachées au chemin actuel du fichier.
+
+    Returns:
+        None
+    """
+    bucket = 'resource "aws_s3_bucket" "a" {\n  bucket = "%s"\n}\n'
+
+    first = git_repo.commit({"old/main.tf": bucket % "a"}, "c1")
+    git_repo.commit({"README.md": "doc"}, "docs only")
+    git_repo.move("old/main.tf", "new/main.tf", "rename")
+    last = git_repo.commit({"new/main.tf": bucket % "b"}, "c4", author="bob")
+
+    index = build_contributions_index(
+        str(git_repo.path), {"new/main.tf": ["aws_s3_bucket.a"]}
+    )
+    history = index[("new/main.tf", "aws_s3_bucket.a")]
+
+    assert [c["commit"] for c in history] == [first, last]
+    assert all(c["file"] == "new/main.tf" for c in history)
@@ -0,0 +1,157 @@
+import json
+import threading
+
+from infrastructure.ml.defect_history_manager import defect_history_digest
+from infrastructure.ml.defect_history_store import DefectHistoryStore
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    """
+    Teste l'import de l'ancien fichier defect_history.json dans la base.
+
+    Scénario :
+        - Un fichier JSON contient l'historique de deux blocs, dont un prédit sur
+          deux commits.
+        - La base est ouverte une première fois, puis rouverte après modification
+          du fichier JSON.
+
+    Assertions :
+        - Vérifie que toutes les prédictions du fichier sont importées, dans l'ordre.
+        - Vérifie que le fichier n'est plus relu aux ouvertures suivantes.
+
+    Returns:
+        None
+    """
+    legacy = {
+        "main.tf::aws_s3_bucket.logs": [
+            {"commit": "c1", "fault_prone": 0, "date": "2025-03-22T13:30:14"},
+            {"commit": "c2", "fault_prone": 1, "date": "2025-03-23T09:00:00"},
+        ],
+        "vars.tf::variable.region": [
+            {"commit": "c2", "fault_prone": 0, "date": "2025-03-23T09:00:00"}
+        ],
+    }
+    json_path = tmp_path / "defect_history.json"
+    json_path.write_text(json.dumps(legacy))
+    db_path = str(tmp_path / "defect_history.db")
+
+    with DefectHistoryStore(db_path) as store:
+        assert store.history() == legacy
+        assert len(store) == 3
+    imported = dict(legacy)
+
+    legacy["main.tf::aws_s3_bucket.new"] = [{"commit": "c3", "fault_prone": 1}]
+    json_path.write_text(json.dumps(legacy))
+    with DefectHistoryStore(db_path) as store:
+        assert store.history() == imported
+
+
+def test_record_keeps_first_prediction_per_commit(tmp_path):
+    """
+    Teste l'enregistrement et la consultation des prédictions par bloc et par commit.
+
+    Scénario :
+        - Les prédictions d'un commit sont enregistrées deux fois (la seconde avec
+          un label différent), puis celles d'un second commit.
+
+    Assertions :
+        - Vérifie que seules les nouvelles prédictions sont comptées.
+        - Vérifie que la première prédiction d'un bloc pour un commit est conservée.
+        - Vérifie que la consultation ne retourne que les blocs demandés, avec leur
+          dernière prédiction.
+
+    Returns:
+        None
+    """
+    with DefectHistoryStore(str(tmp_path / "defect_history.db")) as store:
+        assert store.record({"main.tf::a": 1, "main.tf::b": 0}, "c1") == 2
+        assert store.record({"main.tf::a": 0}, "c1") == 0
+        assert store.record({"main.tf::a": 0, "main.tf::c": 1}, "c2", "2025-04-01") == 2
+
+        assert store.get("main.tf::a", "c1") == 1
+        assert store.get("main.tf::a", "c3") is None
+        assert store.fault_prone_by_commit(["main.tf::a", "main.tf::z"]) == {
+            "main.tf::a": {"c1": 1, "c2": 0}
+        }
+        assert store.latest(["main.tf::a", "main.tf::b"]) == {
+            "main.tf::a": {"commit": "c2", "fault_prone": 0, "date": "2025-04-01"},
+            "main.tf::b": store.history(["main.tf::b"])["main.tf::b"][0],
+        }
+        assert len(store) == 4
+
+
+def test_concurrent_writers_merge_their_predictions(tmp_path):
+    """
+    Teste l'enregistrement simultané dans la même base par plusieurs écrivains.
+
+    Scénario :
+        - Huit écrivains, chacun avec sa propre connexion, enregistrent en même
+          temps les prédictions de leur commit sur des blocs en partie communs.
+
+    Assertions :
+        - Vérifie qu'aucun enregistrement n'échoue ni n'en écrase un autre : chaque
+          bloc partagé a une prédiction par commit.
+
+    Returns:
+        None
+    """
+    db_path = str(tmp_path / "defect_history.db")
+    DefectHistoryStore(db_path).close()
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def write(writer: int):
+        try:
+            with DefectHistoryStore(db_path) as store:
+                barrier.wait()
+                for run in range(10):
+                    predictions = {
+                        f"main.tf::shared_{i}": (i + writer) % 2 for i in range(50)
+                    }
+                    predictions[f"main.tf::own_{writer}"] = 1
+                    store.record(predictions, f"w{writer}-c{run}")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with DefectHistoryStore(db_path) as store:
+        assert len(store) == 8 * 10 * 51
+        shared = store.fault_prone_by_commit(["main.tf::shared_0"])["main.tf::shared_0"]
+        assert len(shared) == 8 * 10
+
+
+def test_history_digest_changes_with_block_predictions(tmp_path):
+    """
+    Teste l'empreinte de l'historique des prédictions utilisée par le magasin de features.
+
+    Scénario :
+        - L'empreinte de deux blocs est calculée avant et après l'enregistrement de
+          prédictions, pour ces blocs puis pour un autre bloc.
+
+    Assertions :
+        - Vérifie que l'empreinte change quand une prédiction de l'un des blocs est ajoutée.
+        - Vérifie qu'elle ne dépend pas des prédictions des autres blocs.
+        - Vérifie qu'elle ignore les prédictions du commit exclu (commit analysé).
+
+    Returns:
+        None
+    """
+    db_path = str(tmp_path / "defect_history.db")
+    blocks = ["main.tf::a", "main.tf::b"]
+    empty = defect_history_digest(blocks, db_path)
+
+    with DefectHistoryStore(db_path) as store:
+        store.record({"main.tf::a": 1}, "c1")
+    recorded = defect_history_digest(blocks, db_path)
+    assert recorded != empty
+
+    with DefectHistoryStore(db_path) as store:
+        store.record({"main.tf::z": 1}, "c2")
+    assert defect_history_digest(blocks, db_path) == recorded
+    assert defect_history_digest(blocks, db_path, exclude_commit="c1") == empty
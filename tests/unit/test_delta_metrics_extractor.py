@@ -1,3 +1,6 @@
+from concurrent.futures import Future
+from unittest.mock import patch
+
 from core.parsers.delta_metrics_extractor import DeltaMetricsExtractor
 
 
@@ -138,3 +141,119 @@ def test_delta_with_empty_data_list():
 
     result = extractor._compute_delta_metrics(metrics_before, metrics_after)
     assert "error" in result
+
+
+def test_extract_metrics_reuses_code_metrics_for_after_side():
+    """
+    Teste que `extract_metrics` réutilise les métriques « après » fournies par
+    CodeMetrics et n'analyse que les blocs « avant » utiles.
+
+    Scénario :
+        - Un fichier contient un bloc modifié et un bloc supprimé côté « avant ».
+        - Les métriques CodeMetrics du bloc modifié sont fournies.
+        - L'exécution de TerraMetrics est simulée.
+
+    Assertions :
+        - Vérifie que seul le bloc « avant » ayant un homologue « après » est analysé.
+        - Vérifie que le delta est calculé à partir des métriques CodeMetrics.
+
+    Returns:
+        None
+    """
+    extractor = DeltaMetricsExtractor(jar_path="libs/terraform_metrics-1.0.jar")
+    before = 'resource "aws_instance" "example" {\n}'
+    removed = 'resource "aws_s3_bucket" "old" {\n}'
+    after = 'resource "aws_instance" "example" {\n  ami = "x"\n}'
+    code_metrics = {
+        "main.tf": {
+            "data": [
+                {"block_identifiers": "resource aws_instance example", "numTokens": 35}
+            ]
+        }
+    }
+
+    with patch.object(extractor.runner, "run_batch") as mock_run_batch:
+        mock_run_batch.return_value = {
+            "main.tf::before": {
+                "data": [
+                    {"block_identifiers": "resource aws_instance example", "numTokens": 32}
+                ]
+            }
+        }
+        result = extractor.extract_metrics(
+            {"main.tf": {"before": [before, removed], "after": [after]}},
+            after_metrics=code_metrics,
+        )
+
+    mock_run_batch.assert_called_once_with({"main.tf::before": [before]})
+    assert result["main.tf"]["resource aws_instance example"]["numTokens_delta"] == 3
+
+
+def test_extract_metrics_measures_before_side_while_after_metrics_are_pending():
+    """
+    Teste que les blocs « avant » sont analysés sans attendre les métriques CodeMetrics.
+
+    Scénario :
+        - Les métriques « après » sont fournies sous forme de `Future` non résolu.
+        - L'analyse des blocs « avant » résout ce `Future`, comme le ferait
+          l'extracteur CodeMetrics exécuté en parallèle.
+
+    Assertions :
+        - Vérifie que l'analyse « avant » a lieu alors que le `Future` est en attente.
+        - Vérifie que le delta utilise ensuite les métriques « après » résolues.
+
+    Returns:
+        None
+    """
+    extractor = DeltaMetricsExtractor(jar_path="libs/terraform_metrics-1.0.jar")
+    block = 'resource "aws_instance" "example" {\n}'
+    pending = Future()
+
+    def run_batch(documents):
+        assert not pending.done()
+        pending.set_result(
+            {"main.tf": {"data": [{"block_identifiers": "resource aws_instance example", "numVars": 3}]}}
+        )
+        return {
+            "main.tf::before": {
+                "data": [{"block_identifiers": "resource aws_instance example", "numVars": 1}]
+            }
+        }
+
+    with patch.object(extractor.runner, "run_batch", side_effect=run_batch):
+        result = extractor.extract_metrics(
+            {"main.tf": {"before": [block], "after": [block]}}, after_metrics=pending
+        )
+
+    assert result["main.tf"]["resource aws_instance example"]["numVars_delta"] == 2
+
+
+def test_extract_metrics_returns_empty_delta_for_added_file():
+    """
+    Teste qu'un fichier sans version « avant » (fichier ajouté) a un delta vide.
+
+    Scénario :
+        - Un fichier ne contient que des blocs « après » ; un autre fichier n'a que
+          des blocs nouveaux (aucun homologue « avant »).
+
+    Assertions :
+        - Vérifie que TerraMetrics n'est pas exécuté.
+        - Vérifie que les deux fichiers ont un delta vide, sans erreur.
+
+    Returns:
+        None
+    """
+    extractor = DeltaMetricsExtractor(jar_path="libs/terraform_metrics-1.0.jar")
+    added = 'resource "aws_instance" "example" {\n}'
+    removed = 'resource "aws_s3_bucket" "old" {\n}'
+
+    with patch.object(extractor.runner, "run_batch") as mock_run_batch:
+        result = extractor.extract_metrics(
+            {
+                "new.tf": {"after": [added]},
+                "main.tf": {"before": [removed], "after": [added]},
+            }
+        )
+
+    mock_run_batch.assert_not_called()
+    assert result == {"new.tf": {}, "main.tf": {}}
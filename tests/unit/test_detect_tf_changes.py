@@ -30,8 +30,37 @@ def test_get_modified_tf_blocks_returns_git_results(mock_git_cls):
     detector = DetectTFChanges(repo_path=".")
     result = detector.get_modified_tf_blocks()
 
-    mock_git_cls.assert_called_once_with(".")
+    mock_git_cls.assert_called_once_with(".", parse_cache=None, commit="HEAD")
     mock_git_instance.get_modified_blocks.assert_called_once()
 
     assert "main.tf" in result
     assert isinstance(result["main.tf"], list)
+
+
+def test_modified_blocks_are_read_at_the_analysed_commit(git_repo):
+    """
+    Teste que les blocs modifiés sont lus au dernier commit, et non dans la copie
+    de travail.
+
+    Scénario :
+        - Un commit modifie un bloc Terraform, puis le fichier est modifié sans
+          être commité.
+
+    Assertions :
+        - Vérifie que le bloc retourné pour CodeMetrics est celui du commit,
+          identique au bloc « après » retourné pour le delta.
+
+    Returns:
+        None
+    """
+    bucket = 'resource "aws_s3_bucket" "a" {{\n  bucket = "{}"\n}}\n'
+    git_repo.commit({"main.tf": bucket.format("a")}, "c1")
+    git_repo.commit({"main.tf": bucket.format("b")}, "c2")
+    (git_repo.path / "main.tf").write_text(bucket.format("dirty"))
+
+    with DetectTFChanges(str(git_repo.path)) as detect:
+        modified = detect.get_modified_tf_blocks()
+        changed = detect.get_changed_blocks()
+
+    assert modified == {"main.tf": ['resource "aws_s3_bucket" "a" {\n  bucket = "b"\n}']}
+    assert modified["main.tf"] == changed["main.tf"]["after"]
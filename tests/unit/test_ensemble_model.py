@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from infrastructure.ml.ensemble_model import EnsembleModel
+from infrastructure.ml.feature_matrix import FeatureMatrix
+
+
+@patch("infrastructure.ml.ensemble_model.load_selected_features")
+def test_ensemble_scores_each_model_on_its_schema(mock_features):
+    """
+    Teste l'évaluation de plusieurs modèles sur une seule matrice de features.
+
+    Scénario :
+        - Deux modèles simulés utilisent des schémas différents qui se recoupent.
+        - La matrice est construite une seule fois pour l'union des schémas.
+        - Chaque modèle retourne une probabilité calculée à partir de sa matrice.
+
+    Assertions :
+        - Vérifie que l'union des schémas conserve l'ordre de première apparition.
+        - Vérifie que chaque modèle reçoit uniquement les colonnes de son schéma,
+          dans son ordre.
+        - Vérifie que la probabilité combinée est la moyenne des probabilités des
+          modèles et que le label en découle.
+
+    Returns:
+        None
+    """
+    mock_features.side_effect = lambda name: {
+        "lightgbm": ["nloc", "additions"],
+        "randomforest": ["code_ownership", "nloc"],
+    }[name]
+
+    received = {}
+
+    def member(name, probas):
+        model = MagicMock()
+
+        def predict_with_confidence(matrix):
+            received[name] = (matrix.features, matrix.values.copy())
+            return {
+                block_id: (int(p >= 0.5), p)
+                for block_id, p in zip(matrix.block_ids.tolist(), probas)
+            }
+
+        model.predict_with_confidence.side_effect = predict_with_confidence
+        return model
+
+    ensemble = EnsembleModel(
+        {
+            "lightgbm": member("lightgbm", [0.9, 0.2]),
+            "randomforest": member("randomforest", [0.5, 0.4]),
+        }
+    )
+    assert ensemble.selected_features == ["nloc", "additions", "code_ownership"]
+
+    matrix = FeatureMatrix(
+        np.array([[10.0, 3.0, 0.5], [20.0, 0.0, 1.0]]),
+        ["main.tf::a", "main.tf::b"],
+        ensemble.selected_features,
+    )
+
+    members = ensemble.predict_members(matrix)
+    combined = ensemble.combine(members)
+
+    assert received["lightgbm"][0] == ["nloc", "additions"]
+    assert received["lightgbm"][1].tolist() == [[10.0, 3.0], [20.0, 0.0]]
+    assert received["randomforest"][0] == ["code_ownership", "nloc"]
+    assert received["randomforest"][1].tolist() == [[0.5, 10.0], [1.0, 20.0]]
+
+    assert members["lightgbm"]["main.tf::a"] == (1, 0.9)
+    assert combined == {"main.tf::a": (1, 0.7), "main.tf::b": (0, 0.3)}
+    assert ensemble.predict(matrix) == {"main.tf::a": 1, "main.tf::b": 0}
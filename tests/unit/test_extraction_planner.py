@@ -0,0 +1,32 @@
+from core.use_cases.extraction_planner import ExtractionPlanner
+
+
+def test_planner_selects_extractors_from_feature_schema():
+    """
+    Teste la construction du plan d'extraction à partir des features d'un modèle.
+
+    Scénario :
+        - Les extracteurs codemetrics, delta et process sont disponibles.
+        - Le modèle utilise des métriques de code, des deltas et une feature inconnue,
+          mais aucune métrique de processus.
+
+    Assertions :
+        - Vérifie que l'extracteur de processus (parcours Git) n'est pas retenu.
+        - Vérifie que chaque extracteur retenu reçoit uniquement ses features.
+        - Vérifie que la feature sans extracteur est signalée.
+
+    Returns:
+        None
+    """
+    planner = ExtractionPlanner(
+        {"code": "codemetrics", "delta": "delta", "process": "process"}
+    )
+
+    plan = planner.plan(["nloc", "numMetaArg_delta", "isModule", "textEntropyMeasure"])
+
+    assert list(plan.extractors) == ["code", "delta"]
+    assert not plan.requires("process")
+    assert plan.features["code"] == ["nloc", "textEntropyMeasure"]
+    assert plan.features["delta"] == ["numMetaArg_delta"]
+    assert plan.unresolved == ["isModule"]
+    assert plan.cost == 6
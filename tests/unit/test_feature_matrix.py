@@ -0,0 +1,85 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from infrastructure.ml.feature_matrix import FeatureMatrix
+from infrastructure.ml.random_forest_model import RandomForestModel
+
+
+def test_from_records_maps_metrics_to_schema_columns():
+    """
+    Teste la construction de la matrice à partir des métriques fusionnées des blocs.
+
+    Scénario :
+        - Deux blocs possèdent des métriques partiellement renseignées, dont une
+          métrique absente du schéma et une valeur textuelle (identifiant de bloc).
+        - La matrice est construite pour un schéma de trois features.
+
+    Assertions :
+        - Vérifie que les valeurs sont rangées dans une matrice contiguë, une colonne
+          par feature, dans l'ordre du schéma.
+        - Vérifie que les features sans valeur valent 0 et que les métriques hors schéma
+          sont ignorées.
+        - Vérifie que la matrice reste utilisable comme un dictionnaire {block_id: vecteur}.
+
+    Returns:
+        None
+    """
+    records = {
+        "main.tf::aws_s3_bucket.a": {
+            "block_identifiers": "resource aws_s3_bucket a",
+            "nloc": 10,
+            "ndevs": 2,
+        },
+        "main.tf::aws_s3_bucket.b": {"nloc_delta": -3, "unused": 42},
+    }
+
+    matrix = FeatureMatrix.from_records(records, ["nloc", "nloc_delta", "ndevs"])
+
+    assert matrix.values.shape == (2, 3)
+    assert matrix.values.flags["C_CONTIGUOUS"]
+    assert matrix.column("nloc").tolist() == [10.0, 0.0]
+    assert matrix.column("nloc_delta").tolist() == [0.0, -3.0]
+    assert matrix == {
+        "main.tf::aws_s3_bucket.a": [10.0, 0.0, 2.0],
+        "main.tf::aws_s3_bucket.b": [0.0, -3.0, 0.0],
+    }
+    assert list(matrix) == list(records)
+
+
+def test_model_consumes_matrix_without_row_conversion():
+    """
+    Teste la prédiction d'un modèle scikit-learn à partir d'une `FeatureMatrix`.
+
+    Scénario :
+        - Un `RandomForestModel` est créé sans chargement de fichier, avec un scaler
+          et un classifieur simulés.
+        - La prédiction est demandée pour une matrice de trois blocs, puis pour les
+          mêmes vecteurs sous forme de dictionnaire.
+
+    Assertions :
+        - Vérifie que le scaler reçoit directement le tableau NumPy de la matrice.
+        - Vérifie que les labels et probabilités sont calculés pour toute la matrice et
+          associés au bon bloc.
+        - Vérifie que les vecteurs sous forme de dictionnaire donnent le même résultat.
+
+    Returns:
+        None
+    """
+    matrix = FeatureMatrix(
+        np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]), ["a", "b", "c"], ["x", "y"]
+    )
+
+    model = RandomForestModel.__new__(RandomForestModel)
+    model.scaler = MagicMock()
+    model.scaler.transform.side_effect = lambda X: X
+    model.model = MagicMock()
+    model.model.predict_proba.side_effect = lambda X: np.column_stack(
+        [1 - X[:, 0] / 10, X[:, 0] / 10]
+    )
+
+    results = model.predict_with_confidence(matrix)
+
+    assert model.scaler.transform.call_args[0][0] is matrix.values
+    assert results == {"a": (0, 0.1), "b": (0, 0.3), "c": (1, 0.5)}
+    assert model.predict_with_confidence(dict(matrix)) == results
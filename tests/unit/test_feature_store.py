@@ -0,0 +1,278 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from core.use_cases.feature_vector_builder import FeatureVectorBuilder
+from infrastructure.ml.defect_history_store import DefectHistoryStore
+from infrastructure.ml.feature_matrix import FeatureMatrix
+from infrastructure.ml.feature_store import FeatureStore
+
+
+def _matrix():
+    return FeatureMatrix(
+        np.array([[10.0, 1.0, 0.5], [20.0, 0.0, 1.0]]),
+        ["main.tf::aws_s3_bucket.a", "main.tf::aws_s3_bucket.b"],
+        ["nloc", "additions", "code_ownership"],
+    )
+
+
+def test_store_reuses_extraction_for_included_schemas(tmp_path):
+    """
+    Teste l'enregistrement et la relecture des vecteurs d'un commit.
+
+    Scénario :
+        - Les vecteurs de deux blocs sont enregistrés pour un commit, avec trois features.
+        - Ils sont relus pour un schéma inclus (dans un autre ordre), pour un schéma
+          non couvert, pour un autre moteur de métriques et pour un autre commit.
+
+    Assertions :
+        - Vérifie que les vecteurs sont restitués, projetés sur le schéma demandé.
+        - Vérifie qu'aucune entrée n'est retournée si une feature manque, si le moteur
+          diffère ou si le commit est inconnu.
+
+    Returns:
+        None
+    """
+    store = FeatureStore(str(tmp_path))
+    store.save("abc123", _matrix(), "terrametrics")
+
+    loaded = store.load("abc123", ["code_ownership", "nloc"], "terrametrics")
+
+    assert loaded.features == ["code_ownership", "nloc"]
+    assert loaded == {
+        "main.tf::aws_s3_bucket.a": [0.5, 10.0],
+        "main.tf::aws_s3_bucket.b": [1.0, 20.0],
+    }
+    assert store.load("abc123", ["nloc", "ndevs"], "terrametrics") is None
+    assert store.load("abc123", ["nloc"], "other-engine") is None
+    assert store.load("def456", ["nloc"], "terrametrics") is None
+
+
+def test_store_exports_all_commits(tmp_path):
+    """
+    Teste l'export groupé du magasin pour l'entraînement.
+
+    Scénario :
+        - Deux commits sont enregistrés avec des schémas différents, dont un avec
+          une seconde entrée (autre schéma) pour un de ses blocs.
+        - Le magasin est exporté au format `.npz`.
+
+    Assertions :
+        - Vérifie qu'une seule ligne est exportée par (commit, block_id), qui fusionne
+          les entrées du commit.
+        - Vérifie que le schéma exporté est l'union des schémas enregistrés et que
+          les features absentes de toutes les entrées d'un bloc valent 0.
+
+    Returns:
+        None
+    """
+    store = FeatureStore(str(tmp_path / "store"))
+    store.save("abc123", _matrix(), "terrametrics")
+    store.save(
+        "def456",
+        FeatureMatrix(np.array([[7.0, 2.0]]), ["vars.tf::variable.x"], ["ndevs", "nloc"]),
+        "terrametrics",
+    )
+    store.save(
+        "abc123",
+        FeatureMatrix(np.array([[3.0]]), ["main.tf::aws_s3_bucket.b"], ["ndevs"]),
+        "terrametrics",
+    )
+
+    export_path = str(tmp_path / "features.npz")
+    assert store.export(export_path) == 3
+
+    with np.load(export_path) as data:
+        assert sorted(data["features"].tolist()) == [
+            "additions", "code_ownership", "ndevs", "nloc"
+        ]
+        rows = {
+            (commit, block_id): dict(zip(data["features"].tolist(), values.tolist()))
+            for commit, block_id, values in zip(
+                data["commits"].tolist(), data["block_ids"].tolist(), data["values"]
+            )
+        }
+    assert sorted(rows) == [
+        ("abc123", "main.tf::aws_s3_bucket.a"),
+        ("abc123", "main.tf::aws_s3_bucket.b"),
+        ("def456", "vars.tf::variable.x"),
+    ]
+    assert rows[("abc123", "main.tf::aws_s3_bucket.b")] == {
+        "nloc": 20.0, "additions": 0.0, "code_ownership": 1.0, "ndevs": 3.0
+    }
+    assert rows[("abc123", "main.tf::aws_s3_bucket.a")]["ndevs"] == 0.0
+    assert rows[("def456", "vars.tf::variable.x")] == {
+        "nloc": 2.0, "additions": 0.0, "code_ownership": 0.0, "ndevs": 7.0
+    }
+
+
+def test_store_ignores_entries_with_stale_defect_history(tmp_path):
+    """
+    Teste l'invalidation des vecteurs lorsque l'historique des prédictions change.
+
+    Scénario :
+        - Les vecteurs d'un commit sont enregistrés avec l'empreinte de l'historique
+          des prédictions de leurs blocs.
+        - Ils sont relus avec la même empreinte, puis après l'ajout d'une prédiction.
+
+    Assertions :
+        - Vérifie que l'empreinte est calculée sur les blocs de l'entrée.
+        - Vérifie que l'entrée n'est plus réutilisée dès que l'empreinte change.
+
+    Returns:
+        None
+    """
+    store = FeatureStore(str(tmp_path))
+    store.save("abc123", _matrix(), "terrametrics", history="v1")
+    seen = []
+
+    def digest(version):
+        def compute(block_ids):
+            seen.append(block_ids)
+            return version
+
+        return compute
+
+    assert store.load("abc123", ["nloc"], "terrametrics", history_digest=digest("v1"))
+    assert seen == [["main.tf::aws_s3_bucket.a", "main.tf::aws_s3_bucket.b"]]
+    assert store.load("abc123", ["nloc"], "terrametrics", history_digest=digest("v2")) is None
+
+
+@patch("core.use_cases.feature_vector_builder.resolve_analyzed_commit", return_value="abc123")
+@patch("core.use_cases.feature_vector_builder.load_selected_features")
+@patch("core.use_cases.feature_vector_builder.MetricsExtractorFactory.get_extractor")
+@patch("core.use_cases.feature_vector_builder.DetectTFChanges")
+def test_builder_reads_store_before_extracting(
+    mock_detect, mock_factory, mock_features, mock_commit, tmp_path
+):
+    """
+    Teste que le constructeur de vecteurs consulte le magasin avant toute extraction.
+
+    Scénario :
+        - Le magasin fourni au constructeur contient déjà les vecteurs du commit analysé.
+        - Les vecteurs sont demandés, pour ce commit déjà résolu, pour un modèle dont
+          le schéma y est inclus.
+
+    Assertions :
+        - Vérifie que les vecteurs proviennent du magasin.
+        - Vérifie que le commit n'est pas résolu une seconde fois.
+        - Vérifie qu'aucune détection de blocs ni aucune extraction n'est lancée.
+
+    Returns:
+        None
+    """
+    mock_features.return_value = ["additions", "nloc"]
+    store = FeatureStore(str(tmp_path))
+    store.save("abc123", _matrix(), "terrametrics")
+    builder = FeatureVectorBuilder(
+        ".", "fake.jar", model_name="randomforest", feature_store=store
+    )
+    vectors = builder.build_vectors("abc123")
+
+    assert vectors["main.tf::aws_s3_bucket.a"] == [1.0, 10.0]
+    mock_commit.assert_not_called()
+    mock_detect.assert_not_called()
+    for extractor in (builder.code_extractor, builder.change_extractor):
+        extractor.extract_metrics.assert_not_called()
+
+
+@patch("core.use_cases.feature_vector_builder.resolve_analyzed_commit", return_value="abc123")
+@patch("core.use_cases.feature_vector_builder.load_selected_features")
+@patch("core.use_cases.feature_vector_builder.MetricsExtractorFactory.get_extractor")
+@patch("core.use_cases.feature_vector_builder.DetectTFChanges")
+def test_builder_does_not_store_failed_extractions(
+    mock_detect, mock_factory, mock_features, mock_commit, tmp_path
+):
+    """
+    Teste qu'une extraction dont un extracteur a échoué n'est pas enregistrée.
+
+    Scénario :
+        - TerraMetrics échoue sur un fichier (`{"error": ...}`) alors que les
+          métriques de changement d'un autre fichier sont calculées.
+        - Les vecteurs sont construits deux fois avec un magasin.
+
+    Assertions :
+        - Vérifie que les vecteurs disponibles sont retournés.
+        - Vérifie que le magasin reste vide et que la seconde construction relance
+          l'extraction.
+
+    Returns:
+        None
+    """
+    mock_features.return_value = ["additions", "nloc"]
+    code_extractor, change_extractor = MagicMock(), MagicMock()
+    code_extractor.extract_metrics.return_value = {
+        "main.tf": {"error": "TerraMetrics execution failed"}
+    }
+    change_extractor.extract_metrics.return_value = {
+        "vars.tf": {"resource aws_s3_bucket b": {"additions": 2}}
+    }
+    mock_factory.side_effect = [code_extractor, change_extractor]
+
+    store = FeatureStore(str(tmp_path))
+    builder = FeatureVectorBuilder(
+        ".", "fake.jar", model_name="randomforest", feature_store=store
+    )
+    vectors = builder.build_vectors()
+    builder.build_vectors()
+
+    assert vectors["vars.tf::aws_s3_bucket.b"] == [2.0, 0.0]
+    assert store.load("abc123", ["additions", "nloc"], "terrametrics") is None
+    assert code_extractor.extract_metrics.call_count == 2
+
+
+@patch("core.use_cases.feature_vector_builder.resolve_analyzed_commit", return_value="abc123")
+@patch("core.use_cases.feature_vector_builder.load_selected_features")
+@patch("core.use_cases.feature_vector_builder.MetricsExtractorFactory.get_extractor")
+@patch("core.use_cases.feature_vector_builder.DetectTFChanges")
+def test_builder_reuses_store_after_recording_commit_predictions(
+    mock_detect, mock_factory, mock_features, mock_commit, tmp_path
+):
+    """
+    Teste que l'enregistrement des prédictions du commit analysé n'invalide pas ses
+    vecteurs, contrairement à une nouvelle prédiction d'un autre commit.
+
+    Scénario :
+        - Des vecteurs comprenant une métrique de processus sont construits et
+          enregistrés pour le commit analysé.
+        - La prédiction de ce commit est enregistrée dans l'historique, puis une
+          prédiction d'un autre commit pour le même bloc.
+
+    Assertions :
+        - Vérifie que la deuxième construction reprend les vecteurs du magasin.
+        - Vérifie que la troisième relance l'extraction (l'historique dont dépendent
+          les métriques de processus a changé).
+
+    Returns:
+        None
+    """
+    mock_features.return_value = ["additions", "ndevs"]
+    change_extractor, process_extractor = MagicMock(), MagicMock()
+    change_extractor.extract_metrics.return_value = {
+        "main.tf": {"resource aws_s3_bucket a": {"additions": 1}}
+    }
+    process_extractor.extract_metrics.return_value = {
+        "main.tf::resource aws_s3_bucket a": {"ndevs": 2}
+    }
+    mock_factory.side_effect = [change_extractor, process_extractor]
+    history_path = str(tmp_path / "defect_history.db")
+
+    builder = FeatureVectorBuilder(
+        ".",
+        "fake.jar",
+        model_name="randomforest",
+        defect_history_path=history_path,
+        feature_store=FeatureStore(str(tmp_path / "store")),
+    )
+    vectors = builder.build_vectors()
+    assert vectors["main.tf::aws_s3_bucket.a"] == [1.0, 2.0]
+
+    with DefectHistoryStore(history_path) as history:
+        history.record({"main.tf::aws_s3_bucket.a": 1}, "abc123")
+    assert builder.build_vectors() == vectors
+    assert process_extractor.extract_metrics.call_count == 1
+
+    with DefectHistoryStore(history_path) as history:
+        history.record({"main.tf::aws_s3_bucket.a": 0}, "def456")
+    builder.build_vectors()
+    assert process_extractor.extract_metrics.call_count == 2
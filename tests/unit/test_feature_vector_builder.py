@@ -1,3 +1,4 @@
+import threading
 from unittest.mock import MagicMock, patch
 
 from core.use_cases.feature_vector_builder import FeatureVectorBuilder
@@ -11,7 +12,7 @@ def test_build_vectors_merges_all_metrics(mock_detect, mock_factory):
     qu'elle fusionne correctement les métriques extraites des différents extracteurs.
 
     Scénario :
-        - Les extracteurs de métriques (code, delta, process) sont simulés pour retourner
+        - Les extracteurs de métriques (code, delta, change, process) sont simulés pour retourner
           des métriques spécifiques.
         - Les blocs Terraform modifiés sont simulés via `DetectTFChanges`.
         - La méthode `build_vectors` est appelée pour générer les vecteurs de caractéristiques.
@@ -43,15 +44,21 @@ def test_build_vectors_merges_all_metrics(mock_detect, mock_factory):
         "main.tf": {"resource aws_s3_bucket mybucket": {"lines_delta": 3}}
     }
 
+    mock_change_extractor = MagicMock()
+    mock_change_extractor.extract_metrics.return_value = {
+        "main.tf": {"resource aws_s3_bucket mybucket": {"additions": 4}}
+    }
+
     mock_process_extractor = MagicMock()
     mock_process_extractor.extract_metrics.return_value = {
         "main.tf::aws_s3_bucket.mybucket": {"num_commits": 5, "ndevs": 2}
     }
 
-    # L’ordre des extracteurs retournés : code, delta, process
+    # L’ordre des extracteurs retournés : code, delta, change, process
     mock_factory.side_effect = [
         mock_code_extractor,
         mock_delta_extractor,
+        mock_change_extractor,
         mock_process_extractor,
     ]
 
@@ -73,3 +80,131 @@ def test_build_vectors_merges_all_metrics(mock_detect, mock_factory):
     key = "main.tf::aws_s3_bucket.mybucket"
     assert key in vectors
     assert vectors[key] == [2, 10, 3, 2, 5] or isinstance(vectors[key], list)
+    assert vectors[key][builder.selected_features.index("additions")] == 4
+
+
+@patch("core.use_cases.feature_vector_builder.load_selected_features")
+@patch("core.use_cases.feature_vector_builder.MetricsExtractorFactory.get_extractor")
+@patch("core.use_cases.feature_vector_builder.DetectTFChanges")
+def test_build_vectors_reuses_code_metrics_and_skips_delta_errors(
+    mock_detect, mock_factory, mock_features
+):
+    """
+    Teste que `build_vectors` transmet les métriques CodeMetrics à l'extracteur delta
+    et ignore les fichiers en échec dans la sortie delta.
+
+    Scénario :
+        - L'extracteur delta retourne une entrée `{"error": ...}` pour un fichier.
+        - Les autres extracteurs retournent des métriques valides.
+
+    Assertions :
+        - Vérifie que l'extracteur delta reçoit la sortie CodeMetrics.
+        - Vérifie que l'entrée en erreur n'empêche pas la construction des vecteurs.
+
+    Returns:
+        None
+    """
+    code_metrics = {
+        "main.tf": {
+            "data": [{"block_identifiers": "resource aws_s3_bucket b", "nloc": 10}]
+        }
+    }
+    mock_code_extractor = MagicMock()
+    mock_code_extractor.extract_metrics.return_value = code_metrics
+    mock_delta_extractor = MagicMock()
+    mock_delta_extractor.extract_metrics.return_value = {
+        "main.tf": {"error": "TerraMetrics execution failed"}
+    }
+    mock_process_extractor = MagicMock()
+    mock_process_extractor.extract_metrics.return_value = {}
+    mock_factory.side_effect = [
+        mock_code_extractor,
+        mock_delta_extractor,
+        mock_process_extractor,
+    ]
+    mock_features.return_value = ["nloc", "nloc_delta", "code_ownership"]
+
+    builder = FeatureVectorBuilder(repo_path=".", terrametrics_jar_path="fake.jar", model_name="dummy")
+    vectors = builder.build_vectors()
+
+    _, kwargs = mock_delta_extractor.extract_metrics.call_args
+    assert kwargs["after_metrics"].result() is code_metrics
+    assert vectors == {"main.tf::aws_s3_bucket.b": [10.0, 0.0, 0.0]}
+
+
+@patch("core.use_cases.feature_vector_builder.load_selected_features")
+@patch("core.use_cases.feature_vector_builder.MetricsExtractorFactory.get_extractor")
+@patch("core.use_cases.feature_vector_builder.DetectTFChanges")
+def test_build_vectors_runs_only_planned_extractors(mock_detect, mock_factory, mock_features):
+    """
+    Teste que seuls les extracteurs produisant des features du modèle sont exécutés.
+
+    Scénario :
+        - Le schéma du modèle ne contient que des métriques de code.
+        - Les extracteurs et la détection des changements sont simulés.
+
+    Assertions :
+        - Vérifie que seul l'extracteur de métriques de code est instancié.
+        - Vérifie que les blocs avant/après (delta) ne sont pas calculés.
+        - Vérifie que les vecteurs contiennent les métriques de code.
+
+    Returns:
+        None
+    """
+    mock_features.return_value = ["numMetaArg", "nloc"]
+    mock_code_extractor = MagicMock()
+    mock_code_extractor.extract_metrics.return_value = {
+        "main.tf": {
+            "data": [
+                {"block_identifiers": "resource aws_s3_bucket b", "nloc": 4, "numMetaArg": 1}
+            ]
+        }
+    }
+    mock_factory.return_value = mock_code_extractor
+
+    builder = FeatureVectorBuilder(repo_path=".", terrametrics_jar_path="fake.jar", model_name="dummy")
+    vectors = builder.build_vectors()
+
+    assert [c.args[0] for c in mock_factory.call_args_list] == ["codemetrics"]
+    mock_detect.return_value.get_changed_blocks.assert_not_called()
+    assert vectors == {"main.tf::aws_s3_bucket.b": [1.0, 4.0]}
+
+
+@patch("core.use_cases.feature_vector_builder.load_selected_features")
+@patch("core.use_cases.feature_vector_builder.MetricsExtractorFactory.get_extractor")
+@patch("core.use_cases.feature_vector_builder.DetectTFChanges")
+def test_build_vectors_runs_extractors_concurrently(mock_detect, mock_factory, mock_features):
+    """
+    Teste l'exécution simultanée des extracteurs de code et de processus.
+
+    Scénario :
+        - Les extracteurs de code et de processus attendent chacun l'autre via une
+          barrière : une exécution séquentielle ferait échouer l'attente.
+
+    Assertions :
+        - Vérifie que les deux extractions se terminent et que leurs métriques sont fusionnées.
+
+    Returns:
+        None
+    """
+    barrier = threading.Barrier(2, timeout=5)
+
+    def code_metrics(_blocks):
+        barrier.wait()
+        return {"main.tf": {"data": [{"block_identifiers": "resource aws_s3_bucket b", "nloc": 3}]}}
+
+    def process_metrics(_blocks, commit=None):
+        barrier.wait()
+        return {"main.tf::aws_s3_bucket.b": {"code_ownership": 0.5}}
+
+    mock_code_extractor = MagicMock()
+    mock_code_extractor.extract_metrics.side_effect = code_metrics
+    mock_process_extractor = MagicMock()
+    mock_process_extractor.extract_metrics.side_effect = process_metrics
+    mock_factory.side_effect = [mock_code_extractor, mock_process_extractor]
+    mock_features.return_value = ["nloc", "code_ownership"]
+
+    builder = FeatureVectorBuilder(repo_path=".", terrametrics_jar_path="fake.jar", model_name="dummy")
+    vectors = builder.build_vectors()
+
+    assert vectors == {"main.tf::aws_s3_bucket.b": [3.0, 0.5]}
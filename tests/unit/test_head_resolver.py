@@ -0,0 +1,88 @@
+from infrastructure.git.head_resolver import HeadResolver
+
+
+def test_head_resolver_follows_head_and_skips_merges(git_repo):
+    """
+    Teste la résolution de HEAD par `HeadResolver`.
+
+    Scénario :
+        - Un dépôt Git temporaire contient un commit, puis un deuxième commit est ajouté
+          après une première résolution.
+        - Une branche est ensuite fusionnée sans avance rapide (commit de merge).
+
+    Assertions :
+        - Vérifie que l'instance est partagée pour un même dépôt.
+        - Vérifie que HEAD est relu lorsqu'un nouveau commit est créé.
+        - Vérifie que les fichiers modifiés correspondent au dernier commit.
+        - Vérifie qu'après un merge, le dernier commit non-merge est retourné.
+
+    Returns:
+        None
+    """
+    HeadResolver.reset()
+    try:
+        first = git_repo.commit({"main.tf": 'variable "a" {}\n'}, "c1")
+        resolver = HeadResolver.for_repo(str(git_repo.path))
+
+        assert HeadResolver.for_repo(str(git_repo.path)) is resolver
+        assert resolver.head().hash == first
+
+        second = git_repo.commit({"vars.tf": 'variable "b" {}\n'}, "c2")
+        head = resolver.head()
+
+        assert head.hash == second
+        assert [f.new_path for f in resolver.modified_files(head)] == ["vars.tf"]
+        assert resolver.latest_non_merge().hash == second
+
+        git_repo.git("checkout", "-q", "-b", "feature", first)
+        feature = git_repo.commit({"feature.tf": 'variable "c" {}\n'}, "c3")
+        git_repo.git("checkout", "-q", "-")
+        git_repo.git(
+            "-c",
+            "user.name=alice",
+            "-c",
+            "user.email=alice@example.com",
+            "merge",
+            "-q",
+            "--no-ff",
+            "--no-edit",
+            "feature",
+        )
+
+        assert len(resolver.head().parents) == 2
+        assert resolver.latest_non_merge().hash in (second, feature)
+    finally:
+        HeadResolver.reset()
+
+
+def test_head_resolver_resolves_other_revisions_and_evicts(git_repo):
+    """
+    Teste la résolution d'une révision autre que HEAD et l'oubli de l'instance.
+
+    Scénario :
+        - Un dépôt contient deux commits ; le premier est résolu par son hash abrégé.
+        - L'instance du dépôt est ensuite oubliée.
+
+    Assertions :
+        - Vérifie que la révision est résolue en son commit, avec ses propres
+          fichiers modifiés, sans changer la résolution de HEAD.
+        - Vérifie qu'une nouvelle instance est créée après l'oubli.
+
+    Returns:
+        None
+    """
+    HeadResolver.reset()
+    try:
+        first = git_repo.commit({"main.tf": 'variable "a" {}\n'}, "c1")
+        second = git_repo.commit({"vars.tf": 'variable "b" {}\n'}, "c2")
+        resolver = HeadResolver.for_repo(str(git_repo.path))
+
+        commit = resolver.latest_non_merge(first[:8])
+        assert commit.hash == first
+        assert [f.new_path for f in resolver.modified_files(commit)] == ["main.tf"]
+        assert resolver.latest_non_merge().hash == second
+
+        HeadResolver.evict(str(git_repo.path))
+        assert HeadResolver.for_repo(str(git_repo.path)) is not resolver
+    finally:
+        HeadResolver.reset()
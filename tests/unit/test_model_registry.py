@@ -0,0 +1,125 @@
+import os
+import shutil
+import subprocess
+import sys
+
+from app import config
+from infrastructure.ml import model_registry
+from infrastructure.ml.model_factory import ModelFactory
+from infrastructure.ml.model_registry import MODEL_PATHS, ModelRegistry
+
+
+def test_factory_import_does_not_load_model_backends():
+    """
+    Teste que l'import de la factory et le modèle `dummy` n'importent aucun backend.
+
+    Scénario :
+        - Dans un nouvel interpréteur, la factory est importée et le modèle `dummy`
+          est instancié.
+
+    Assertions :
+        - Vérifie que ni scikit-learn, ni LightGBM, ni les classes des modèles
+          `.joblib` ne sont importés.
+
+    Returns:
+        None
+    """
+    code = (
+        "import sys\n"
+        "from infrastructure.ml.model_factory import ModelFactory\n"
+        "ModelFactory.get_model('dummy')\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in "
+        "('sklearn', 'lightgbm', 'joblib') or m.endswith(('random_forest_model', "
+        "'sklearn_model'))))\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=root,
+        env={**os.environ, "PYTHONPATH": root},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_registry_loads_each_model_once_per_file_version(tmp_path, monkeypatch):
+    """
+    Teste le cache des modèles chargés, indexé par date de modification et empreinte.
+
+    Scénario :
+        - Le modèle de régression logistique (sans version compilée) est demandé
+          plusieurs fois depuis une copie de son fichier `.joblib`.
+        - Le fichier est ensuite simplement touché, puis remplacé par un autre modèle.
+
+    Assertions :
+        - Vérifie que les demandes répétées retournent la même instance, chargée une
+          seule fois.
+        - Vérifie qu'un fichier touché mais inchangé n'est pas rechargé.
+        - Vérifie qu'un fichier au contenu différent est rechargé.
+
+    Returns:
+        None
+    """
+    source = tmp_path / "logisticreg_model.joblib"
+    shutil.copy(MODEL_PATHS["logisticreg"], source)
+    monkeypatch.setitem(MODEL_PATHS, "logisticreg", str(source))
+    monkeypatch.setattr(config, "USE_COMPILED_MODELS", False)
+    registry = ModelRegistry()
+    monkeypatch.setattr(model_registry.ModelRegistry, "_shared", registry)
+
+    first = ModelFactory.get_model("logisticreg")
+    assert ModelFactory.get_model("logisticreg") is first
+    assert registry.loads == 1
+
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert ModelFactory.get_model("logisticreg") is first
+    assert registry.loads == 1
+
+    shutil.copy(MODEL_PATHS["naivebayes"], source)
+    reloaded = ModelFactory.get_model("logisticreg")
+    assert reloaded is not first
+    assert registry.loads == 2
+
+
+def test_ensemble_is_built_once_per_member_version(tmp_path, monkeypatch):
+    """
+    Teste la réutilisation de l'ensemble tant que ses modèles ne sont pas rechargés.
+
+    Scénario :
+        - Un ensemble de deux modèles est demandé plusieurs fois (comme à chaque lot
+          du serveur de prédiction).
+        - Le fichier d'un des modèles est ensuite remplacé.
+
+    Assertions :
+        - Vérifie que les demandes répétées retournent le même ensemble, sans relire
+          les schémas des modèles.
+        - Vérifie que l'ensemble est reconstruit avec le modèle rechargé.
+
+    Returns:
+        None
+    """
+    source = tmp_path / "logisticreg_model.joblib"
+    shutil.copy(MODEL_PATHS["logisticreg"], source)
+    monkeypatch.setitem(MODEL_PATHS, "logisticreg", str(source))
+    monkeypatch.setattr(config, "USE_COMPILED_MODELS", False)
+    monkeypatch.setattr(model_registry.ModelRegistry, "_shared", ModelRegistry())
+    members = ["logisticreg", "naivebayes"]
+
+    first = ModelFactory.get_model("ensemble", members)
+    schemas = []
+    monkeypatch.setattr(
+        "infrastructure.ml.ensemble_model.load_selected_features",
+        lambda name: schemas.append(name) or [],
+    )
+    assert ModelFactory.get_model("ensemble", members) is first
+    assert schemas == []
+
+    shutil.copy(MODEL_PATHS["naivebayes"], source)
+    rebuilt = ModelFactory.get_model("ensemble", members)
+    assert rebuilt is not first
+    assert rebuilt.models["logisticreg"] is not first.models["logisticreg"]
+    assert rebuilt.models["naivebayes"] is first.models["naivebayes"]
@@ -0,0 +1,195 @@
+from infrastructure.git.git_adapter import GitAdapter
+from infrastructure.git.git_adapter_factory import GitAdapterFactory
+from infrastructure.git.head_resolver import HeadResolver
+from infrastructure.git.native_git_adapter import NativeGitAdapter
+
+
+def assert_backends_agree(repo_path: str, commit: str = "HEAD"):
+    """
+    Compare les informations des deux backends sur un commit d'un dépôt (HEAD par défaut).
+
+    Le renommage pur est exclu de la comparaison des contenus : PyDriller ne fournit
+    aucun contenu alors que le backend natif retourne deux versions identiques.
+    """
+    HeadResolver.reset()
+    pydriller_adapter = GitAdapterFactory.get_adapter("pydriller", repo_path, commit)
+    native_adapter = GitAdapterFactory.get_adapter("native", repo_path, commit)
+    try:
+        assert sorted(native_adapter.get_latest_commit_files()) == sorted(
+            pydriller_adapter.get_latest_commit_files()
+        )
+        native_files = {
+            path: (status, current, previous)
+            for path, status, current, previous in native_adapter.get_modified_tf_files_with_content()
+            if not (current == previous and current)
+        }
+        pydriller_files = {
+            path: (status, current, previous)
+            for path, status, current, previous in pydriller_adapter.get_modified_tf_files_with_content()
+            if path in native_files or current or previous
+        }
+        assert native_files == pydriller_files
+        assert (
+            native_adapter.get_modified_lines() == pydriller_adapter.get_modified_lines()
+        )
+        assert (
+            pydriller_adapter.get_latest_commit_sources().items()
+            <= native_adapter.get_latest_commit_sources().items()
+        )
+    finally:
+        native_adapter.close()
+        HeadResolver.reset()
+
+
+def test_native_adapter_matches_pydriller_adapter(git_repo):
+    """
+    Teste que `NativeGitAdapter` retourne les mêmes informations que `GitAdapter` (PyDriller).
+
+    Scénario :
+        - Un premier commit crée plusieurs fichiers Terraform.
+        - Un second commit modifie, ajoute, supprime et renomme des fichiers `.tf`
+          et modifie un fichier non Terraform.
+        - Les deux backends sont interrogés sur ce dernier commit.
+
+    Assertions :
+        - Vérifie que la factory retourne le backend demandé.
+        - Vérifie que les fichiers modifiés et leurs statuts sont identiques.
+        - Vérifie que les contenus avant et après modification sont identiques, sauf pour
+          le renommage pur pour lequel PyDriller ne fournit aucun contenu alors que le
+          backend natif retourne deux versions identiques (aucun bloc modifié).
+        - Vérifie que les numéros des lignes ajoutées et supprimées sont identiques.
+
+    Returns:
+        None
+    """
+    git_repo.commit(
+        {
+            "main.tf": 'resource "aws_s3_bucket" "a" {\n  bucket = "a"\n  acl = "private"\n}\n',
+            "old.tf": 'variable "region" {\n  default = "eu-west-1"\n}\n',
+            "moved.tf": 'output "id" {\n  value = "x"\n}\n',
+            "README.md": "doc\n",
+        },
+        "c1",
+    )
+    git_repo.git("rm", "-q", "old.tf")
+    git_repo.git("mv", "moved.tf", "renamed.tf")
+    git_repo.commit(
+        {
+            "main.tf": 'resource "aws_s3_bucket" "a" {\n  bucket = "b"\n}\n\n'
+            'resource "aws_s3_bucket" "c" {\n  bucket = "c"\n}\n',
+            "new.tf": 'variable "zone" {}\n',
+            "README.md": "doc 2\n",
+        },
+        "c2",
+    )
+
+    HeadResolver.reset()
+    repo_path = str(git_repo.path)
+    pydriller_adapter = GitAdapterFactory.get_adapter("pydriller", repo_path)
+    native_adapter = GitAdapterFactory.get_adapter("native", repo_path)
+
+    try:
+        assert isinstance(pydriller_adapter, GitAdapter)
+        assert isinstance(native_adapter, NativeGitAdapter)
+
+        assert sorted(native_adapter.get_latest_commit_files()) == sorted(
+            pydriller_adapter.get_latest_commit_files()
+        )
+        native_files = {
+            path: (status, current, previous)
+            for path, status, current, previous in native_adapter.get_modified_tf_files_with_content()
+        }
+        pydriller_files = {
+            path: (status, current, previous)
+            for path, status, current, previous in pydriller_adapter.get_modified_tf_files_with_content()
+        }
+
+        renamed_status, renamed_current, renamed_previous = native_files.pop("renamed.tf")
+        assert pydriller_files.pop("renamed.tf")[0] == renamed_status
+        assert renamed_current == renamed_previous != ""
+        assert native_files == pydriller_files
+        assert (
+            native_adapter.get_modified_lines() == pydriller_adapter.get_modified_lines()
+        )
+    finally:
+        native_adapter.close()
+        HeadResolver.reset()
+
+
+def test_native_adapter_matches_pydriller_on_every_commit(git_repo):
+    """
+    Teste la parité des deux backends sur chaque commit d'un historique varié.
+
+    Scénario :
+        - L'historique contient des ajouts, modifications, renommages avec
+          modification, suppressions, un fichier binaire, un changement de mode seul,
+          un fichier remplacé par un lien symbolique (deux patchs pour un seul
+          enregistrement) et un fichier dont le nom contient une espace, mêlés à
+          des fichiers `.tf` modifiés dans les mêmes commits.
+        - Chaque commit est extrait (HEAD détaché) puis les deux backends sont comparés.
+        - Depuis le dernier commit, les deux backends sont comparés sur chaque commit
+          passé en révision explicite.
+
+    Assertions :
+        - Vérifie que fichiers, statuts, contenus et lignes modifiées sont identiques
+          sur chaque commit, y compris quand un patch sans hunk (binaire, mode seul)
+          précède un fichier Terraform.
+        - Vérifie qu'un commit passé en révision est lu comme s'il était HEAD.
+
+    Returns:
+        None
+    """
+    bucket = 'resource "aws_s3_bucket" "{name}" {{\n  bucket = "{value}"\n}}\n'
+    commits = [
+        git_repo.commit(
+            {
+                "a.bin": "\0binaire\0",
+                "a-link": "cible\n",
+                "b.tf": bucket.format(name="b", value="1"),
+                "mod dir/c d.tf": 'variable "zone" {\n  default = "a"\n}\n',
+                "network.tf": bucket.format(name="n", value="1"),
+            },
+            "c1",
+        )
+    ]
+    (git_repo.path / "a.bin").write_bytes(b"\0binaire modifie\0")
+    git_repo.git("add", "a.bin")
+    (git_repo.path / "b.tf").chmod(0o755)
+    git_repo.git("add", "b.tf")
+    commits.append(
+        git_repo.commit(
+            {
+                "mod dir/c d.tf": 'variable "zone" {\n  default = "b"\n}\n',
+                "network.tf": bucket.format(name="n", value="2")
+                + bucket.format(name="m", value="1"),
+            },
+            "c2",
+        )
+    )
+    (git_repo.path / "net").mkdir()
+    git_repo.git("mv", "network.tf", "net/network.tf")
+    git_repo.git("rm", "-q", "b.tf")
+    (git_repo.path / "a-link").unlink()
+    (git_repo.path / "a-link").symlink_to("b.tf")
+    git_repo.git("add", "a-link")
+    commits.append(
+        git_repo.commit(
+            {"net/network.tf": bucket.format(name="n", value="3")}, "c3"
+        )
+    )
+    commits.append(git_repo.commit({"README.md": "doc\n"}, "c4"))
+
+    for commit in commits:
+        git_repo.git("checkout", "-q", commit)
+        assert_backends_agree(str(git_repo.path))
+
+    for commit in commits:
+        assert_backends_agree(str(git_repo.path), commit)
+
+    HeadResolver.reset()
+    native_adapter = GitAdapterFactory.get_adapter("native", str(git_repo.path), commits[1])
+    try:
+        assert native_adapter.get_modified_lines()["network.tf"] == ([2, 3, 4], [])
+    finally:
+        native_adapter.close()
+        HeadResolver.reset()
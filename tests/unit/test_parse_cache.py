@@ -0,0 +1,79 @@
+import subprocess
+from unittest.mock import patch
+
+from core.parsers.parse_cache import ParseCache, content_key
+from core.parsers.terraform_parser import TerraformParser
+
+CONTENT = (
+    'resource "aws_s3_bucket" "a" {\n  bucket = "a"\n}\n\n'
+    'variable "region" {\n  default = "eu-west-1"\n}\n'
+)
+
+
+def test_parse_cache_shares_spans_between_file_and_string(tmp_path):
+    """
+    Teste que le découpage d'une même version de fichier n'est calculé qu'une fois.
+
+    Scénario :
+        - Un contenu Terraform est découpé depuis une chaîne, puis depuis un fichier
+          du répertoire de travail ayant le même contenu.
+
+    Assertions :
+        - Vérifie que la clé de cache correspond au hash de blob calculé par Git.
+        - Vérifie que le second parser réutilise le découpage sans le recalculer.
+        - Vérifie que les bornes et le nombre de blocs retrouvés sont identiques.
+
+    Returns:
+        None
+    """
+    tf_file = tmp_path / "main.tf"
+    tf_file.write_text(CONTENT)
+
+    git_sha = subprocess.run(
+        ["git", "hash-object", str(tf_file)], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert content_key(CONTENT) == git_sha
+
+    cache = ParseCache()
+    from_string = TerraformParser.from_string(CONTENT, cache=cache)
+    blocks_from_string = from_string.find_blocks(range(len(from_string.lines)))
+
+    with patch.object(
+        TerraformParser, "_build_block_index", side_effect=AssertionError
+    ):
+        from_file = TerraformParser(str(tf_file), cache=cache)
+        blocks_from_file = from_file.find_blocks(range(len(from_file.lines)))
+
+    assert from_file.get_block_spans() == from_string.get_block_spans()
+    assert len(blocks_from_file) == len(blocks_from_string) == 2
+
+
+def test_parse_cache_persists_on_disk(tmp_path):
+    """
+    Teste la couche persistante du cache de parsing.
+
+    Scénario :
+        - Un contenu est découpé avec un cache adossé à une base SQLite, puis le cache est fermé.
+        - Un nouveau cache est ouvert sur la même base et le même contenu est découpé.
+
+    Assertions :
+        - Vérifie que le découpage est relu depuis la base sans être recalculé.
+        - Vérifie que les bornes des blocs sont identiques.
+
+    Returns:
+        None
+    """
+    db_path = str(tmp_path / "parse_cache.db")
+
+    cache = ParseCache(db_path)
+    expected = TerraformParser.from_string(CONTENT, cache=cache).get_block_spans()
+    cache.close()
+
+    cache = ParseCache(db_path)
+    with patch.object(
+        TerraformParser, "_build_block_index", side_effect=AssertionError
+    ):
+        spans = TerraformParser.from_string(CONTENT, cache=cache).get_block_spans()
+    cache.close()
+
+    assert spans == expected
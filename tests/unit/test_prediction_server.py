@@ -0,0 +1,208 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from app import prediction_server
+from app.prediction_server import (
+    PredictionBatcher,
+    PredictionServer,
+    request_prediction,
+)
+from infrastructure.ml.base_model import BaseModel
+from infrastructure.ml.feature_matrix import FeatureMatrix
+from tfdefect import analyzer
+
+FEATURES = ["lines", "complexity"]
+
+
+class SumModel(BaseModel):
+    """Modèle de test : probabilité = somme des features / 10, appels enregistrés."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, vectors):
+        return {b: label for b, (label, _) in self.predict_with_confidence(vectors).items()}
+
+    def predict_with_confidence(self, vectors):
+        matrix = FeatureMatrix.from_vectors(vectors)
+        self.calls.append(len(matrix))
+        probas = matrix.values.sum(axis=1) / 10
+        return {
+            block_id: (int(p >= 0.5), float(p))
+            for block_id, p in zip(matrix.block_ids, probas)
+        }
+
+    def describe(self):
+        return "SumModel"
+
+
+def make_matrix(rows: dict) -> FeatureMatrix:
+    return FeatureMatrix(np.array(list(rows.values()), dtype=float), list(rows), FEATURES)
+
+
+def test_batcher_coalesces_concurrent_requests():
+    """
+    Teste le regroupement des requêtes simultanées en un seul appel au modèle.
+
+    Scénario :
+        - Trois matrices sont soumises pendant la fenêtre de regroupement, dont deux
+          contenant le même identifiant de bloc (deux dépôts différents).
+
+    Assertions :
+        - Vérifie que le modèle n'est appelé qu'une fois, sur toutes les lignes.
+        - Vérifie que chaque requête reçoit uniquement ses propres prédictions.
+
+    Returns:
+        None
+    """
+    model = SumModel()
+    with patch.object(prediction_server.ModelFactory, "get_model", return_value=model):
+        batcher = PredictionBatcher("sum", batch_window=0.5)
+        futures = [
+            batcher.submit(make_matrix({"main.tf::a": [1, 1], "main.tf::b": [4, 4]})),
+            batcher.submit(make_matrix({"main.tf::a": [3, 0]})),
+            batcher.submit(make_matrix({"vars.tf::c": [0, 0]})),
+        ]
+        results = [future.result(timeout=5) for future in futures]
+        batcher.close()
+
+    assert model.calls == [4]
+    assert batcher.batches == 1
+    assert results[0] == {
+        "main.tf::a": {"fault_prone": 0, "probability": 0.2},
+        "main.tf::b": {"fault_prone": 1, "probability": 0.8},
+    }
+    assert results[1] == {"main.tf::a": {"fault_prone": 0, "probability": 0.3}}
+    assert list(results[2]) == ["vars.tf::c"]
+
+
+def test_server_scores_repository_over_unix_socket(git_repo, tmp_path):
+    """
+    Teste une analyse demandée au serveur par le socket Unix.
+
+    Scénario :
+        - Le serveur est lancé sur un socket temporaire avec un modèle de test ; la
+          construction des vecteurs est simulée.
+        - Le client demande l'analyse du dépôt, puis de nouveau après un nouveau
+          commit, puis celle du premier commit (révision explicite), puis celle
+          d'un dépôt inexistant.
+
+    Assertions :
+        - Vérifie que la réponse contient le commit analysé (HEAD) et les prédictions.
+        - Vérifie que la seconde analyse porte sur le nouveau HEAD, et la troisième
+          sur la révision demandée, transmise résolue à la construction des vecteurs.
+        - Vérifie que les vecteurs sont construits pour le dépôt demandé, avec sa
+          propre base d'historique des blocs et les caches du serveur.
+        - Vérifie qu'une requête en échec est signalée sans arrêter le serveur.
+
+    Returns:
+        None
+    """
+    head = git_repo.commit({"main.tf": 'resource "null_resource" "a" {}\n'}, "init")
+    cache_dir = tmp_path / "cache"
+    socket_path = str(tmp_path / "tfdefect.sock")
+
+    builder = MagicMock()
+    builder.build_vectors.return_value = make_matrix({"main.tf::null_resource.a": [2, 5]})
+
+    with patch.object(
+        prediction_server.ModelFactory, "get_model", return_value=SumModel()
+    ), patch.object(
+        analyzer, "FeatureVectorBuilder", return_value=builder
+    ) as mock_builder:
+        server = PredictionServer(
+            socket_path, "sum", batch_window=0, cache_dir=str(cache_dir)
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            response = request_prediction(
+                str(git_repo.path), socket_path=socket_path, timeout=10
+            )
+            new_head = git_repo.commit({"main.tf": 'resource "null_resource" "b" {}\n'}, "b")
+            second = request_prediction(
+                str(git_repo.path), socket_path=socket_path, timeout=10
+            )
+            older = request_prediction(
+                str(git_repo.path), head[:7], socket_path=socket_path, timeout=10
+            )
+            refused = request_prediction(
+                str(tmp_path / "absent"), socket_path=socket_path, timeout=10
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    assert response == {
+        "ok": True,
+        "commit": head,
+        "predictions": {
+            "main.tf::null_resource.a": {"fault_prone": 1, "probability": 0.7}
+        },
+    }
+    args, kwargs = mock_builder.call_args
+    assert args[0] == str(git_repo.path)
+    assert kwargs["history_db_path"].startswith(str(cache_dir))
+    assert kwargs["parse_cache"] is server.caches.parse_cache
+    assert kwargs["feature_store"] is server.caches.feature_store
+
+    assert second["commit"] == new_head != head
+    assert older["commit"] == head
+    builder.build_vectors.assert_called_with(head)
+    assert refused["ok"] is False
+    assert "absent" in refused["error"]
+
+
+def test_server_closes_least_recently_used_analyzers(git_repo, tmp_path):
+    """
+    Teste la limite du nombre d'analyseurs ouverts par le serveur.
+
+    Scénario :
+        - Le serveur accepte deux dépôts ouverts ; trois dépôts sont analysés, le
+          premier étant servi de nouveau avant le troisième.
+
+    Assertions :
+        - Vérifie que seul l'analyseur le moins récemment servi (le deuxième dépôt)
+          est fermé et oublié.
+        - Vérifie que les analyseurs restants sont fermés avec le serveur.
+
+    Returns:
+        None
+    """
+    git_repo.commit({"main.tf": 'resource "null_resource" "a" {}\n'}, "init")
+    repos = [str(git_repo.path)]
+    for name in ("second", "third"):
+        path = tmp_path / name
+        path.mkdir()
+        repos.append(str(path))
+
+    builder = MagicMock()
+    builder.build_vectors.return_value = make_matrix({"main.tf::null_resource.a": [1, 1]})
+    closed = []
+
+    with patch.object(
+        prediction_server.ModelFactory, "get_model", return_value=SumModel()
+    ), patch.object(analyzer, "FeatureVectorBuilder", return_value=builder), patch.object(
+        analyzer, "resolve_analyzed_commit", return_value="abc123"
+    ), patch.object(
+        analyzer.Analyzer, "close", autospec=True, side_effect=closed.append
+    ):
+        server = PredictionServer(
+            str(tmp_path / "tfdefect.sock"),
+            "sum",
+            batch_window=0,
+            cache_dir=str(tmp_path / "cache"),
+            max_repos=2,
+        )
+        try:
+            for repo_path in (repos[0], repos[1], repos[0], repos[2]):
+                assert server.score(repo_path)["commit"] == "abc123"
+
+            assert [a.repo_path for a in closed] == [repos[1]]
+            assert list(server._analyzers) == [repos[0], repos[2]]
+        finally:
+            server.server_close()
+
+    assert [a.repo_path for a in closed] == repos[1:2] + [repos[0], repos[2]]
@@ -116,6 +116,8 @@ def test_resume_process_metrics_keys():
 
     Assertions :
         - Vérifie que toutes les clés attendues sont présentes dans le résumé retourné.
+        - Vérifie que seules les métriques demandées sont calculées lorsqu'une
+          sélection est fournie.
 
     Returns:
         None
@@ -206,3 +208,7 @@ def test_resume_process_metrics_keys():
     }
 
     assert set(metrics.keys()) == expected_keys
+    assert set(pm.resume_process_metrics(["kexp", "code_ownership"])) == {
+        "kexp",
+        "code_ownership",
+    }
@@ -0,0 +1,74 @@
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from utils import terraform_fmt
+from utils.terraform_fmt import format_terraform_source
+
+RAW = 'resource "aws_s3_bucket" "a" {\nbucket="a"\n}\n'
+FORMATTED = 'resource "aws_s3_bucket" "a" {\n  bucket = "a"\n}\n'
+
+
+@pytest.fixture(autouse=True)
+def reset_terraform_fmt():
+    """Réinitialise le cache des contenus formatés et la détection de Terraform."""
+    format_terraform_source.cache_clear()
+    terraform_fmt._terraform_missing = False
+    yield
+    format_terraform_source.cache_clear()
+    terraform_fmt._terraform_missing = False
+
+
+def test_format_terraform_source_formats_in_memory():
+    """
+    Teste que le contenu est formaté par `terraform fmt -` sans écrire de fichier.
+
+    Scénario :
+        - `terraform fmt -` est simulé et retourne le contenu formaté.
+        - Le même contenu est formaté deux fois.
+
+    Assertions :
+        - Vérifie que le contenu est transmis sur l'entrée standard.
+        - Vérifie que le contenu formaté est retourné.
+        - Vérifie que Terraform n'est lancé qu'une fois pour un même contenu.
+
+    Returns:
+        None
+    """
+    completed = subprocess.CompletedProcess([], 0, stdout=FORMATTED, stderr="")
+    with patch("utils.terraform_fmt.subprocess.run", return_value=completed) as run:
+        assert format_terraform_source(RAW) == FORMATTED
+        assert format_terraform_source(RAW) == FORMATTED
+
+    run.assert_called_once()
+    assert run.call_args.args[0] == ["terraform", "fmt", "-"]
+    assert run.call_args.kwargs["input"] == RAW
+
+
+def test_format_terraform_source_keeps_content_on_failure():
+    """
+    Teste que le contenu d'origine est conservé quand le formatage est impossible.
+
+    Scénario :
+        - `terraform fmt -` échoue sur une syntaxe invalide.
+        - Terraform n'est ensuite plus installé.
+
+    Assertions :
+        - Vérifie que le contenu d'origine est retourné dans les deux cas.
+        - Vérifie que Terraform n'est plus relancé une fois détecté comme absent.
+
+    Returns:
+        None
+    """
+    failed = subprocess.CompletedProcess([], 2, stdout="", stderr="Invalid syntax")
+    with patch("utils.terraform_fmt.subprocess.run", return_value=failed):
+        assert format_terraform_source(RAW) == RAW
+
+    with patch(
+        "utils.terraform_fmt.subprocess.run", side_effect=FileNotFoundError
+    ) as run:
+        assert format_terraform_source("variable \"a\" {}\n") == "variable \"a\" {}\n"
+        assert format_terraform_source(FORMATTED) == FORMATTED
+
+    run.assert_called_once()
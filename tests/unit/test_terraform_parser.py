@@ -158,3 +158,73 @@ def test_empty_content_raises_error():
     """
     with pytest.raises(ValueError, match="contenu Terraform fourni est vide"):
         TerraformParser.from_string("")
+
+
+def test_find_blocks_ignores_nested_header_keywords():
+    """
+    Teste que seuls les en-têtes de premier niveau délimitent les blocs.
+
+    Scénario :
+        - Un contenu Terraform débute par un commentaire, puis contient une ressource
+          dont un attribut (`provider`) porte le nom d'un type de bloc.
+        - La méthode `find_blocks` est appelée sur toutes les lignes.
+
+    Assertions :
+        - Vérifie que les lignes précédant le premier bloc n'appartiennent à aucun bloc.
+        - Vérifie que l'attribut `provider` reste rattaché à la ressource complète.
+        - Vérifie que les blocs sont retournés sans doublon, dans l'ordre du fichier.
+
+    Returns:
+        None
+    """
+    content = """# Fichier de test
+resource "aws_instance" "web" {
+  ami      = "ami-123456"
+  provider = aws.east
+  tags = {
+    Name = "web"
+  }
+}
+
+variable "region" {}
+"""
+
+    parser = TerraformParser.from_string(content)
+    assert parser.find_block(0) == ""
+    assert parser.find_block(5) == parser.find_block(1)
+    assert parser.find_block(5).endswith("}")
+
+    blocks = parser.find_blocks(range(len(parser.lines)))
+    assert len(blocks) == 2
+    assert blocks[0].startswith('resource "aws_instance" "web"')
+    assert blocks[1] == 'variable "region" {}'
+
+
+def test_find_blocks_large_generated_file():
+    """
+    Teste la méthode `find_blocks` sur un fichier Terraform généré de grande taille.
+
+    Scénario :
+        - Un contenu de plus de 10 000 lignes contenant 1 000 ressources est généré.
+        - La méthode `find_blocks` est appelée sur toutes les lignes.
+
+    Assertions :
+        - Vérifie que chaque ressource est retournée une seule fois.
+        - Vérifie que chaque ligne d'une ressource est rattachée à son bloc.
+
+    Returns:
+        None
+    """
+    resource = (
+        'resource "aws_instance" "i%d" {\n  ami = "x"\n  tags = {\n'
+        '    Name = "%d"\n  }\n  /* commentaire\n  */\n}\n\n\n\n'
+    )
+    content = "".join(resource % (i, i) for i in range(1000))
+
+    parser = TerraformParser.from_string(content)
+    blocks = parser.find_blocks(range(len(parser.lines)))
+
+    assert len(parser.lines) > 10000
+    assert len(blocks) == 1000
+    assert blocks[999].startswith('resource "aws_instance" "i999"')
+    assert parser.find_block(11 * 500 + 4) == blocks[500]
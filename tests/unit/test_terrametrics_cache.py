@@ -0,0 +1,109 @@
+from unittest.mock import patch
+
+import pytest
+
+from core.parsers.terrametrics_cache import TerraMetricsCache
+from core.parsers.terrametrics_runner import TerraMetricsRunner
+from tests.unit.test_terrametrics_runner import _fake_terrametrics
+
+
+@pytest.fixture
+def jar_path(tmp_path):
+    """Fournit un JAR factice dont le contenu détermine la version."""
+    jar = tmp_path / "terrametrics.jar"
+    jar.write_bytes(b"v1")
+    return str(jar)
+
+
+@patch("core.parsers.terrametrics_runner.TerraMetricsRunner.run")
+def test_run_batch_serves_known_blocks_from_cache(mock_run, tmp_path, jar_path):
+    """
+    Teste que les blocs déjà mesurés sont servis depuis le cache sans relancer TerraMetrics.
+
+    Scénario :
+        - Un premier lot de documents est analysé avec un cache vide.
+        - Un second lot reprend les mêmes blocs (à l'indentation finale près) et
+          ajoute un nouveau bloc.
+        - Le JAR est ensuite modifié puis le premier lot est réanalysé.
+
+    Assertions :
+        - Vérifie que seul le nouveau bloc est envoyé à TerraMetrics au second passage.
+        - Vérifie que les métriques sont restituées dans l'ordre des blocs du document.
+        - Vérifie que le taux de succès du cache est comptabilisé.
+        - Vérifie qu'un changement de version du JAR invalide les entrées.
+
+    Returns:
+        None
+    """
+    analyzed = []
+
+    def fake_run(tf_path, output_path):
+        with open(tf_path) as f:
+            analyzed.append(f.read())
+        _fake_terrametrics(tf_path, output_path)
+
+    mock_run.side_effect = fake_run
+    bucket = 'resource "aws_s3_bucket" "b" {\n  acl = "private"\n}'
+    region = 'variable "region" {\n}'
+    cache = TerraMetricsCache(str(tmp_path / "cache.db"))
+    runner = TerraMetricsRunner(jar_path, cache=cache, max_workers=1)
+
+    runner.run_batch({"main.tf": [bucket], "vars.tf": [region]})
+    assert mock_run.call_count == 1
+    assert cache.hits == 0
+
+    mock_run.reset_mock()
+    results = runner.run_batch(
+        {"main.tf": [region + "  \n", 'resource "aws_instance" "web" {\n}', bucket]}
+    )
+
+    assert mock_run.call_count == 1
+    assert analyzed[-1] == 'resource "aws_instance" "web" {\n}'
+    assert [e["block_identifiers"] for e in results["main.tf"]["data"]] == [
+        "variable region",
+        "resource aws_instance web",
+        "resource aws_s3_bucket b",
+    ]
+    assert cache.hits == 2
+    assert cache.hit_rate() == pytest.approx(2 / 5)
+
+    with open(jar_path, "wb") as f:
+        f.write(b"version 2")
+    mock_run.reset_mock()
+    runner.run_batch({"main.tf": [bucket]})
+    assert mock_run.call_count == 1
+    cache.close()
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    """
+    Teste l'éviction LRU lorsque la taille maximale du cache est dépassée.
+
+    Scénario :
+        - Un cache limité à deux entrées reçoit deux entrées, dont la première est relue.
+        - Une troisième entrée est ensuite ajoutée.
+
+    Assertions :
+        - Vérifie que l'entrée la moins récemment utilisée est évincée.
+        - Vérifie que les entrées conservées survivent à la réouverture de la base.
+
+    Returns:
+        None
+    """
+    db_path = str(tmp_path / "cache.db")
+    metrics = {"numTokens": 1}
+    entry_size = len('{"numTokens": 1}')
+    cache = TerraMetricsCache(db_path, max_bytes=2 * entry_size)
+
+    cache.put("a", metrics)
+    cache.put("b", metrics)
+    assert cache.get("a") == metrics
+    cache.put("c", metrics)
+
+    assert cache.get("b") is None
+    cache.close()
+
+    reopened = TerraMetricsCache(db_path, max_bytes=2 * entry_size)
+    assert reopened.get("a") == metrics
+    assert reopened.get("c") == metrics
+    reopened.close()
@@ -0,0 +1,166 @@
+import json
+import re
+import subprocess
+import threading
+import time
+from unittest.mock import patch
+
+from core.parsers.terrametrics_runner import TerraMetricsRunner
+
+
+def _fake_terrametrics(tf_path, output_path):
+    """
+    Simule TerraMetrics : une entrée `data` par bloc, triée par identifiant, et
+    des informations propres à l'invocation (fichier analysé).
+    """
+    with open(tf_path) as f:
+        content = f.read()
+
+    entries = []
+    for match in re.finditer(r'^(resource|variable) ((?:"[^"]*" ?)+)\{', content, re.M):
+        labels = match.group(2).replace('"', "").split()
+        entries.append(
+            {
+                "block_identifiers": " ".join([match.group(1)] + labels),
+                "numTokens": len(labels),
+            }
+        )
+    entries.sort(key=lambda e: e["block_identifiers"])
+
+    with open(output_path, "w") as f:
+        json.dump({"file": tf_path, "data": entries}, f)
+
+
+@patch("core.parsers.terrametrics_runner.TerraMetricsRunner.run")
+def test_run_batch_groups_documents_and_demultiplexes(mock_run):
+    """
+    Teste que `TerraMetricsRunner.run_batch` regroupe les documents en un minimum
+    d'invocations et redistribue les métriques par document.
+
+    Scénario :
+        - Trois documents sont fournis, dont deux partagent un identifiant de bloc
+          (versions avant/après d'un même bloc).
+        - TerraMetrics est simulé et retourne les blocs triés par identifiant.
+
+    Assertions :
+        - Vérifie que deux invocations suffisent (les documents partageant un
+          identifiant sont placés dans des lots distincts).
+        - Vérifie que chaque document reçoit uniquement les métriques de ses blocs,
+          sous la même forme `{"data": [...]}` qu'il soit seul dans son lot ou non.
+
+    Returns:
+        None
+    """
+    mock_run.side_effect = _fake_terrametrics
+
+    documents = {
+        "main.tf::before": ['resource "aws_s3_bucket" "b" {\n}'],
+        "main.tf::after": [
+            'resource "aws_s3_bucket" "b" {\n  acl = "private"\n}',
+            'variable "region" {\n}',
+        ],
+        "other.tf::after": ['resource "aws_instance" "web" {\n}'],
+    }
+
+    results = TerraMetricsRunner("fake.jar", max_workers=1).run_batch(documents)
+
+    assert mock_run.call_count == 2
+    assert all(set(result) == {"data"} for result in results.values())
+    assert [e["block_identifiers"] for e in results["main.tf::before"]["data"]] == [
+        "resource aws_s3_bucket b"
+    ]
+    assert [e["block_identifiers"] for e in results["main.tf::after"]["data"]] == [
+        "resource aws_s3_bucket b",
+        "variable region",
+    ]
+    assert [e["block_identifiers"] for e in results["other.tf::after"]["data"]] == [
+        "resource aws_instance web"
+    ]
+
+
+@patch("core.parsers.terrametrics_runner.TerraMetricsRunner.run")
+def test_run_batch_falls_back_to_single_runs(mock_run):
+    """
+    Teste le repli document par document lorsque l'analyse groupée échoue.
+
+    Scénario :
+        - Deux documents sont regroupés dans un même lot.
+        - TerraMetrics échoue sur le lot, puis sur l'un des deux documents seul.
+
+    Assertions :
+        - Vérifie que chaque document est réanalysé individuellement.
+        - Vérifie que l'échec d'un document n'empêche pas l'analyse de l'autre.
+
+    Returns:
+        None
+    """
+    calls = []
+
+    def fake_run(tf_path, output_path):
+        calls.append(tf_path)
+        with open(tf_path) as f:
+            content = f.read()
+        if len(calls) == 1 or "broken" in content:
+            raise subprocess.CalledProcessError(1, "java")
+        _fake_terrametrics(tf_path, output_path)
+
+    mock_run.side_effect = fake_run
+
+    documents = {
+        "a.tf": ['resource "aws_s3_bucket" "broken" {\n}'],
+        "b.tf": ['resource "aws_s3_bucket" "ok" {\n}'],
+    }
+
+    results = TerraMetricsRunner("fake.jar", max_workers=1).run_batch(documents)
+
+    assert len(calls) == 3
+    assert results["a.tf"] == {"error": "TerraMetrics execution failed"}
+    assert results["b.tf"]["data"][0]["block_identifiers"] == "resource aws_s3_bucket ok"
+
+
+@patch("core.parsers.terrametrics_runner.TerraMetricsRunner.run")
+def test_run_batch_runs_chunks_concurrently_in_document_order(mock_run):
+    """
+    Teste l'exécution simultanée de TerraMetrics sur plusieurs lots.
+
+    Scénario :
+        - Quatre documents sont analysés avec quatre workers.
+        - Chaque exécution simulée dure un court instant ; l'une d'elles échoue.
+
+    Assertions :
+        - Vérifie que plusieurs exécutions ont lieu en même temps.
+        - Vérifie que le résultat suit l'ordre des documents fournis.
+        - Vérifie que l'échec d'un document reste isolé dans une entrée `error`.
+
+    Returns:
+        None
+    """
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def fake_run(tf_path, output_path):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.1)
+        with lock:
+            running[0] -= 1
+        with open(tf_path) as f:
+            if "broken" in f.read():
+                raise subprocess.CalledProcessError(1, "java")
+        _fake_terrametrics(tf_path, output_path)
+
+    mock_run.side_effect = fake_run
+    names = ["d.tf", "broken.tf", "b.tf", "a.tf"]
+    documents = {
+        name: [f'resource "aws_s3_bucket" "{name.split(".")[0]}" {{\n}}'] for name in names
+    }
+
+    results = TerraMetricsRunner("fake.jar", max_workers=4).run_batch(documents)
+
+    assert mock_run.call_count == 4
+    assert peak[0] > 1
+    assert list(results) == names
+    assert results["broken.tf"] == {"error": "TerraMetrics execution failed"}
+    assert results["a.tf"]["data"][0]["block_identifiers"] == "resource aws_s3_bucket a"
@@ -0,0 +1,196 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from core.parsers.terrametrics_runner import TerraMetricsRunner
+from core.parsers.terrametrics_worker_pool import TerraMetricsWorkerPool
+
+# Worker de substitution parlant le protocole de TerraMetricsWorkerPool, sans JVM
+STAND_IN_WORKER = r'''
+import json, subprocess, sys
+
+for line in sys.stdin:
+    request = json.loads(line)
+    if request.get("op") == "extract":
+        content = open(request["file"]).read()
+        if "crash" in content:
+            sys.exit(1)
+        if "hang" in content:
+            # Comme `java -jar`, le processus bloqué est un enfant du worker
+            child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+            open(request["target"] + ".pid", "w").write(str(child.pid))
+            child.wait()
+        entries = [
+            {"block_identifiers": l.split("{")[0].replace('"', "").strip(), "numTokens": 1}
+            for l in content.splitlines() if l.startswith("resource")
+        ]
+        with open(request["target"], "w") as f:
+            json.dump({"data": entries}, f)
+    sys.stdout.write(json.dumps({"id": request.get("id"), "ok": True}) + "\n")
+    sys.stdout.flush()
+    if request.get("op") == "shutdown":
+        break
+'''
+
+# Point d'entrée TerraMetrics factice : compte ses appels dans la JVM et écrit sur
+# la sortie standard, que le worker Java doit garder hors du protocole
+FAKE_TERRAMETRICS = r"""
+import java.nio.file.Files;
+import java.nio.file.Paths;
+
+public class FakeTerraMetrics {
+    static int calls;
+
+    public static void main(String[] args) throws Exception {
+        calls++;
+        System.out.println("TerraMetrics " + String.join(" ", args));
+        String json = "{\"data\": [], \"calls\": " + calls + "}";
+        Files.write(Paths.get(args[4]), json.getBytes("UTF-8"));
+    }
+}
+"""
+
+
+def _is_running(pid: int) -> bool:
+    """Indique si le processus existe encore (hors zombie)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] not in ("Z", "X")
+    except FileNotFoundError:
+        return False
+
+
+@pytest.fixture
+def worker_pool(tmp_path):
+    """Fournit un pool de deux workers de substitution."""
+    script = tmp_path / "stand_in_worker.py"
+    script.write_text(STAND_IN_WORKER)
+    pool = TerraMetricsWorkerPool(
+        "fake.jar", size=2, timeout=2, command=[sys.executable, str(script)]
+    )
+    yield pool
+    pool.close()
+
+
+def test_runner_dispatches_batches_to_worker_pool(worker_pool):
+    """
+    Teste l'analyse de documents TerraMetrics via un pool de workers maintenus en vie.
+
+    Scénario :
+        - Un `TerraMetricsRunner` est configuré avec un pool de deux workers de substitution.
+        - Trois documents répartis en deux lots sont analysés, puis les workers sont vérifiés.
+
+    Assertions :
+        - Vérifie que chaque document reçoit les métriques de ses blocs.
+        - Vérifie que le pool ne lance pas plus de workers que sa taille.
+        - Vérifie que les workers répondent au contrôle de santé.
+
+    Returns:
+        None
+    """
+    runner = TerraMetricsRunner("fake.jar", pool=worker_pool)
+    documents = {
+        "main.tf::before": ['resource "aws_s3_bucket" "b" {\n}'],
+        "main.tf::after": ['resource "aws_s3_bucket" "b" {\n  acl = "private"\n}'],
+        "other.tf::after": ['resource "aws_instance" "web" {\n}'],
+    }
+
+    results = runner.run_batch(documents)
+
+    assert results["main.tf::before"]["data"][0]["block_identifiers"] == (
+        "resource aws_s3_bucket b"
+    )
+    assert [e["block_identifiers"] for e in results["other.tf::after"]["data"]] == [
+        "resource aws_instance web"
+    ]
+    assert len(worker_pool._workers) <= 2
+    assert worker_pool.health_check() == 0
+
+
+def test_worker_pool_restarts_crashed_and_stuck_workers(worker_pool, tmp_path):
+    """
+    Teste le redémarrage des workers après un arrêt brutal ou un dépassement de délai.
+
+    Scénario :
+        - Un worker s'arrête pendant une analyse, puis un autre dépasse le délai imparti.
+        - Une analyse valide est ensuite soumise au pool.
+
+    Assertions :
+        - Vérifie que l'arrêt du worker est signalé comme un échec de TerraMetrics.
+        - Vérifie que le dépassement de délai est signalé et que le processus lancé
+          par le worker bloqué (la JVM en production) est tué avec lui.
+        - Vérifie que l'analyse suivante réussit grâce au redémarrage des workers.
+
+    Returns:
+        None
+    """
+    crash_tf, hang_tf, ok_tf = (tmp_path / n for n in ("crash.tf", "hang.tf", "ok.tf"))
+    crash_tf.write_text("crash")
+    hang_tf.write_text("hang")
+    ok_tf.write_text('resource "aws_s3_bucket" "ok" {\n}')
+    output = tmp_path / "ok.json"
+
+    with pytest.raises(subprocess.CalledProcessError):
+        worker_pool.run(str(crash_tf), str(tmp_path / "crash.json"))
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        worker_pool.run(str(hang_tf), str(tmp_path / "hang.json"))
+    if os.path.isdir("/proc"):
+        child_pid = int((tmp_path / "hang.json.pid").read_text())
+        deadline = time.monotonic() + 5
+        while _is_running(child_pid) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not _is_running(child_pid)
+
+    worker_pool.run(str(ok_tf), str(output))
+    assert json.loads(output.read_text())["data"][0]["block_identifiers"] == (
+        "resource aws_s3_bucket ok"
+    )
+
+
+@pytest.mark.skipif(
+    not (shutil.which("javac") and shutil.which("jar")), reason="JDK indisponible"
+)
+def test_java_worker_keeps_terrametrics_loaded(tmp_path):
+    """
+    Teste que le worker Java par défaut charge TerraMetrics une seule fois.
+
+    Scénario :
+        - Un JAR factice est compilé, avec un point d'entrée qui compte ses appels.
+        - Un pool d'un seul worker, lancé avec la commande par défaut, traite deux
+          analyses.
+
+    Assertions :
+        - Vérifie que les deux analyses sont servies par la même JVM (le compteur
+          du point d'entrée atteint 2), malgré ses écritures sur la sortie standard.
+
+    Returns:
+        None
+    """
+    (tmp_path / "FakeTerraMetrics.java").write_text(FAKE_TERRAMETRICS)
+    (tmp_path / "MANIFEST.MF").write_text("Main-Class: FakeTerraMetrics\n")
+    classes = tmp_path / "classes"
+    subprocess.run(
+        ["javac", "-d", str(classes), str(tmp_path / "FakeTerraMetrics.java")], check=True
+    )
+    jar_path = str(tmp_path / "fake.jar")
+    subprocess.run(
+        ["jar", "cfm", jar_path, str(tmp_path / "MANIFEST.MF"), "-C", str(classes), "."],
+        check=True,
+    )
+    tf_path = tmp_path / "main.tf"
+    tf_path.write_text('resource "aws_s3_bucket" "a" {\n}\n')
+
+    pool = TerraMetricsWorkerPool(jar_path, size=1, timeout=60)
+    try:
+        for run in (1, 2):
+            output = tmp_path / f"out{run}.json"
+            pool.run(str(tf_path), str(output))
+            assert json.loads(output.read_text())["calls"] == run
+    finally:
+        pool.close()
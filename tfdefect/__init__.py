@@ -0,0 +1,12 @@
+"""
+API Python de TFDefectGA : analyse et prédiction de défauts Terraform en bibliothèque.
+
+    import tfdefect
+
+    with tfdefect.Analyzer("/depots/infra", model="randomforest", cache_dir="/var/cache/tfdefect") as analyzer:
+        result = analyzer.analyze()
+"""
+
+from tfdefect.analyzer import AnalysisCaches, Analyzer
+
+__all__ = ["AnalysisCaches", "Analyzer"]
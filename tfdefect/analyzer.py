@@ -0,0 +1,236 @@
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, List, Tuple
+
+from app import config
+from core.parsers.parse_cache import ParseCache
+from core.parsers.terrametrics_cache import TerraMetricsCache
+from core.use_cases.feature_vector_builder import FeatureVectorBuilder
+from infrastructure.git.git_adapter import resolve_analyzed_commit
+from infrastructure.git.head_resolver import HeadResolver
+from infrastructure.ml.base_model import BaseModel, Vectors
+from infrastructure.ml.defect_history_manager import update_defect_history
+from infrastructure.ml.ensemble_model import EnsembleModel
+from infrastructure.ml.feature_matrix import FeatureMatrix
+from infrastructure.ml.feature_store import FeatureStore
+from infrastructure.ml.model_factory import ModelFactory
+
+
+def repo_digest(repo_path: str) -> str:
+    """Identifiant court d'un dépôt (répertoire de ses données dans le cache)."""
+    return hashlib.sha1(os.path.abspath(repo_path).encode()).hexdigest()[:16]
+
+
+def predict_blocks(model: BaseModel, vectors: Vectors) -> Dict[str, dict]:
+    """
+    Prédit chaque bloc et met en forme le résultat.
+
+    Args:
+        model (BaseModel): Modèle de prédiction.
+        vectors (Vectors): Matrice construite pour le schéma du modèle.
+
+    Returns:
+        Dict[str, dict]: {block_id: {"fault_prone": 0|1, "probability": float}}, avec
+        les probabilités de chaque modèle ("models") pour un ensemble.
+    """
+    member_predictions = {}
+    if isinstance(model, EnsembleModel):
+        member_predictions = model.predict_members(vectors)
+        predictions = model.combine(member_predictions)
+    else:
+        predictions = model.predict_with_confidence(vectors)
+
+    results = {}
+    for block_id, (label, proba) in predictions.items():
+        result = {"fault_prone": int(label), "probability": float(proba)}
+        if member_predictions:
+            result["models"] = {
+                name: float(member[block_id][1])
+                for name, member in member_predictions.items()
+            }
+        results[block_id] = result
+    return results
+
+
+class AnalysisCaches:
+    """
+    Caches adressés par contenu d'un répertoire (découpages, métriques TerraMetrics,
+    vecteurs), passés explicitement aux extractions des analyseurs qui les reçoivent.
+
+    Aucun cache global du processus n'est modifié : des analyseurs utilisant des
+    répertoires différents peuvent fonctionner en même temps.
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        Args:
+            cache_dir (str): Répertoire des caches (créé si nécessaire).
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.parse_cache = ParseCache(os.path.join(self.cache_dir, "parse_cache.db"))
+        self.metrics_cache = TerraMetricsCache(
+            os.path.join(self.cache_dir, "terrametrics_cache.db"),
+            config.TERRAMETRICS_CACHE_MAX_MB * 1024 * 1024,
+        )
+        self.feature_store = FeatureStore(os.path.join(self.cache_dir, "feature_store"))
+
+    def close(self):
+        """Ferme les bases SQLite des caches."""
+        self.parse_cache.close()
+        self.metrics_cache.close()
+
+
+class Analyzer:
+    """
+    Analyse en bibliothèque des blocs Terraform modifiés par un commit d'un dépôt
+    (HEAD par défaut), sans ligne de commande ni variables globales de chemins.
+
+    Toutes les données persistantes sont placées sous `cache_dir` : les caches
+    adressés par contenu (découpages, métriques TerraMetrics, vecteurs) peuvent être
+    partagés par plusieurs dépôts (`caches`), l'historique des blocs et celui des
+    prédictions sont propres à chaque dépôt (`repos/<empreinte du chemin>/`). Les
+    extracteurs sont créés une fois par analyseur et les modèles une fois par
+    processus (`ModelRegistry`).
+
+    Exemple :
+        analyzer = Analyzer("/depots/infra", model="randomforest", cache_dir="/var/cache/tfdefect")
+        result = analyzer.analyze()          # HEAD
+        previous = analyzer.analyze("HEAD~1")  # autre révision
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        model: str = "randomforest",
+        cache_dir: str = None,
+        members: List[str] = None,
+        jar_path: str = None,
+        record_history: bool = True,
+        feature_store: bool = True,
+        caches: AnalysisCaches = None,
+    ):
+        """
+        Args:
+            repo_path (str): Chemin du dépôt Git.
+            model (str): Type du modèle (voir `ModelFactory`).
+            cache_dir (str, optional): Répertoire des caches et historiques (par défaut,
+                celui de `caches`, sinon un répertoire temporaire supprimé par `close()`).
+            members (List[str], optional): Modèles combinés par 'ensemble'.
+            jar_path (str, optional): JAR TerraMetrics (par défaut `config.TERRAMETRICS_JAR_PATH`).
+            record_history (bool): Enregistrer les prédictions dans l'historique du dépôt.
+            feature_store (bool): Réutiliser les vecteurs déjà extraits pour un commit.
+            caches (AnalysisCaches, optional): Caches partagés avec d'autres analyseurs
+                (par défaut, ceux de `cache_dir`, ouverts et fermés par l'analyseur).
+        """
+        self.repo_path = os.path.abspath(repo_path)
+        self.model_type = model.lower()
+        self.members = members
+        self.jar_path = jar_path or config.TERRAMETRICS_JAR_PATH
+        self.record_history = record_history
+        self.feature_store = feature_store
+
+        self._tmp_dir = None
+        if cache_dir is None and caches is not None:
+            cache_dir = caches.cache_dir
+        if cache_dir is None:
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix="tfdefect-")
+            cache_dir = self._tmp_dir.name
+        self.cache_dir = os.path.abspath(cache_dir)
+
+        self._owns_caches = caches is None
+        self.caches = caches if caches is not None else AnalysisCaches(self.cache_dir)
+
+        repo_dir = os.path.join(self.cache_dir, "repos", repo_digest(self.repo_path))
+        self.history_db_path = os.path.join(repo_dir, "block_history.db")
+        self.defect_history_path = os.path.join(repo_dir, "defect_history.db")
+
+        self._lock = threading.Lock()
+        self._builder = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def model(self) -> BaseModel:
+        """Retourne le modèle (chargé une fois par processus, rechargé si son fichier change)."""
+        return ModelFactory.get_model(self.model_type, self.members)
+
+    def vectors(self, commit: str = None) -> Tuple[str, FeatureMatrix]:
+        """
+        Construit les vecteurs des blocs modifiés par un commit du dépôt.
+
+        La révision est résolue une seule fois : le hash obtenu sert à lire les
+        changements, l'historique du commit et la clé du magasin de features, même si
+        HEAD avance pendant l'analyse.
+
+        Args:
+            commit (str, optional): Révision analysée (hash, branche, tag ; par défaut HEAD).
+                Un merge est analysé à travers son dernier ancêtre qui n'est pas un merge.
+
+        Returns:
+            Tuple[str, FeatureMatrix]: Hash du commit analysé et matrice des blocs modifiés.
+
+        Raises:
+            ValueError: Si la révision est inconnue.
+        """
+        with self._lock:
+            analysed = resolve_analyzed_commit(self.repo_path, commit or "HEAD")
+            if self._builder is None:
+                model = self.model()
+                self._builder = FeatureVectorBuilder(
+                    self.repo_path,
+                    self.jar_path,
+                    model_name=self.model_type,
+                    selected_features=(
+                        model.selected_features
+                        if isinstance(model, EnsembleModel)
+                        else None
+                    ),
+                    history_db_path=self.history_db_path,
+                    defect_history_path=self.defect_history_path,
+                    parse_cache=self.caches.parse_cache,
+                    metrics_cache=self.caches.metrics_cache,
+                    feature_store=self.caches.feature_store if self.feature_store else None,
+                )
+            return analysed, self._builder.build_vectors(analysed)
+
+    def analyze(self, commit: str = None) -> dict:
+        """
+        Prédit les blocs modifiés par un commit du dépôt.
+
+        Args:
+            commit (str, optional): Révision analysée (par défaut HEAD).
+
+        Returns:
+            dict: {"commit": hash, "predictions": {block_id: {"fault_prone": 0|1,
+            "probability": float, ["models": {...}]}}}
+        """
+        analysed, vectors = self.vectors(commit)
+        predictions = predict_blocks(self.model(), vectors) if len(vectors) else {}
+
+        if self.record_history and predictions:
+            update_defect_history(
+                {block_id: p["fault_prone"] for block_id, p in predictions.items()},
+                self.defect_history_path,
+                self.repo_path,
+                commit=analysed,
+            )
+        return {"commit": analysed, "predictions": predictions}
+
+    def close(self):
+        """
+        Ferme les caches de l'analyseur, libère le dépôt ouvert pour la résolution des
+        commits et supprime son répertoire temporaire éventuel.
+        """
+        # Attend la fin d'une analyse en cours
+        with self._lock:
+            HeadResolver.evict(self.repo_path)
+            if self._owns_caches:
+                self.caches.close()
+            if self._tmp_dir is not None:
+                self._tmp_dir.cleanup()
+                self._tmp_dir = None
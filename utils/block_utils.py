@@ -1,3 +1,12 @@
+import re
+from typing import Optional
+
+# En-tête d'un bloc : mot-clé suivi de ses libellés, jusqu'à l'accolade ouvrante
+BLOCK_HEADER_PATTERN = re.compile(
+    r"^\s*(resource|variable|module|output|provider|data|terraform|locals)\b([^{]*)"
+)
+
+
 def extract_block_identifier(block: str) -> str:
     """
     Extrait un identifiant unique pour un bloc Terraform.
@@ -25,3 +34,25 @@ def extract_block_identifier(block: str) -> str:
         elif line.startswith("terraform"):
             return "terraform"
     return ""
+
+
+def terrametrics_block_identifier(block: str) -> Optional[str]:
+    """
+    Calcule l'identifiant d'un bloc au format de TerraMetrics.
+
+    Exemple : 'resource "aws_instance" "example" {' -> 'resource aws_instance example'
+
+    Args:
+        block (str): Contenu brut du bloc.
+
+    Returns:
+        Optional[str]: Identifiant, ou None si l'en-tête n'est pas reconnu.
+    """
+    for line in block.strip().splitlines():
+        match = BLOCK_HEADER_PATTERN.match(line)
+        if match:
+            labels = [label.strip('"') for label in match.group(2).split()]
+            return " ".join([match.group(1)] + labels)
+        if line.strip():
+            return None
+    return None
@@ -0,0 +1,169 @@
+def osa_distance(a: str, b: str, upper_bound: int = None) -> int:
+    """
+    Calcule la distance de Damerau-Levenshtein (variante « alignement optimal de
+    chaînes » : insertion, suppression, substitution et transposition de deux
+    caractères adjacents) entre deux chaînes.
+
+    Le préfixe et le suffixe communs sont écartés, puis la distance est calculée par
+    l'algorithme bit-parallèle de Hyyrö : une colonne entière de la matrice de
+    programmation dynamique est codée dans les bits d'un entier, soit
+    O(len(a) * len(b) / 64) opérations machine au lieu de O(len(a) * len(b)).
+
+    Si une borne supérieure de la distance est connue, seule la bande diagonale de
+    la matrice qu'un alignement optimal peut traverser est calculée (Ukkonen) : le
+    coût devient O(len(b) * upper_bound / 64), et le résultat reste exact.
+
+    Args:
+        a (str): Première chaîne.
+        b (str): Seconde chaîne.
+        upper_bound (int, optional): Majorant de la distance (ex: coût d'un
+            alignement quelconque des deux chaînes).
+
+    Returns:
+        int: Distance d'édition.
+    """
+    # Préfixe et suffixe communs : sans effet sur la distance
+    start = 0
+    limit = min(len(a), len(b))
+    while start < limit and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+
+    # La chaîne la plus longue est codée en bits, la plus courte est parcourue
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+
+    if upper_bound is not None:
+        band = max(upper_bound, len(a) - len(b))
+        if _band_width(band, _band_chunk(band)) < len(a):
+            return _osa_distance_banded(a, b, band)
+    return _osa_distance_full(a, b)
+
+
+def _osa_distance_full(a: str, b: str) -> int:
+    """Distance OSA sur la matrice complète (une colonne de `len(a)` bits par caractère de `b`)."""
+    m = len(a)
+    peq = _match_masks(a)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    vp, vn, d0, pm_previous = mask, 0, 0, 0
+    distance = m
+
+    for char in b:
+        pm = peq.get(char, 0)
+        # Transpositions : correspondance croisée avec le caractère précédent
+        tr = (((~d0) & pm) << 1) & pm_previous
+        d0 = ((((pm & vp) + vp) ^ vp) | pm | vn | tr) & mask
+        hp = vn | (mask ^ (d0 | vp))
+        hn = d0 & vp
+
+        if hp & last:
+            distance += 1
+        elif hn & last:
+            distance -= 1
+
+        hp = ((hp << 1) | 1) & mask
+        hn = (hn << 1) & mask
+        vp = hn | (mask ^ (d0 | hp))
+        vn = hp & d0
+        pm_previous = pm
+
+    return distance
+
+
+def _osa_distance_banded(a: str, b: str, band: int, chunk: int = None) -> int:
+    """
+    Distance OSA limitée aux cellules (i, j) telles que |i - j| <= band.
+
+    Les colonnes ne codent qu'une fenêtre de lignes de `a`, qui descend par pas de
+    `chunk` lignes le long de la diagonale. La ligne au-dessus de la fenêtre vaut
+    celle de sa première ligne (hors bande) + 1, et les lignes qui entrent par le bas
+    celle de la ligne précédente + 1 : chaque valeur calculée majore donc la valeur
+    exacte, et lui est égale le long d'un alignement restant dans la bande, ce qui
+    est le cas d'un alignement optimal dès que sa distance ne dépasse pas `band`.
+
+    Args:
+        a (str): Chaîne codée en bits (la plus longue).
+        b (str): Chaîne parcourue.
+        band (int): Majorant de la distance (au moins len(a) - len(b)).
+        chunk (int, optional): Pas de descente de la fenêtre.
+
+    Returns:
+        int: Distance d'édition.
+    """
+    m = len(a)
+    chunk = chunk or _band_chunk(band)
+    width = min(m, _band_width(band, chunk))
+    mask = (1 << width) - 1
+
+    # Fenêtre : lignes top + 1 .. top + width ; base = D[top][j]
+    top, base = 0, 0
+    peq = _match_masks(a[:width])
+    vp, vn, d0, pm_previous = mask, 0, 0, 0
+
+    for j, char in enumerate(b, 1):
+        # Lignes au-dessus de la bande (transpositions comprises) : la fenêtre descend
+        # (jusqu'à la dernière position, qui couvre la ligne m)
+        new_top = min(j - band - 3, m - width)
+        if new_top - top >= chunk or top < new_top == m - width:
+            shift = new_top - top
+            # Nouvelle première ligne, hors bande : la ligne au-dessus vaut sa valeur + 1,
+            # elle ne fournit donc jamais le minimum (et les deltas restent dans {-1, 0, 1})
+            kept = (1 << (shift + 1)) - 1
+            base += _popcount(vp & kept) - _popcount(vn & kept) + 1
+            entering = mask ^ (mask >> shift)
+            # Lignes entrantes : D[i][j - 1] = D[i - 1][j - 1] + 1, sans transposition
+            vp = ((vp >> shift) | entering) & ~1
+            vn = (vn >> shift) | 1
+            d0 = (d0 >> shift) | entering
+            top = new_top
+            peq = _match_masks(a[top : top + width])
+            pm_previous = peq.get(b[j - 2], 0)
+
+        pm = peq.get(char, 0)
+        tr = (((~d0) & pm) << 1) & pm_previous
+        d0 = ((((pm & vp) + vp) ^ vp) | pm | vn | tr) & mask
+        hp = vn | (mask ^ (d0 | vp))
+        hn = d0 & vp
+
+        hp = ((hp << 1) | 1) & mask
+        hn = (hn << 1) & mask
+        vp = hn | (mask ^ (d0 | hp))
+        vn = hp & d0
+        pm_previous = pm
+        # Ligne au-dessus de la fenêtre : une insertion par colonne
+        base += 1
+
+    # La fenêtre couvre la dernière ligne : D[m][n] = D[top][n] + somme des deltas
+    return base + _popcount(vp) - _popcount(vn)
+
+
+def _band_chunk(band: int) -> int:
+    return max(64, band // 2)
+
+
+def _band_width(band: int, chunk: int) -> int:
+    # Bande de part et d'autre de la diagonale, retard de descente, première ligne
+    # sacrifiée et transpositions
+    return 2 * band + 2 * chunk + 4
+
+
+def _match_masks(a: str) -> dict:
+    """Masques de correspondance : bit i de masks[c] à 1 si a[i] == c."""
+    masks = {}
+    bit = 1
+    for char in a:
+        masks[char] = masks.get(char, 0) | bit
+        bit <<= 1
+    return masks
+
+
+def _popcount(value: int) -> int:
+    return bin(value).count("1")
@@ -4,7 +4,15 @@ import sys
 logger = logging.getLogger("TFDefect")
 logger.setLevel(logging.DEBUG)
 
-if not logger.hasHandlers():
+
+def configure_logging():
+    """
+    Affiche les messages sur la sortie standard (points d'entrée en ligne de
+    commande ; en bibliothèque, la configuration est laissée à l'application).
+    """
+    if logger.hasHandlers():
+        return
+
     handler = logging.StreamHandler(sys.stdout)
     handler.setLevel(logging.DEBUG)
 
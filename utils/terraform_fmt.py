@@ -0,0 +1,50 @@
+import subprocess
+from functools import lru_cache
+
+from utils.logger_utils import logger
+
+_terraform_missing = False
+
+
+@lru_cache(maxsize=1024)
+def format_terraform_source(content: str) -> str:
+    """
+    Applique `terraform fmt` à un contenu Terraform, en mémoire (`terraform fmt -`).
+
+    Les blocs sont lus dans les fichiers au commit analysé et non dans la copie de
+    travail : le formatage est donc appliqué au contenu lu, sans modifier le dépôt.
+    Si Terraform n'est pas installé ou si le formatage échoue (syntaxe invalide),
+    le contenu est retourné tel quel.
+
+    Args:
+        content (str): Contenu d'un fichier `.tf`.
+
+    Returns:
+        str: Contenu formaté, ou le contenu d'origine en cas d'échec.
+    """
+    global _terraform_missing
+    if _terraform_missing:
+        return content
+
+    try:
+        result = subprocess.run(
+            ["terraform", "fmt", "-"],
+            input=content,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except FileNotFoundError:
+        _terraform_missing = True
+        logger.warning(
+            "Terraform n'est pas installé. Impossible d'appliquer terraform fmt."
+        )
+        return content
+    except Exception as e:
+        logger.error(f"Erreur lors de terraform fmt : {e}")
+        return content
+
+    if result.returncode != 0:
+        logger.warning(f"terraform fmt a échoué, contenu non formaté : {result.stderr.strip()}")
+        return content
+    return result.stdout